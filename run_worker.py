@@ -13,12 +13,15 @@ from src.worker import ArkWatchWorker
 async def main():
     worker = ArkWatchWorker()
     
-    # Run once if --once flag
-    if "--once" in sys.argv:
-        await worker.run_cycle()
-    else:
-        # Run forever with 5 minute intervals
-        await worker.run_forever(check_interval=300)
+    try:
+        # Run once if --once flag
+        if "--once" in sys.argv:
+            await worker.run_cycle()
+        else:
+            # Run forever, waking whenever the next watch is due
+            await worker.run_forever()
+    finally:
+        await worker.aclose()
 
 
 if __name__ == "__main__":
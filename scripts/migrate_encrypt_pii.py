@@ -6,7 +6,8 @@ Usage:
 
 This script:
 1. Backs up existing data files
-2. Encrypts PII fields (email, name, IP) in api_keys.json
+2. Encrypts PII fields (email, name, IP) in api_keys.json and adds the
+   blind index used for lookups (email, stripe_customer_id)
 3. Encrypts PII fields (notify_email, user_email) in watches.json
 4. Verifies decryption works correctly
 """
@@ -16,7 +17,7 @@ import shutil
 import sys
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from src.crypto import encrypt_pii, decrypt_pii, is_encrypted
+from src.crypto import blind_index, encrypt_pii, decrypt_pii, is_encrypted
 
 DATA_DIR = "/opt/claude-ceo/workspace/arkwatch/data"
 BACKUP_DIR = f"{DATA_DIR}/.backup_pre_encryption"
@@ -25,6 +26,7 @@ API_KEYS_FILE = f"{DATA_DIR}/api_keys.json"
 WATCHES_FILE = f"{DATA_DIR}/watches.json"
 
 API_KEY_PII_FIELDS = ("email", "name", "privacy_accepted_ip")
+API_KEY_INDEXED_FIELDS = ("email", "stripe_customer_id")
 WATCH_PII_FIELDS = ("notify_email", "user_email")
 
 
@@ -47,6 +49,8 @@ def migrate_api_keys():
 
     count = 0
     for key_hash, user_data in keys.items():
+        for field in API_KEY_INDEXED_FIELDS:
+            user_data[f"{field}_bidx"] = blind_index(decrypt_pii(user_data.get(field)), field)
         for field in API_KEY_PII_FIELDS:
             val = user_data.get(field)
             if val and isinstance(val, str) and not is_encrypted(val):
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""One-shot migration: import watches.json and reports.json into the SQLite backend.
+
+Usage:
+    python3 scripts/migrate_json_to_sqlite.py [--force]
+
+This script:
+1. Backs up existing JSON data files
+2. Copies every watch and report into arkwatch.db (PII stays encrypted as stored)
+3. Verifies record counts match
+
+Then set ARKWATCH_STORAGE_BACKEND=sqlite for the API and the worker.
+"""
+import json
+import os
+import shutil
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.storage.database import DATA_DIR, REPORTS_FILE, SQLITE_FILE, WATCHES_FILE
+from src.storage.report_log import ReportLog
+from src.storage.sqlite_backend import SQLiteDatabase
+
+BACKUP_DIR = f"{DATA_DIR}/.backup_pre_sqlite_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+
+def backup_file(filepath):
+    if not os.path.exists(filepath):
+        return
+    os.makedirs(BACKUP_DIR, exist_ok=True)
+    dest = os.path.join(BACKUP_DIR, os.path.basename(filepath))
+    if os.path.isdir(filepath):
+        shutil.copytree(filepath, dest)
+    else:
+        shutil.copy2(filepath, dest)
+    print(f"  Backed up: {filepath} -> {dest}")
+
+
+def count_records(filepath):
+    if not os.path.exists(filepath):
+        return 0
+    with open(filepath) as f:
+        return len(json.load(f))
+
+
+def main():
+    force = "--force" in sys.argv
+
+    print("=== ArkWatch JSON -> SQLite Migration ===\n")
+    print("Step 1: Backing up JSON files...")
+    backup_file(WATCHES_FILE)
+    backup_file(REPORTS_FILE)
+    backup_file(ReportLog(REPORTS_FILE).segment_dir)
+
+    print(f"\nStep 2: Importing into {SQLITE_FILE}...")
+    db = SQLiteDatabase(SQLITE_FILE)
+    try:
+        counts = db.import_json(WATCHES_FILE, REPORTS_FILE, force=force)
+    except RuntimeError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+    print(f"  Imported {counts['watches']} watches, {counts['reports']} reports")
+
+    print("\nStep 3: Verifying...")
+    expected_watches = count_records(WATCHES_FILE)
+    expected_reports = sum(1 for _ in ReportLog(REPORTS_FILE).reports())
+    assert len(db.get_watches()) >= expected_watches, "Watch count mismatch"
+    assert len(db.get_reports(limit=expected_reports + 1)) >= expected_reports, "Report count mismatch"
+    print("  All verifications passed!")
+
+    print("\nDone! Set ARKWATCH_STORAGE_BACKEND=sqlite and restart arkwatch-api / arkwatch-worker.")
+
+
+if __name__ == "__main__":
+    main()
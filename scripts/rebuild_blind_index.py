@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Rebuild the blind index (<field>_bidx) of api_keys.json.
+
+Usage:
+    ARKWATCH_PII_KEY=<key> [ARKWATCH_BLIND_INDEX_KEY=<key>] python3 scripts/rebuild_blind_index.py
+
+Run after setting or changing ARKWATCH_BLIND_INDEX_KEY. Stop the API first:
+lookups by email or Stripe customer ID miss records whose index was built
+with another key.
+"""
+
+import json
+import os
+import shutil
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.crypto import blind_index, decrypt_pii, is_encrypted
+
+DATA_DIR = "/opt/claude-ceo/workspace/arkwatch/data"
+BACKUP_DIR = f"{DATA_DIR}/.backup_pre_bidx_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+API_KEYS_FILE = f"{DATA_DIR}/api_keys.json"
+
+API_KEY_INDEXED_FIELDS = ("email", "stripe_customer_id")
+
+
+def main():
+    if not os.path.exists(API_KEYS_FILE):
+        print("api_keys.json not found, nothing to do")
+        return
+
+    os.makedirs(BACKUP_DIR, exist_ok=True)
+    shutil.copy2(API_KEYS_FILE, os.path.join(BACKUP_DIR, "api_keys.json"))
+    print(f"Backed up api_keys.json to {BACKUP_DIR}")
+
+    with open(API_KEYS_FILE) as f:
+        keys = json.load(f)
+
+    errors = 0
+    for key_hash, user_data in keys.items():
+        for field in API_KEY_INDEXED_FIELDS:
+            plaintext = decrypt_pii(user_data.get(field))
+            if is_encrypted(plaintext):
+                print(f"  FAIL: cannot decrypt {field} in {key_hash[:8]}... (wrong ARKWATCH_PII_KEY?)")
+                errors += 1
+                continue
+            user_data[f"{field}_bidx"] = blind_index(plaintext, field)
+
+    if errors:
+        print(f"{errors} field(s) could not be decrypted; api_keys.json left unchanged")
+        sys.exit(1)
+
+    tmp = f"{API_KEYS_FILE}.tmp.{os.getpid()}"
+    with open(tmp, "w") as f:
+        json.dump(keys, f, indent=2, default=str)
+    os.chmod(tmp, 0o600)
+    os.replace(tmp, API_KEYS_FILE)
+    print(f"Rebuilt blind index for {len(keys)} API key(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,9 @@ This script:
 1. Backs up data files
 2. Decrypts PII fields using old key
 3. Re-encrypts PII fields using new key
-4. Verifies all decryption works with new key
+4. Rebuilds the blind index of api_keys.json (keyed from the new key unless
+   ARKWATCH_BLIND_INDEX_KEY is set)
+5. Verifies all decryption works with new key
 """
 import json
 import os
@@ -17,7 +19,7 @@ import sys
 from datetime import datetime
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from src.crypto import _ENC_PREFIX, is_encrypted
+from src.crypto import _ENC_PREFIX, blind_index, is_encrypted
 
 from cryptography.fernet import Fernet, InvalidToken
 import base64
@@ -30,6 +32,7 @@ API_KEYS_FILE = f"{DATA_DIR}/api_keys.json"
 WATCHES_FILE = f"{DATA_DIR}/watches.json"
 
 API_KEY_PII_FIELDS = ("email", "name", "privacy_accepted_ip")
+API_KEY_INDEXED_FIELDS = ("email", "stripe_customer_id")
 WATCH_PII_FIELDS = ("notify_email", "user_email")
 
 
@@ -87,6 +90,9 @@ def rotate_api_keys(f_old: Fernet, f_new: Fernet) -> int:
                 if not is_encrypted(plaintext):
                     user_data[field] = encrypt_value(f_new, plaintext)
                     count += 1
+        for field in API_KEY_INDEXED_FIELDS:
+            plaintext = decrypt_value(f_new, user_data.get(field))
+            user_data[f"{field}_bidx"] = blind_index(plaintext, field)
 
     with open(API_KEYS_FILE, "w") as f:
         json.dump(keys, f, indent=2, default=str)
@@ -1,5 +1,6 @@
 """ArkWatch Analyzer Module - AI-powered content analysis"""
 
 from .analyzer import AnalysisResult, ContentAnalyzer
+from .cache import AnalysisCache
 
-__all__ = ["ContentAnalyzer", "AnalysisResult"]
+__all__ = ["ContentAnalyzer", "AnalysisResult", "AnalysisCache"]
@@ -6,8 +6,13 @@ import sys
 from dataclasses import dataclass
 from datetime import UTC, datetime
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import httpx
+from .batch import ANALYSIS_BATCH_SIZE, AnalysisBatcher
+from .dispatch import LLMDispatcher
+
+if TYPE_CHECKING:
+    from .cache import AnalysisCache
 
 # Ajouter le path pour importer mistral_client
 sys.path.insert(0, "/opt/claude-ceo/automation")
@@ -25,6 +30,11 @@ if Path(CREDENTIALS_FILE).exists():
 MISTRAL_API_KEY = os.environ.get("MISTRAL_API_KEY")
 MISTRAL_API_URL = os.environ.get("MISTRAL_API_URL", "https://api.mistral.ai/v1")
 
+# Characters of the diff sent to the model (also all the analysis cache keys on)
+DIFF_PROMPT_CHARS = 2000
+# Answer mechanical changes (date/counter bumps, reordering, whitespace) locally instead of asking the model
+HEURISTIC_CLASSIFIER = os.getenv("ARKWATCH_HEURISTIC_CLASSIFIER", "1") == "1"
+
 
 @dataclass
 class AnalysisResult:
@@ -42,20 +52,84 @@ class AnalysisResult:
 class ContentAnalyzer:
     """Analyze content changes using Mistral API"""
 
-    def __init__(self, model: str = "mistral-small-latest"):
+    def __init__(
+        self,
+        model: str = "mistral-small-latest",
+        cache: "AnalysisCache | None" = None,
+        dispatcher: LLMDispatcher | None = None,
+        batch_size: int | None = None,
+        heuristics: bool | None = None,
+    ):
         self.model = model
         self.api_url = f"{MISTRAL_API_URL}/chat/completions"
         self.api_key = MISTRAL_API_KEY
+        self.cache = cache
+        # Shared client, concurrency cap and rate limiting for every API call
+        self.dispatcher = dispatcher or LLMDispatcher(self.api_url, self.api_key)
+        # Changes detected close together share one API call when batching is on
+        batch_size = ANALYSIS_BATCH_SIZE if batch_size is None else batch_size
+        self.batcher = AnalysisBatcher(self, batch_size) if batch_size > 1 else None
+        self.heuristics = HEURISTIC_CLASSIFIER if heuristics is None else heuristics
+
+    async def aclose(self):
+        """Release the pooled API client."""
+        await self.dispatcher.aclose()
 
     async def analyze_changes(self, url: str, old_content: str, new_content: str, diff: str) -> AnalysisResult:
-        """Analyze changes between old and new content"""
+        """Analyze changes between old and new content (served from the cache when the same diff was seen)"""
+        result = self.local_result(url, diff)
+        if result is not None:
+            return result
+        return await self.analyze_remote(url, diff)
+
+    def local_result(self, url: str, diff: str) -> AnalysisResult | None:
+        """Analysis available without calling the API: a mechanical change or a cached one"""
+        if self.heuristics:
+            from .classifier import heuristic_result
+
+            result = heuristic_result(diff)
+            if result is not None:
+                return result
+        if self.cache is not None:
+            return self.cache.get(self._cache_key(url, diff))
+        return None
+
+    async def analyze_remote(self, url: str, diff: str) -> AnalysisResult:
+        """Ask the API for an analysis (batched when batching is on) and cache it"""
+        result = await self._analyze(url, diff)
+        if self.cache is not None:
+            self.cache.put(self._cache_key(url, diff), result)
+        return result
+
+    def _cache_key(self, url: str, diff: str) -> str:
+        from .cache import diff_fingerprint
+
+        return diff_fingerprint(url, diff, self.model)
+
+    async def _analyze(self, url: str, diff: str) -> AnalysisResult:
+        if self.batcher is not None:
+            return await self.batcher.submit(url, diff)
+        return await self._request_analysis(url, diff)
+
+    def _result_from(self, data: dict) -> AnalysisResult:
+        return AnalysisResult(
+            summary=data.get("summary", "Analyse non disponible"),
+            key_changes=data.get("key_changes", []),
+            sentiment=data.get("sentiment", "neutral"),
+            importance=data.get("importance", "medium"),
+            analyzed_at=datetime.now(UTC),
+            model_used=self.model,
+        )
+
+    async def _request_analysis(self, url: str, diff: str) -> AnalysisResult:
+        """Ask the model to analyze a diff"""
 
         prompt = f"""Tu es un assistant d'analyse de veille web. Analyse les changements suivants sur une page web.
 
 URL surveillée: {url}
 
 Diff des changements:
-{diff[:2000]}
+{diff[:DIFF_PROMPT_CHARS]}
 
 Réponds en JSON avec ce format exact:
 {{
@@ -68,55 +142,99 @@ Réponds en JSON avec ce format exact:
 Réponds UNIQUEMENT avec le JSON, sans texte avant ou après."""
 
         try:
-            async with httpx.AsyncClient(timeout=60) as client:
-                response = await client.post(
-                    self.api_url,
-                    headers={"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"},
-                    json={
-                        "model": self.model,
-                        "temperature": 0.3,
-                        "max_tokens": 500,
-                        "messages": [{"role": "user", "content": prompt}],
-                    },
-                )
-
-                if response.status_code != 200:
-                    return self._error_result(f"Mistral error: {response.status_code}")
-
-                result = response.json()
-                text = result["choices"][0]["message"]["content"]
-
-                # Parse JSON response
-                try:
-                    # Find JSON in response
-                    start = text.find("{")
-                    end = text.rfind("}") + 1
-                    if start >= 0 and end > start:
-                        data = json.loads(text[start:end])
-                        return AnalysisResult(
-                            summary=data.get("summary", "Analyse non disponible"),
-                            key_changes=data.get("key_changes", []),
-                            sentiment=data.get("sentiment", "neutral"),
-                            importance=data.get("importance", "medium"),
-                            analyzed_at=datetime.now(UTC),
-                            model_used=self.model,
-                        )
-                except json.JSONDecodeError:
-                    pass
-
-                # Fallback if JSON parsing fails
-                return AnalysisResult(
-                    summary=text[:500],
-                    key_changes=[],
-                    sentiment="neutral",
-                    importance="medium",
-                    analyzed_at=datetime.now(UTC),
-                    model_used=self.model,
-                )
+            response = await self.dispatcher.post(
+                {
+                    "model": self.model,
+                    "temperature": 0.3,
+                    "max_tokens": 500,
+                    "messages": [{"role": "user", "content": prompt}],
+                }
+            )
+
+            if response.status_code != 200:
+                return self._error_result(f"Mistral error: {response.status_code}")
+
+            result = response.json()
+            text = result["choices"][0]["message"]["content"]
+
+            # Parse JSON response
+            try:
+                # Find JSON in response
+                start = text.find("{")
+                end = text.rfind("}") + 1
+                if start >= 0 and end > start:
+                    return self._result_from(json.loads(text[start:end]))
+            except json.JSONDecodeError:
+                pass
+
+            # Fallback if JSON parsing fails
+            return AnalysisResult(
+                summary=text[:500],
+                key_changes=[],
+                sentiment="neutral",
+                importance="medium",
+                analyzed_at=datetime.now(UTC),
+                model_used=self.model,
+            )
 
         except Exception as e:
             return self._error_result(str(e))
 
+    async def _request_batch(self, items: list[tuple[str, str]]) -> list[AnalysisResult | None] | None:
+        """Analyze several (url, diff) changes in one API call.
+
+        Returns one result per item, None for items the response left out, or
+        None altogether when the response could not be parsed. API errors are
+        returned as error results for every item, as for a single request.
+        """
+        changes = "\n\n".join(
+            f"### Changement {i}\nURL surveillée: {url}\n\nDiff des changements:\n{diff[:DIFF_PROMPT_CHARS]}"
+            for i, (url, diff) in enumerate(items, 1)
+        )
+        prompt = f"""Tu es un assistant d'analyse de veille web. Analyse séparément chacun des {len(items)} changements suivants, chacun sur sa propre page web.
+
+{changes}
+
+Réponds en JSON avec ce format exact, une entrée par changement avec son numéro comme "id":
+{{
+    "analyses": [
+        {{
+            "id": 1,
+            "summary": "Résumé en 1-2 phrases des changements",
+            "key_changes": ["changement 1", "changement 2"],
+            "sentiment": "positive|negative|neutral",
+            "importance": "low|medium|high|critical"
+        }}
+    ]
+}}
+
+Réponds UNIQUEMENT avec le JSON, sans texte avant ou après."""
+
+        try:
+            response = await self.dispatcher.post(
+                {
+                    "model": self.model,
+                    "temperature": 0.3,
+                    "max_tokens": 100 + 300 * len(items),
+                    "messages": [{"role": "user", "content": prompt}],
+                }
+            )
+            if response.status_code != 200:
+                return [self._error_result(f"Mistral error: {response.status_code}")] * len(items)
+            text = response.json()["choices"][0]["message"]["content"]
+        except Exception as e:
+            return [self._error_result(str(e))] * len(items)
+
+        try:
+            data = json.loads(text[text.find("{") : text.rfind("}") + 1])
+            entries = {int(entry["id"]): entry for entry in data["analyses"] if isinstance(entry, dict)}
+        except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+            return None
+        return [
+            self._result_from(entries[i]) if isinstance(entries.get(i), dict) and "summary" in entries[i] else None
+            for i in range(1, len(items) + 1)
+        ]
+
     async def summarize_content(self, content: str, max_length: int = 200) -> str:
         """Summarize content"""
         prompt = f"""Résume ce contenu web en {max_length} caractères maximum, en français:
@@ -126,25 +244,26 @@ Réponds UNIQUEMENT avec le JSON, sans texte avant ou après."""
 Résumé:"""
 
         try:
-            async with httpx.AsyncClient(timeout=60) as client:
-                response = await client.post(
-                    self.api_url,
-                    headers={"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"},
-                    json={
-                        "model": self.model,
-                        "temperature": 0.3,
-                        "max_tokens": 200,
-                        "messages": [{"role": "user", "content": prompt}],
-                    },
-                )
-
-                if response.status_code == 200:
-                    result = response.json()
-                    return result["choices"][0]["message"]["content"][:max_length]
-                return "Résumé non disponible"
+            response = await self.dispatcher.post(
+                {
+                    "model": self.model,
+                    "temperature": 0.3,
+                    "max_tokens": 200,
+                    "messages": [{"role": "user", "content": prompt}],
+                }
+            )
+
+            if response.status_code == 200:
+                result = response.json()
+                return result["choices"][0]["message"]["content"][:max_length]
+            return "Résumé non disponible"
         except Exception:
             return "Erreur lors du résumé"
 
+    def unavailable_result(self, reason: str) -> AnalysisResult:
+        """Stand-in analysis for a change the API could not analyze (timeout, backfill given up)"""
+        return self._error_result(reason)
+
     def _error_result(self, error: str) -> AnalysisResult:
         return AnalysisResult(
             summary="Analyse non disponible",
@@ -0,0 +1,88 @@
+"""Batching of change analyses: several watches' diffs in one API call.
+
+Most detected changes are small, so the fixed part of the prompt dominates a
+single analysis. With batching on (ANALYSIS_BATCH_SIZE > 1), changes submitted
+within ANALYSIS_BATCH_WINDOW seconds of the first one (or until the batch is
+full) are sent as one numbered prompt and the JSON answer is split back into
+one AnalysisResult per change. Changes the answer leaves out, or the whole
+batch when the answer can't be parsed, are analyzed one by one instead.
+"""
+
+import asyncio
+import os
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .analyzer import AnalysisResult, ContentAnalyzer
+
+# Max changes per batched call (1 = no batching) and how long the first one waits for company
+ANALYSIS_BATCH_SIZE = int(os.getenv("ARKWATCH_ANALYSIS_BATCH_SIZE", "1"))
+ANALYSIS_BATCH_WINDOW = float(os.getenv("ARKWATCH_ANALYSIS_BATCH_WINDOW", "2"))
+
+
+class AnalysisBatcher:
+    """Collects analysis requests for a short window and sends them as one."""
+
+    def __init__(self, analyzer: "ContentAnalyzer", max_size: int | None = None, window: float | None = None):
+        self.analyzer = analyzer
+        self.max_size = max(1, max_size or ANALYSIS_BATCH_SIZE)
+        self.window = ANALYSIS_BATCH_WINDOW if window is None else window
+        self._pending: list[tuple[str, str, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+        # Batched calls made, and changes that had to be analyzed alone after one
+        self.batches = 0
+        self.fallbacks = 0
+
+    async def submit(self, url: str, diff: str) -> "AnalysisResult":
+        """Queue a change and wait for its analysis."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((url, diff, future))
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[str, str, asyncio.Future]]):
+        try:
+            if len(batch) == 1:
+                results = [None]
+            else:
+                self.batches += 1
+                results = await self.analyzer._request_batch([(url, diff) for url, diff, _ in batch])
+                if results is None:
+                    print(f"Batched analysis of {len(batch)} changes unparseable, analyzing them one by one")
+                    results = [None] * len(batch)
+
+            missing = [i for i, result in enumerate(results) if result is None]
+            if len(batch) > 1:
+                self.fallbacks += len(missing)
+            singles = await asyncio.gather(
+                *(self.analyzer._request_analysis(batch[i][0], batch[i][1]) for i in missing)
+            )
+            for i, result in zip(missing, singles, strict=True):
+                results[i] = result
+
+            for (_, _, future), result in zip(batch, results, strict=True):
+                if not future.done():
+                    future.set_result(result)
+        except asyncio.CancelledError:
+            for _, _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
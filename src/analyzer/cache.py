@@ -0,0 +1,127 @@
+"""Persistent cache of change analyses, keyed by a fingerprint of the diff.
+
+The same diff often turns up more than once: several watches on one page,
+rotating banners that come back every few days. Analyses are stored in a
+small SQLite file keyed by the model, the normalized URL and the part of the
+diff the model actually sees (whitespace-normalized, hunk positions dropped),
+so a repeat returns the stored AnalysisResult without calling the API.
+
+Entries expire after ttl seconds; past max_entries the least recently used
+ones are evicted. Failed analyses are never stored.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict
+from datetime import datetime
+
+from ..scraper.politeness import url_key
+from .analyzer import DIFF_PROMPT_CHARS, AnalysisResult
+from .classifier import diff_changes
+
+# Max cached analyses (0 disables the cache) and how long one stays valid
+ANALYSIS_CACHE_SIZE = int(os.getenv("ARKWATCH_ANALYSIS_CACHE_SIZE", "10000"))
+ANALYSIS_CACHE_TTL = float(os.getenv("ARKWATCH_ANALYSIS_CACHE_TTL", str(7 * 86400)))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    key TEXT PRIMARY KEY,
+    result TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_analyses_used ON analyses(used_at);
+"""
+
+
+def _diff_lines(diff: str) -> list[str]:
+    """Changed lines of a unified diff, whitespace collapsed (headers and hunk positions dropped)."""
+    removed, added = diff_changes(diff)
+    return ["-" + " ".join(line.split()) for line in removed] + ["+" + " ".join(line.split()) for line in added]
+
+
+def diff_fingerprint(url: str, diff: str, model: str) -> str:
+    """Cache key of an analysis: same model, same page, same changes => same key."""
+    material = "\n".join([model, url_key(url), *_diff_lines(diff[:DIFF_PROMPT_CHARS])])
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+class AnalysisCache:
+    """SQLite-backed TTL + LRU cache of AnalysisResults, with hit/miss counters."""
+
+    def __init__(self, path: str, max_entries: int | None = None, ttl: float | None = None):
+        self.path = path
+        self.max_entries = ANALYSIS_CACHE_SIZE if max_entries is None else max_entries
+        self.ttl = ANALYSIS_CACHE_TTL if ttl is None else ttl
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        """Per-thread connection, opened (and the file created) on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key: str) -> AnalysisResult | None:
+        """Cached analysis for key, None on a miss or once expired."""
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT result FROM analyses WHERE key = ? AND created_at > ?", (key, now - self.ttl)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        conn.execute("UPDATE analyses SET used_at = ? WHERE key = ?", (now, key))
+        self.hits += 1
+        data = json.loads(row[0])
+        data["analyzed_at"] = datetime.fromisoformat(data["analyzed_at"])
+        return AnalysisResult(**data)
+
+    def put(self, key: str, result: AnalysisResult):
+        """Store a successful analysis, then drop expired and least recently used entries."""
+        if result.error or self.max_entries <= 0:
+            return
+        now = time.time()
+        data = {**asdict(result), "analyzed_at": result.analyzed_at.isoformat()}
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO analyses (key, result, created_at, used_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(data), now, now),
+            )
+            conn.execute("DELETE FROM analyses WHERE created_at <= ?", (now - self.ttl,))
+            conn.execute(
+                "DELETE FROM analyses WHERE key IN (SELECT key FROM analyses ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
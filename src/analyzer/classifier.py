@@ -0,0 +1,183 @@
+"""Local pre-classifier that answers for mechanical changes without calling the LLM.
+
+Many changes that pass min_change_ratio are mechanical: a date or counter
+bumped, a version number incremented, a list reordered, whitespace reflowed.
+classify_diff() compares the removed and added lines of a diff and pairs
+them up: a removed line pairs with an added line that is equal once
+whitespace is collapsed (reflow, or reordering when the order changed) or
+once dates, version strings and explicit counters (views, comments, stars,
+copyright years, pagination, relative times) are masked (bumps). Every other
+number stays literal, so a price, limit, quantity or opening-hours change is
+never mechanical.
+
+The score is the share of changed lines explained that way. Only a diff
+explained completely gets a local AnalysisResult; anything else is left to
+the model.
+"""
+
+import re
+from collections import Counter
+from dataclasses import dataclass
+from datetime import UTC, datetime
+
+from .analyzer import AnalysisResult
+
+MECHANICAL = "mechanical"
+ESCALATE = "escalate"
+
+# model_used of results produced here
+HEURISTIC_MODEL = "heuristic"
+
+_FILE_HEADER = re.compile(r"^--- .*?(?:\+\+\+ .*?(?=@@ |$)|$)")
+_HUNK_HEADER = re.compile(r"^@@ -\d+(?:,\d+)? \+\d+(?:,\d+)? @@")
+
+_MONTHS = (
+    "january|february|march|april|may|june|july|august|september|october|november|december|"
+    "janvier|février|fevrier|mars|avril|mai|juin|juillet|août|aout|septembre|octobre|novembre|décembre|decembre|"
+    "jan|feb|mar|apr|jun|jul|aug|sep|sept|oct|nov|dec|janv|févr|fevr|avr|juil|déc"
+)
+_DAYS = (
+    "monday|tuesday|wednesday|thursday|friday|saturday|sunday|lundi|mardi|mercredi|jeudi|vendredi|samedi|dimanche|"
+    "mon|tue|wed|thu|fri|sat|sun"
+)
+_TIME = r"\d{1,2}[:h]\d{2}(?::\d{2})?"
+# Dates and timestamps; a time only counts when it is part of one ("lundi 9:30"), opening hours are not a date
+_DATE = (
+    rf"\d{{4}}-\d{{2}}-\d{{2}}(?:[T ]{_TIME})?"
+    rf"|\d{{1,2}}[/.]\d{{1,2}}[/.]\d{{2,4}}(?:,?\s+{_TIME})?"
+    rf"|(?:\b(?:{_DAYS})\b\.?,?\s+)?"
+    rf"(?:\d{{1,2}}(?:er|st|nd|rd|th)?\s+(?:{_MONTHS})\b\.?(?:\s+\d{{4}})?"
+    rf"|\b(?:{_MONTHS})\b\.?\s+\d{{1,2}}(?:er|st|nd|rd|th)?\b(?:,?\s+\d{{4}})?)"
+    rf"|\b(?:{_DAYS})\b\.?,?\s+{_TIME}"
+)
+_VERSION = r"(?:\bv|\bversion\s*:?\s*|\brelease\s+v?|\bbuild\s+)\d+(?:[.-]\d+)*|\b\d+\.\d+\.\d+(?:[.-]\d+)*\b"
+_INT = r"\d{1,3}(?:[,.\u00a0\u202f ]\d{3})+(?!\d)|\d+"
+# Nouns of engagement counters ("42 commentaires", "Visitors today: 318")
+_COUNTERS = (
+    "vues|views|stars|étoiles|commentaires|comments|likes|j'aime|followers|abonnés|partages|shares|"
+    "downloads|téléchargements|visites|visits|visitors|visiteurs|reviews|avis|votes|réponses|replies|forks"
+)
+_COUNTER = (
+    rf"(?:{_INT})\s*(?:{_COUNTERS})\b"
+    rf"|\b(?:{_COUNTERS})\b[^:\d\n]{{0,20}}:\s*(?:{_INT})"
+    rf"|(?:©|\(c\)|copyright)\s*\d{{4}}(?:\s*[-–]\s*\d{{4}})?"
+    rf"|\bpage\s+\d+\s+(?:of|sur|/)\s+\d+"
+    rf"|\b(?:il y a|lecture\s*:)\s*\d+\s*(?:secondes?|minutes?|min|heures?|h|jours?)\b"
+    rf"|\b\d+\s*(?:seconds?|minutes?|mins?|hours?|days?)\s+ago\b"
+)
+# Only these are masked: every other number (prices, limits, quantities, hours, amounts) stays literal
+_TOKENS = re.compile(rf"(?P<date>{_DATE})|(?P<version>{_VERSION})|(?P<counter>{_COUNTER})", re.IGNORECASE)
+_DIGITS = re.compile(_INT)
+
+_SUMMARIES = {
+    "whitespace": "Mise en forme modifiée (espaces, retours à la ligne), contenu identique.",
+    "reordered": "Éléments réordonnés, sans contenu nouveau.",
+    "bumped": "Mise à jour mécanique de dates, compteurs ou numéros de version.",
+}
+
+
+@dataclass
+class Classification:
+    """Verdict on a diff: MECHANICAL (answered locally) or ESCALATE (needs the model)"""
+
+    verdict: str
+    score: float  # share of changed lines explained as mechanical
+    kind: str | None = None  # whitespace | reordered | bumped, for mechanical diffs
+
+
+def diff_changes(diff: str) -> tuple[list[str], list[str]]:
+    """Removed and added lines of a unified diff (WebScraper.compute_diff's headers included)."""
+    removed, added = [], []
+    skip_plus_header = False
+    for n, line in enumerate(diff.splitlines()):
+        if n == 0 and line.startswith("--- "):
+            # compute_diff glues "--- a", "+++ b" and the first hunk header onto the first line
+            stripped = _FILE_HEADER.sub("", line, count=1)
+            skip_plus_header = stripped == "" and "+++ " not in line
+            line = stripped
+        elif n == 1 and skip_plus_header and line.startswith("+++ "):
+            continue
+        line = _HUNK_HEADER.sub("", line, count=1)
+        if line.startswith("+"):
+            added.append(line[1:])
+        elif line.startswith("-"):
+            removed.append(line[1:])
+    return removed, added
+
+
+def _collapse(line: str) -> str:
+    return " ".join(line.split())
+
+
+def _mask(line: str) -> str:
+    def token_class(match: re.Match) -> str:
+        if match.lastgroup == "date":
+            return "<date>"
+        # Keep the words around the number: "42 vues" and "42 avis" are different counters
+        return _DIGITS.sub("<n>", match.group(0))
+
+    return _TOKENS.sub(token_class, _collapse(line))
+
+
+def _pair(removed: list[str], added: list[str], key) -> tuple[list[str], list[str], int]:
+    """Pair removed with added lines equal under key; returns the leftovers and the lines paired."""
+    pool = Counter(key(line) for line in added)
+    left_removed = []
+    paired = 0
+    for line in removed:
+        k = key(line)
+        if pool[k]:
+            pool[k] -= 1
+            paired += 1
+        else:
+            left_removed.append(line)
+    left_added = []
+    for line in added:
+        k = key(line)
+        if pool[k]:
+            pool[k] -= 1
+            left_added.append(line)
+    return left_removed, left_added, paired
+
+
+def classify_diff(diff: str) -> Classification:
+    removed, added = diff_changes(diff)
+    # Blank lines come and go with reflows
+    removed = [line for line in removed if line.strip()]
+    added = [line for line in added if line.strip()]
+    total = len(removed) + len(added)
+    if total == 0:
+        return Classification(MECHANICAL, 1.0, "whitespace")
+
+    moved_only = Counter(removed) == Counter(added)
+    removed, added, moved = _pair(removed, added, _collapse)
+    removed, added, bumped = _pair(removed, added, _mask)
+    score = 2 * (moved + bumped) / total
+    if removed or added:
+        return Classification(ESCALATE, score)
+    if bumped:
+        kind = "bumped"
+    else:
+        kind = "reordered" if moved_only else "whitespace"
+    return Classification(MECHANICAL, score, kind)
+
+
+def _key_changes(diff: str, limit: int = 3) -> list[str]:
+    removed, added = diff_changes(diff)
+    pairs = [(_collapse(old), _collapse(new)) for old, new in zip(removed, added, strict=False) if old != new]
+    return [f"{old[:80]} → {new[:80]}" for old, new in pairs[:limit]]
+
+
+def heuristic_result(diff: str) -> AnalysisResult | None:
+    """AnalysisResult for a mechanical diff, None when the model should look at it."""
+    classification = classify_diff(diff)
+    if classification.verdict != MECHANICAL:
+        return None
+    return AnalysisResult(
+        summary=_SUMMARIES[classification.kind],
+        key_changes=_key_changes(diff) if classification.kind == "bumped" else [],
+        sentiment="neutral",
+        importance="low",
+        analyzed_at=datetime.now(UTC),
+        model_used=HEURISTIC_MODEL,
+    )
@@ -0,0 +1,155 @@
+"""Paced, concurrency-limited dispatch of requests to the LLM API.
+
+Every analyzer request goes through one LLMDispatcher, which owns a pooled
+httpx client and caps requests in flight (LLM_CONCURRENCY) and their rate (a
+token bucket of LLM_RATE requests per second, bursts of LLM_BURST). A 429 or
+503 pauses the whole dispatcher for the Retry-After the provider asked for
+(exponential backoff when it gives none) and the request is retried.
+
+Each request has an overall deadline (LLM_DEADLINE) covering queueing, pauses
+and retries; past it DeadlineExceeded is raised so the caller can fall back
+instead of holding up change detection.
+"""
+
+import asyncio
+import os
+import time
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+# Max LLM requests in flight, and pacing: requests per second with bursts of up to LLM_BURST
+LLM_CONCURRENCY = int(os.getenv("ARKWATCH_LLM_CONCURRENCY", "4"))
+LLM_RATE = float(os.getenv("ARKWATCH_LLM_RATE", "1"))
+LLM_BURST = int(os.getenv("ARKWATCH_LLM_BURST", "5"))
+# Seconds one request may take overall (queue + throttling + retries) and per HTTP attempt
+LLM_DEADLINE = float(os.getenv("ARKWATCH_LLM_DEADLINE", "90"))
+LLM_TIMEOUT = float(os.getenv("ARKWATCH_LLM_TIMEOUT", "60"))
+
+# Statuses meaning "slow down", retried after Retry-After
+_THROTTLED = {429, 503}
+# Backoff when a throttling response carries no Retry-After
+_BACKOFF_BASE = 1.0
+_BACKOFF_MAX = 60.0
+
+
+class DeadlineExceeded(Exception):
+    """An LLM request did not complete within its deadline"""
+
+
+def retry_after(response: httpx.Response) -> float | None:
+    """Seconds asked for by a Retry-After header (delta-seconds or HTTP date), None if absent."""
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Requests per second with bursts, paced by reserving future start times."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """Take a token and return how many seconds to wait before using it."""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= 1
+        return max(0.0, -self._tokens / self.rate)
+
+    async def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class LLMDispatcher:
+    """Shared client, concurrency cap, pacing and Retry-After handling for LLM API calls."""
+
+    def __init__(
+        self,
+        api_url: str,
+        api_key: str | None,
+        concurrency: int | None = None,
+        rate: float | None = None,
+        burst: int | None = None,
+        deadline: float | None = None,
+        timeout: float | None = None,
+    ):
+        self.api_url = api_url
+        self.api_key = api_key
+        self.concurrency = max(1, concurrency or LLM_CONCURRENCY)
+        self.bucket = TokenBucket(LLM_RATE if rate is None else rate, burst or LLM_BURST)
+        self.deadline = LLM_DEADLINE if deadline is None else deadline
+        self.timeout = LLM_TIMEOUT if timeout is None else timeout
+        self._client: httpx.AsyncClient | None = None
+        self._slots: asyncio.Semaphore | None = None
+        # monotonic time until which the provider asked us to hold off
+        self._paused_until = 0.0
+        self.throttled = 0
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency),
+            )
+        return self._client
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the running loop
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.concurrency)
+        return self._slots
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _pause(self, seconds: float):
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    async def _send(self, payload: dict) -> httpx.Response:
+        failures = 0
+        async with self._get_slots():
+            while True:
+                await self.bucket.acquire()
+                paused = self._paused_until - time.monotonic()
+                if paused > 0:
+                    await asyncio.sleep(paused)
+                response = await self._get_client().post(
+                    self.api_url,
+                    headers={"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"},
+                    json=payload,
+                )
+                if response.status_code not in _THROTTLED:
+                    return response
+                failures += 1
+                self.throttled += 1
+                wait = retry_after(response)
+                if wait is None:
+                    wait = min(_BACKOFF_MAX, _BACKOFF_BASE * 2 ** (failures - 1))
+                print(f"LLM API throttled ({response.status_code}), retrying in {wait:.0f}s")
+                self._pause(wait)
+
+    async def post(self, payload: dict) -> httpx.Response:
+        """POST payload to the API; raises DeadlineExceeded past the deadline."""
+        try:
+            return await asyncio.wait_for(self._send(payload), self.deadline)
+        except TimeoutError as e:
+            raise DeadlineExceeded(f"LLM request exceeded its {self.deadline:.0f}s deadline") from e
@@ -2,31 +2,49 @@
 
 import hashlib
 import hmac
-import json
 import logging
 import os
 import secrets
+import threading
+import time
 from datetime import datetime, timedelta
 
 from fastapi import HTTPException, Security
 from fastapi.security import APIKeyHeader
 
-from ..crypto import decrypt_pii, encrypt_pii
+from ..crypto import blind_index, decrypt_pii, encrypt_pii
+from ..storage.jsonfile import file_lock, file_version, read_json, write_json
 
 API_KEYS_FILE = "/opt/claude-ceo/workspace/arkwatch/data/api_keys.json"
 _UNSUBSCRIBE_SECRET = os.getenv("ARKWATCH_UNSUBSCRIBE_SECRET", "arkwatch-unsubscribe-default-secret")
 
+# Usage counters (last_used, requests_count) are kept in memory and merged into
+# api_keys.json after this many seconds or pending requests, whichever comes first
+USAGE_FLUSH_INTERVAL = float(os.getenv("ARKWATCH_USAGE_FLUSH_INTERVAL", "30"))
+USAGE_FLUSH_BATCH = int(os.getenv("ARKWATCH_USAGE_FLUSH_BATCH", "100"))
+
 logger = logging.getLogger(__name__)
 
 # PII fields that must be encrypted at rest
 _PII_FIELDS = ("email", "name", "privacy_accepted_ip")
+# Fields looked up by value; records store their blind index as <field>_bidx
+_INDEXED_FIELDS = ("email", "stripe_customer_id")
 
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
+# api_keys.json as stored ("raw"), records decrypted so far ("users"), and the
+# blind index ("index": bidx -> key hashes); "stamp" identifies the file version
+_cache: dict = {"path": None, "stamp": None, "raw": {}, "users": {}, "index": {}}
+_cache_lock = threading.Lock()
+# path -> key_hash -> [requests since last flush, last_used]
+_pending_usage: dict[str, dict[str, list]] = {}
+_pending_total = 0
+_last_flush = time.monotonic()
+
 
 def _decrypt_user_data(user_data: dict) -> dict:
     """Decrypt PII fields in user data for in-memory use."""
-    result = dict(user_data)
+    result = {k: v for k, v in user_data.items() if not k.endswith("_bidx")}
     for field in _PII_FIELDS:
         if field in result and result[field] and isinstance(result[field], str):
             result[field] = decrypt_pii(result[field])
@@ -34,31 +52,146 @@ def _decrypt_user_data(user_data: dict) -> dict:
 
 
 def _encrypt_user_data(user_data: dict) -> dict:
-    """Encrypt PII fields in user data for storage."""
+    """Encrypt PII fields in user data for storage, adding the blind index fields."""
     result = dict(user_data)
     for field in _PII_FIELDS:
         if field in result and result[field] and isinstance(result[field], str):
             result[field] = encrypt_pii(result[field])
+    for field in _INDEXED_FIELDS:
+        result[f"{field}_bidx"] = blind_index(user_data.get(field), field)
     return result
 
 
-def _load_keys() -> dict:
-    """Load and decrypt API keys from disk."""
-    if os.path.exists(API_KEYS_FILE):
-        with open(API_KEYS_FILE) as f:
-            raw = json.load(f)
-        # Decrypt PII fields in memory
-        return {k: _decrypt_user_data(v) for k, v in raw.items()}
-    return {}
+def _build_index(raw: dict) -> dict[str, list[str]]:
+    """Blind index of stored records: bidx -> key hashes, in file order."""
+    index: dict[str, list[str]] = {}
+    for key_hash, record in raw.items():
+        for field in _INDEXED_FIELDS:
+            if f"{field}_bidx" in record:
+                bidx = record[f"{field}_bidx"]
+            else:
+                # Written before the index existed: compute it once per reload
+                bidx = blind_index(decrypt_pii(record.get(field)), field)
+            if bidx:
+                index.setdefault(bidx, []).append(key_hash)
+    return index
+
+
+def _snapshot() -> dict:
+    """The key store, reloaded only when api_keys.json changes on disk.
+
+    Reloading parses the file and builds the blind index without decrypting
+    anything; records are decrypted on first access by _user(). The returned
+    dicts are shared: copy records before modifying them.
+    """
+    path = API_KEYS_FILE
+    stamp = file_version(path)
+    with _cache_lock:
+        if _cache["path"] != path or _cache["stamp"] != stamp:
+            raw = read_json(path, {}) if stamp else {}
+            _cache.update(path=path, stamp=stamp, raw=raw, users={}, index=_build_index(raw))
+        return dict(_cache)
+
+
+def _user(snapshot: dict, key_hash: str) -> dict | None:
+    """Decrypted record for key_hash (decrypted once per file version)."""
+    users = snapshot["users"]
+    user = users.get(key_hash)
+    if user is None:
+        record = snapshot["raw"].get(key_hash)
+        if record is None:
+            return None
+        user = users[key_hash] = _decrypt_user_data(record)
+    return user
 
 
-def _save_keys(keys: dict):
-    """Encrypt PII fields and save to disk."""
-    os.makedirs(os.path.dirname(API_KEYS_FILE), exist_ok=True)
-    # Encrypt PII fields before writing
-    encrypted = {k: _encrypt_user_data(v) for k, v in keys.items()}
-    with open(API_KEYS_FILE, "w") as f:
-        json.dump(encrypted, f, indent=2, default=str)
+def _find(snapshot: dict, field: str, value: str | None) -> list[tuple[str, dict]]:
+    """(key_hash, user) for every record whose field equals value, via the blind index."""
+    if not value:
+        return []
+    matches = []
+    for key_hash in snapshot["index"].get(blind_index(value, field), ()):
+        user = _user(snapshot, key_hash)
+        # The index is a truncated MAC: confirm on the decrypted value
+        if user is not None and user.get(field) == value:
+            matches.append((key_hash, user))
+    return matches
+
+
+def _save(snapshot: dict, changes: dict[str, dict | None]):
+    """Write changed users (None = delete) on top of snapshot. Call with file_lock(API_KEYS_FILE) held.
+
+    Only the changed records are encrypted; the rest are written back as stored.
+    """
+    path = API_KEYS_FILE
+    raw = dict(snapshot["raw"])
+    users = dict(snapshot["users"])
+    for key_hash, user in changes.items():
+        if user is None:
+            raw.pop(key_hash, None)
+            users.pop(key_hash, None)
+        else:
+            raw[key_hash] = _encrypt_user_data(user)
+            users[key_hash] = _decrypt_user_data(user)
+    write_json(path, raw)
+    with _cache_lock:
+        _cache.update(path=path, stamp=file_version(path), raw=raw, users=users, index=_build_index(raw))
+
+
+def _record_usage(key_hash: str, now: str) -> int:
+    """Count one request for key_hash in memory. Returns this process's unflushed count for it."""
+    global _pending_total
+    with _cache_lock:
+        usage = _pending_usage.setdefault(API_KEYS_FILE, {}).setdefault(key_hash, [0, now])
+        usage[0] += 1
+        usage[1] = now
+        _pending_total += 1
+        return usage[0]
+
+
+def _flush_due() -> bool:
+    return _pending_total >= USAGE_FLUSH_BATCH or time.monotonic() - _last_flush >= USAGE_FLUSH_INTERVAL
+
+
+def flush_usage():
+    """Merge accumulated last_used/requests_count into api_keys.json.
+
+    Counters are applied as increments to the file's current values under the
+    file lock, so concurrent API workers never overwrite each other's counts.
+    """
+    global _pending_total, _last_flush
+    with _cache_lock:
+        pending = dict(_pending_usage)
+        _pending_usage.clear()
+        _pending_total = 0
+        _last_flush = time.monotonic()
+
+    for path, usage in pending.items():
+        try:
+            with file_lock(path):
+                cache_current = _cache["path"] == path and _cache["stamp"] == file_version(path)
+                raw = read_json(path, {})
+                for key_hash, (count, last_used) in usage.items():
+                    user = raw.get(key_hash)
+                    if user is None:
+                        continue  # deleted since
+                    user["requests_count"] = (user.get("requests_count") or 0) + count
+                    if not user.get("last_used") or user["last_used"] < last_used:
+                        user["last_used"] = last_used
+                write_json(path, raw)
+                with _cache_lock:
+                    # Only counters changed: keep the decrypted records and index, patching the counters
+                    if cache_current and _cache["path"] == path:
+                        users = dict(_cache["users"])
+                        for key_hash in usage.keys() & raw.keys() & users.keys():
+                            users[key_hash] = {
+                                **users[key_hash],
+                                "requests_count": raw[key_hash]["requests_count"],
+                                "last_used": raw[key_hash]["last_used"],
+                            }
+                        _cache.update(stamp=file_version(path), raw=raw, users=users)
+        except OSError as e:
+            logger.warning(f"Could not flush API key usage to {path}: {e}")
 
 
 def _hash_key(key: str) -> str:
@@ -75,43 +208,44 @@ def create_api_key(
     signup_source: str = None,
 ) -> tuple[str, str, str]:
     """Create a new API key. Returns (raw_key, key_hash, verification_code)."""
-    keys = _load_keys()
-
-    # Generate key
-    raw_key = f"ak_{secrets.token_urlsafe(32)}"
-    key_hash = _hash_key(raw_key)
-
-    # Generate 6-digit verification code (valid 24h)
-    verification_code = f"{secrets.randbelow(900000) + 100000}"
-    verification_expires = (datetime.utcnow() + timedelta(hours=24)).isoformat()
-
-    now = datetime.utcnow().isoformat()
-
-    keys[key_hash] = {
-        "name": name,
-        "email": email,
-        "tier": tier,
-        "is_admin": is_admin,
-        "email_verified": False,
-        "verification_code": hashlib.sha256(verification_code.encode()).hexdigest(),
-        "verification_expires": verification_expires,
-        "created_at": now,
-        "last_used": None,
-        "requests_count": 0,
-        # RGPD consent tracking
-        "privacy_accepted": privacy_accepted,
-        "privacy_accepted_at": now if privacy_accepted else None,
-        "privacy_accepted_ip": client_ip,
-        # Stripe fields
-        "stripe_customer_id": None,
-        "stripe_subscription_id": None,
-        "subscription_status": None,  # active, canceled, past_due, etc.
-        # Conversion tracking
-        "signup_source": signup_source or "direct",
-    }
+    with file_lock(API_KEYS_FILE):
+        snapshot = _snapshot()
+
+        # Generate key
+        raw_key = f"ak_{secrets.token_urlsafe(32)}"
+        key_hash = _hash_key(raw_key)
+
+        # Generate 6-digit verification code (valid 24h)
+        verification_code = f"{secrets.randbelow(900000) + 100000}"
+        verification_expires = (datetime.utcnow() + timedelta(hours=24)).isoformat()
+
+        now = datetime.utcnow().isoformat()
+
+        user = {
+            "name": name,
+            "email": email,
+            "tier": tier,
+            "is_admin": is_admin,
+            "email_verified": False,
+            "verification_code": hashlib.sha256(verification_code.encode()).hexdigest(),
+            "verification_expires": verification_expires,
+            "created_at": now,
+            "last_used": None,
+            "requests_count": 0,
+            # RGPD consent tracking
+            "privacy_accepted": privacy_accepted,
+            "privacy_accepted_at": now if privacy_accepted else None,
+            "privacy_accepted_ip": client_ip,
+            # Stripe fields
+            "stripe_customer_id": None,
+            "stripe_subscription_id": None,
+            "subscription_status": None,  # active, canceled, past_due, etc.
+            # Conversion tracking
+            "signup_source": signup_source or "direct",
+        }
 
-    _save_keys(keys)
-    return raw_key, key_hash, verification_code
+        _save(snapshot, {key_hash: user})
+        return raw_key, key_hash, verification_code
 
 
 def update_stripe_info(
@@ -122,42 +256,39 @@ def update_stripe_info(
     tier: str = None,
 ):
     """Update Stripe-related fields for an API key"""
-    keys = _load_keys()
+    with file_lock(API_KEYS_FILE):
+        snapshot = _snapshot()
+        user = _user(snapshot, key_hash)
 
-    if key_hash not in keys:
-        return False
+        if user is None:
+            return False
 
-    if customer_id is not None:
-        keys[key_hash]["stripe_customer_id"] = customer_id
-    if subscription_id is not None:
-        keys[key_hash]["stripe_subscription_id"] = subscription_id
-    if subscription_status is not None:
-        keys[key_hash]["subscription_status"] = subscription_status
-    if tier is not None:
-        keys[key_hash]["tier"] = tier
+        user = dict(user)
+        if customer_id is not None:
+            user["stripe_customer_id"] = customer_id
+        if subscription_id is not None:
+            user["stripe_subscription_id"] = subscription_id
+        if subscription_status is not None:
+            user["subscription_status"] = subscription_status
+        if tier is not None:
+            user["tier"] = tier
 
-    _save_keys(keys)
-    return True
+        _save(snapshot, {key_hash: user})
+        return True
 
 
 def get_user_by_customer_id(customer_id: str) -> tuple[str, dict] | None:
     """Find a user by their Stripe customer ID. Returns (key_hash, user_data)."""
-    keys = _load_keys()
-
-    for key_hash, user_data in keys.items():
-        if user_data.get("stripe_customer_id") == customer_id:
-            return key_hash, user_data
+    for key_hash, user_data in _find(_snapshot(), "stripe_customer_id", customer_id):
+        return key_hash, dict(user_data)
 
     return None
 
 
 def get_user_by_email(email: str) -> tuple[str, dict] | None:
     """Find a user by their email. Returns (key_hash, user_data)."""
-    keys = _load_keys()
-
-    for key_hash, user_data in keys.items():
-        if user_data.get("email") == email:
-            return key_hash, user_data
+    for key_hash, user_data in _find(_snapshot(), "email", email):
+        return key_hash, dict(user_data)
 
     return None
 
@@ -167,54 +298,55 @@ def validate_api_key(api_key: str) -> dict | None:
     if not api_key:
         return None
 
-    keys = _load_keys()
     key_hash = _hash_key(api_key)
-
-    if key_hash not in keys:
+    user = _user(_snapshot(), key_hash)
+    if user is None:
         return None
 
-    # Update last used
-    keys[key_hash]["last_used"] = datetime.utcnow().isoformat()
-    keys[key_hash]["requests_count"] += 1
-    _save_keys(keys)
+    # Update last used (in memory, flushed to disk in batches)
+    user = dict(user)
+    user["last_used"] = datetime.utcnow().isoformat()
+    user["requests_count"] = (user.get("requests_count") or 0) + _record_usage(key_hash, user["last_used"])
+    if _flush_due():
+        flush_usage()
 
-    return keys[key_hash]
+    return user
 
 
 def update_user_data(email: str, **kwargs) -> bool:
     """Update user profile data (GDPR Art. 16 - Right to rectification).
     Allowed fields: name."""
     allowed_fields = {"name"}
-    keys = _load_keys()
-    for key_hash, user_data in keys.items():
-        if user_data.get("email") == email:
+    with file_lock(API_KEYS_FILE):
+        snapshot = _snapshot()
+        for key_hash, user_data in _find(snapshot, "email", email):
+            user_data = dict(user_data)
             for field, value in kwargs.items():
                 if field in allowed_fields:
-                    keys[key_hash][field] = value
-            _save_keys(keys)
+                    user_data[field] = value
+            _save(snapshot, {key_hash: user_data})
             return True
-    return False
+        return False
 
 
 def delete_api_key_by_email(email: str) -> bool:
     """Delete API key for a user by email. Returns True if deleted."""
-    keys = _load_keys()
-    to_delete = [k for k, v in keys.items() if v.get("email") == email]
-    if not to_delete:
-        return False
-    for key_hash in to_delete:
-        del keys[key_hash]
-    _save_keys(keys)
-    return True
+    with file_lock(API_KEYS_FILE):
+        snapshot = _snapshot()
+        to_delete = [key_hash for key_hash, _ in _find(snapshot, "email", email)]
+        if not to_delete:
+            return False
+        _save(snapshot, dict.fromkeys(to_delete))
+        return True
 
 
 def verify_user_email(email: str, code: str) -> bool:
     """Verify a user's email with the 6-digit code. Returns True if verified."""
-    keys = _load_keys()
-    code_hash = hashlib.sha256(code.encode()).hexdigest()
+    with file_lock(API_KEYS_FILE):
+        snapshot = _snapshot()
+        code_hash = hashlib.sha256(code.encode()).hexdigest()
 
-    for key_hash, user_data in keys.items():
-        if user_data.get("email") == email:
+        for key_hash, user_data in _find(snapshot, "email", email):
             if user_data.get("email_verified"):
                 return True  # Already verified
 
@@ -225,33 +357,35 @@ def verify_user_email(email: str, code: str) -> bool:
 
             # Check code
             if user_data.get("verification_code") == code_hash:
-                keys[key_hash]["email_verified"] = True
-                keys[key_hash].pop("verification_code", None)
-                keys[key_hash].pop("verification_expires", None)
-                _save_keys(keys)
+                user_data = dict(user_data)
+                user_data["email_verified"] = True
+                user_data.pop("verification_code", None)
+                user_data.pop("verification_expires", None)
+                _save(snapshot, {key_hash: user_data})
                 return True
 
             return False  # Wrong code
 
-    return False  # User not found
+        return False  # User not found
 
 
 def regenerate_verification_code(email: str) -> str | None:
     """Regenerate a verification code for a user. Returns the new raw code or None."""
-    keys = _load_keys()
+    with file_lock(API_KEYS_FILE):
+        snapshot = _snapshot()
 
-    for key_hash, user_data in keys.items():
-        if user_data.get("email") == email:
+        for key_hash, user_data in _find(snapshot, "email", email):
             if user_data.get("email_verified"):
                 return None  # Already verified
 
             new_code = f"{secrets.randbelow(900000) + 100000}"
-            keys[key_hash]["verification_code"] = hashlib.sha256(new_code.encode()).hexdigest()
-            keys[key_hash]["verification_expires"] = (datetime.utcnow() + timedelta(hours=24)).isoformat()
-            _save_keys(keys)
+            user_data = dict(user_data)
+            user_data["verification_code"] = hashlib.sha256(new_code.encode()).hexdigest()
+            user_data["verification_expires"] = (datetime.utcnow() + timedelta(hours=24)).isoformat()
+            _save(snapshot, {key_hash: user_data})
             return new_code
 
-    return None
+        return None
 
 
 def is_admin(user: dict) -> bool:
@@ -262,10 +396,11 @@ def is_admin(user: dict) -> bool:
 def get_tier_limits(tier: str) -> dict:
     """Get limits for a tier"""
     tiers = {
-        "free": {"max_watches": 3, "check_interval_min": 86400},  # 1/day
-        "starter": {"max_watches": 10, "check_interval_min": 3600},  # 1/hour
-        "pro": {"max_watches": 50, "check_interval_min": 300},  # 5 min
-        "business": {"max_watches": 1000, "check_interval_min": 60},  # 1 min
+        # check_interval_max: slowest an adaptive watch may back off to
+        "free": {"max_watches": 3, "check_interval_min": 86400, "check_interval_max": 604800},  # 1/day, 1/week
+        "starter": {"max_watches": 10, "check_interval_min": 3600, "check_interval_max": 259200},  # 1/hour, 3 days
+        "pro": {"max_watches": 50, "check_interval_min": 300, "check_interval_max": 86400},  # 5 min, 1/day
+        "business": {"max_watches": 1000, "check_interval_min": 60, "check_interval_max": 86400},  # 1 min, 1/day
     }
     return tiers.get(tier, tiers["free"])
 
@@ -306,7 +441,8 @@ async def get_optional_user(api_key: str = Security(api_key_header)) -> dict | N
 # CLI helpers
 def list_api_keys() -> list:
     """List all API keys (for admin)"""
-    keys = _load_keys()
+    snapshot = _snapshot()
+    keys = {k: _user(snapshot, k) for k in snapshot["raw"]}
     return [
         {
             "hash": k[:8] + "...",
@@ -324,10 +460,8 @@ def list_api_keys() -> list:
 
 def get_key_hash_for_user(user: dict) -> str | None:
     """Get the key hash for a user (needed for updates)"""
-    keys = _load_keys()
-    for key_hash, user_data in keys.items():
-        if user_data.get("email") == user.get("email"):
-            return key_hash
+    for key_hash, _ in _find(_snapshot(), "email", user.get("email")):
+        return key_hash
     return None
 
 
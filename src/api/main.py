@@ -1,15 +1,29 @@
 """ArkWatch API - Point d'entrée principal"""
 
 import os
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from ..scraper import close_scraper, get_scraper
+from .auth import flush_usage
 from .middleware.page_visit_tracker import PageVisitTracker
 from .routers import alert_hot_visit, arkwatch_checkout, audit_gratuit, audit_gratuit_exit_capture, auth, billing, conversion_dashboard, conversion_metrics, early_adopter, email_tracking, first_3, free_trial, health, leadgen_analytics, lifetime, mcp_checkout, page_visit_alert, pricing, pricing_ab, quick_check, reports, stats, subscribe, support_email, track_visitor_audit_gratuit, trial_14d, trial_signup, trial_tracking, try_check, unified_email_tracking, watches, webhooks
 
 is_dev = os.getenv("ARKWATCH_ENV", "production") == "development"
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Shared scraper connection pool (used by quick-check) lives as long as the app
+    await get_scraper().startup()
+    yield
+    await close_scraper()
+    # Persist API key usage counters still held in memory
+    flush_usage()
+
+
 app = FastAPI(
     title="ArkWatch API",
     description="Web monitoring API with AI-powered change summaries. Free tier: 3 URLs, daily checks.",
@@ -17,6 +31,7 @@ app = FastAPI(
     docs_url="/docs" if is_dev else None,
     redoc_url="/redoc" if is_dev else None,
     openapi_url="/openapi.json" if is_dev else None,
+    lifespan=lifespan,
 )
 
 # Page visit tracking for conversion monitoring
@@ -9,6 +9,8 @@ from pathlib import Path
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, EmailStr, Field
 
+from ...storage.jsonfile import file_lock, write_json
+
 # Add automation directory to path for email_sender
 sys.path.insert(0, "/opt/claude-ceo/automation")
 
@@ -70,14 +72,9 @@ def load_tracking() -> dict:
 
 
 def save_tracking(data: dict):
-    """Save audit tracking data atomically"""
+    """Save audit tracking data atomically. Call with file_lock(AUDIT_TRACKING_FILE) held."""
     data["last_updated"] = datetime.utcnow().isoformat() + "Z"
-    path = Path(AUDIT_TRACKING_FILE)
-    path.parent.mkdir(parents=True, exist_ok=True)
-    tmp = path.with_suffix(".json.tmp")
-    with open(tmp, "w") as f:
-        json.dump(data, f, indent=2)
-    tmp.replace(path)
+    write_json(AUDIT_TRACKING_FILE, data)
 
 
 def get_slots_remaining(data: dict) -> int:
@@ -191,48 +188,53 @@ async def submit_audit(request: AuditRequest):
     Handle audit gratuit form submission.
     Tracks submission, sends confirmation + team notification, manages slot count.
     """
-    tracking = load_tracking()
-    slots = get_slots_remaining(tracking)
-
-    # Check slots
-    if slots <= 0:
-        raise HTTPException(
-            status_code=409,
-            detail="Offre complete. Les 5 places ont ete prises."
-        )
-
-    # Check duplicate email
-    existing = next(
-        (s for s in tracking["submissions"] if s["email"] == request.email),
-        None
-    )
-    if existing:
-        return AuditResponse(
-            success=True,
-            message="Vous etes deja inscrit ! Votre rapport arrive sous 48h.",
-            slots_remaining=slots,
-            submission_id=existing["submission_id"]
+    with file_lock(AUDIT_TRACKING_FILE):
+        tracking = load_tracking()
+        slots = get_slots_remaining(tracking)
+
+        # Check slots
+        if slots <= 0:
+            raise HTTPException(
+                status_code=409,
+                detail="Offre complete. Les 5 places ont ete prises."
+            )
+
+        # Check duplicate email
+        existing = next(
+            (s for s in tracking["submissions"] if s["email"] == request.email),
+            None
         )
+        if existing:
+            return AuditResponse(
+                success=True,
+                message="Vous etes deja inscrit ! Votre rapport arrive sous 48h.",
+                slots_remaining=slots,
+                submission_id=existing["submission_id"]
+            )
+
+        timestamp = request.timestamp or (datetime.utcnow().isoformat() + "Z")
+
+        submission = {
+            "submission_id": request.submission_id,
+            "name": request.name,
+            "email": request.email,
+            "stack": request.stack,
+            "url": request.url,
+            "pain_point": request.pain_point,
+            "source": request.source,
+            "utm_source": request.utm_source,
+            "utm_campaign": request.utm_campaign,
+            "referrer": request.referrer,
+            "submitted_at": timestamp,
+            "confirmation_sent": False,
+            "notification_sent": False,
+            "report_delivered": False,
+            "report_delivered_at": None,
+        }
 
-    timestamp = request.timestamp or (datetime.utcnow().isoformat() + "Z")
-
-    submission = {
-        "submission_id": request.submission_id,
-        "name": request.name,
-        "email": request.email,
-        "stack": request.stack,
-        "url": request.url,
-        "pain_point": request.pain_point,
-        "source": request.source,
-        "utm_source": request.utm_source,
-        "utm_campaign": request.utm_campaign,
-        "referrer": request.referrer,
-        "submitted_at": timestamp,
-        "confirmation_sent": False,
-        "notification_sent": False,
-        "report_delivered": False,
-        "report_delivered_at": None,
-    }
+        # Reserve the slot before sending emails (file lock not held over network calls)
+        tracking["submissions"].append(dict(submission))
+        save_tracking(tracking)
 
     # Send confirmation to lead
     send_confirmation_email(
@@ -249,8 +251,12 @@ async def submit_audit(request: AuditRequest):
     submission["notification_sent"] = True
 
     # Save
-    tracking["submissions"].append(submission)
-    save_tracking(tracking)
+    with file_lock(AUDIT_TRACKING_FILE):
+        tracking = load_tracking()
+        for saved in tracking["submissions"]:
+            if saved["submission_id"] == submission["submission_id"]:
+                saved.update(submission)
+        save_tracking(tracking)
 
     new_slots = get_slots_remaining(tracking)
 
@@ -9,6 +9,8 @@ import json
 from datetime import datetime, timezone
 from pathlib import Path
 
+from ...storage.jsonfile import file_lock, write_json
+
 router = APIRouter()
 
 # Data files
@@ -42,13 +44,9 @@ def load_captures():
 
 
 def save_captures(data):
-    """Save captures atomically."""
-    CAPTURES_FILE.parent.mkdir(parents=True, exist_ok=True)
+    """Save captures atomically. Call with file_lock(CAPTURES_FILE) held."""
     data["last_updated"] = datetime.now(timezone.utc).isoformat()
-    tmp = CAPTURES_FILE.with_suffix(".json.tmp")
-    with open(tmp, "w") as f:
-        json.dump(data, f, indent=2)
-    tmp.replace(CAPTURES_FILE)
+    write_json(CAPTURES_FILE, data)
 
 
 @router.post("/audit-gratuit/capture-email")
@@ -62,39 +60,40 @@ async def capture_email(capture: EmailCapture, request: Request):
     # Get IP from request
     ip = capture.ip or request.client.host
 
-    # Load existing captures
-    data = load_captures()
-
-    # Check if already captured (prevent duplicates)
-    existing = next(
-        (c for c in data["captures"] if c.get("email", "").lower() == capture.email.lower()),
-        None
-    )
-
-    if existing:
-        # Update existing capture with new data
-        existing["last_seen"] = datetime.now(timezone.utc).isoformat()
-        existing["time_on_page"] = max(existing.get("time_on_page", 0), capture.time_on_page)
-        existing["scroll_depth"] = max(existing.get("scroll_depth", 0), capture.scroll_depth)
-        existing["form_started"] = existing.get("form_started", False) or capture.form_started
-        existing["form_submitted"] = existing.get("form_submitted", False) or capture.form_submitted
-    else:
-        # New capture
-        data["captures"].append({
-            "email": capture.email.lower(),
-            "visitor_id": capture.visitor_id,
-            "ip": ip,
-            "time_on_page": capture.time_on_page,
-            "scroll_depth": capture.scroll_depth,
-            "form_started": capture.form_started,
-            "form_submitted": capture.form_submitted,
-            "referrer": capture.referrer,
-            "user_agent": capture.user_agent or request.headers.get("user-agent"),
-            "captured_at": datetime.now(timezone.utc).isoformat(),
-        })
-        data["stats"]["total"] += 1
-
-    save_captures(data)
+    with file_lock(CAPTURES_FILE):
+        # Load existing captures
+        data = load_captures()
+
+        # Check if already captured (prevent duplicates)
+        existing = next(
+            (c for c in data["captures"] if c.get("email", "").lower() == capture.email.lower()),
+            None
+        )
+
+        if existing:
+            # Update existing capture with new data
+            existing["last_seen"] = datetime.now(timezone.utc).isoformat()
+            existing["time_on_page"] = max(existing.get("time_on_page", 0), capture.time_on_page)
+            existing["scroll_depth"] = max(existing.get("scroll_depth", 0), capture.scroll_depth)
+            existing["form_started"] = existing.get("form_started", False) or capture.form_started
+            existing["form_submitted"] = existing.get("form_submitted", False) or capture.form_submitted
+        else:
+            # New capture
+            data["captures"].append({
+                "email": capture.email.lower(),
+                "visitor_id": capture.visitor_id,
+                "ip": ip,
+                "time_on_page": capture.time_on_page,
+                "scroll_depth": capture.scroll_depth,
+                "form_started": capture.form_started,
+                "form_submitted": capture.form_submitted,
+                "referrer": capture.referrer,
+                "user_agent": capture.user_agent or request.headers.get("user-agent"),
+                "captured_at": datetime.now(timezone.utc).isoformat(),
+            })
+            data["stats"]["total"] += 1
+
+        save_captures(data)
 
     return {
         "status": "ok",
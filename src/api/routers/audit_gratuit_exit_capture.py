@@ -14,6 +14,8 @@ from typing import Optional
 from fastapi import APIRouter, BackgroundTasks, Request
 from pydantic import BaseModel, EmailStr
 
+from ...storage.jsonfile import file_lock, write_json
+
 sys.path.insert(0, "/opt/claude-ceo/automation")
 
 try:
@@ -54,13 +56,9 @@ def load_captures() -> dict:
 
 
 def save_captures(data: dict):
+    """Call with file_lock(CAPTURE_FILE) held."""
     data["last_updated"] = datetime.now(timezone.utc).isoformat()
-    path = Path(CAPTURE_FILE)
-    path.parent.mkdir(parents=True, exist_ok=True)
-    tmp = path.with_suffix(".json.tmp")
-    with open(tmp, "w") as f:
-        json.dump(data, f, indent=2)
-    tmp.replace(path)
+    write_json(CAPTURE_FILE, data)
 
 
 def send_relance_j0(email: str, capture: dict):
@@ -172,62 +170,65 @@ async def capture_exit_email(
     """Capture email from exit-intent popup on audit-gratuit page.
     Sends immediate J+0 relance email with booking link + 3 monitoring questions.
     """
-    data = load_captures()
-
-    # Check duplicate email
-    existing_emails = {c["email"].lower() for c in data["captures"]}
-    if req.email.lower() in existing_emails:
-        return ExitCaptureResponse(status="duplicate", message="Email already captured")
-
-    # Also check if this email already submitted the audit form
-    audit_tracking_file = Path("/opt/claude-ceo/workspace/arkwatch/data/audit_gratuit_tracking.json")
-    if audit_tracking_file.exists():
-        try:
-            with open(audit_tracking_file) as f:
-                audit_data = json.load(f)
-            submitted_emails = {s["email"].lower() for s in audit_data.get("submissions", [])}
-            if req.email.lower() in submitted_emails:
-                return ExitCaptureResponse(status="already_submitted", message="Already submitted audit form")
-        except (json.JSONDecodeError, OSError):
-            pass
-
-    client_ip = request.headers.get("x-real-ip") or (
-        request.client.host if request.client else "unknown"
-    )
+    with file_lock(CAPTURE_FILE):
+        data = load_captures()
+
+        # Check duplicate email
+        existing_emails = {c["email"].lower() for c in data["captures"]}
+        if req.email.lower() in existing_emails:
+            return ExitCaptureResponse(status="duplicate", message="Email already captured")
+
+        # Also check if this email already submitted the audit form
+        audit_tracking_file = Path("/opt/claude-ceo/workspace/arkwatch/data/audit_gratuit_tracking.json")
+        if audit_tracking_file.exists():
+            try:
+                with open(audit_tracking_file) as f:
+                    audit_data = json.load(f)
+                submitted_emails = {s["email"].lower() for s in audit_data.get("submissions", [])}
+                if req.email.lower() in submitted_emails:
+                    return ExitCaptureResponse(status="already_submitted", message="Already submitted audit form")
+            except (json.JSONDecodeError, OSError):
+                pass
+
+        client_ip = request.headers.get("x-real-ip") or (
+            request.client.host if request.client else "unknown"
+        )
 
-    capture = {
-        "email": req.email,
-        "visitor_id": req.visitor_id,
-        "time_on_page": req.time_on_page,
-        "scroll_depth": req.scroll_depth,
-        "form_started": req.form_started,
-        "ip": client_ip,
-        "user_agent": request.headers.get("user-agent", ""),
-        "referrer": request.headers.get("referer", ""),
-        "captured_at": datetime.now(timezone.utc).isoformat(),
-        "sequence_started": True,
-        "sequence_step": 1,
-        "relance_j0_sent": False,
-        "relance_j0_sent_at": None,
-    }
-
-    data["captures"].append(capture)
-    save_captures(data)
+        capture = {
+            "email": req.email,
+            "visitor_id": req.visitor_id,
+            "time_on_page": req.time_on_page,
+            "scroll_depth": req.scroll_depth,
+            "form_started": req.form_started,
+            "ip": client_ip,
+            "user_agent": request.headers.get("user-agent", ""),
+            "referrer": request.headers.get("referer", ""),
+            "captured_at": datetime.now(timezone.utc).isoformat(),
+            "sequence_started": True,
+            "sequence_step": 1,
+            "relance_j0_sent": False,
+            "relance_j0_sent_at": None,
+        }
+
+        data["captures"].append(capture)
+        save_captures(data)
 
     # Send J+0 relance email in background (non-blocking for API response)
-    background_tasks.add_task(_send_and_update_capture, req.email, capture, data)
+    background_tasks.add_task(_send_and_update_capture, req.email, capture)
 
     return ExitCaptureResponse(status="ok", message="Email captured for follow-up")
 
 
-def _send_and_update_capture(email: str, capture: dict, data: dict):
+def _send_and_update_capture(email: str, capture: dict):
     """Background task: send relance email and update capture record."""
     success = send_relance_j0(email, capture)
     if success:
-        # Update the capture record with send status
-        for c in data["captures"]:
-            if c["email"].lower() == email.lower() and c["visitor_id"] == capture["visitor_id"]:
-                c["relance_j0_sent"] = True
-                c["relance_j0_sent_at"] = datetime.now(timezone.utc).isoformat()
-                break
-        save_captures(data)
+        # Update the capture record with send status (re-read: other captures may have been added since)
+        with file_lock(CAPTURE_FILE):
+            data = load_captures()
+            for c in data["captures"]:
+                if c["email"].lower() == email.lower() and c["visitor_id"] == capture["visitor_id"]:
+                    c["relance_j0_sent"] = True
+                    c["relance_j0_sent_at"] = datetime.now(timezone.utc).isoformat()
+                    break
+            save_captures(data)
@@ -375,8 +375,7 @@ async def export_account_data(user: dict = Depends(get_current_user)):
     watches = db.get_watches_by_user(email)
     watch_ids = {w["id"] for w in watches}
 
-    all_reports = db.get_reports()
-    user_reports = [r for r in all_reports if r.get("watch_id") in watch_ids]
+    user_reports = db.query_reports(watch_ids, limit=None)
 
     return {
         "account": {
@@ -142,10 +142,10 @@ async def cancel_subscription(user: dict = Depends(get_current_user)):
 @router.get("/usage")
 async def get_usage(user: dict = Depends(get_current_user)):
     """Get current usage vs limits"""
-    from ...storage.database import Database
+    from ...storage import get_db
     from ..auth import get_tier_limits
 
-    db = Database()
+    db = get_db()
     watches = db.get_watches_by_user(user.get("email", ""))
 
     limits = get_tier_limits(user.get("tier", "free"))
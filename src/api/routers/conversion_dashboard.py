@@ -17,7 +17,6 @@ import json
 import os
 import sys
 from datetime import datetime, timezone, timedelta
-from pathlib import Path
 from typing import Optional
 import glob as glob_module
 
@@ -25,6 +24,8 @@ from fastapi import APIRouter, Query
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
 
+from ...storage.jsonfile import file_lock, write_json
+
 # Email sender for alerts
 sys.path.insert(0, "/opt/claude-ceo/automation")
 try:
@@ -90,13 +91,8 @@ def _load_alert_state() -> dict:
 
 
 def _save_alert_state(state: dict):
-    """Save alert state."""
-    path = Path(ALERT_STATE_FILE)
-    path.parent.mkdir(parents=True, exist_ok=True)
-    tmp = path.with_suffix(".json.tmp")
-    with open(tmp, "w") as f:
-        json.dump(state, f, indent=2)
-    tmp.replace(path)
+    """Save alert state. Call with file_lock(ALERT_STATE_FILE) held."""
+    write_json(ALERT_STATE_FILE, state)
 
 
 def _get_outreach_metrics() -> dict:
@@ -432,62 +428,64 @@ def _detect_hot_leads(outreach: dict, signups: dict, visits: dict,
 def _check_and_send_alerts(hot_leads: list, outreach: dict, visits: dict) -> list:
     """Check for critical events and send alerts if needed."""
     alerts_triggered = []
-    state = _load_alert_state()
-    now = datetime.now(timezone.utc)
-    now_iso = now.isoformat()
-
-    # Clean old alerts (older than cooldown)
-    cutoff = (now - timedelta(minutes=ALERT_COOLDOWN_MINUTES)).isoformat()
-    state["alerts_sent"] = [
-        a for a in state.get("alerts_sent", [])
-        if a.get("timestamp", "") > cutoff
-    ]
-
-    # Check what alert types were recently sent
-    recent_types = {a.get("type") for a in state.get("alerts_sent", [])}
-
-    for lead in hot_leads:
-        if lead["severity"] == "high" and lead["type"] not in recent_types:
-            alert = {
-                "type": lead["type"],
-                "timestamp": now_iso,
-                "lead": lead.get("lead_name", "Unknown"),
-                "detail": lead["detail"],
-            }
-
-            # Send email alert
-            if EMAIL_AVAILABLE:
-                try:
-                    subject = f"[ArkWatch HOT LEAD] {lead.get('lead_name', 'Unknown')} - {lead['company']}"
-                    body = f"""
-<h2>Hot Lead Alert</h2>
-<p><strong>Lead:</strong> {lead.get('lead_name', 'Unknown')} ({lead.get('company', '')})</p>
-<p><strong>Type:</strong> {lead['type']}</p>
-<p><strong>Detail:</strong> {lead['detail']}</p>
-<p><strong>Recommended Action:</strong> {lead['action']}</p>
-<p><strong>Email:</strong> {lead.get('email', 'N/A')}</p>
-<hr>
-<p><a href="https://watch.arkforge.fr/conversion/dashboard.html">View Dashboard</a></p>
-"""
-                    send_email(
-                        to_addr=SHAREHOLDER_EMAIL,
-                        subject=subject,
-                        body="Hot lead alert",
-                        html_body=body,
-                    )
-                    alert["email_sent"] = True
-                except Exception as e:
+    # Held while sending, so API workers don't each send the same alert
+    with file_lock(ALERT_STATE_FILE):
+        state = _load_alert_state()
+        now = datetime.now(timezone.utc)
+        now_iso = now.isoformat()
+
+        # Clean old alerts (older than cooldown)
+        cutoff = (now - timedelta(minutes=ALERT_COOLDOWN_MINUTES)).isoformat()
+        state["alerts_sent"] = [
+            a for a in state.get("alerts_sent", [])
+            if a.get("timestamp", "") > cutoff
+        ]
+
+        # Check what alert types were recently sent
+        recent_types = {a.get("type") for a in state.get("alerts_sent", [])}
+
+        for lead in hot_leads:
+            if lead["severity"] == "high" and lead["type"] not in recent_types:
+                alert = {
+                    "type": lead["type"],
+                    "timestamp": now_iso,
+                    "lead": lead.get("lead_name", "Unknown"),
+                    "detail": lead["detail"],
+                }
+
+                # Send email alert
+                if EMAIL_AVAILABLE:
+                    try:
+                        subject = f"[ArkWatch HOT LEAD] {lead.get('lead_name', 'Unknown')} - {lead['company']}"
+                        body = f"""
+    <h2>Hot Lead Alert</h2>
+    <p><strong>Lead:</strong> {lead.get('lead_name', 'Unknown')} ({lead.get('company', '')})</p>
+    <p><strong>Type:</strong> {lead['type']}</p>
+    <p><strong>Detail:</strong> {lead['detail']}</p>
+    <p><strong>Recommended Action:</strong> {lead['action']}</p>
+    <p><strong>Email:</strong> {lead.get('email', 'N/A')}</p>
+    <hr>
+    <p><a href="https://watch.arkforge.fr/conversion/dashboard.html">View Dashboard</a></p>
+    """
+                        send_email(
+                            to_addr=SHAREHOLDER_EMAIL,
+                            subject=subject,
+                            body="Hot lead alert",
+                            html_body=body,
+                        )
+                        alert["email_sent"] = True
+                    except Exception as e:
+                        alert["email_sent"] = False
+                        alert["error"] = str(e)
+                else:
                     alert["email_sent"] = False
-                    alert["error"] = str(e)
-            else:
-                alert["email_sent"] = False
-                alert["note"] = "Email not available"
+                    alert["note"] = "Email not available"
 
-            state["alerts_sent"].append(alert)
-            alerts_triggered.append(alert)
+                state["alerts_sent"].append(alert)
+                alerts_triggered.append(alert)
 
-    state["last_check"] = now_iso
-    _save_alert_state(state)
+        state["last_check"] = now_iso
+        _save_alert_state(state)
 
     return alerts_triggered
 
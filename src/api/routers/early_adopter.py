@@ -1,7 +1,6 @@
 """Early-adopter email collection - minimal endpoint, JSON storage, no external deps."""
 
 import json
-import os
 import re
 import time
 from collections import defaultdict
@@ -10,6 +9,8 @@ from pathlib import Path
 from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel, field_validator
 
+from ...storage.jsonfile import file_lock, write_json
+
 router = APIRouter()
 
 EMAIL_REGEX = re.compile(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$")
@@ -32,11 +33,8 @@ def _load_emails() -> list[dict]:
 
 
 def _save_emails(entries: list[dict]):
-    DATA_FILE.parent.mkdir(parents=True, exist_ok=True)
-    tmp = str(DATA_FILE) + ".tmp"
-    with open(tmp, "w") as f:
-        json.dump(entries, f, indent=2, ensure_ascii=False)
-    os.replace(tmp, str(DATA_FILE))
+    """Call with file_lock(DATA_FILE) held."""
+    write_json(DATA_FILE, entries, ensure_ascii=False)
 
 
 class EarlyAdopterRequest(BaseModel):
@@ -62,18 +60,19 @@ async def collect_early_adopter_email(req: EarlyAdopterRequest, request: Request
         raise HTTPException(status_code=429, detail="Trop de tentatives. Réessayez plus tard.")
     _submit_attempts[client_ip].append(now)
 
-    entries = _load_emails()
+    with file_lock(DATA_FILE):
+        entries = _load_emails()
 
-    # Check duplicate
-    if any(e["email"] == req.email for e in entries):
-        return {"status": "already_registered", "message": "Cet email est déjà inscrit. Vous serez notifié(e) !"}
+        # Check duplicate
+        if any(e["email"] == req.email for e in entries):
+            return {"status": "already_registered", "message": "Cet email est déjà inscrit. Vous serez notifié(e) !"}
 
-    entries.append({
-        "email": req.email,
-        "registered_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-        "ip": client_ip,
-        "source": request.headers.get("referer", "direct"),
-    })
-    _save_emails(entries)
+        entries.append({
+            "email": req.email,
+            "registered_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "ip": client_ip,
+            "source": request.headers.get("referer", "direct"),
+        })
+        _save_emails(entries)
 
     return {"status": "ok", "message": "Merci ! Vous serez notifié(e) dès le lancement de l'offre early-adopter."}
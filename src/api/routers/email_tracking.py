@@ -8,6 +8,8 @@ from pathlib import Path
 from fastapi import APIRouter, Response
 from fastapi.responses import RedirectResponse
 
+from ...storage.jsonfile import file_lock, write_json
+
 router = APIRouter()
 
 # Use data directory that's accessible by the API service
@@ -63,17 +65,35 @@ def log_email_open(lead_id: int):
     """
     timestamp = datetime.utcnow().isoformat() + "Z"
 
-    # Load tracking data
-    try:
-        if os.path.exists(TRACKING_FILE):
-            with open(TRACKING_FILE, 'r') as f:
-                tracking_data = json.load(f)
-        else:
+    with file_lock(TRACKING_FILE):
+        # Load tracking data
+        try:
+            if os.path.exists(TRACKING_FILE):
+                with open(TRACKING_FILE, 'r') as f:
+                    tracking_data = json.load(f)
+            else:
+                tracking_data = {
+                    "task_id": "20260934",
+                    "campaign_name": "Outreach Email Direct - 15 DevOps/SRE Leaders",
+                    "created_date": "2026-02-09",
+                    "status": "scheduled",
+                    "leads": [],
+                    "metrics": {
+                        "scheduled": 15,
+                        "sent": 0,
+                        "opened": 0,
+                        "replied": 0,
+                        "trials_activated": 0
+                    },
+                    "notes": []
+                }
+        except (FileNotFoundError, json.JSONDecodeError):
+            # Fallback if file corrupted
             tracking_data = {
                 "task_id": "20260934",
                 "campaign_name": "Outreach Email Direct - 15 DevOps/SRE Leaders",
                 "created_date": "2026-02-09",
-                "status": "scheduled",
+                "status": "active",
                 "leads": [],
                 "metrics": {
                     "scheduled": 15,
@@ -84,66 +104,48 @@ def log_email_open(lead_id: int):
                 },
                 "notes": []
             }
-    except (FileNotFoundError, json.JSONDecodeError):
-        # Fallback if file corrupted
-        tracking_data = {
-            "task_id": "20260934",
-            "campaign_name": "Outreach Email Direct - 15 DevOps/SRE Leaders",
-            "created_date": "2026-02-09",
-            "status": "active",
-            "leads": [],
-            "metrics": {
-                "scheduled": 15,
-                "sent": 0,
-                "opened": 0,
-                "replied": 0,
-                "trials_activated": 0
-            },
-            "notes": []
-        }
 
-    # Update lead data
-    lead_found = False
-    for lead in tracking_data.get("leads", []):
-        if lead.get("id") == lead_id:
-            lead_found = True
+        # Update lead data
+        lead_found = False
+        for lead in tracking_data.get("leads", []):
+            if lead.get("id") == lead_id:
+                lead_found = True
 
-            # Initialize opens tracking
-            if "opens" not in lead:
-                lead["opens"] = []
+                # Initialize opens tracking
+                if "opens" not in lead:
+                    lead["opens"] = []
 
-            # Add new open event
-            lead["opens"].append(timestamp)
+                # Add new open event
+                lead["opens"].append(timestamp)
 
-            # Update opened timestamp if first open
-            if lead.get("opened") is None:
-                lead["opened"] = timestamp
+                # Update opened timestamp if first open
+                if lead.get("opened") is None:
+                    lead["opened"] = timestamp
 
-                # Increment metrics counter
-                tracking_data["metrics"]["opened"] = tracking_data["metrics"].get("opened", 0) + 1
+                    # Increment metrics counter
+                    tracking_data["metrics"]["opened"] = tracking_data["metrics"].get("opened", 0) + 1
 
-            break
+                break
 
-    # If lead not found, create entry
-    if not lead_found:
-        new_lead = {
-            "id": lead_id,
-            "opened": timestamp,
-            "opens": [timestamp],
-            "status": "opened"
-        }
-        tracking_data["leads"].append(new_lead)
-        tracking_data["metrics"]["opened"] = tracking_data["metrics"].get("opened", 0) + 1
+        # If lead not found, create entry
+        if not lead_found:
+            new_lead = {
+                "id": lead_id,
+                "opened": timestamp,
+                "opens": [timestamp],
+                "status": "opened"
+            }
+            tracking_data["leads"].append(new_lead)
+            tracking_data["metrics"]["opened"] = tracking_data["metrics"].get("opened", 0) + 1
 
-    # Add note
-    note = f"{timestamp}: Lead {lead_id} opened email"
-    if "notes" not in tracking_data:
-        tracking_data["notes"] = []
-    tracking_data["notes"].append(note)
+        # Add note
+        note = f"{timestamp}: Lead {lead_id} opened email"
+        if "notes" not in tracking_data:
+            tracking_data["notes"] = []
+        tracking_data["notes"].append(note)
 
-    # Save updated tracking data
-    with open(TRACKING_FILE, 'w') as f:
-        json.dump(tracking_data, f, indent=2)
+        # Save updated tracking data
+        write_json(TRACKING_FILE, tracking_data)
 
 
 def log_trial_signup_email_open(lead_id: str):
@@ -159,13 +161,27 @@ def log_trial_signup_email_open(lead_id: str):
 
     tracking_file = Path(TRIAL_SIGNUP_TRACKING_FILE)
 
-    # Load trial signup tracking data
-    try:
-        if tracking_file.exists():
-            with open(tracking_file, 'r') as f:
-                tracking_data = json.load(f)
-        else:
-            # Initialize if doesn't exist
+    with file_lock(TRIAL_SIGNUP_TRACKING_FILE):
+        # Load trial signup tracking data
+        try:
+            if tracking_file.exists():
+                with open(tracking_file, 'r') as f:
+                    tracking_data = json.load(f)
+            else:
+                # Initialize if doesn't exist
+                tracking_data = {
+                    "campaign": "trial_signup",
+                    "created_at": timestamp,
+                    "last_updated": timestamp,
+                    "submissions": [],
+                    "metrics": {
+                        "total_submissions": 0,
+                        "total_emails_sent": 0,
+                        "total_conversions": 0,
+                        "conversion_rate": 0.0
+                    }
+                }
+        except (FileNotFoundError, json.JSONDecodeError):
             tracking_data = {
                 "campaign": "trial_signup",
                 "created_at": timestamp,
@@ -178,61 +194,44 @@ def log_trial_signup_email_open(lead_id: str):
                     "conversion_rate": 0.0
                 }
             }
-    except (FileNotFoundError, json.JSONDecodeError):
-        tracking_data = {
-            "campaign": "trial_signup",
-            "created_at": timestamp,
-            "last_updated": timestamp,
-            "submissions": [],
-            "metrics": {
-                "total_submissions": 0,
-                "total_emails_sent": 0,
-                "total_conversions": 0,
-                "conversion_rate": 0.0
-            }
-        }
 
-    # Find submission by submission_id
-    submission_found = False
-    for submission in tracking_data.get("submissions", []):
-        if submission.get("submission_id") == submission_id:
-            submission_found = True
+        # Find submission by submission_id
+        submission_found = False
+        for submission in tracking_data.get("submissions", []):
+            if submission.get("submission_id") == submission_id:
+                submission_found = True
 
-            # Initialize opens tracking
-            if "email_opens" not in submission:
-                submission["email_opens"] = []
+                # Initialize opens tracking
+                if "email_opens" not in submission:
+                    submission["email_opens"] = []
 
-            # Add new open event
-            submission["email_opens"].append(timestamp)
+                # Add new open event
+                submission["email_opens"].append(timestamp)
 
-            # Mark as opened if first open
-            if not submission.get("email_opened"):
-                submission["email_opened"] = True
-                submission["email_opened_at"] = timestamp
+                # Mark as opened if first open
+                if not submission.get("email_opened"):
+                    submission["email_opened"] = True
+                    submission["email_opened_at"] = timestamp
 
-            break
+                break
+
+        # If submission not found, log warning but continue (pixel might be opened later)
+        if not submission_found:
+            print(f"Warning: Trial signup submission not found for ID: {submission_id}")
+            # Create placeholder entry
+            tracking_data["submissions"].append({
+                "submission_id": submission_id,
+                "email_opened": True,
+                "email_opened_at": timestamp,
+                "email_opens": [timestamp],
+                "note": "Email opened before submission was recorded (race condition)"
+            })
+
+        # Update timestamp
+        tracking_data["last_updated"] = timestamp
 
-    # If submission not found, log warning but continue (pixel might be opened later)
-    if not submission_found:
-        print(f"Warning: Trial signup submission not found for ID: {submission_id}")
-        # Create placeholder entry
-        tracking_data["submissions"].append({
-            "submission_id": submission_id,
-            "email_opened": True,
-            "email_opened_at": timestamp,
-            "email_opens": [timestamp],
-            "note": "Email opened before submission was recorded (race condition)"
-        })
-
-    # Update timestamp
-    tracking_data["last_updated"] = timestamp
-
-    # Save updated tracking data
-    tracking_file.parent.mkdir(parents=True, exist_ok=True)
-    tmp_file = tracking_file.with_suffix(".json.tmp")
-    with open(tmp_file, 'w') as f:
-        json.dump(tracking_data, f, indent=2)
-    tmp_file.replace(tracking_file)
+        # Save updated tracking data
+        write_json(TRIAL_SIGNUP_TRACKING_FILE, tracking_data)
 
 
 NURTURING_STATE_FILE = Path("/opt/claude-ceo/workspace/arkwatch/data/nurturing_state.json")
@@ -262,49 +261,46 @@ def log_nurturing_email_open(lead_id: str):
             email_safe = parts[: -(len(sid) + 1)]
             break
 
-    # Load nurturing state
-    state_file = NURTURING_STATE_FILE
-    try:
-        if state_file.exists():
-            with open(state_file) as f:
-                state = json.load(f)
-        else:
+    with file_lock(NURTURING_STATE_FILE):
+        # Load nurturing state
+        state_file = NURTURING_STATE_FILE
+        try:
+            if state_file.exists():
+                with open(state_file) as f:
+                    state = json.load(f)
+            else:
+                state = {"leads": {}, "metrics": {}}
+        except (json.JSONDecodeError, OSError):
             state = {"leads": {}, "metrics": {}}
-    except (json.JSONDecodeError, OSError):
-        state = {"leads": {}, "metrics": {}}
-
-    # Find matching lead by email_safe pattern
-    matched_email = None
-    for email in state.get("leads", {}):
-        safe = email.replace("@", "_at_").replace(".", "_")
-        if safe == email_safe:
-            matched_email = email
-            break
 
-    if matched_email and step_id:
-        lead = state["leads"][matched_email]
-        opens_key = "opens"
-        if opens_key not in lead:
-            lead[opens_key] = {}
-        if step_id not in lead[opens_key]:
-            lead[opens_key][step_id] = []
-        lead[opens_key][step_id].append(timestamp)
-
-        # Update metrics
-        if "opens" not in state.get("metrics", {}):
-            state.setdefault("metrics", {})["opens"] = {}
-        state["metrics"]["opens"][step_id] = state["metrics"]["opens"].get(step_id, 0) + 1
-
-        state["last_open"] = timestamp
-
-        # Save
-        state_file.parent.mkdir(parents=True, exist_ok=True)
-        tmp = state_file.with_suffix(".json.tmp")
-        with open(tmp, "w") as f:
-            json.dump(state, f, indent=2)
-        os.replace(str(tmp), str(state_file))
-    else:
-        print(f"Warning: Nurturing open for unknown lead: {lead_id}")
+        # Find matching lead by email_safe pattern
+        matched_email = None
+        for email in state.get("leads", {}):
+            safe = email.replace("@", "_at_").replace(".", "_")
+            if safe == email_safe:
+                matched_email = email
+                break
+
+        if matched_email and step_id:
+            lead = state["leads"][matched_email]
+            opens_key = "opens"
+            if opens_key not in lead:
+                lead[opens_key] = {}
+            if step_id not in lead[opens_key]:
+                lead[opens_key][step_id] = []
+            lead[opens_key][step_id].append(timestamp)
+
+            # Update metrics
+            if "opens" not in state.get("metrics", {}):
+                state.setdefault("metrics", {})["opens"] = {}
+            state["metrics"]["opens"][step_id] = state["metrics"]["opens"].get(step_id, 0) + 1
+
+            state["last_open"] = timestamp
+
+            # Save
+            write_json(state_file, state)
+        else:
+            print(f"Warning: Nurturing open for unknown lead: {lead_id}")
 
 
 CLICK_TRACKING_FILE = Path("/opt/claude-ceo/workspace/arkwatch/data/nurturing_clicks.json")
@@ -332,33 +328,30 @@ async def track_email_click(lead_id: str, url: str = ""):
 
     # Log click
     timestamp = datetime.utcnow().isoformat() + "Z"
-    try:
-        clicks = {}
-        if CLICK_TRACKING_FILE.exists():
-            with open(CLICK_TRACKING_FILE) as f:
-                clicks = json.load(f)
-
-        if "clicks" not in clicks:
-            clicks["clicks"] = []
-        clicks["clicks"].append({
-            "lead_id": lead_id,
-            "url": url,
-            "timestamp": timestamp,
-        })
-        clicks["last_click"] = timestamp
-        clicks["total"] = len(clicks["clicks"])
-
-        # Update nurturing state with click data
-        if lead_id.startswith("nurturing_"):
-            _log_nurturing_click(lead_id, url, timestamp)
-
-        CLICK_TRACKING_FILE.parent.mkdir(parents=True, exist_ok=True)
-        tmp = CLICK_TRACKING_FILE.with_suffix(".json.tmp")
-        with open(tmp, "w") as f:
-            json.dump(clicks, f, indent=2)
-        os.replace(str(tmp), str(CLICK_TRACKING_FILE))
-    except Exception as e:
-        print(f"Click tracking error: {e}")
+    with file_lock(CLICK_TRACKING_FILE):
+        try:
+            clicks = {}
+            if CLICK_TRACKING_FILE.exists():
+                with open(CLICK_TRACKING_FILE) as f:
+                    clicks = json.load(f)
+
+            if "clicks" not in clicks:
+                clicks["clicks"] = []
+            clicks["clicks"].append({
+                "lead_id": lead_id,
+                "url": url,
+                "timestamp": timestamp,
+            })
+            clicks["last_click"] = timestamp
+            clicks["total"] = len(clicks["clicks"])
+
+            # Update nurturing state with click data
+            if lead_id.startswith("nurturing_"):
+                _log_nurturing_click(lead_id, url, timestamp)
+
+            write_json(CLICK_TRACKING_FILE, clicks)
+        except Exception as e:
+            print(f"Click tracking error: {e}")
 
     return RedirectResponse(url=url, status_code=302)
 
@@ -378,31 +371,29 @@ def _log_nurturing_click(lead_id: str, url: str, timestamp: str):
     if not step_id:
         return
 
-    try:
-        if NURTURING_STATE_FILE.exists():
-            with open(NURTURING_STATE_FILE) as f:
-                state = json.load(f)
-        else:
-            return
-
-        for email in state.get("leads", {}):
-            safe = email.replace("@", "_at_").replace(".", "_")
-            if safe == email_safe:
-                lead = state["leads"][email]
-                if "clicks" not in lead:
-                    lead["clicks"] = {}
-                if step_id not in lead["clicks"]:
-                    lead["clicks"][step_id] = []
-                lead["clicks"][step_id].append({"url": url, "at": timestamp})
-
-                if "clicks" not in state.get("metrics", {}):
-                    state.setdefault("metrics", {})["clicks"] = {}
-                state["metrics"]["clicks"][step_id] = state["metrics"]["clicks"].get(step_id, 0) + 1
-
-                tmp = NURTURING_STATE_FILE.with_suffix(".json.tmp")
-                with open(tmp, "w") as f:
-                    json.dump(state, f, indent=2)
-                os.replace(str(tmp), str(NURTURING_STATE_FILE))
-                break
-    except Exception as e:
-        print(f"Nurturing click log error: {e}")
+    with file_lock(NURTURING_STATE_FILE):
+        try:
+            if NURTURING_STATE_FILE.exists():
+                with open(NURTURING_STATE_FILE) as f:
+                    state = json.load(f)
+            else:
+                return
+
+            for email in state.get("leads", {}):
+                safe = email.replace("@", "_at_").replace(".", "_")
+                if safe == email_safe:
+                    lead = state["leads"][email]
+                    if "clicks" not in lead:
+                        lead["clicks"] = {}
+                    if step_id not in lead["clicks"]:
+                        lead["clicks"][step_id] = []
+                    lead["clicks"][step_id].append({"url": url, "at": timestamp})
+
+                    if "clicks" not in state.get("metrics", {}):
+                        state.setdefault("metrics", {})["clicks"] = {}
+                    state["metrics"]["clicks"][step_id] = state["metrics"]["clicks"].get(step_id, 0) + 1
+
+                    write_json(NURTURING_STATE_FILE, state)
+                    break
+        except Exception as e:
+            print(f"Nurturing click log error: {e}")
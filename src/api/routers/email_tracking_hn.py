@@ -9,6 +9,8 @@ import json
 import os
 from pathlib import Path
 
+from ...storage.jsonfile import file_lock, write_json
+
 router = APIRouter()
 
 TRACKING_LOG_FILE = "/opt/claude-ceo/workspace/croissance/email_opens_tracking_20260964.json"
@@ -21,9 +23,8 @@ def load_tracking_data():
     return {"opens": []}
 
 def save_tracking_data(data):
-    """Sauvegarde les données de tracking"""
-    with open(TRACKING_LOG_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
+    """Sauvegarde les données de tracking (appeler avec file_lock(TRACKING_LOG_FILE))"""
+    write_json(TRACKING_LOG_FILE, data)
 
 @router.get("/track/email/{tracking_id}")
 async def track_email_open(tracking_id: str):
@@ -33,20 +34,21 @@ async def track_email_open(tracking_id: str):
     """
 
     # Charger données existantes
-    data = load_tracking_data()
+    with file_lock(TRACKING_LOG_FILE):
+        data = load_tracking_data()
 
-    # Ajouter ouverture
-    open_event = {
-        "tracking_id": tracking_id,
-        "opened_at": datetime.now().isoformat(),
-        "user_agent": "N/A",  # FastAPI request.headers["user-agent"] si disponible
-        "ip": "N/A"
-    }
+        # Ajouter ouverture
+        open_event = {
+            "tracking_id": tracking_id,
+            "opened_at": datetime.now().isoformat(),
+            "user_agent": "N/A",  # FastAPI request.headers["user-agent"] si disponible
+            "ip": "N/A"
+        }
 
-    data["opens"].append(open_event)
+        data["opens"].append(open_event)
 
-    # Sauvegarder
-    save_tracking_data(data)
+        # Sauvegarder
+        save_tracking_data(data)
 
     # Retourner pixel transparent 1x1
     pixel = bytes.fromhex(
@@ -1,7 +1,6 @@
 """First 3 Customers - Lifetime FREE in exchange for testimonial + case study."""
 
 import json
-import os
 import re
 import time
 from collections import defaultdict
@@ -10,6 +9,8 @@ from pathlib import Path
 from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel, field_validator
 
+from ...storage.jsonfile import file_lock, write_json
+
 router = APIRouter()
 
 EMAIL_REGEX = re.compile(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$")
@@ -35,11 +36,8 @@ def _load_signups() -> list[dict]:
 
 
 def _save_signups(signups: list[dict]):
-    DATA_FILE.parent.mkdir(parents=True, exist_ok=True)
-    tmp = str(DATA_FILE) + ".tmp"
-    with open(tmp, "w") as f:
-        json.dump(signups, f, indent=2, ensure_ascii=False)
-    os.replace(tmp, str(DATA_FILE))
+    """Call with file_lock(DATA_FILE) held."""
+    write_json(DATA_FILE, signups, ensure_ascii=False)
 
 
 def _log_notification(signup_data: dict):
@@ -138,40 +136,41 @@ async def signup(req: First3SignupRequest, request: Request):
         )
     _submit_attempts[client_ip].append(now)
 
-    signups = _load_signups()
-
-    # Check duplicate email
-    if any(e["email"] == req.email for e in signups):
-        remaining = max(0, MAX_SPOTS - len(signups))
-        return {
-            "status": "already_claimed",
-            "message": "You've already claimed your spot! Check your email for next steps.",
-            "remaining": remaining,
+    with file_lock(DATA_FILE):
+        signups = _load_signups()
+
+        # Check duplicate email
+        if any(e["email"] == req.email for e in signups):
+            remaining = max(0, MAX_SPOTS - len(signups))
+            return {
+                "status": "already_claimed",
+                "message": "You've already claimed your spot! Check your email for next steps.",
+                "remaining": remaining,
+            }
+
+        # Check capacity
+        if len(signups) >= MAX_SPOTS:
+            raise HTTPException(
+                status_code=410,
+                detail="Sorry, all 3 spots have been claimed. You're too late!",
+            )
+
+        # Create signup entry
+        signup_data = {
+            "email": req.email,
+            "company": req.company,
+            "usecase": req.usecase,
+            "linkedin": req.linkedin,
+            "source": req.source,
+            "claimed_at": current_time,
+            "ip": client_ip,
+            "referer": request.headers.get("referer", "direct"),
+            "user_agent": request.headers.get("user-agent", "unknown"),
+            "spot_number": len(signups) + 1,
         }
 
-    # Check capacity
-    if len(signups) >= MAX_SPOTS:
-        raise HTTPException(
-            status_code=410,
-            detail="Sorry, all 3 spots have been claimed. You're too late!",
-        )
-
-    # Create signup entry
-    signup_data = {
-        "email": req.email,
-        "company": req.company,
-        "usecase": req.usecase,
-        "linkedin": req.linkedin,
-        "source": req.source,
-        "claimed_at": current_time,
-        "ip": client_ip,
-        "referer": request.headers.get("referer", "direct"),
-        "user_agent": request.headers.get("user-agent", "unknown"),
-        "spot_number": len(signups) + 1,
-    }
-
-    signups.append(signup_data)
-    _save_signups(signups)
+        signups.append(signup_data)
+        _save_signups(signups)
 
     # Log for Slack notification
     _log_notification(signup_data)
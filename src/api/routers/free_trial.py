@@ -1,7 +1,6 @@
 """Free trial 6 months - signup endpoint for ultra-conversion landing page."""
 
 import json
-import os
 import re
 import subprocess
 import time
@@ -13,6 +12,7 @@ from fastapi.responses import FileResponse
 from pydantic import BaseModel, field_validator
 
 from ...billing.stripe_service import StripeService
+from ...storage.jsonfile import file_lock, write_json
 from ..auth import create_api_key, get_user_by_email
 
 router = APIRouter()
@@ -38,11 +38,8 @@ def _load_signups() -> list[dict]:
 
 
 def _save_signups(entries: list[dict]):
-    DATA_FILE.parent.mkdir(parents=True, exist_ok=True)
-    tmp = str(DATA_FILE) + ".tmp"
-    with open(tmp, "w") as f:
-        json.dump(entries, f, indent=2, ensure_ascii=False)
-    os.replace(tmp, str(DATA_FILE))
+    """Call with file_lock(DATA_FILE) held."""
+    write_json(DATA_FILE, entries, ensure_ascii=False)
 
 
 def _notify_ceo_new_signup(email: str, source: str, spots_left: int, api_key: str = ""):
@@ -233,19 +230,21 @@ async def free_trial_signup(req: FreeTrialSignup, request: Request):
 
     if existing_user:
         # User exists, just add to signups tracking if not already there
-        if not any(e["email"] == req.email for e in signups):
-            signups.append({
-                "email": req.email,
-                "registered_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-                "ip": client_ip,
-                "source": req.source,
-                "campaign": req.campaign,
-                "user_agent": request.headers.get("user-agent", ""),
-                "referer": request.headers.get("referer", ""),
-                "account_created": True,
-                "api_key_created": True,
-            })
-            _save_signups(signups)
+        with file_lock(DATA_FILE):
+            signups = _load_signups()
+            if not any(e["email"] == req.email for e in signups):
+                signups.append({
+                    "email": req.email,
+                    "registered_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                    "ip": client_ip,
+                    "source": req.source,
+                    "campaign": req.campaign,
+                    "user_agent": request.headers.get("user-agent", ""),
+                    "referer": request.headers.get("referer", ""),
+                    "account_created": True,
+                    "api_key_created": True,
+                })
+                _save_signups(signups)
 
         return {
             "success": True,
@@ -299,21 +298,23 @@ async def free_trial_signup(req: FreeTrialSignup, request: Request):
         checkout_url = "https://arkforge.fr/dashboard.html?upgrade=true"
         print(f"Warning: Failed to create Stripe checkout session for {req.email}: {e}")
 
-    # Add to signups tracking
-    signups.append({
-        "email": req.email,
-        "registered_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-        "ip": client_ip,
-        "source": req.source,
-        "campaign": req.campaign,
-        "user_agent": request.headers.get("user-agent", ""),
-        "referer": request.headers.get("referer", ""),
-        "account_created": True,
-        "api_key": raw_key[:20] + "...",  # Truncated for tracking
-        "stripe_customer_id": customer_id,
-        "checkout_url": checkout_url,
-    })
-    _save_signups(signups)
+    # Add to signups tracking (re-read: the file lock isn't held across the calls above)
+    with file_lock(DATA_FILE):
+        signups = _load_signups()
+        signups.append({
+            "email": req.email,
+            "registered_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "ip": client_ip,
+            "source": req.source,
+            "campaign": req.campaign,
+            "user_agent": request.headers.get("user-agent", ""),
+            "referer": request.headers.get("referer", ""),
+            "account_created": True,
+            "api_key": raw_key[:20] + "...",  # Truncated for tracking
+            "stripe_customer_id": customer_id,
+            "checkout_url": checkout_url,
+        })
+        _save_signups(signups)
 
     spots_left = MAX_SPOTS - len(signups)
 
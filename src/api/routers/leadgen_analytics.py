@@ -1,7 +1,6 @@
 """Lead generation analytics tracking for conversion optimization."""
 
 import json
-import os
 import time
 from collections import defaultdict
 from pathlib import Path
@@ -10,6 +9,8 @@ from fastapi import APIRouter, Request
 from fastapi.responses import Response
 from pydantic import BaseModel
 
+from ...storage.jsonfile import file_lock, write_json
+
 router = APIRouter()
 
 # Data file for analytics events
@@ -34,17 +35,12 @@ def _load_analytics() -> list[dict]:
 
 
 def _save_analytics(events: list[dict]):
-    """Save analytics events to file."""
-    ANALYTICS_FILE.parent.mkdir(parents=True, exist_ok=True)
-    tmp = str(ANALYTICS_FILE) + ".tmp"
-
+    """Save analytics events to file. Call with file_lock(ANALYTICS_FILE) held."""
     # Keep only last 10,000 events to prevent file bloat
     if len(events) > 10000:
         events = events[-10000:]
 
-    with open(tmp, "w") as f:
-        json.dump(events, f, indent=2, ensure_ascii=False)
-    os.replace(tmp, str(ANALYTICS_FILE))
+    write_json(ANALYTICS_FILE, events, ensure_ascii=False)
 
 
 def _aggregate_analytics() -> dict:
@@ -184,23 +180,24 @@ async def track_event(e: str, p: str = "unknown", s: str = "direct", request: Re
     if len(_event_attempts[client_ip]) < RATE_LIMIT_MAX:
         _event_attempts[client_ip].append(now)
 
-        # Load existing events
-        events = _load_analytics()
-
-        # Add new event
-        events.append({
-            "event": e,
-            "page": p,
-            "source": s,
-            "ip": client_ip,
-            "timestamp": now,
-            "date": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-            "user_agent": request.headers.get("user-agent", ""),
-            "referer": request.headers.get("referer", ""),
-        })
-
-        # Save events
-        _save_analytics(events)
+        with file_lock(ANALYTICS_FILE):
+            # Load existing events
+            events = _load_analytics()
+
+            # Add new event
+            events.append({
+                "event": e,
+                "page": p,
+                "source": s,
+                "ip": client_ip,
+                "timestamp": now,
+                "date": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "user_agent": request.headers.get("user-agent", ""),
+                "referer": request.headers.get("referer", ""),
+            })
+
+            # Save events
+            _save_analytics(events)
 
     # Return 1x1 transparent GIF
     gif_data = (
@@ -265,59 +262,55 @@ async def capture_demo_lead(lead: DemoLeadRequest, request: Request):
         request.client.host if request.client else "unknown"
     )
 
-    # Load existing demo leads
-    demo_leads = []
-    if DEMO_LEADS_FILE.exists():
-        try:
-            with open(DEMO_LEADS_FILE) as f:
-                demo_leads = json.load(f)
-        except (json.JSONDecodeError, OSError):
-            demo_leads = []
-
-    # Check if email already exists (prevent duplicates)
-    existing_emails = {lead.get("email") for lead in demo_leads}
-    is_new = lead.email not in existing_emails
-
-    # Add new lead
-    lead_data = {
-        "email": lead.email,
-        "source": lead.source,
-        "timestamp": lead.timestamp,
-        "ip": client_ip,
-        "user_agent": request.headers.get("user-agent", ""),
-        "referer": request.headers.get("referer", ""),
-        "captured_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-        "is_new": is_new,
-    }
-
-    demo_leads.append(lead_data)
+    with file_lock(DEMO_LEADS_FILE):
+        # Load existing demo leads
+        demo_leads = []
+        if DEMO_LEADS_FILE.exists():
+            try:
+                with open(DEMO_LEADS_FILE) as f:
+                    demo_leads = json.load(f)
+            except (json.JSONDecodeError, OSError):
+                demo_leads = []
+
+        # Check if email already exists (prevent duplicates)
+        existing_emails = {lead.get("email") for lead in demo_leads}
+        is_new = lead.email not in existing_emails
+
+        # Add new lead
+        lead_data = {
+            "email": lead.email,
+            "source": lead.source,
+            "timestamp": lead.timestamp,
+            "ip": client_ip,
+            "user_agent": request.headers.get("user-agent", ""),
+            "referer": request.headers.get("referer", ""),
+            "captured_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "is_new": is_new,
+        }
 
-    # Save to file
-    DEMO_LEADS_FILE.parent.mkdir(parents=True, exist_ok=True)
-    tmp = str(DEMO_LEADS_FILE) + ".tmp"
+        demo_leads.append(lead_data)
 
-    # Keep last 5,000 leads to prevent file bloat
-    if len(demo_leads) > 5000:
-        demo_leads = demo_leads[-5000:]
+        # Save to file (keep last 5,000 leads to prevent file bloat)
+        if len(demo_leads) > 5000:
+            demo_leads = demo_leads[-5000:]
 
-    with open(tmp, "w") as f:
-        json.dump(demo_leads, f, indent=2, ensure_ascii=False)
-    os.replace(tmp, str(DEMO_LEADS_FILE))
+        write_json(DEMO_LEADS_FILE, demo_leads, ensure_ascii=False)
 
     # Track event in analytics
-    events = _load_analytics()
-    events.append({
-        "event": "demo_lead_captured",
-        "page": "demo",
-        "source": lead.source,
-        "ip": client_ip,
-        "timestamp": time.time(),
-        "date": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-        "user_agent": request.headers.get("user-agent", ""),
-        "referer": request.headers.get("referer", ""),
-        "email_hash": hash(lead.email),  # Don't store plain email in analytics
-    })
-    _save_analytics(events)
+    with file_lock(ANALYTICS_FILE):
+        events = _load_analytics()
+        events.append({
+            "event": "demo_lead_captured",
+            "page": "demo",
+            "source": lead.source,
+            "ip": client_ip,
+            "timestamp": time.time(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "user_agent": request.headers.get("user-agent", ""),
+            "referer": request.headers.get("referer", ""),
+            "email_hash": hash(lead.email),  # Don't store plain email in analytics
+        })
+        _save_analytics(events)
 
     return {
         "success": True,
@@ -1,7 +1,6 @@
 """Lifetime free beta - 50 spots, email + URL collection, counter tracking."""
 
 import json
-import os
 import re
 import time
 from collections import defaultdict
@@ -10,6 +9,8 @@ from pathlib import Path
 from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel, field_validator
 
+from ...storage.jsonfile import file_lock, write_json
+
 router = APIRouter()
 
 EMAIL_REGEX = re.compile(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$")
@@ -34,11 +35,8 @@ def _load_entries() -> list[dict]:
 
 
 def _save_entries(entries: list[dict]):
-    DATA_FILE.parent.mkdir(parents=True, exist_ok=True)
-    tmp = str(DATA_FILE) + ".tmp"
-    with open(tmp, "w") as f:
-        json.dump(entries, f, indent=2, ensure_ascii=False)
-    os.replace(tmp, str(DATA_FILE))
+    """Call with file_lock(DATA_FILE) held."""
+    write_json(DATA_FILE, entries, ensure_ascii=False)
 
 
 class LifetimeClaimRequest(BaseModel):
@@ -84,29 +82,30 @@ async def claim_lifetime_spot(req: LifetimeClaimRequest, request: Request):
         raise HTTPException(status_code=429, detail="Too many attempts. Please try again later.")
     _submit_attempts[client_ip].append(now)
 
-    entries = _load_entries()
-
-    # Check duplicate email
-    if any(e["email"] == req.email for e in entries):
-        remaining = max(0, MAX_SPOTS - len(entries))
-        return {
-            "status": "already_claimed",
-            "message": "You've already claimed your spot! We'll send setup instructions soon.",
-            "remaining": remaining,
-        }
-
-    # Check capacity
-    if len(entries) >= MAX_SPOTS:
-        raise HTTPException(status_code=410, detail="Sorry, all 50 lifetime spots have been claimed.")
-
-    entries.append({
-        "email": req.email,
-        "url": req.url,
-        "claimed_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-        "ip": client_ip,
-        "source": request.headers.get("referer", "direct"),
-    })
-    _save_entries(entries)
+    with file_lock(DATA_FILE):
+        entries = _load_entries()
+
+        # Check duplicate email
+        if any(e["email"] == req.email for e in entries):
+            remaining = max(0, MAX_SPOTS - len(entries))
+            return {
+                "status": "already_claimed",
+                "message": "You've already claimed your spot! We'll send setup instructions soon.",
+                "remaining": remaining,
+            }
+
+        # Check capacity
+        if len(entries) >= MAX_SPOTS:
+            raise HTTPException(status_code=410, detail="Sorry, all 50 lifetime spots have been claimed.")
+
+        entries.append({
+            "email": req.email,
+            "url": req.url,
+            "claimed_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "ip": client_ip,
+            "source": request.headers.get("referer", "direct"),
+        })
+        _save_entries(entries)
 
     remaining = max(0, MAX_SPOTS - len(entries))
     spot_number = len(entries)
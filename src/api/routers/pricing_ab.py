@@ -12,6 +12,8 @@ from datetime import datetime, timezone
 from fastapi import APIRouter, Request
 from fastapi.responses import JSONResponse, RedirectResponse
 
+from ...storage.jsonfile import file_lock, write_json
+
 router = APIRouter(prefix="/api/pricing-ab", tags=["pricing-ab"])
 
 # Data file for A/B test tracking (must be in ReadWritePaths for systemd)
@@ -39,10 +41,8 @@ def _load_data() -> dict:
 
 
 def _save_data(data: dict) -> None:
-    """Save A/B test tracking data."""
-    os.makedirs(os.path.dirname(AB_DATA_FILE), exist_ok=True)
-    with open(AB_DATA_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+    """Save A/B test tracking data. Call with file_lock(AB_DATA_FILE) held."""
+    write_json(AB_DATA_FILE, data)
 
 
 @router.get("/redirect")
@@ -60,9 +60,10 @@ async def ab_redirect(request: Request):
     version = "v1" if fingerprint == 0 else "v2"
 
     # Track the pageview
-    data = _load_data()
-    data[version]["pageviews"] += 1
-    _save_data(data)
+    with file_lock(AB_DATA_FILE):
+        data = _load_data()
+        data[version]["pageviews"] += 1
+        _save_data(data)
 
     if version == "v1":
         return RedirectResponse(url="/pricing.html?version=v1", status_code=302)
@@ -86,26 +87,27 @@ async def track_event(request: Request):
     if version not in ("v1", "v2"):
         return JSONResponse({"error": "version must be v1 or v2"}, status_code=400)
 
-    data = _load_data()
+    with file_lock(AB_DATA_FILE):
+        data = _load_data()
 
-    if event == "cta_click":
-        data[version]["cta_clicks"] += 1
+        if event == "cta_click":
+            data[version]["cta_clicks"] += 1
 
-    # Track source breakdown
-    if source not in data[version]["sources"]:
-        data[version]["sources"][source] = {"pageviews": 0, "cta_clicks": 0}
-    if event == "pageview":
-        data[version]["sources"][source]["pageviews"] += 1
-    elif event == "cta_click":
-        data[version]["sources"][source]["cta_clicks"] += 1
+        # Track source breakdown
+        if source not in data[version]["sources"]:
+            data[version]["sources"][source] = {"pageviews": 0, "cta_clicks": 0}
+        if event == "pageview":
+            data[version]["sources"][source]["pageviews"] += 1
+        elif event == "cta_click":
+            data[version]["sources"][source]["cta_clicks"] += 1
 
-    # Keep last 200 events for debugging
-    data["events"].append(
-        {"event": event, "version": version, "source": source, "timestamp": timestamp}
-    )
-    data["events"] = data["events"][-200:]
+        # Keep last 200 events for debugging
+        data["events"].append(
+            {"event": event, "version": version, "source": source, "timestamp": timestamp}
+        )
+        data["events"] = data["events"][-200:]
 
-    _save_data(data)
+        _save_data(data)
 
     return {"status": "ok", "tracked": event, "version": version}
 
@@ -4,7 +4,7 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, HttpUrl
 import asyncio
 
-from ...scraper.scraper import _is_safe_url, WebScraper
+from ...scraper.scraper import is_safe_url, get_scraper
 
 router = APIRouter()
 
@@ -29,7 +29,7 @@ async def quick_check(request: QuickCheckRequest):
     url = str(request.url)
 
     # SSRF protection
-    safe, reason, _ = _is_safe_url(url)
+    safe, reason, _ = await is_safe_url(url)
     if not safe:
         raise HTTPException(
             status_code=400,
@@ -37,10 +37,9 @@ async def quick_check(request: QuickCheckRequest):
         )
 
     try:
-        # Scrape the URL immediately
-        scraper = WebScraper(timeout=15)
+        # Scrape the URL immediately, over the process-wide connection pool
         result = await asyncio.wait_for(
-            scraper.scrape(url),
+            get_scraper().scrape(url, timeout=15),
             timeout=20.0
         )
 
@@ -1,15 +1,49 @@
 """Reports endpoints with authentication"""
 
-from fastapi import APIRouter, Depends, HTTPException
+import base64
+import binascii
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 
 from ...storage import get_db
 from ..auth import get_current_user
 
 router = APIRouter()
 
+# Largest page a client can ask for
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(report: dict) -> str:
+    """Opaque cursor for a report's position in the feed."""
+    return base64.urlsafe_b64encode(f"{report['created_at']}|{report['id']}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, str]:
+    try:
+        created_at, report_id = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode().split("|", 1)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+    return created_at, report_id
+
 
 @router.get("/reports")
-async def list_reports(watch_id: str | None = None, limit: int = 100, user: dict = Depends(get_current_user)):
+async def list_reports(
+    response: Response,
+    watch_id: str | None = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    after: str | None = None,
+    before: str | None = None,
+    user: dict = Depends(get_current_user),
+):
+    """Reports newest first, one page at a time.
+
+    X-Next-Cursor (pass as ``after``) fetches the next, older page when there
+    is one; X-Prev-Cursor (pass as ``before``) fetches reports newer than this
+    page, e.g. to poll the feed.
+    """
+    if after and before:
+        raise HTTPException(status_code=400, detail="Use either after or before, not both")
     db = get_db()
 
     # If watch_id provided, verify ownership
@@ -19,29 +53,37 @@ async def list_reports(watch_id: str | None = None, limit: int = 100, user: dict
             raise HTTPException(status_code=404, detail="Watch not found")
         if not user.get("is_admin") and watch.get("user_email") != user["email"]:
             raise HTTPException(status_code=403, detail="Access denied")
-        return db.get_reports(watch_id=watch_id, limit=limit)
+        watch_ids = [watch_id]
+    elif user.get("is_admin"):
+        watch_ids = None
+    else:
+        watch_ids = [w["id"] for w in db.get_watches_by_user(user["email"])]
 
-    # Get all reports for user's watches
-    reports = db.get_reports(limit=limit)
-
-    if not user.get("is_admin"):
-        user_watches = {w["id"] for w in db.get_watches() if w.get("user_email") == user["email"]}
-        reports = [r for r in reports if r["watch_id"] in user_watches]
+    if before:
+        reports = db.query_reports(watch_ids, before=decode_cursor(before), limit=limit)
+        has_older = bool(reports)
+    else:
+        # One extra report tells whether an older page exists
+        reports = db.query_reports(watch_ids, after=decode_cursor(after) if after else None, limit=limit + 1)
+        has_older = len(reports) > limit
+        reports = reports[:limit]
 
+    if reports:
+        response.headers["X-Prev-Cursor"] = encode_cursor(reports[0])
+        if has_older:
+            response.headers["X-Next-Cursor"] = encode_cursor(reports[-1])
     return reports
 
 
 @router.get("/reports/{report_id}")
 async def get_report(report_id: str, user: dict = Depends(get_current_user)):
     db = get_db()
-    reports = db.get_reports()
-
-    for report in reports:
-        if report["id"] == report_id:
-            # Verify ownership
-            watch = db.get_watch(report["watch_id"])
-            if not user.get("is_admin") and watch and watch.get("user_email") != user["email"]:
-                raise HTTPException(status_code=403, detail="Access denied")
-            return report
+    report = db.get_report(report_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Report not found")
 
-    raise HTTPException(status_code=404, detail="Report not found")
+    # Verify ownership
+    watch = db.get_watch(report["watch_id"])
+    if not user.get("is_admin") and watch and watch.get("user_email") != user["email"]:
+        raise HTTPException(status_code=403, detail="Access denied")
+    return report
@@ -3,7 +3,6 @@ Each new subscriber triggers a webhook notification (logged + email to CEO)."""
 
 import json
 import logging
-import os
 import re
 import subprocess
 import time
@@ -13,6 +12,8 @@ from pathlib import Path
 from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel, field_validator
 
+from ...storage.jsonfile import file_lock, write_json
+
 logger = logging.getLogger("arkwatch.subscribe")
 
 router = APIRouter()
@@ -40,11 +41,8 @@ def _load_subscribers() -> list[dict]:
 
 
 def _save_subscribers(entries: list[dict]):
-    DATA_FILE.parent.mkdir(parents=True, exist_ok=True)
-    tmp = str(DATA_FILE) + ".tmp"
-    with open(tmp, "w") as f:
-        json.dump(entries, f, indent=2, ensure_ascii=False)
-    os.replace(tmp, str(DATA_FILE))
+    """Call with file_lock(DATA_FILE) held."""
+    write_json(DATA_FILE, entries, ensure_ascii=False)
 
 
 class SubscribeRequest(BaseModel):
@@ -70,21 +68,22 @@ async def subscribe_email(req: SubscribeRequest, request: Request):
         raise HTTPException(status_code=429, detail="Too many attempts. Please try again later.")
     _submit_attempts[client_ip].append(now)
 
-    entries = _load_subscribers()
-
-    # Check duplicate
-    if any(e["email"] == req.email for e in entries):
-        return {"status": "already_subscribed", "message": "You're already on the list! We'll notify you."}
-
-    subscribed_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
-    source = request.headers.get("referer", "direct")
-    entries.append({
-        "email": req.email,
-        "subscribed_at": subscribed_at,
-        "ip": client_ip,
-        "source": source,
-    })
-    _save_subscribers(entries)
+    with file_lock(DATA_FILE):
+        entries = _load_subscribers()
+
+        # Check duplicate
+        if any(e["email"] == req.email for e in entries):
+            return {"status": "already_subscribed", "message": "You're already on the list! We'll notify you."}
+
+        subscribed_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        source = request.headers.get("referer", "direct")
+        entries.append({
+            "email": req.email,
+            "subscribed_at": subscribed_at,
+            "ip": client_ip,
+            "source": source,
+        })
+        _save_subscribers(entries)
 
     # Webhook notification: log + email alert for new traction signal
     _notify_new_subscriber(req.email, subscribed_at, source, len(entries))
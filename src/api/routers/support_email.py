@@ -11,6 +11,8 @@ import os
 from datetime import datetime
 from pathlib import Path
 
+from ...storage.jsonfile import write_json
+
 router = APIRouter()
 
 SUPPORT_EMAILS_DIR = Path("/opt/claude-ceo/workspace/arkwatch/support_emails")
@@ -73,8 +75,7 @@ async def receive_support_email(
 
     # Save as JSON
     email_file = SUPPORT_EMAILS_DIR / f"{email_id}.json"
-    with open(email_file, 'w', encoding='utf-8') as f:
-        json.dump(email_data, f, indent=2, ensure_ascii=False)
+    write_json(email_file, email_data, ensure_ascii=False)
 
     print(f"[INBOUND EMAIL] Saved: {email_id}")
     print(f"  From: {sender}")
@@ -1,7 +1,6 @@
 """Trial 14 jours sans CB - activation automatique pour DevTo traffic."""
 
 import json
-import os
 import re
 import sys
 import time
@@ -11,6 +10,7 @@ from pathlib import Path
 from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel, field_validator
 
+from ...storage.jsonfile import file_lock, write_json
 from ..auth import create_api_key, get_user_by_email
 
 # Direct import for reliable email sending (not subprocess)
@@ -44,11 +44,8 @@ def _load_signups() -> list[dict]:
 
 
 def _save_signups(entries: list[dict]):
-    DATA_FILE.parent.mkdir(parents=True, exist_ok=True)
-    tmp = str(DATA_FILE) + ".tmp"
-    with open(tmp, "w") as f:
-        json.dump(entries, f, indent=2, ensure_ascii=False)
-    os.replace(tmp, str(DATA_FILE))
+    """Call with file_lock(DATA_FILE) held."""
+    write_json(DATA_FILE, entries, ensure_ascii=False)
 
 
 def _send_trial_welcome_email(email: str, api_key: str) -> bool:
@@ -215,18 +212,20 @@ async def trial_14d_signup(req: Trial14DSignup, request: Request):
 
     if existing_user:
         # User exists, add to tracking
-        if not any(e["email"] == req.email for e in signups):
-            signups.append({
-                "email": req.email,
-                "registered_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-                "ip": client_ip,
-                "source": req.source,
-                "campaign": req.campaign,
-                "user_agent": request.headers.get("user-agent", ""),
-                "referer": request.headers.get("referer", ""),
-                "account_existed": True,
-            })
-            _save_signups(signups)
+        with file_lock(DATA_FILE):
+            signups = _load_signups()
+            if not any(e["email"] == req.email for e in signups):
+                signups.append({
+                    "email": req.email,
+                    "registered_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                    "ip": client_ip,
+                    "source": req.source,
+                    "campaign": req.campaign,
+                    "user_agent": request.headers.get("user-agent", ""),
+                    "referer": request.headers.get("referer", ""),
+                    "account_existed": True,
+                })
+                _save_signups(signups)
 
         return {
             "success": True,
@@ -249,20 +248,22 @@ async def trial_14d_signup(req: Trial14DSignup, request: Request):
             detail=f"Failed to create account: {str(e)}"
         )
 
-    # Track signup
-    signups.append({
-        "email": req.email,
-        "registered_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-        "ip": client_ip,
-        "source": req.source,
-        "campaign": req.campaign,
-        "user_agent": request.headers.get("user-agent", ""),
-        "referer": request.headers.get("referer", ""),
-        "account_created": True,
-        "api_key": raw_key[:20] + "...",  # Truncated
-        "trial_ends_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() + TRIAL_DAYS * 24 * 3600)),
-    })
-    _save_signups(signups)
+    # Track signup (re-read: the file lock isn't held across the calls above)
+    with file_lock(DATA_FILE):
+        signups = _load_signups()
+        signups.append({
+            "email": req.email,
+            "registered_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "ip": client_ip,
+            "source": req.source,
+            "campaign": req.campaign,
+            "user_agent": request.headers.get("user-agent", ""),
+            "referer": request.headers.get("referer", ""),
+            "account_created": True,
+            "api_key": raw_key[:20] + "...",  # Truncated
+            "trial_ends_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() + TRIAL_DAYS * 24 * 3600)),
+        })
+        _save_signups(signups)
 
     # Send welcome email
     _send_trial_welcome_email(req.email, raw_key)
@@ -8,6 +8,7 @@ from pathlib import Path
 from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 
+from ...storage.jsonfile import file_lock, write_json
 from ..auth import get_user_by_email
 
 router = APIRouter()
@@ -27,13 +28,8 @@ def _load_trial_activity() -> dict:
 
 
 def _save_trial_activity(data: dict):
-    """Save trial activity data."""
-    TRIAL_ACTIVITY_FILE.parent.mkdir(parents=True, exist_ok=True)
-    tmp = str(TRIAL_ACTIVITY_FILE) + ".tmp"
-    with open(tmp, "w") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    import os
-    os.replace(tmp, str(TRIAL_ACTIVITY_FILE))
+    """Save trial activity data. Call with file_lock(TRIAL_ACTIVITY_FILE) held."""
+    write_json(TRIAL_ACTIVITY_FILE, data, ensure_ascii=False)
 
 
 def _notify_trial_start(email: str):
@@ -96,37 +92,38 @@ async def log_trial_start(req: TrialStartRequest, request: Request):
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    # Load activity data
-    activity_data = _load_trial_activity()
-    trials = activity_data.get("trials", {})
-
-    # Check if this is first activity for this trial
-    is_first_activity = email not in trials or not trials[email].get("started")
-
-    # Get client info
-    client_ip = request.headers.get("x-real-ip") or (
-        request.client.host if request.client else "unknown"
-    )
-
-    # Update trial tracking
-    if email not in trials:
-        trials[email] = {}
-
-    trials[email].update({
-        "started": True,
-        "started_at": trials[email].get("started_at") or time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-        "first_action": trials[email].get("first_action") or req.action,
-        "last_activity": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-        "last_action": req.action,
-        "activity_count": trials[email].get("activity_count", 0) + 1,
-        "ip": client_ip,
-    })
-
-    if req.metadata:
-        trials[email]["metadata"] = req.metadata
-
-    activity_data["trials"] = trials
-    _save_trial_activity(activity_data)
+    with file_lock(TRIAL_ACTIVITY_FILE):
+        # Load activity data
+        activity_data = _load_trial_activity()
+        trials = activity_data.get("trials", {})
+
+        # Check if this is first activity for this trial
+        is_first_activity = email not in trials or not trials[email].get("started")
+
+        # Get client info
+        client_ip = request.headers.get("x-real-ip") or (
+            request.client.host if request.client else "unknown"
+        )
+
+        # Update trial tracking
+        if email not in trials:
+            trials[email] = {}
+
+        trials[email].update({
+            "started": True,
+            "started_at": trials[email].get("started_at") or time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "first_action": trials[email].get("first_action") or req.action,
+            "last_activity": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "last_action": req.action,
+            "activity_count": trials[email].get("activity_count", 0) + 1,
+            "ip": client_ip,
+        })
+
+        if req.metadata:
+            trials[email]["metadata"] = req.metadata
+
+        activity_data["trials"] = trials
+        _save_trial_activity(activity_data)
 
     # Notify fondations on first activity (conversion opportunity)
     if is_first_activity:
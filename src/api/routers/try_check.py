@@ -12,7 +12,7 @@ import httpx
 from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel, HttpUrl
 
-from ...scraper.scraper import _is_safe_url
+from ...scraper.scraper import is_safe_url
 
 router = APIRouter()
 
@@ -136,7 +136,7 @@ async def check_url(request: Request, url: str | None = None):
         url = f"https://{url}"
 
     # SSRF protection
-    safe, reason, _ = _is_safe_url(url)
+    safe, reason, _ = await is_safe_url(url)
     if not safe:
         raise HTTPException(status_code=400, detail=f"URL not allowed: {reason}")
 
@@ -200,7 +200,7 @@ async def try_check(request_body: TryCheckRequest, request: Request):
     url = str(request_body.url)
 
     # SSRF protection
-    safe, reason, _ = _is_safe_url(url)
+    safe, reason, _ = await is_safe_url(url)
     if not safe:
         raise HTTPException(status_code=400, detail=f"URL not allowed: {reason}")
 
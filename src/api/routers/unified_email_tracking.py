@@ -16,6 +16,8 @@ from urllib.parse import unquote
 from fastapi import APIRouter, Request, Response
 from fastapi.responses import RedirectResponse
 
+from ...storage.jsonfile import file_lock, write_json
+
 router = APIRouter()
 
 UNIFIED_TRACKING_FILE = "/opt/claude-ceo/workspace/arkwatch/data/unified_email_tracking.json"
@@ -38,12 +40,9 @@ def _load_tracking():
 
 
 def _save_tracking(data):
-    path = Path(UNIFIED_TRACKING_FILE)
+    """Call with file_lock(UNIFIED_TRACKING_FILE) held."""
     data["metadata"]["last_updated"] = datetime.utcnow().isoformat() + "Z"
-    tmp = path.with_suffix(".json.tmp")
-    with open(tmp, "w") as f:
-        json.dump(data, f, indent=2)
-    tmp.replace(path)
+    write_json(UNIFIED_TRACKING_FILE, data)
 
 
 def _find_lead_by_id(data, lead_id: str):
@@ -103,19 +102,20 @@ async def track_open(lead_id: str, request: Request):
     """Track email open via 1x1 transparent pixel."""
     now = datetime.utcnow().isoformat() + "Z"
 
-    data = _load_tracking()
-    lead = _find_lead_by_id(data, lead_id)
-
-    if lead:
-        lead["opens_count"] = lead.get("opens_count", 0) + 1
-        if not lead.get("first_open_at"):
-            lead["first_open_at"] = now
-        lead["last_activity"] = now
-        if "open_timestamps" not in lead:
-            lead["open_timestamps"] = []
-        lead["open_timestamps"].append(now)
-        lead["heat_score"] = _recalculate_heat_score(lead)
-        _save_tracking(data)
+    with file_lock(UNIFIED_TRACKING_FILE):
+        data = _load_tracking()
+        lead = _find_lead_by_id(data, lead_id)
+
+        if lead:
+            lead["opens_count"] = lead.get("opens_count", 0) + 1
+            if not lead.get("first_open_at"):
+                lead["first_open_at"] = now
+            lead["last_activity"] = now
+            if "open_timestamps" not in lead:
+                lead["open_timestamps"] = []
+            lead["open_timestamps"].append(now)
+            lead["heat_score"] = _recalculate_heat_score(lead)
+            _save_tracking(data)
 
     return Response(
         content=TRACKING_PIXEL,
@@ -137,14 +137,15 @@ async def track_click(lead_id: str, url: str, request: Request):
     if not redirect_url.startswith("http"):
         redirect_url = "https://" + redirect_url
 
-    data = _load_tracking()
-    lead = _find_lead_by_id(data, lead_id)
+    with file_lock(UNIFIED_TRACKING_FILE):
+        data = _load_tracking()
+        lead = _find_lead_by_id(data, lead_id)
 
-    if lead:
-        lead["clicks_count"] = lead.get("clicks_count", 0) + 1
-        lead["last_activity"] = now
-        lead["heat_score"] = _recalculate_heat_score(lead)
-        _save_tracking(data)
+        if lead:
+            lead["clicks_count"] = lead.get("clicks_count", 0) + 1
+            lead["last_activity"] = now
+            lead["heat_score"] = _recalculate_heat_score(lead)
+            _save_tracking(data)
 
     return RedirectResponse(url=redirect_url, status_code=302)
 
@@ -1,9 +1,11 @@
 """Watch management endpoints with authentication"""
 
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import UTC, datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel, HttpUrl
 
-from ...scraper.scraper import _is_safe_url
+from ...scraper.scraper import is_safe_url
 from ...storage import get_db
 from ..auth import get_current_user, get_current_verified_user, get_tier_limits
 
@@ -16,6 +18,7 @@ class WatchCreate(BaseModel):
     check_interval: int = 3600
     notify_email: str | None = None
     min_change_ratio: float | None = None  # 0.0-1.0, None = default (5%)
+    adaptive_interval: bool = False  # check less often while the page stays the same
 
 
 class WatchUpdate(BaseModel):
@@ -24,12 +27,13 @@ class WatchUpdate(BaseModel):
     notify_email: str | None = None
     status: str | None = None
     min_change_ratio: float | None = None  # 0.0-1.0, None = default (5%)
+    adaptive_interval: bool | None = None
 
 
 @router.post("/watches")
 async def create_watch(watch: WatchCreate, user: dict = Depends(get_current_verified_user)):
     # SSRF protection: validate URL before accepting
-    safe, reason, _ = _is_safe_url(str(watch.url))
+    safe, reason, _ = await is_safe_url(str(watch.url))
     if not safe:
         raise HTTPException(status_code=400, detail=f"URL not allowed: {reason}")
 
@@ -54,6 +58,8 @@ async def create_watch(watch: WatchCreate, user: dict = Depends(get_current_veri
         check_interval=check_interval,
         notify_email=watch.notify_email or user["email"],
         min_change_ratio=watch.min_change_ratio,
+        adaptive_interval=watch.adaptive_interval,
+        max_check_interval=limits["check_interval_max"],
     )
 
     # Tag with user email
@@ -107,6 +113,11 @@ async def update_watch(watch_id: str, update: WatchUpdate, user: dict = Depends(
         limits = get_tier_limits(user["tier"])
         updates["check_interval"] = max(updates["check_interval"], limits["check_interval_min"])
 
+    # Adaptive back-off restarts from the configured interval, within the tier's ceiling
+    if "check_interval" in updates or "adaptive_interval" in updates:
+        updates["effective_interval"] = updates.get("check_interval", watch.get("check_interval", 3600))
+        updates["max_check_interval"] = get_tier_limits(user["tier"])["check_interval_max"]
+
     watch = db.update_watch(watch_id, **updates)
     return watch
 
@@ -124,3 +135,48 @@ async def delete_watch(watch_id: str, user: dict = Depends(get_current_user)):
 
     db.delete_watch(watch_id)
     return {"status": "deleted"}
+
+
+@router.get("/watches/{watch_id}/versions")
+async def list_versions(
+    watch_id: str,
+    at: datetime | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+    user: dict = Depends(get_current_user),
+):
+    """Versions of the watched page, newest first.
+
+    With ``at``, only versions created at or before that time: the first one
+    is what the page said then.
+    """
+    db = get_db()
+    watch = db.get_watch(watch_id)
+
+    if not watch:
+        raise HTTPException(status_code=404, detail="Watch not found")
+
+    if not user.get("is_admin") and watch.get("user_email") != user["email"]:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    if at is not None and at.tzinfo is not None:
+        # Versions are stamped in naive UTC
+        at = at.astimezone(UTC).replace(tzinfo=None)
+    return db.get_versions(watch_id, at=at.isoformat() if at else None, limit=limit)
+
+
+@router.get("/watches/{watch_id}/versions/{version_id}")
+async def get_version(watch_id: str, version_id: int, user: dict = Depends(get_current_user)):
+    """One version of the watched page with its full text."""
+    db = get_db()
+    watch = db.get_watch(watch_id)
+
+    if not watch:
+        raise HTTPException(status_code=404, detail="Watch not found")
+
+    if not user.get("is_admin") and watch.get("user_email") != user["email"]:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    version = db.get_version(watch_id, version_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Version not found")
+    return version
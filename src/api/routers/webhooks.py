@@ -2,7 +2,6 @@
 
 import json
 import logging
-import os
 import sys
 from datetime import datetime
 from pathlib import Path
@@ -10,6 +9,7 @@ from pathlib import Path
 from fastapi import APIRouter, HTTPException, Request
 
 from ...billing.stripe_service import StripeService
+from ...storage.jsonfile import file_lock, write_json
 from ..auth import get_user_by_customer_id, update_stripe_info
 
 sys.path.insert(0, "/opt/claude-ceo/automation")
@@ -34,42 +34,42 @@ PAYMENTS_FILE = Path("/opt/claude-ceo/workspace/arkwatch/data/payments.json")
 def record_payment(invoice: dict, email: str | None = None):
     """Record a successful payment to payments.json"""
     try:
-        # Load existing payments
-        payments = []
-        if PAYMENTS_FILE.exists():
-            with open(PAYMENTS_FILE) as f:
-                payments = json.load(f)
-
-        # Extract payment details
-        amount_paid = invoice.get("amount_paid", 0) / 100  # Convert cents to EUR
-        currency = invoice.get("currency", "eur").upper()
-        invoice_id = invoice.get("id")
-        subscription_id = invoice.get("subscription")
-        created_timestamp = invoice.get("created")
-
-        # Create payment record
-        payment_record = {
-            "invoice_id": invoice_id,
-            "subscription_id": subscription_id,
-            "customer_email": email,
-            "amount": amount_paid,
-            "currency": currency,
-            "status": "paid",
-            "paid_at": datetime.fromtimestamp(created_timestamp).isoformat() if created_timestamp else datetime.utcnow().isoformat(),
-            "recorded_at": datetime.utcnow().isoformat(),
-        }
-
-        # Check if payment already recorded (avoid duplicates)
-        if not any(p.get("invoice_id") == invoice_id for p in payments):
-            payments.append(payment_record)
-
-            # Write back to file
-            with open(PAYMENTS_FILE, "w") as f:
-                json.dump(payments, f, indent=2)
-
-            logger.info(f"Payment recorded: {amount_paid} {currency} for {email}")
-        else:
-            logger.debug(f"Payment {invoice_id} already recorded, skipping")
+        with file_lock(PAYMENTS_FILE):
+            # Load existing payments
+            payments = []
+            if PAYMENTS_FILE.exists():
+                with open(PAYMENTS_FILE) as f:
+                    payments = json.load(f)
+
+            # Extract payment details
+            amount_paid = invoice.get("amount_paid", 0) / 100  # Convert cents to EUR
+            currency = invoice.get("currency", "eur").upper()
+            invoice_id = invoice.get("id")
+            subscription_id = invoice.get("subscription")
+            created_timestamp = invoice.get("created")
+
+            # Create payment record
+            payment_record = {
+                "invoice_id": invoice_id,
+                "subscription_id": subscription_id,
+                "customer_email": email,
+                "amount": amount_paid,
+                "currency": currency,
+                "status": "paid",
+                "paid_at": datetime.fromtimestamp(created_timestamp).isoformat() if created_timestamp else datetime.utcnow().isoformat(),
+                "recorded_at": datetime.utcnow().isoformat(),
+            }
+
+            # Check if payment already recorded (avoid duplicates)
+            if not any(p.get("invoice_id") == invoice_id for p in payments):
+                payments.append(payment_record)
+
+                # Write back to file
+                write_json(PAYMENTS_FILE, payments)
+
+                logger.info(f"Payment recorded: {amount_paid} {currency} for {email}")
+            else:
+                logger.debug(f"Payment {invoice_id} already recorded, skipping")
 
     except Exception as e:
         logger.error(f"Failed to record payment: {e}", exc_info=True)
@@ -279,28 +279,25 @@ def update_ceo_state_revenue(amount: float, email: str | None, tier: str):
         if not CEO_STATE_FILE.exists():
             return
 
-        with open(CEO_STATE_FILE) as f:
-            state = json.load(f)
+        with file_lock(CEO_STATE_FILE):
+            with open(CEO_STATE_FILE) as f:
+                state = json.load(f)
 
-        old_revenue = state.get("revenus", 0)
-        new_revenue = old_revenue + amount
+            old_revenue = state.get("revenus", 0)
+            new_revenue = old_revenue + amount
 
-        state["revenus"] = new_revenue
-        state["last_stripe_payment"] = {
-            "amount": amount,
-            "email": email,
-            "tier": tier,
-            "timestamp": datetime.utcnow().isoformat() + "Z",
-            "stripe_verified": True,
-        }
+            state["revenus"] = new_revenue
+            state["last_stripe_payment"] = {
+                "amount": amount,
+                "email": email,
+                "tier": tier,
+                "timestamp": datetime.utcnow().isoformat() + "Z",
+                "stripe_verified": True,
+            }
 
-        # Atomic write
-        tmp = CEO_STATE_FILE.with_suffix(".json.tmp")
-        with open(tmp, "w") as f:
-            json.dump(state, f, indent=2, ensure_ascii=False)
-        os.replace(str(tmp), str(CEO_STATE_FILE))
+            write_json(CEO_STATE_FILE, state, ensure_ascii=False)
 
-        logger.info(f"CEO state revenue updated: {old_revenue} -> {new_revenue} EUR (Stripe verified)")
+            logger.info(f"CEO state revenue updated: {old_revenue} -> {new_revenue} EUR (Stripe verified)")
     except Exception as e:
         logger.error(f"Failed to update CEO state revenue: {e}", exc_info=True)
 
@@ -334,31 +331,29 @@ def notify_conversion_telegram(email: str | None, tier: str, amount: float, stat
 def record_conversion(session: dict, email: str | None, tier: str, status: str):
     """Record a checkout conversion event."""
     try:
-        conversions = []
-        if CONVERSIONS_FILE.exists():
-            with open(CONVERSIONS_FILE) as f:
-                conversions = json.load(f)
-
-        record = {
-            "session_id": session.get("id"),
-            "customer_id": session.get("customer"),
-            "email": email,
-            "tier": tier,
-            "status": status,
-            "source": session.get("metadata", {}).get("source", "unknown"),
-            "product": session.get("metadata", {}).get("product", "arkwatch"),
-            "amount_total": (session.get("amount_total") or 0) / 100,
-            "currency": session.get("currency", "eur"),
-            "converted_at": datetime.utcnow().isoformat(),
-        }
-
-        if not any(c.get("session_id") == record["session_id"] for c in conversions):
-            conversions.append(record)
-            tmp = CONVERSIONS_FILE.with_suffix(".json.tmp")
-            with open(tmp, "w") as f:
-                json.dump(conversions, f, indent=2)
-            tmp.replace(CONVERSIONS_FILE)
-            logger.info(f"Conversion recorded: {email} -> {tier} ({status})")
+        with file_lock(CONVERSIONS_FILE):
+            conversions = []
+            if CONVERSIONS_FILE.exists():
+                with open(CONVERSIONS_FILE) as f:
+                    conversions = json.load(f)
+
+            record = {
+                "session_id": session.get("id"),
+                "customer_id": session.get("customer"),
+                "email": email,
+                "tier": tier,
+                "status": status,
+                "source": session.get("metadata", {}).get("source", "unknown"),
+                "product": session.get("metadata", {}).get("product", "arkwatch"),
+                "amount_total": (session.get("amount_total") or 0) / 100,
+                "currency": session.get("currency", "eur"),
+                "converted_at": datetime.utcnow().isoformat(),
+            }
+
+            if not any(c.get("session_id") == record["session_id"] for c in conversions):
+                conversions.append(record)
+                write_json(CONVERSIONS_FILE, conversions)
+                logger.info(f"Conversion recorded: {email} -> {tier} ({status})")
 
     except Exception as e:
         logger.error(f"Failed to record conversion: {e}", exc_info=True)
@@ -0,0 +1,91 @@
+"""Circuit breakers for dependencies that fail in runs (hosts, upstream APIs).
+
+A breaker is closed while calls succeed. After failure_threshold consecutive
+failures it opens and rejects calls for cooldown seconds, then lets a single
+trial call through (half-open): success closes it, failure opens it again.
+A trial that never reports back frees the slot after another cooldown.
+"""
+
+import time
+from collections.abc import Callable
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with a cooling period and a single trial call."""
+
+    def __init__(
+        self, failure_threshold: int = 5, cooldown: float = 300.0, clock: Callable[[], float] = time.monotonic
+    ):
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = max(0.0, cooldown)
+        self._clock = clock
+        self.failures = 0
+        self._opened_at: float | None = None
+        self._trial_at: float | None = None
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return CLOSED
+        if self._clock() - self._opened_at < self.cooldown:
+            return OPEN
+        return HALF_OPEN
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now (claims the trial slot when half-open)."""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == OPEN:
+            return False
+        now = self._clock()
+        if self._trial_at is not None and now - self._trial_at < self.cooldown:
+            return False
+        self._trial_at = now
+        return True
+
+    def retry_in(self) -> float:
+        """Seconds until allow() may return True again (0 when closed)."""
+        if self._opened_at is None:
+            return 0.0
+        now = self._clock()
+        start = self._opened_at if self._trial_at is None else max(self._opened_at, self._trial_at)
+        return max(0.0, start + self.cooldown - now)
+
+    def record_success(self):
+        self.failures = 0
+        self._opened_at = None
+        self._trial_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self._opened_at is not None or self.failures >= self.failure_threshold:
+            # A failed trial (or the failure that crosses the threshold) starts a new cooling period
+            self._opened_at = self._clock()
+            self._trial_at = None
+
+
+class CircuitBreakers:
+    """One CircuitBreaker per key (e.g. host), created on first use."""
+
+    def __init__(
+        self, failure_threshold: int = 5, cooldown: float = 300.0, clock: Callable[[], float] = time.monotonic
+    ):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._clock = clock
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def get(self, key: str) -> CircuitBreaker:
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = self._breakers[key] = CircuitBreaker(self.failure_threshold, self.cooldown, self._clock)
+        return breaker
+
+    def open_keys(self) -> list[str]:
+        """Keys whose breaker is currently rejecting calls."""
+        return [key for key, breaker in self._breakers.items() if breaker.state != CLOSED]
@@ -3,16 +3,24 @@
 Encrypts personal data (emails, names) at rest using Fernet (AES-128-CBC + HMAC).
 The encryption key is derived from ARKWATCH_PII_KEY environment variable.
 If the key is not set, encryption is a no-op (graceful degradation for migration).
+
+Encrypted fields that are looked up by value also get a blind index: a keyed
+HMAC of the plaintext stored next to the ciphertext, so equality lookups don't
+have to decrypt every record. Its key is ARKWATCH_BLIND_INDEX_KEY, or derived
+from ARKWATCH_PII_KEY when that is not set (rotating the PII key then means
+rebuilding the index, which scripts/rotate_pii_key.py does).
 """
 
 import base64
 import hashlib
+import hmac
 import logging
 import os
 
 from cryptography.fernet import Fernet, InvalidToken
 
 _PII_KEY_ENV = "ARKWATCH_PII_KEY"
+_BLIND_INDEX_KEY_ENV = "ARKWATCH_BLIND_INDEX_KEY"
 _ENC_PREFIX = "enc:"
 _fernet_cache = None
 _warned = False
@@ -75,6 +83,19 @@ def is_encrypted(value: str) -> bool:
     return bool(value and value.startswith(_ENC_PREFIX))
 
 
+def blind_index(value: str | None, field: str) -> str | None:
+    """Keyed HMAC of a field's plaintext value, for equality lookups without decrypting.
+
+    The field name is part of the MAC so equal values in different fields don't
+    share an index entry. Returns None for empty values.
+    """
+    if not value:
+        return None
+    raw_key = os.getenv(_BLIND_INDEX_KEY_ENV) or os.getenv(_PII_KEY_ENV) or ""
+    key = hashlib.sha256(b"arkwatch-blind-index:" + raw_key.encode()).digest()
+    return hmac.new(key, f"{field}:{value}".encode(), hashlib.sha256).hexdigest()[:32]
+
+
 def mask_email(email: str) -> str:
     """Mask an email for safe logging: apps.desiorac@gmail.com -> a***c@g***.com"""
     if not email or "@" not in email:
@@ -0,0 +1,7 @@
+"""ArkWatch Scheduler Module - due-time ordering of watch checks"""
+
+from .adaptive import adaptive_interval, interval_of
+from .retry import retry_delay
+from .scheduler import DueWatch, WatchScheduler, next_check_at
+
+__all__ = ["WatchScheduler", "DueWatch", "next_check_at", "adaptive_interval", "interval_of", "retry_delay"]
@@ -0,0 +1,51 @@
+"""Adaptive check intervals estimated from a watch's report history.
+
+Watches with ``adaptive_interval`` enabled are checked less often while their
+page stays the same. The change rate is estimated from the last reports: with
+``c`` changes over a span of ``s`` seconds, changes are expected every
+``s / (c + 1)`` seconds (the +1 assumes one more change is about to happen, so a
+page that never changed still backs off gradually). Dividing that gap by
+ADAPTIVE_CHECKS_PER_CHANGE keeps several checks per expected change.
+
+The interval never grows by more than ADAPTIVE_MAX_GROWTH per check, stays
+between the watch's own check_interval (itself at least the tier minimum) and
+max_check_interval (the tier maximum), and drops back to check_interval as
+soon as a change is detected.
+"""
+
+import os
+from datetime import datetime
+
+# Reports looked at to estimate a watch's change rate
+ADAPTIVE_WINDOW = int(os.getenv("ARKWATCH_ADAPTIVE_WINDOW", "50"))
+# Checks wanted per expected change (higher = backs off less)
+ADAPTIVE_CHECKS_PER_CHANGE = float(os.getenv("ARKWATCH_ADAPTIVE_CHECKS_PER_CHANGE", "4"))
+# Max factor the interval may grow by from one check to the next
+ADAPTIVE_MAX_GROWTH = 2.0
+
+
+def interval_of(watch: dict) -> int:
+    """Seconds until a watch's next check: effective_interval in adaptive mode, else check_interval."""
+    base = watch.get("check_interval", 3600)
+    if watch.get("adaptive_interval") and watch.get("effective_interval"):
+        return watch["effective_interval"]
+    return base
+
+
+def adaptive_interval(watch: dict, reports: list[dict]) -> int:
+    """Next effective interval of an adaptive watch given its reports, newest first."""
+    base = watch.get("check_interval", 3600)
+    ceiling = max(base, watch.get("max_check_interval") or base)
+    if not reports or reports[0].get("changes_detected"):
+        return base
+
+    newest = datetime.fromisoformat(reports[0]["created_at"])
+    oldest = datetime.fromisoformat(reports[-1]["created_at"])
+    # The oldest report covers the interval before it too
+    span = (newest - oldest).total_seconds() + base
+    changes = sum(1 for r in reports if r.get("changes_detected"))
+    estimate = span / (changes + 1) / ADAPTIVE_CHECKS_PER_CHANGE
+
+    current = watch.get("effective_interval") or base
+    interval = min(estimate, current * ADAPTIVE_MAX_GROWTH, ceiling)
+    return int(max(base, interval))
@@ -0,0 +1,23 @@
+"""Retry delays for watches whose last check failed.
+
+A failed check no longer takes a watch out of monitoring: it is retried after
+an exponentially growing delay (RETRY_BASE_DELAY, doubled per consecutive
+failure, capped at the larger of its interval and RETRY_MAX_DELAY). The delay
+is jittered between half and all of that value so watches that failed
+together (same host, same outage) don't all retry at the same instant.
+"""
+
+import os
+import random
+
+# First retry after this many seconds, doubling per consecutive failure
+RETRY_BASE_DELAY = float(os.getenv("ARKWATCH_RETRY_BASE_DELAY", "60"))
+# Longest retry delay (a watch's own interval is used when longer)
+RETRY_MAX_DELAY = float(os.getenv("ARKWATCH_RETRY_MAX_DELAY", "21600"))
+
+
+def retry_delay(failures: int, interval: float, rng: random.Random | None = None) -> float:
+    """Seconds before retrying a watch after its failures-th consecutive failure."""
+    cap = max(interval, RETRY_MAX_DELAY)
+    delay = min(cap, RETRY_BASE_DELAY * 2 ** max(0, min(failures - 1, 32)))
+    return (rng or random).uniform(delay / 2, delay)
@@ -0,0 +1,138 @@
+"""Min-heap scheduler keyed on each watch's next due time"""
+
+import asyncio
+import heapq
+import itertools
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from .adaptive import interval_of
+
+
+def _parse(ts: str | None) -> datetime | None:
+    if not ts:
+        return None
+    return datetime.fromisoformat(ts.replace("Z", ""))
+
+
+def next_check_at(watch: dict) -> datetime:
+    """When a watch is next due (naive UTC, same convention as last_check).
+
+    Never-checked watches are due from their creation time, watches whose
+    last check failed at their next_retry_at.
+    """
+    retry_at = _parse(watch.get("next_retry_at"))
+    if retry_at is not None:
+        return retry_at
+    last_check = _parse(watch.get("last_check"))
+    if last_check is None:
+        return _parse(watch.get("created_at")) or datetime.utcnow()
+    return last_check + timedelta(seconds=interval_of(watch))
+
+
+@dataclass
+class DueWatch:
+    """A watch popped from the scheduler, with how late it is being dispatched"""
+
+    watch: dict
+    due_at: datetime
+    lag: float  # seconds between due_at and dispatch
+
+
+class WatchScheduler:
+    """Index of active watches ordered by next due time.
+
+    Entries are (due_at, seq, watch_id) tuples in a heap. Rescheduling pushes a
+    new entry and leaves the old one in place; stale entries are skipped when
+    they reach the top (their due_at no longer matches the watch's current one).
+    Watches popped for dispatch are "in flight" until complete() is called, and
+    sync() leaves them alone so a slow check is never dispatched twice. sync()
+    only recomputes a due time when the stored record changed (updated_at), so
+    the time set by complete() sticks when a check failed without writing back.
+    ``rescheduled`` is set whenever the earliest due time moves earlier, so a
+    loop sleeping until the previous one can wake up.
+    """
+
+    def __init__(self):
+        self._heap: list[tuple[datetime, int, str]] = []
+        self._seq = itertools.count()
+        self._due_at: dict[str, datetime] = {}
+        self._watches: dict[str, dict] = {}
+        self._versions: dict[str, str | None] = {}
+        self._in_flight: set[str] = set()
+        self.rescheduled = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._due_at)
+
+    def schedule(self, watch: dict, due_at: datetime | None = None):
+        """Add or move a watch to due_at (default: computed from its last_check)."""
+        watch_id = watch["id"]
+        due_at = due_at or next_check_at(watch)
+        self._watches[watch_id] = watch
+        self._versions[watch_id] = watch.get("updated_at")
+        if self._due_at.get(watch_id) != due_at:
+            self._due_at[watch_id] = due_at
+            entry = (due_at, next(self._seq), watch_id)
+            heapq.heappush(self._heap, entry)
+            if self._heap[0] is entry:
+                self.rescheduled.set()
+
+    def remove(self, watch_id: str):
+        self._in_flight.discard(watch_id)
+        self._due_at.pop(watch_id, None)
+        self._watches.pop(watch_id, None)
+        self._versions.pop(watch_id, None)
+
+    def sync(self, watches: list[dict]):
+        """Reconcile with the current set of active watches from storage."""
+        seen = set()
+        for watch in watches:
+            watch_id = watch["id"]
+            seen.add(watch_id)
+            if watch_id in self._in_flight:
+                continue
+            if watch_id in self._due_at and self._versions.get(watch_id) == watch.get("updated_at"):
+                continue
+            self.schedule(watch)
+        for watch_id in list(self._due_at):
+            if watch_id not in seen:
+                self.remove(watch_id)
+
+    def _prune(self):
+        """Drop stale heap entries until the top one is current."""
+        while self._heap:
+            due_at, _, watch_id = self._heap[0]
+            if self._due_at.get(watch_id) == due_at:
+                return
+            heapq.heappop(self._heap)
+
+    def next_due_at(self) -> datetime | None:
+        self._prune()
+        return self._heap[0][0] if self._heap else None
+
+    def seconds_until_next(self, now: datetime | None = None) -> float | None:
+        """Seconds until the earliest watch is due (0 if overdue, None if empty)."""
+        due_at = self.next_due_at()
+        if due_at is None:
+            return None
+        now = now or datetime.utcnow()
+        return max(0.0, (due_at - now).total_seconds())
+
+    def pop_due(self, now: datetime | None = None) -> list[DueWatch]:
+        """Pop every watch due at or before now, most overdue first."""
+        now = now or datetime.utcnow()
+        due = []
+        while True:
+            self._prune()
+            if not self._heap or self._heap[0][0] > now:
+                return due
+            due_at, _, watch_id = heapq.heappop(self._heap)
+            del self._due_at[watch_id]
+            self._in_flight.add(watch_id)
+            due.append(DueWatch(self._watches.pop(watch_id), due_at, (now - due_at).total_seconds()))
+
+    def complete(self, watch: dict, due_at: datetime | None = None):
+        """Mark a dispatched watch as done and schedule its next check."""
+        self._in_flight.discard(watch["id"])
+        self.schedule(watch, due_at)
@@ -1,5 +1,7 @@
 """ArkWatch Scraper Module"""
 
-from .scraper import ScrapeResult, WebScraper
+from .extract import ExtractionPool
+from .politeness import HostThrottle
+from .scraper import ScrapeResult, WebScraper, close_scraper, get_scraper
 
-__all__ = ["WebScraper", "ScrapeResult"]
+__all__ = ["WebScraper", "ScrapeResult", "HostThrottle", "ExtractionPool", "get_scraper", "close_scraper"]
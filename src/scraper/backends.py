@@ -0,0 +1,198 @@
+"""Pluggable HTML extraction backends.
+
+Every backend turns a page into the same ``Extracted`` (text_content, title,
+content_hash) as the BeautifulSoup/html.parser reference, so switching backends
+never changes a watch's hash. bs4 is the default; the faster parsers are opt-in
+(ARKWATCH_HTML_BACKEND) and used only when installed:
+
+- ``lxml``: libxml2 HTML parser (``pip install lxml``)
+- ``selectolax``: Lexbor HTML5 parser (``pip install selectolax``)
+- ``bs4``: BeautifulSoup with html.parser, the reference implementation
+
+The other parsers build a different tree from some inputs than html.parser
+does (CR line endings, CDATA sections, NUL characters, markup inside <title>,
+content before <html> or after </html>, <textarea>/<iframe>/<xmp> and other
+raw-text elements, unterminated or unknown character references). Pages
+containing those are handed to the reference backend so the output stays
+identical; tests/test_extract_backends.py checks conformance on the saved
+pages in tests/fixtures/pages.
+"""
+
+import hashlib
+import importlib.util
+import os
+import re
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from html.entities import html5 as _HTML5_ENTITIES
+
+from bs4 import BeautifulSoup
+
+# bs4 | lxml | selectolax, or auto for the fastest one installed (opt-in: bs4 is the reference)
+HTML_BACKEND = os.getenv("ARKWATCH_HTML_BACKEND", "bs4")
+
+# Elements dropped with their content before extracting text
+STRIP_TAGS = ("script", "style", "nav", "footer", "header")
+
+# Inputs on which HTML5-style parsers diverge from html.parser
+_REFERENCE_ONLY = ("\r", "<![CDATA[", "\x00")
+# Markup inside <title> (html.parser parses it, HTML5 treats it as text)
+_TITLE_MARKUP = re.compile(r"<title\b[^>]*>[^<]*<(?!/title\s*>)", re.IGNORECASE)
+# Content after </html> (dropped by libxml2)
+_AFTER_HTML_END = re.compile(r"</html\s*>\s*\S", re.IGNORECASE)
+# Text before <html> (joined to what follows by the HTML5 parsers)
+_HTML_START = re.compile(r"<html\b", re.IGNORECASE)
+_MARKUP = re.compile(r"<!--.*?-->|<[^>]*>", re.DOTALL)
+# RAWTEXT/RCDATA elements: html.parser parses their content as markup, HTML5 keeps it as text
+_RAW_TEXT = re.compile(r"<(?:textarea|iframe|xmp|noembed|noframes|noscript|plaintext)\b", re.IGNORECASE)
+# Character references; unterminated or unknown ones are decoded differently (&copy2026, &notit;)
+_CHAR_REF = re.compile(r"&(#[xX]?[0-9a-fA-F]*|[A-Za-z][A-Za-z0-9]*)(;?)")
+
+# Fastest first, for auto
+_PREFERENCE = ("lxml", "selectolax", "bs4")
+
+
+@dataclass
+class Extracted:
+    """Text content extracted from an HTML page"""
+
+    text_content: str
+    title: str | None
+    content_hash: str
+
+
+def _result(strings, title: str | None) -> Extracted:
+    text = "\n".join(s for s in (s.strip() for s in strings) if s)
+    return Extracted(
+        text_content=text,
+        title=title,
+        content_hash=hashlib.sha256(text.encode()).hexdigest()[:16],
+    )
+
+
+def _extract_bs4(html: str) -> Extracted:
+    soup = BeautifulSoup(html, "html.parser")
+
+    # Remove script and style elements
+    for element in soup(list(STRIP_TAGS)):
+        element.decompose()
+
+    # Get title (plain str: NavigableString drags the whole tree along when pickled)
+    title = soup.title.string if soup.title else None
+    title = str(title) if title is not None else None
+
+    # Same as soup.get_text(separator="\n", strip=True)
+    return _result(soup.strings, title)
+
+
+def _extract_selectolax(html: str) -> Extracted:
+    from selectolax.lexbor import LexborHTMLParser
+
+    tree = LexborHTMLParser(html)
+    tree.strip_tags(list(STRIP_TAGS))
+
+    title = None
+    title_node = tree.css_first("title")
+    if title_node is not None:
+        children = list(title_node.iter(include_text=True))
+        if len(children) == 1 and children[0].is_text_node:
+            title = children[0].text_content
+
+    # traverse() skips <template> contents, which html.parser excludes from get_text too
+    strings = (node.text_content for node in tree.root.traverse(include_text=True) if node.is_text_node)
+    return _result(strings, title)
+
+
+def _lxml_strings(root) -> Iterator[str]:
+    """Text and tail strings in document order, skipping comments and <template> contents."""
+    stack = [(root, False)]
+    while stack:
+        node, tail = stack.pop()
+        if tail:
+            if node is not root and node.tail:
+                yield node.tail
+            continue
+        stack.append((node, True))
+        # Comments and processing instructions have a callable tag; only their tail is text
+        if isinstance(node.tag, str) and node.tag != "template":
+            if node.text:
+                yield node.text
+            stack.extend((child, False) for child in reversed(node))
+
+
+def _extract_lxml(html: str) -> Extracted:
+    from lxml import etree
+    from lxml import html as lxml_html
+
+    if not html.strip():
+        return _extract_bs4(html)
+    try:
+        root = lxml_html.document_fromstring(html)
+    except (ValueError, etree.ParserError):
+        # e.g. str input with an XML encoding declaration
+        return _extract_bs4(html)
+
+    for element in list(root.iter(*STRIP_TAGS)):
+        element.drop_tree()
+
+    title = None
+    title_node = root.find(".//title")
+    if title_node is not None and len(title_node) == 0 and title_node.text:
+        title = title_node.text
+
+    return _result(_lxml_strings(root), title)
+
+
+BACKENDS: dict[str, Callable[[str], Extracted]] = {
+    "bs4": _extract_bs4,
+    "lxml": _extract_lxml,
+    "selectolax": _extract_selectolax,
+}
+
+
+def available_backends() -> list[str]:
+    """Installed backends, fastest first."""
+    return [name for name in _PREFERENCE if importlib.util.find_spec(name) is not None]
+
+
+def resolve_backend(name: str | None = None) -> str:
+    """Backend to use for name (default HTML_BACKEND); falls back to bs4 if not installed."""
+    name = (name or HTML_BACKEND).lower()
+    available = available_backends()
+    if name == "auto":
+        return available[0]
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown HTML backend: {name}")
+    return name if name in available else "bs4"
+
+
+def _ambiguous_reference(html: str) -> bool:
+    for match in _CHAR_REF.finditer(html):
+        name, terminated = match.groups()
+        if not terminated or (name[0] != "#" and f"{name};" not in _HTML5_ENTITIES):
+            return True
+    return False
+
+
+def _text_before_html(html: str) -> bool:
+    start = _HTML_START.search(html)
+    return start is not None and bool(_MARKUP.sub("", html[: start.start()]).strip())
+
+
+def needs_reference(html: str) -> bool:
+    """True if html contains input on which the fast backends diverge from bs4."""
+    return (
+        any(marker in html for marker in _REFERENCE_ONLY)
+        or _TITLE_MARKUP.search(html) is not None
+        or _AFTER_HTML_END.search(html) is not None
+        or _RAW_TEXT.search(html) is not None
+        or _text_before_html(html)
+        or _ambiguous_reference(html)
+    )
+
+
+def extract_with(html: str, backend: str) -> Extracted:
+    """Extract html with a resolved backend name."""
+    if backend != "bs4" and needs_reference(html):
+        backend = "bs4"
+    return BACKENDS[backend](html)
@@ -0,0 +1,240 @@
+"""Change-ratio engine: how much of a page's text changed between two checks.
+
+The ratio is 1 - similarity, in [0, 1], compared against the watch's
+min_change_ratio to filter out noise. Strategies:
+
+- ``exact``: character-level difflib.SequenceMatcher without its autojunk
+  heuristic, over the part between the common prefix and suffix (up to
+  quadratic in that part's length)
+- ``lines``: length-weighted overlap of the two pages' lines in order (fast; a
+  moved line counts as changed). Every character of a changed line counts, so
+  it is usually at or above ``exact``, but not always: SequenceMatcher matches
+  greedily and may pair a line's characters across the change
+- ``minhash``: bottom-k MinHash estimate over word shingles (linear, blind to
+  reordered lines)
+- ``simhash``: Hamming distance between 64-bit SimHashes (linear, coarse, blind
+  to reordered lines)
+- ``auto`` (default): the ``lines`` estimate when it is below
+  CHANGE_RATIO_TRUST times the threshold (the common case of a timestamp or
+  counter changing), ``exact`` otherwise. The margin covers estimates that
+  fall short of ``exact``
+
+``auto`` and ``exact`` keep the line estimate when more than
+CHANGE_RATIO_EXACT_MAX_CHARS characters changed, so one large page can't hold
+a worker thread for seconds.
+
+tests/test_change_ratio.py pins the tolerance of each estimator against
+``exact`` on a regression corpus built from tests/fixtures/pages.
+"""
+
+import bisect
+import difflib
+import heapq
+import os
+import re
+import time
+import zlib
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass
+
+# exact | lines | minhash | simhash | auto
+CHANGE_RATIO_STRATEGY = os.getenv("ARKWATCH_CHANGE_RATIO", "auto")
+# auto trusts the line estimate only below this fraction of the threshold
+CHANGE_RATIO_TRUST = float(os.getenv("ARKWATCH_CHANGE_RATIO_TRUST", "0.5"))
+# Above this many changed characters (both texts) auto and exact use the line estimate
+CHANGE_RATIO_EXACT_MAX_CHARS = int(os.getenv("ARKWATCH_CHANGE_RATIO_EXACT_MAX_CHARS", "10000"))
+
+SHINGLE_SIZE = 3
+MINHASH_SIZE = 128
+
+_TOKEN = re.compile(r"\w+")
+
+
+@dataclass
+class ChangeRatio:
+    """Result of a change-ratio computation"""
+
+    ratio: float
+    strategy: str  # strategy that produced ratio (exact or lines for auto)
+    elapsed_ms: float
+    estimate: float | None = None  # auto: the line estimate it decided on
+
+
+def _common_affixes(old: str, new: str) -> tuple[int, int]:
+    """Lengths of the common prefix and suffix of old and new (not overlapping)."""
+
+    def longest(n: int, same: Callable[[int], bool]) -> int:
+        # Binary search over slice comparisons: the scanning is done in C
+        lo, hi = 0, n
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if same(mid):
+                lo = mid
+            else:
+                hi = mid - 1
+        return lo
+
+    limit = min(len(old), len(new))
+    prefix = longest(limit, lambda k: old[:k] == new[:k])
+    suffix = longest(limit - prefix, lambda k: old[len(old) - k :] == new[len(new) - k :])
+    return prefix, suffix
+
+
+def _changed_chars(old: str, new: str) -> int:
+    """Characters of old and new outside their common prefix and suffix."""
+    prefix, suffix = _common_affixes(old, new)
+    return len(old) + len(new) - 2 * (prefix + suffix)
+
+
+def exact_ratio(old: str, new: str) -> float:
+    total = len(old) + len(new)
+    if not total:
+        return 0.0
+    # The common prefix and suffix match as they are; only the middle needs difflib
+    prefix, suffix = _common_affixes(old, new)
+    # autojunk ignores every character making up over 1% of a text longer than 200, i.e. most
+    # letters of a page: a one-line edit could then read as most of the page changing
+    matcher = difflib.SequenceMatcher(
+        None, old[prefix : len(old) - suffix], new[prefix : len(new) - suffix], autojunk=False
+    )
+    matched = prefix + suffix + sum(block.size for block in matcher.get_matching_blocks())
+    return 1.0 - 2 * matched / total
+
+
+def _anchors(a: list[str], b: list[str]) -> list[tuple[int, int]]:
+    """Lines occurring once in a and once in b, as (i, j) pairs in order in both."""
+    count_a, count_b = Counter(a), Counter(b)
+    in_b = {line: j for j, line in enumerate(b) if count_b[line] == 1}
+    pairs = [(i, in_b[line]) for i, line in enumerate(a) if count_a[line] == 1 and line in in_b]
+    # Longest subsequence of pairs with increasing j (patience sorting)
+    tails: list[int] = []  # smallest last j of an increasing run of each length
+    ends: list[int] = []  # index in pairs of that last pair
+    previous: list[int | None] = []
+    for k, (_, j) in enumerate(pairs):
+        length = bisect.bisect_left(tails, j)
+        previous.append(ends[length - 1] if length else None)
+        if length == len(tails):
+            tails.append(j)
+            ends.append(k)
+        else:
+            tails[length] = j
+            ends[length] = k
+    chain = []
+    k = ends[-1] if ends else None
+    while k is not None:
+        chain.append(pairs[k])
+        k = previous[k]
+    return chain[::-1]
+
+
+def _matched_runs(a: list[str], b: list[str]) -> list[tuple[int, int]]:
+    """(start in a, length) of runs of lines matched in order between a and b.
+
+    Patience alignment: lines unique to both sides anchor the match, and the
+    equal lines leading and trailing each gap between anchors match in place.
+    O(n log n), where difflib's line matching goes quadratic when changes are
+    spread over a long page.
+    """
+    pairs = []
+    alo = blo = 0
+    for i, j in [*_anchors(a, b), (len(a), len(b))]:
+        head = 0
+        while alo + head < i and blo + head < j and a[alo + head] == b[blo + head]:
+            head += 1
+        tail = 0
+        while tail < min(i - alo, j - blo) - head and a[i - 1 - tail] == b[j - 1 - tail]:
+            tail += 1
+        pairs += [(alo + k, blo + k) for k in range(head)]
+        pairs += [(i - tail + k, j - tail + k) for k in range(tail + (i < len(a)))]
+        alo, blo = i + 1, j + 1
+    runs: list[tuple[int, int]] = []
+    last = (-2, -2)
+    for i, j in pairs:
+        if runs and (i, j) == (last[0] + 1, last[1] + 1):
+            runs[-1] = (runs[-1][0], runs[-1][1] + 1)
+        else:
+            runs.append((i, 1))
+        last = (i, j)
+    return runs
+
+
+def line_ratio(old: str, new: str) -> float:
+    """Share of characters outside the lines the two texts have in common, in order.
+
+    Lines are matched in order, so a moved line counts as removed and added.
+    """
+    total = len(old) + len(new)
+    if not total:
+        return 0.0
+    a, b = old.split("\n"), new.split("\n")
+    runs = _matched_runs(a, b)
+    # A run of k matched lines also matches the k - 1 newlines between them
+    matched = sum(sum(map(len, a[start : start + size])) + max(0, size - 1) for start, size in runs)
+    return max(0.0, 1.0 - 2 * matched / total)
+
+
+def _shingles(text: str) -> set[int]:
+    tokens = _TOKEN.findall(text.lower())
+    if len(tokens) < SHINGLE_SIZE:
+        return {zlib.crc32(" ".join(tokens).encode())} if tokens else set()
+    return {zlib.crc32(" ".join(tokens[i : i + SHINGLE_SIZE]).encode()) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+
+
+def minhash_ratio(old: str, new: str) -> float:
+    """Dice distance from a bottom-k MinHash estimate of the shingle Jaccard index."""
+    a, b = _shingles(old), _shingles(new)
+    if not a and not b:
+        return 0.0
+    sample = heapq.nsmallest(MINHASH_SIZE, a | b)
+    jaccard = sum(1 for h in sample if h in a and h in b) / len(sample)
+    return 1.0 - 2 * jaccard / (1 + jaccard)
+
+
+def _simhash(text: str) -> int:
+    hashes = [h | zlib.crc32(str(h).encode()) << 32 for h in _shingles(text)]
+    fingerprint = 0
+    for bit in range(64):
+        if 2 * sum((h >> bit) & 1 for h in hashes) > len(hashes):
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def simhash_ratio(old: str, new: str) -> float:
+    """Hamming distance between SimHashes, scaled so unrelated texts (~32 bits apart) score 1."""
+    if old == new:
+        return 0.0
+    return min(1.0, bin(_simhash(old) ^ _simhash(new)).count("1") / 32)
+
+
+STRATEGIES: dict[str, Callable[[str, str], float]] = {
+    "exact": exact_ratio,
+    "lines": line_ratio,
+    "minhash": minhash_ratio,
+    "simhash": simhash_ratio,
+}
+
+
+def change_ratio(old: str, new: str, threshold: float, strategy: str | None = None) -> ChangeRatio:
+    """Compute how much changed from old to new, timing the computation."""
+    strategy = (strategy or CHANGE_RATIO_STRATEGY).lower()
+    if strategy != "auto" and strategy not in STRATEGIES:
+        raise ValueError(f"Unknown change ratio strategy: {strategy}")
+
+    start = time.perf_counter()
+    estimate = None
+    if strategy in ("auto", "exact") and _changed_chars(old, new) > CHANGE_RATIO_EXACT_MAX_CHARS:
+        strategy = "lines"
+        estimate = ratio = line_ratio(old, new)
+    elif strategy == "auto":
+        estimate = line_ratio(old, new)
+        if estimate < threshold * CHANGE_RATIO_TRUST:
+            strategy = "lines"
+            ratio = estimate
+        else:
+            strategy = "exact"
+            ratio = exact_ratio(old, new)
+    else:
+        ratio = STRATEGIES[strategy](old, new)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return ChangeRatio(ratio=ratio, strategy=strategy, elapsed_ms=elapsed_ms, estimate=estimate)
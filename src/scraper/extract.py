@@ -0,0 +1,93 @@
+"""HTML text extraction, run off the event loop.
+
+``extract()`` is a pure function (HTML in, text/title/hash out, using one of the
+parsers in backends.py) so it can run in a worker process. ``ExtractionPool``
+decides where each page is parsed: small pages in the default thread pool, large
+ones in a process pool so parsing a multi-megabyte page doesn't stall in-flight
+fetches.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from .backends import Extracted, extract_with, resolve_backend
+
+logger = logging.getLogger(__name__)
+
+# Worker processes for large pages (0 = parse everything in threads)
+EXTRACT_PROCESSES = int(os.getenv("ARKWATCH_EXTRACT_PROCESSES", "2"))
+# Pages at least this many characters long go to the process pool
+EXTRACT_PROCESS_THRESHOLD = int(os.getenv("ARKWATCH_EXTRACT_PROCESS_THRESHOLD", "262144"))
+# Max extractions queued or running at once; further scrapes wait for a slot
+EXTRACT_MAX_PENDING = int(os.getenv("ARKWATCH_EXTRACT_MAX_PENDING", "32"))
+
+
+def extract(html: str, backend: str = "bs4") -> Extracted:
+    """Strip page chrome and return the visible text, title and content hash."""
+    return extract_with(html, backend)
+
+
+class ExtractionPool:
+    """Run extract() in threads or worker processes with bounded backlog.
+
+    Pages shorter than process_threshold characters are parsed in the event
+    loop's default thread pool (cheap to hand off, no pickling); longer ones in
+    a lazily started process pool. At most max_pending extractions are queued
+    or running at once, so a burst of large pages applies backpressure to the
+    fetchers instead of piling HTML up in memory. If the process pool breaks
+    (e.g. a worker was OOM-killed) it is restarted and the page is parsed in a
+    thread.
+    """
+
+    def __init__(
+        self,
+        processes: int | None = None,
+        process_threshold: int | None = None,
+        max_pending: int | None = None,
+        backend: str | None = None,
+    ):
+        self.backend = resolve_backend(backend)
+        self.processes = max(0, EXTRACT_PROCESSES if processes is None else processes)
+        self.process_threshold = EXTRACT_PROCESS_THRESHOLD if process_threshold is None else process_threshold
+        self.max_pending = max(1, max_pending or EXTRACT_MAX_PENDING)
+        self._executor: ProcessPoolExecutor | None = None
+        self._pending: asyncio.Semaphore | None = None
+        self._pending_loop: asyncio.AbstractEventLoop | None = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that already runs threads is unsafe
+            self._executor = ProcessPoolExecutor(self.processes, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def _get_pending(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._pending is None or self._pending_loop is not loop:
+            self._pending = asyncio.Semaphore(self.max_pending)
+            self._pending_loop = loop
+        return self._pending
+
+    def uses_process(self, html: str) -> bool:
+        return self.processes > 0 and len(html) >= self.process_threshold
+
+    async def run(self, html: str) -> Extracted:
+        """Extract html off the event loop."""
+        async with self._get_pending():
+            if self.uses_process(html):
+                loop = asyncio.get_running_loop()
+                try:
+                    return await loop.run_in_executor(self._get_executor(), extract, html, self.backend)
+                except BrokenProcessPool:
+                    logger.warning("Extraction process pool broke; restarting it")
+                    self.close()
+            return await asyncio.to_thread(extract, html, self.backend)
+
+    def close(self):
+        """Shut down the worker processes (restarted on next use)."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,66 @@
+"""Per-host politeness limits for concurrent scraping"""
+
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse, urlunparse
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def host_key(url: str) -> str:
+    """Host used to group requests for politeness (lowercased, port ignored)."""
+    return (urlparse(url).hostname or "").lower()
+
+
+def url_key(url: str) -> str:
+    """URL used to coalesce fetches: scheme and host lowercased, default port,
+    fragment and empty path normalized away. Query strings are kept verbatim."""
+    parts = urlparse(url.strip())
+    if parts.username or parts.password:
+        # Credentials select a different view of the page: never share them
+        return url
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if ":" in host:
+        host = f"[{host}]"
+    try:
+        port = parts.port
+    except ValueError:
+        return url
+    netloc = host if port is None or port == _DEFAULT_PORTS.get(scheme) else f"{host}:{port}"
+    return urlunparse((scheme, netloc, parts.path or "/", parts.params, parts.query, ""))
+
+
+class HostThrottle:
+    """Cap in-flight requests per host and space out request starts to the same host.
+
+    Replaces the fixed sleep between watches: requests to different hosts run
+    freely, requests to the same host are paced by min_delay seconds.
+    """
+
+    def __init__(self, max_per_host: int = 2, min_delay: float = 2.0):
+        self.max_per_host = max(1, max_per_host)
+        self.min_delay = max(0.0, min_delay)
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._next_start: dict[str, float] = {}
+
+    async def _pace(self, host: str):
+        """Reserve the next start slot for host and sleep until it comes up."""
+        now = time.monotonic()
+        start_at = max(now, self._next_start.get(host, now))
+        self._next_start[host] = start_at + self.min_delay
+        if start_at > now:
+            await asyncio.sleep(start_at - now)
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        """Hold one of the host's request slots for the duration of the block."""
+        host = host_key(url)
+        semaphore = self._semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._semaphores[host] = asyncio.Semaphore(self.max_per_host)
+        async with semaphore:
+            await self._pace(host)
+            yield
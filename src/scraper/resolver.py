@@ -0,0 +1,97 @@
+"""Non-blocking DNS resolution with a bounded TTL cache of vetted results"""
+
+import asyncio
+import socket
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+
+# (safe, reason, resolved_ip) — same shape as _is_safe_url
+Verdict = tuple[bool, str, str | None]
+
+
+class CachingResolver:
+    """Resolve hostnames off the event loop and cache the SSRF verdict.
+
+    getaddrinfo runs in the loop's default thread pool, so a slow resolver no
+    longer stalls other requests. The system resolver does not expose record
+    TTLs, so entries live for at most ``ttl`` seconds (``negative_ttl`` for
+    lookups that failed). The cache stores the verdict computed by ``vet``
+    from the resolved addresses, so a host that resolved to a blocked network
+    stays blocked for as long as it is cached. Concurrent lookups of the same
+    host share one getaddrinfo call, which keeps running if the caller that
+    started it is cancelled.
+    """
+
+    def __init__(
+        self,
+        vet: Callable[[str, list], Verdict],
+        ttl: float = 60.0,
+        negative_ttl: float = 10.0,
+        max_entries: int = 4096,
+    ):
+        self.vet = vet
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._cache: OrderedDict[tuple[str, int], tuple[float, Verdict]] = OrderedDict()
+        self._pending: dict[tuple[str, int], asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        self._cache.clear()
+
+    def _get(self, key: tuple[str, int]) -> Verdict | None:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, verdict = entry
+        if expires_at <= time.monotonic():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return verdict
+
+    def _put(self, key: tuple[str, int], verdict: Verdict, ttl: float):
+        self._cache[key] = (time.monotonic() + ttl, verdict)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    async def _lookup(self, hostname: str, port: int) -> tuple[Verdict, float]:
+        loop = asyncio.get_running_loop()
+        try:
+            addr_info = await loop.getaddrinfo(hostname, port, proto=socket.IPPROTO_TCP)
+        except socket.gaierror:
+            return (False, f"Cannot resolve hostname: {hostname}", None), self.negative_ttl
+        return self.vet(hostname, addr_info), self.ttl
+
+    async def vet_host(self, hostname: str, port: int) -> Verdict:
+        """Resolve hostname:port and return the cached or freshly computed verdict."""
+        key = (hostname.lower(), port)
+        verdict = self._get(key)
+        if verdict is not None:
+            self.hits += 1
+            return verdict
+
+        self.misses += 1
+        task = self._pending.get(key)
+        if task is None:
+            # Own task: a caller cancelled mid-lookup (e.g. a wait_for timeout) doesn't cancel it for the others
+            task = asyncio.create_task(self._resolve(key, hostname, port))
+            self._pending[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        return await asyncio.shield(task)
+
+    async def _resolve(self, key: tuple[str, int], hostname: str, port: int) -> Verdict:
+        verdict, ttl = await self._lookup(hostname, port)
+        self._put(key, verdict, ttl)
+        return verdict
+
+    def _finished(self, key: tuple[str, int], task: asyncio.Task):
+        if self._pending.get(key) is task:
+            del self._pending[key]
+        # Waiters re-raise it; mark retrieved so a lookup nobody awaits any more doesn't warn
+        if not task.cancelled():
+            task.exception()
@@ -1,15 +1,22 @@
 """Web scraping module using httpx and BeautifulSoup"""
 
+import asyncio
+import codecs
 import difflib
 import hashlib
+import importlib.util
 import ipaddress
+import logging
+import os
 import socket
 from dataclasses import dataclass
 from datetime import datetime
 from urllib.parse import urlparse
 
 import httpx
-from bs4 import BeautifulSoup
+
+from .extract import ExtractionPool
+from .resolver import CachingResolver
 
 # Private/reserved IP ranges that must never be scraped (SSRF protection)
 _BLOCKED_NETWORKS = [
@@ -33,6 +40,35 @@ _BLOCKED_NETWORKS = [
 # Ports of internal services that should never be accessed by the scraper
 _BLOCKED_PORTS = {22, 25, 465, 587, 3306, 5432, 6379, 27017, 11211, 9200}
 
+# Connection pool shared by all scrapes of a WebScraper
+HTTP_MAX_CONNECTIONS = int(os.getenv("ARKWATCH_HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("ARKWATCH_HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("ARKWATCH_HTTP_KEEPALIVE_EXPIRY", "30"))
+
+# HTTP/2 needs the optional h2 package (pip install "httpx[http2]")
+HTTP2_ENABLED = os.getenv("ARKWATCH_HTTP2", "0") == "1"
+
+# Response bodies are streamed and abandoned past this size (after decompression),
+# so a scrape never buffers more than this much of a body
+MAX_BODY_BYTES = int(os.getenv("ARKWATCH_MAX_BODY_BYTES", str(5 * 1024 * 1024)))
+# Content types worth extracting text from (responses without a Content-Type are allowed);
+# application/json keeps watches on status pages and API endpoints working
+ALLOWED_CONTENT_TYPES = {
+    t.strip().lower()
+    for t in os.getenv(
+        "ARKWATCH_ALLOWED_CONTENT_TYPES",
+        "text/html,application/xhtml+xml,application/xml,text/xml,text/plain,application/json",
+    ).split(",")
+    if t.strip()
+}
+
+# SSRF DNS cache: seconds a vetted lookup is reused (failed lookups: negative TTL)
+DNS_CACHE_TTL = float(os.getenv("ARKWATCH_DNS_CACHE_TTL", "60"))
+DNS_NEGATIVE_TTL = float(os.getenv("ARKWATCH_DNS_NEGATIVE_TTL", "10"))
+DNS_CACHE_SIZE = int(os.getenv("ARKWATCH_DNS_CACHE_SIZE", "4096"))
+
+logger = logging.getLogger(__name__)
+
 
 def _is_ip_blocked(ip: ipaddress.IPv4Address | ipaddress.IPv6Address) -> bool:
     """Check if an IP is in a blocked network."""
@@ -42,43 +78,41 @@ def _is_ip_blocked(ip: ipaddress.IPv4Address | ipaddress.IPv6Address) -> bool:
     return False
 
 
-def _is_safe_url(url: str) -> tuple[bool, str, str | None]:
-    """Validate URL is safe to scrape (no SSRF).
+def _precheck_url(url: str) -> tuple[tuple[bool, str, str | None] | None, str | None, int | None]:
+    """SSRF checks that need no DNS lookup.
 
-    Returns (safe, reason, resolved_ip).
-    When safe, resolved_ip is the first safe IPv4 address to connect to,
-    eliminating the DNS-rebinding TOCTOU window.
+    Returns (verdict, hostname, port). verdict is None when the URL passed
+    and its hostname still has to be resolved and vetted.
     """
     parsed = urlparse(url)
 
     # Only allow http/https
     if parsed.scheme not in ("http", "https"):
-        return False, f"Blocked scheme: {parsed.scheme}", None
+        return (False, f"Blocked scheme: {parsed.scheme}", None), None, None
 
     hostname = parsed.hostname
     if not hostname:
-        return False, "No hostname", None
+        return (False, "No hostname", None), None, None
 
     # Block dangerous ports
     port = parsed.port
     if port and port in _BLOCKED_PORTS:
-        return False, f"Blocked port: {port}", None
+        return (False, f"Blocked port: {port}", None), hostname, port
 
     # Check if hostname is an IP literal
     try:
         ip = ipaddress.ip_address(hostname)
         if _is_ip_blocked(ip):
-            return False, "Blocked: private/reserved IP address", None
-        return True, "", str(ip)
+            return (False, "Blocked: private/reserved IP address", None), hostname, port
+        return (True, "", str(ip)), hostname, port
     except ValueError:
-        pass  # Not an IP literal, will resolve via DNS below
+        pass  # Not an IP literal, must be resolved via DNS
+
+    return None, hostname, port
 
-    # Resolve hostname to IP and verify all resolved addresses
-    try:
-        addr_info = socket.getaddrinfo(hostname, port or 443, proto=socket.IPPROTO_TCP)
-    except socket.gaierror:
-        return False, f"Cannot resolve hostname: {hostname}", None
 
+def _vet_addresses(hostname: str, addr_info: list) -> tuple[bool, str, str | None]:
+    """Verify all resolved addresses of hostname are outside blocked networks."""
     first_safe_ip = None
     for _family, _, _, _, sockaddr in addr_info:
         ip = ipaddress.ip_address(sockaddr[0])
@@ -93,6 +127,42 @@ def _is_safe_url(url: str) -> tuple[bool, str, str | None]:
     return True, "", first_safe_ip
 
 
+_resolver = CachingResolver(
+    _vet_addresses, ttl=DNS_CACHE_TTL, negative_ttl=DNS_NEGATIVE_TTL, max_entries=DNS_CACHE_SIZE
+)
+
+
+def _is_safe_url(url: str) -> tuple[bool, str, str | None]:
+    """Validate URL is safe to scrape (no SSRF).
+
+    Returns (safe, reason, resolved_ip).
+    When safe, resolved_ip is the first safe IPv4 address to connect to,
+    eliminating the DNS-rebinding TOCTOU window.
+
+    Blocking: resolves DNS on the calling thread. Async code should await
+    is_safe_url() instead.
+    """
+    verdict, hostname, port = _precheck_url(url)
+    if verdict is not None:
+        return verdict
+
+    # Resolve hostname to IP and verify all resolved addresses
+    try:
+        addr_info = socket.getaddrinfo(hostname, port or 443, proto=socket.IPPROTO_TCP)
+    except socket.gaierror:
+        return False, f"Cannot resolve hostname: {hostname}", None
+
+    return _vet_addresses(hostname, addr_info)
+
+
+async def is_safe_url(url: str) -> tuple[bool, str, str | None]:
+    """Async _is_safe_url: DNS is resolved off the event loop and cached (see CachingResolver)."""
+    verdict, hostname, port = _precheck_url(url)
+    if verdict is not None:
+        return verdict
+    return await _resolver.vet_host(hostname, port or 443)
+
+
 @dataclass
 class ScrapeResult:
     """Result of a web scrape"""
@@ -104,24 +174,166 @@ class ScrapeResult:
     title: str | None
     scraped_at: datetime
     error: str | None = None
+    # Cache validators from the response, sent back on the next conditional fetch
+    etag: str | None = None
+    last_modified: str | None = None
+    # True when the server answered 304 to our validators, or sent the same bytes as body_hash
+    not_modified: bool = False
+    # sha256 prefix of the raw body, to spot byte-identical pages without parsing them
+    body_hash: str | None = None
+    # True when the body exceeded the size cap and was abandoned (error is set too)
+    too_large: bool = False
+    # True when the host could not be reached at all (connect error, timeout; error is set too)
+    unreachable: bool = False
+
+
+async def _check_redirect(response: httpx.Response):
+    """Verify each redirect target is safe (SSRF via redirect)."""
+    if response.is_redirect and "location" in response.headers:
+        redirect_url = str(response.next_request.url) if response.next_request else response.headers["location"]
+        safe_redir, reason_redir, _ = await is_safe_url(redirect_url)
+        if not safe_redir:
+            raise httpx.TooManyRedirects(f"Redirect blocked: {reason_redir}")
+
+
+async def _verify_connected_ip(response: httpx.Response):
+    """Post-connection check: verify the actual IP connected to is safe.
+
+    This is the second layer of SSRF defense, catching DNS rebinding
+    attacks where the IP changes between our pre-check and the actual
+    connection. It runs on every response, including those served over a
+    reused keep-alive connection.
+    """
+    network_stream = response.extensions.get("network_stream")
+    if network_stream is None:
+        return
+    peername = network_stream.get_extra_info("server_addr") or network_stream.get_extra_info("peername")
+    if peername:
+        ip = ipaddress.ip_address(peername[0])
+        if _is_ip_blocked(ip):
+            await response.aclose()
+            raise httpx.ConnectError(f"SSRF blocked: connected to private/reserved IP {ip}")
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
 
 
 class WebScraper:
-    """Simple web scraper for monitoring changes"""
+    """Simple web scraper for monitoring changes
 
-    def __init__(self, timeout: int = 30):
+    Owns one pooled httpx.AsyncClient (keep-alive, optional HTTP/2) reused for
+    every scrape. Use ``async with WebScraper() as scraper`` or call
+    ``startup()``/``aclose()``; the client is also created lazily on first use.
+    HTML parsing is handed to an ExtractionPool so it never runs on the event loop.
+    Bodies are streamed under a size cap and a content-type allowlist.
+    """
+
+    def __init__(
+        self,
+        timeout: int = 30,
+        max_connections: int | None = None,
+        max_keepalive_connections: int | None = None,
+        keepalive_expiry: float | None = None,
+        http2: bool | None = None,
+        extractor: ExtractionPool | None = None,
+        max_body_bytes: int | None = None,
+        allowed_content_types: set[str] | None = None,
+    ):
         self.timeout = timeout
+        self.max_body_bytes = max_body_bytes or MAX_BODY_BYTES
+        self.allowed_content_types = allowed_content_types or ALLOWED_CONTENT_TYPES
+        self.extractor = extractor or ExtractionPool()
         self.headers = {
             "User-Agent": "ArkWatch/1.0 (Web Monitoring Service)",
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
             "Accept-Language": "fr,en;q=0.5",
         }
-
-    async def scrape(self, url: str) -> ScrapeResult:
-        """Scrape a URL and return the result"""
+        self.limits = httpx.Limits(
+            max_connections=max_connections or HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=max_keepalive_connections or HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY if keepalive_expiry is None else keepalive_expiry,
+        )
+        self.http2 = HTTP2_ENABLED if http2 is None else http2
+        if self.http2 and not _http2_available():
+            logger.warning("HTTP/2 requested but the h2 package is not installed; using HTTP/1.1")
+            self.http2 = False
+        self._client: httpx.AsyncClient | None = None
+        self._client_loop: asyncio.AbstractEventLoop | None = None
+
+    async def startup(self):
+        """Create the pooled client (idempotent)."""
+        self._get_client()
+
+    async def aclose(self):
+        """Close the pooled client and its connections, and stop extraction workers."""
+        client, self._client, self._client_loop = self._client, None, None
+        self.extractor.close()
+        if client is not None:
+            await client.aclose()
+
+    async def __aenter__(self) -> "WebScraper":
+        await self.startup()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        # Pooled connections are bound to the loop that opened them
+        if self._client is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                follow_redirects=True,
+                limits=self.limits,
+                http2=self.http2,
+                event_hooks={"response": [_check_redirect, _verify_connected_ip]},
+            )
+            self._client_loop = loop
+        return self._client
+
+    async def _read_body(self, response: httpx.Response) -> tuple[str, str] | None:
+        """Stream the body, decoding and hashing it chunk by chunk.
+
+        Returns (text, body_hash), or None as soon as the body (after
+        Content-Encoding is undone) exceeds max_body_bytes.
+        """
+        declared = response.headers.get("content-length", "")
+        if declared.isdigit() and int(declared) > self.max_body_bytes:
+            return None
+
+        decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+        digest = hashlib.sha256()
+        chunks = []
+        size = 0
+        async for chunk in response.aiter_bytes():
+            size += len(chunk)
+            if size > self.max_body_bytes:
+                return None
+            digest.update(chunk)
+            chunks.append(decoder.decode(chunk))
+        chunks.append(decoder.decode(b"", final=True))
+        return "".join(chunks), digest.hexdigest()[:16]
+
+    async def scrape(
+        self,
+        url: str,
+        timeout: float | None = None,
+        etag: str | None = None,
+        last_modified: str | None = None,
+        body_hash: str | None = None,
+    ) -> ScrapeResult:
+        """Scrape a URL and return the result (timeout overrides the client default).
+
+        When etag/last_modified from a previous fetch are given, the request is
+        conditional and a 304 returns not_modified=True without parsing anything.
+        Likewise when the body is byte-identical to the one hashed as body_hash.
+        Bodies over max_body_bytes are abandoned and return too_large=True.
+        """
         try:
             # SSRF protection: validate URL before making request
-            safe, reason, resolved_ip = _is_safe_url(url)
+            safe, reason, resolved_ip = await is_safe_url(url)
             if not safe:
                 return ScrapeResult(
                     url=url,
@@ -133,66 +345,103 @@ class WebScraper:
                     error=f"URL blocked: {reason}",
                 )
 
-            async def _check_redirect(response: httpx.Response):
-                """Verify each redirect target is safe (SSRF via redirect)."""
-                if response.is_redirect and "location" in response.headers:
-                    redirect_url = (
-                        str(response.next_request.url) if response.next_request else response.headers["location"]
+            client = self._get_client()
+            headers = dict(self.headers)
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+            request = client.build_request(
+                "GET", url, headers=headers, timeout=self.timeout if timeout is None else timeout
+            )
+            response = await client.send(request, stream=True)
+            try:
+                validators = {
+                    "etag": response.headers.get("etag"),
+                    "last_modified": response.headers.get("last-modified"),
+                }
+
+                if response.status_code == 304 and (etag or last_modified):
+                    return ScrapeResult(
+                        url=url,
+                        status_code=304,
+                        content_hash="",
+                        text_content="",
+                        title=None,
+                        scraped_at=datetime.utcnow(),
+                        # A 304 may omit unchanged validators; keep the ones we sent
+                        etag=validators["etag"] or etag,
+                        last_modified=validators["last_modified"] or last_modified,
+                        not_modified=True,
+                        body_hash=body_hash,
                     )
-                    safe_redir, reason_redir, _ = _is_safe_url(redirect_url)
-                    if not safe_redir:
-                        raise httpx.TooManyRedirects(f"Redirect blocked: {reason_redir}")
-
-            async def _verify_connected_ip(response: httpx.Response):
-                """Post-connection check: verify the actual IP connected to is safe.
-
-                This is the second layer of SSRF defense, catching DNS rebinding
-                attacks where the IP changes between our pre-check and the actual
-                connection.
-                """
-                stream = response.stream
-                if hasattr(stream, "_stream") and hasattr(stream._stream, "_connection"):
-                    conn = stream._stream._connection
-                    if hasattr(conn, "_network_stream"):
-                        sock = conn._network_stream
-                        if hasattr(sock, "get_extra_info"):
-                            peername = sock.get_extra_info("peername")
-                            if peername:
-                                ip = ipaddress.ip_address(peername[0])
-                                if _is_ip_blocked(ip):
-                                    await response.aclose()
-                                    raise httpx.ConnectError(f"SSRF blocked: connected to private/reserved IP {ip}")
-
-            async with httpx.AsyncClient(
-                timeout=self.timeout,
-                follow_redirects=True,
-                event_hooks={"response": [_check_redirect, _verify_connected_ip]},
-            ) as client:
-                response = await client.get(url, headers=self.headers)
-
-                soup = BeautifulSoup(response.text, "html.parser")
-
-                # Remove script and style elements
-                for element in soup(["script", "style", "nav", "footer", "header"]):
-                    element.decompose()
 
-                # Get text content
-                text = soup.get_text(separator="\n", strip=True)
+                content_type = response.headers.get("content-type", "").split(";")[0].strip().lower()
+                if content_type and content_type not in self.allowed_content_types:
+                    return ScrapeResult(
+                        url=url,
+                        status_code=response.status_code,
+                        content_hash="",
+                        text_content="",
+                        title=None,
+                        scraped_at=datetime.utcnow(),
+                        error=f"Unsupported content type: {content_type}",
+                    )
 
-                # Get title
-                title = soup.title.string if soup.title else None
+                body = await self._read_body(response)
+            finally:
+                await response.aclose()
 
-                # Compute hash
-                content_hash = hashlib.sha256(text.encode()).hexdigest()[:16]
+            if body is None:
+                return ScrapeResult(
+                    url=url,
+                    status_code=response.status_code,
+                    content_hash="",
+                    text_content="",
+                    title=None,
+                    scraped_at=datetime.utcnow(),
+                    error=f"Response too large (over {self.max_body_bytes} bytes)",
+                    too_large=True,
+                )
 
+            text, new_body_hash = body
+            if body_hash and new_body_hash == body_hash:
+                # Same bytes as last time: the extracted text can't have changed either
                 return ScrapeResult(
                     url=url,
                     status_code=response.status_code,
-                    content_hash=content_hash,
-                    text_content=text,
-                    title=title,
+                    content_hash="",
+                    text_content="",
+                    title=None,
                     scraped_at=datetime.utcnow(),
+                    not_modified=True,
+                    body_hash=new_body_hash,
+                    **validators,
                 )
+
+            extracted = await self.extractor.run(text)
+
+            return ScrapeResult(
+                url=url,
+                status_code=response.status_code,
+                content_hash=extracted.content_hash,
+                text_content=extracted.text_content,
+                title=extracted.title,
+                scraped_at=datetime.utcnow(),
+                body_hash=new_body_hash,
+                **validators,
+            )
+        except httpx.TransportError as e:
+            return ScrapeResult(
+                url=url,
+                status_code=0,
+                content_hash="",
+                text_content="",
+                title=None,
+                scraped_at=datetime.utcnow(),
+                error=str(e) or type(e).__name__,
+                unreachable=True,
+            )
         except Exception as e:
             return ScrapeResult(
                 url=url,
@@ -222,10 +471,29 @@ class WebScraper:
         return True, diff_text
 
 
+# Shared instance (API process: quick_check router; worker process: ArkWatchWorker)
+_scraper: WebScraper | None = None
+
+
+def get_scraper() -> WebScraper:
+    global _scraper
+    if _scraper is None:
+        _scraper = WebScraper()
+    return _scraper
+
+
+async def close_scraper():
+    """Close the shared scraper's connection pool (call on shutdown)."""
+    global _scraper
+    if _scraper is not None:
+        await _scraper.aclose()
+        _scraper = None
+
+
 # Test function
 async def test_scraper():
-    scraper = WebScraper()
-    result = await scraper.scrape("https://example.com")
+    async with WebScraper() as scraper:
+        result = await scraper.scrape("https://example.com")
     print(f"URL: {result.url}")
     print(f"Status: {result.status_code}")
     print(f"Title: {result.title}")
@@ -236,6 +504,4 @@ async def test_scraper():
 
 
 if __name__ == "__main__":
-    import asyncio
-
     asyncio.run(test_scraper())
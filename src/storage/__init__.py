@@ -2,5 +2,6 @@
 
 from .database import Database, get_db
 from .models import Report, Watch, WatchStatus
+from .sqlite_backend import SQLiteDatabase
 
-__all__ = ["Database", "get_db", "Watch", "Report", "WatchStatus"]
+__all__ = ["Database", "SQLiteDatabase", "get_db", "Watch", "Report", "WatchStatus"]
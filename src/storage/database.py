@@ -1,23 +1,55 @@
 """Database connection and operations"""
 
-import json
 import os
+from collections.abc import Iterable
 from datetime import datetime
+from typing import TYPE_CHECKING
 from uuid import uuid4
 
 from ..crypto import decrypt_pii, encrypt_pii
+from .jsonfile import file_lock, read_json, update_json, write_json
+from .report_index import get_index
+from .report_log import ReportLog
+from .snapshots import SnapshotStore
+from .versions import VersionStore
+
+if TYPE_CHECKING:
+    from .sqlite_backend import SQLiteDatabase
 
 # For MVP, we use a simple JSON file storage
 # Will be replaced by PostgreSQL for production
 
 DATA_DIR = "/opt/claude-ceo/workspace/arkwatch/data"
 WATCHES_FILE = f"{DATA_DIR}/watches.json"
+# Index of the segmented report log; segments live in reports/ (see report_log.py)
 REPORTS_FILE = f"{DATA_DIR}/reports.json"
+SQLITE_FILE = f"{DATA_DIR}/arkwatch.db"
+
+# Storage backend: "json" (default, flat files) or "sqlite" (indexed, WAL mode)
+STORAGE_BACKEND = os.getenv("ARKWATCH_STORAGE_BACKEND", "json")
 
 # PII fields in watches that must be encrypted at rest
 _WATCH_PII_FIELDS = ("notify_email", "user_email")
 
 
+def decrypt_watch(watch: dict) -> dict:
+    """Decrypt PII fields in a watch record."""
+    result = dict(watch)
+    for field in _WATCH_PII_FIELDS:
+        if field in result and result[field] and isinstance(result[field], str):
+            result[field] = decrypt_pii(result[field])
+    return result
+
+
+def encrypt_watch(watch: dict) -> dict:
+    """Encrypt PII fields in a watch record."""
+    result = dict(watch)
+    for field in _WATCH_PII_FIELDS:
+        if field in result and result[field] and isinstance(result[field], str):
+            result[field] = encrypt_pii(result[field])
+    return result
+
+
 class Database:
     """Simple JSON-based database for MVP"""
 
@@ -26,41 +58,48 @@ class Database:
         self._init_files()
 
     def _init_files(self):
-        for f in [WATCHES_FILE, REPORTS_FILE]:
-            if not os.path.exists(f):
-                with open(f, "w") as fp:
-                    json.dump([], fp)
+        with file_lock(WATCHES_FILE):
+            if not os.path.exists(WATCHES_FILE):
+                write_json(WATCHES_FILE, [])
+        self._reports().ensure()
+
+    def _reports(self) -> ReportLog:
+        return ReportLog(REPORTS_FILE)
 
     def _decrypt_watch(self, watch: dict) -> dict:
-        """Decrypt PII fields in a watch record."""
-        result = dict(watch)
-        for field in _WATCH_PII_FIELDS:
-            if field in result and result[field] and isinstance(result[field], str):
-                result[field] = decrypt_pii(result[field])
-        return result
+        return decrypt_watch(watch)
 
     def _encrypt_watch(self, watch: dict) -> dict:
-        """Encrypt PII fields in a watch record."""
-        result = dict(watch)
-        for field in _WATCH_PII_FIELDS:
-            if field in result and result[field] and isinstance(result[field], str):
-                result[field] = encrypt_pii(result[field])
-        return result
+        return encrypt_watch(watch)
 
     def _load(self, filepath: str) -> list:
-        with open(filepath) as f:
-            data = json.load(f)
+        data = read_json(filepath, [])
         # Decrypt PII in watch records
         if filepath == WATCHES_FILE:
             return [self._decrypt_watch(w) for w in data]
         return data
 
-    def _save(self, filepath: str, data: list):
+    def _encode(self, filepath: str, data: list) -> list:
         # Encrypt PII in watch records before saving
         if filepath == WATCHES_FILE:
-            data = [self._encrypt_watch(w) for w in data]
-        with open(filepath, "w") as f:
-            json.dump(data, f, indent=2, default=str)
+            return [self._encrypt_watch(w) for w in data]
+        return data
+
+    def _update(self, filepath: str, fn):
+        """Read-modify-write filepath without losing concurrent writers' updates.
+
+        fn(records) returns (new_records, result), new_records None to skip the
+        write. It may be called again on fresh records if another process
+        committed in between (see jsonfile.update_json).
+        """
+
+        def apply(data: list):
+            if filepath == WATCHES_FILE:
+                data = [self._decrypt_watch(w) for w in data]
+            records, result = fn(data)
+            return (None if records is None else self._encode(filepath, records)), result
+
+        return update_json(filepath, apply, default=[])
 
     # Watches
     def create_watch(
@@ -70,25 +109,30 @@ class Database:
         check_interval: int = 3600,
         notify_email: str | None = None,
         min_change_ratio: float | None = None,
+        adaptive_interval: bool = False,
+        max_check_interval: int | None = None,
     ) -> dict:
-        watches = self._load(WATCHES_FILE)
         watch = {
             "id": str(uuid4()),
             "name": name,
             "url": url,
             "check_interval": check_interval,
             "min_change_ratio": min_change_ratio,
+            "adaptive_interval": adaptive_interval,
+            "effective_interval": check_interval,
+            "max_check_interval": max_check_interval,
             "notify_email": notify_email,
             "status": "active",
             "last_check": None,
             "last_content_hash": None,
-            "last_content": None,
+            "last_snapshot": None,
+            "consecutive_failures": 0,
+            "last_error": None,
+            "next_retry_at": None,
             "created_at": datetime.utcnow().isoformat(),
             "updated_at": datetime.utcnow().isoformat(),
         }
-        watches.append(watch)
-        self._save(WATCHES_FILE, watches)
-        return watch
+        return self._update(WATCHES_FILE, lambda watches: (watches + [watch], watch))
 
     def get_watches(self, status: str | None = None) -> list:
         watches = self._load(WATCHES_FILE)
@@ -108,23 +152,28 @@ class Database:
         return None
 
     def update_watch(self, watch_id: str, **kwargs) -> dict | None:
-        watches = self._load(WATCHES_FILE)
-        for i, w in enumerate(watches):
-            if w["id"] == watch_id:
-                w.update(kwargs)
-                w["updated_at"] = datetime.utcnow().isoformat()
-                watches[i] = w
-                self._save(WATCHES_FILE, watches)
-                return w
-        return None
+        def apply(watches):
+            for i, w in enumerate(watches):
+                if w["id"] == watch_id:
+                    w.update(kwargs)
+                    w["updated_at"] = datetime.utcnow().isoformat()
+                    watches[i] = w
+                    return watches, w
+            return None, None
+
+        return self._update(WATCHES_FILE, apply)
 
     def delete_watch(self, watch_id: str) -> bool:
-        watches = self._load(WATCHES_FILE)
-        new_watches = [w for w in watches if w["id"] != watch_id]
-        if len(new_watches) < len(watches):
-            self._save(WATCHES_FILE, new_watches)
-            return True
-        return False
+        def apply(watches):
+            new_watches = [w for w in watches if w["id"] != watch_id]
+            if len(new_watches) < len(watches):
+                return new_watches, True
+            return None, False
+
+        deleted = self._update(WATCHES_FILE, apply)
+        if deleted:
+            self._versions().drop(watch_id)
+        return deleted
 
     # Reports
     def create_report(
@@ -136,8 +185,8 @@ class Database:
         diff: str | None = None,
         ai_summary: str | None = None,
         ai_importance: str | None = None,
+        analysis_pending: bool = False,
     ) -> dict:
-        reports = self._load(REPORTS_FILE)
         report = {
             "id": str(uuid4()),
             "watch_id": watch_id,
@@ -147,56 +196,122 @@ class Database:
             "diff": diff,
             "ai_summary": ai_summary,
             "ai_importance": ai_importance,
+            "analysis_pending": analysis_pending,
             "notified": False,
             "created_at": datetime.utcnow().isoformat(),
         }
-        reports.append(report)
-        self._save(REPORTS_FILE, reports)
+        self._reports().append(report)
         return report
 
     def get_reports(self, watch_id: str | None = None, limit: int = 100) -> list:
-        reports = self._load(REPORTS_FILE)
-        if watch_id:
-            reports = [r for r in reports if r["watch_id"] == watch_id]
-        return sorted(reports, key=lambda x: x["created_at"], reverse=True)[:limit]
+        return self.query_reports(watch_ids=[watch_id] if watch_id else None, limit=limit)
+
+    def query_reports(
+        self,
+        watch_ids: Iterable[str] | None = None,
+        after: tuple[str, str] | None = None,
+        before: tuple[str, str] | None = None,
+        limit: int | None = 100,
+    ) -> list:
+        """Reports of watch_ids (all if None), newest first, paged by (created_at, id) positions.
+
+        after: only reports older than that position; before: the `limit` reports just newer.
+        """
+        return get_index(self._reports()).query(watch_ids, after=after, before=before, limit=limit)
+
+    def get_report(self, report_id: str) -> dict | None:
+        return get_index(self._reports()).get(report_id)
 
     def delete_user_data(self, user_email: str) -> dict:
         """Delete all data for a user (GDPR Art. 17 right to erasure)."""
+
         # Delete user's watches
-        watches = self._load(WATCHES_FILE)
-        user_watches = [w for w in watches if w.get("user_email") == user_email]
+        def drop_watches(watches):
+            user_watches = [w for w in watches if w.get("user_email") == user_email]
+            remaining_watches = [w for w in watches if w.get("user_email") != user_email]
+            return remaining_watches, user_watches
+
+        user_watches = self._update(WATCHES_FILE, drop_watches)
         watch_ids = {w["id"] for w in user_watches}
-        remaining_watches = [w for w in watches if w.get("user_email") != user_email]
-        self._save(WATCHES_FILE, remaining_watches)
 
         # Delete reports linked to user's watches
-        reports = self._load(REPORTS_FILE)
-        remaining_reports = [r for r in reports if r.get("watch_id") not in watch_ids]
-        deleted_reports = len(reports) - len(remaining_reports)
-        self._save(REPORTS_FILE, remaining_reports)
+        deleted_reports = self._reports().remove(lambda r: r.get("watch_id") in watch_ids) if watch_ids else 0
+        for watch_id in watch_ids:
+            self._versions().drop(watch_id)
 
         return {
             "watches_deleted": len(user_watches),
             "reports_deleted": deleted_reports,
         }
 
+    def purge_reports_before(self, cutoff: str) -> int:
+        """Delete reports created before cutoff (ISO timestamp). Returns count deleted."""
+        return self._reports().drop_before(cutoff)
+
     def mark_report_notified(self, report_id: str) -> bool:
-        reports = self._load(REPORTS_FILE)
-        for i, r in enumerate(reports):
-            if r["id"] == report_id:
-                r["notified"] = True
-                reports[i] = r
-                self._save(REPORTS_FILE, reports)
-                return True
-        return False
+        return self.update_report(report_id, notified=True)
+
+    def update_report(self, report_id: str, **fields) -> bool:
+        """Update fields of a report. False if not found."""
+        return self._reports().patch(report_id, fields)
+
+    def get_pending_reports(self) -> list:
+        """Reports still waiting for their AI analysis, oldest first."""
+        return sorted(
+            (r for r in self._reports().reports() if r.get("analysis_pending")), key=lambda r: r["created_at"]
+        )
+
+    # Snapshots
+    def _snapshots(self) -> SnapshotStore:
+        return SnapshotStore(f"{DATA_DIR}/snapshots")
+
+    def put_snapshot(self, text: str) -> str:
+        """Store a page text, returning the key to keep on the watch."""
+        return self._snapshots().put(text)
+
+    def get_snapshot(self, key: str | None) -> str | None:
+        return self._snapshots().get(key)
+
+    def collect_snapshots(self, grace: float | None = None) -> int:
+        """Delete snapshots no watch references any more. Returns count deleted."""
+        referenced = {w.get("last_snapshot") for w in read_json(WATCHES_FILE, [])}
+        return self._snapshots().collect(referenced | self._versions().keyframe_keys(), grace)
+
+    # Versions
+    def _versions(self) -> VersionStore:
+        return VersionStore(f"{DATA_DIR}/versions", self._snapshots())
+
+    def add_version(self, watch_id: str, text: str, content_hash: str, previous_text: str | None = None) -> dict:
+        """Record a changed page text in the watch's history (previous_text: the text it replaced)."""
+        return self._versions().append(
+            watch_id, text, content_hash, datetime.utcnow().isoformat(), previous_text=previous_text
+        )
+
+    def get_versions(self, watch_id: str, at: str | None = None, limit: int | None = 100) -> list:
+        """Version metadata newest first; with at (ISO timestamp), those created at or before it."""
+        return self._versions().history(watch_id, at=at, limit=limit)
+
+    def get_version(self, watch_id: str, version_id: int) -> dict | None:
+        """A version with its reconstructed text in "content"."""
+        return self._versions().get(watch_id, version_id)
+
+    def purge_versions_before(self, cutoff: str) -> int:
+        """Delete versions superseded before cutoff (ISO timestamp). Returns count deleted."""
+        return self._versions().drop_before(cutoff)
 
 
 # Global instance
-_db: Database | None = None
+_db: "Database | SQLiteDatabase | None" = None
 
 
-def get_db() -> Database:
+def get_db() -> "Database | SQLiteDatabase":
+    """Return the process-wide database for the configured storage backend."""
     global _db
     if _db is None:
-        _db = Database()
+        if STORAGE_BACKEND == "sqlite":
+            from .sqlite_backend import SQLiteDatabase
+
+            _db = SQLiteDatabase(SQLITE_FILE)
+        else:
+            _db = Database()
     return _db
@@ -0,0 +1,164 @@
+"""Cross-process safe JSON files: advisory locks, atomic commits, optimistic versions.
+
+The API runs several uvicorn workers next to the watch worker, all reading
+and rewriting the same JSON files. Writers use one of two patterns:
+
+- pessimistic: ``with file_lock(path):`` around load, modify, ``write_json``
+- optimistic: ``update_json(path, fn)`` reads and modifies without the lock,
+  then commits only if the file is still at the version it read (retrying
+  otherwise), so the lock is held just for the compare-and-replace
+
+``write_json`` writes a temp file in the same directory and ``os.replace``s
+it over the target, so readers see the old or the new contents, never a
+truncated file. Locks are ``flock`` on a ``<path>.lock`` sidecar (the data
+file itself is replaced on every commit) and are re-entrant per thread.
+"""
+
+import fcntl
+import json
+import os
+import tempfile
+import threading
+from collections.abc import Callable, Iterable
+from contextlib import contextmanager
+from typing import Any
+
+# Optimistic attempts before update_json takes the lock for the whole update
+UPDATE_RETRIES = 3
+
+_held = threading.local()
+
+
+class VersionConflict(Exception):
+    """The file changed since it was read"""
+
+
+def file_version(path: str) -> tuple | None:
+    """Identity of the file's current contents (changes on every commit), None if missing."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+@contextmanager
+def file_lock(path: str):
+    """Exclusive advisory lock on path across processes (re-entrant within a thread)."""
+    path = os.path.abspath(path)
+    held = _held.__dict__.setdefault("paths", set())
+    if path in held:
+        yield
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f"{path}.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        held.add(path)
+        try:
+            yield
+        finally:
+            held.discard(path)
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def read_json(path: str, default: Any = None) -> Any:
+    """Parsed contents of path, or default if it does not exist."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+
+def read_json_versioned(path: str, default: Any = None) -> tuple[Any, tuple | None]:
+    """(contents, version) read consistently, for a later commit_json."""
+    while True:
+        version = file_version(path)
+        data = read_json(path, default)
+        # A commit between stat and open would pair new contents with the old version
+        if file_version(path) == version:
+            return data, version
+
+
+def _atomic_write(path: str, write: Callable[[Any], None], binary: bool = False):
+    """Replace path with what write(f) writes to a temp file next to it."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        try:
+            os.fchmod(fd, os.stat(path).st_mode & 0o777)
+        except FileNotFoundError:
+            os.fchmod(fd, 0o644)
+        with os.fdopen(fd, "wb") if binary else os.fdopen(fd, "w", encoding="utf-8") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def write_json(path: str, data: Any, **dump_kwargs):
+    """Atomically replace path with data serialized as JSON.
+
+    Keeps the existing file's permissions. Does not lock: hold file_lock(path)
+    when the data came from a read of the same file.
+    """
+    dump_kwargs.setdefault("indent", 2)
+    dump_kwargs.setdefault("default", str)
+    _atomic_write(path, lambda f: json.dump(data, f, **dump_kwargs))
+
+
+def write_jsonl(path: str, records: Iterable[Any]):
+    """Atomically replace path with one JSON document per line (same rules as write_json)."""
+    _atomic_write(path, lambda f: f.writelines(json.dumps(r, default=str) + "\n" for r in records))
+
+
+def write_bytes(path: str, data: bytes):
+    """Atomically replace path with data (same rules as write_json)."""
+    _atomic_write(path, lambda f: f.write(data), binary=True)
+
+
+def commit_json(path: str, data: Any, version: tuple | None, **dump_kwargs):
+    """Write data if path is still at version (from read_json_versioned), else raise VersionConflict."""
+    with file_lock(path):
+        if file_version(path) != version:
+            raise VersionConflict(path)
+        write_json(path, data, **dump_kwargs)
+
+
+def update_json(
+    path: str,
+    fn: Callable[[Any], tuple[Any, Any]],
+    default: Any = None,
+    retries: int | None = None,
+    **dump_kwargs,
+) -> Any:
+    """Read-modify-write path with optimistic concurrency. Returns fn's result.
+
+    fn(data) returns (new_data, result); new_data None means nothing to write.
+    fn may run more than once, on fresh data each time, so it must not have
+    side effects. After ``retries`` conflicts the update runs under the lock.
+    """
+    retries = UPDATE_RETRIES if retries is None else retries
+    for _ in range(retries):
+        data, version = read_json_versioned(path, default)
+        new_data, result = fn(data)
+        if new_data is None:
+            return result
+        try:
+            commit_json(path, new_data, version, **dump_kwargs)
+            return result
+        except VersionConflict:
+            continue
+
+    with file_lock(path):
+        new_data, result = fn(read_json(path, default))
+        if new_data is not None:
+            write_json(path, new_data, **dump_kwargs)
+        return result
@@ -10,7 +10,7 @@ from pydantic import BaseModel
 class WatchStatus(str, Enum):
     ACTIVE = "active"
     PAUSED = "paused"
-    ERROR = "error"
+    ERROR = "error"  # legacy: failed checks now keep the watch active and retry with backoff
 
 
 class Watch(BaseModel):
@@ -22,11 +22,21 @@ class Watch(BaseModel):
     url: str
     check_interval: int = 3600  # seconds
     min_change_ratio: float | None = None  # per-watch threshold (0.0-1.0), None = use global default
+    adaptive_interval: bool = False  # back off on stable pages, between check_interval and max_check_interval
+    effective_interval: int | None = None  # seconds between checks actually used (adaptive mode)
+    max_check_interval: int | None = None  # tier ceiling for adaptive back-off
     notify_email: str | None = None
     status: WatchStatus = WatchStatus.ACTIVE
     last_check: datetime | None = None
     last_content_hash: str | None = None
-    last_content: str | None = None
+    last_content: str | None = None  # legacy inline text, replaced by last_snapshot
+    last_snapshot: str | None = None  # key of the last page text in the snapshot store
+    etag: str | None = None  # HTTP validators from the last fetch, for conditional requests
+    last_modified: str | None = None
+    last_body_hash: str | None = None  # hash of the last raw body, to skip parsing identical pages
+    consecutive_failures: int = 0  # failed checks in a row, reset by a successful one
+    last_error: str | None = None  # error of the last failed check
+    next_retry_at: datetime | None = None  # when a failing watch is retried (exponential backoff with jitter)
     created_at: datetime
     updated_at: datetime
 
@@ -45,6 +55,7 @@ class Report(BaseModel):
     diff: str | None = None
     ai_summary: str | None = None
     ai_importance: str | None = None
+    analysis_pending: bool = False
     notified: bool = False
     created_at: datetime
 
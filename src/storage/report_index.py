@@ -0,0 +1,195 @@
+"""In-memory index over the report log, for paginated report queries.
+
+Keeps, per process, where each report lives (segment and byte offsets of its
+line and patch lines) sorted by created_at globally and per watch, so a page
+of reports costs a bisect plus one seek-and-read per report instead of
+parsing every segment. Segments are append-only, so refreshing the index
+reads only the bytes appended since the last query; a segment that was
+rewritten (erasure, retention) or dropped triggers a full rebuild.
+
+Positions are ``(created_at, id)`` tuples: pages are newest first, ``after``
+pages go back in time from a position and ``before`` pages forward.
+"""
+
+import heapq
+import json
+import os
+import threading
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any
+
+from .report_log import _PATCH, ReportLog, _parse_line
+
+Position = tuple[str, str]
+
+
+@dataclass
+class _Entry:
+    watch_id: str
+    created_at: str
+    key: str
+    offsets: list[int] = field(default_factory=list)  # the report line, then its patches
+
+
+class _StaleSegment(Exception):
+    """A segment was rewritten after the index was refreshed"""
+
+
+def _descending(items: list[Position], hi: int) -> Iterator[Position]:
+    for i in range(hi - 1, -1, -1):
+        yield items[i]
+
+
+class ReportIndex:
+    """Report positions by id, by watch_id and by created_at."""
+
+    def __init__(self, log: ReportLog):
+        self.log = log
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._segments: dict[str, tuple[int, int]] = {}  # key -> (inode, bytes indexed)
+        self._entries: dict[str, _Entry] = {}
+        self._by_time: list[Position] = []
+        self._by_watch: dict[str, list[Position]] = {}
+
+    def refresh(self):
+        """Index what was appended to the log since the last refresh."""
+        with self._lock:
+            stats = {}
+            for key in self.log.segments():
+                try:
+                    st = os.stat(self.log._path(key))
+                except FileNotFoundError:
+                    continue
+                stats[key] = (st.st_ino, st.st_size)
+
+            if any(
+                key not in stats or stats[key][0] != inode or stats[key][1] < indexed
+                for key, (inode, indexed) in self._segments.items()
+            ):
+                self._reset()
+            for key, (inode, size) in stats.items():
+                indexed = self._segments.get(key, (inode, 0))[1]
+                if size > indexed:
+                    self._ingest(key, indexed)
+
+    def _ingest(self, key: str, start: int):
+        with open(self.log._path(key), "rb") as f:
+            inode = os.fstat(f.fileno()).st_ino
+            f.seek(start)
+            data = f.read()
+        # A line without its newline is an append in progress
+        data = data[: data.rfind(b"\n") + 1]
+        offset = start
+        for line in data.splitlines(keepends=True):
+            record = _parse_line(line, key) if line.strip() else None
+            if record is not None:
+                self._add(key, offset, record)
+            offset += len(line)
+        self._segments[key] = (inode, offset)
+
+    def _add(self, key: str, offset: int, record: dict):
+        patched = record.get(_PATCH)
+        if patched is not None:
+            entry = self._entries.get(patched)
+            if entry is not None and entry.key == key:
+                entry.offsets.append(offset)
+            return
+        if record["id"] in self._entries:
+            return
+        self._entries[record["id"]] = _Entry(record["watch_id"], record["created_at"], key, [offset])
+        position = (record["created_at"], record["id"])
+        insort(self._by_time, position)
+        insort(self._by_watch.setdefault(record["watch_id"], []), position)
+
+    def _page(
+        self,
+        watch_ids: Iterable[str] | None,
+        after: Position | None,
+        before: Position | None,
+        limit: int | None,
+    ) -> list[str]:
+        lists = [self._by_time] if watch_ids is None else [self._by_watch.get(w, []) for w in set(watch_ids)]
+        if before is not None:
+            newer = heapq.merge(*(islice(items, bisect_right(items, before), None) for items in lists))
+            return [report_id for _, report_id in reversed(list(islice(newer, limit)))]
+        older = heapq.merge(
+            *(_descending(items, len(items) if after is None else bisect_left(items, after)) for items in lists),
+            reverse=True,
+        )
+        return [report_id for _, report_id in islice(older, limit)]
+
+    def _load(self, report_ids: list[str]) -> list[dict]:
+        reports = {}
+        by_key: dict[str, list[str]] = {}
+        for report_id in report_ids:
+            by_key.setdefault(self._entries[report_id].key, []).append(report_id)
+        for key, ids in by_key.items():
+            try:
+                f = open(self.log._path(key), "rb")
+            except FileNotFoundError:
+                raise _StaleSegment(key) from None
+            with f:
+                if os.fstat(f.fileno()).st_ino != self._segments[key][0]:
+                    raise _StaleSegment(key)
+                for report_id in ids:
+                    report = None
+                    for offset in self._entries[report_id].offsets:
+                        f.seek(offset)
+                        record = json.loads(f.readline())
+                        if report is None:
+                            report = record
+                        else:
+                            record.pop(_PATCH)
+                            report.update(record)
+                    reports[report_id] = report
+        return [reports[report_id] for report_id in report_ids]
+
+    def _read(self, read: Callable[[], Any]) -> Any:
+        """Run read() on a fresh index, rebuilding it if a segment changed underneath."""
+        for attempt in range(3):
+            self.refresh()
+            with self._lock:
+                try:
+                    return read()
+                except _StaleSegment:
+                    if attempt == 2:
+                        raise
+                    self._reset()
+
+    def query(
+        self,
+        watch_ids: Iterable[str] | None = None,
+        after: Position | None = None,
+        before: Position | None = None,
+        limit: int | None = 100,
+    ) -> list[dict]:
+        """Reports of watch_ids (all watches if None), newest first.
+
+        after: only reports older than this position; before: only newer ones
+        (the ``limit`` closest to it).
+        """
+        watch_ids = None if watch_ids is None else list(watch_ids)
+        return self._read(lambda: self._load(self._page(watch_ids, after, before, limit)))
+
+    def get(self, report_id: str) -> dict | None:
+        """Report by id, None if not found."""
+        return self._read(lambda: self._load([report_id])[0] if report_id in self._entries else None)
+
+
+_indexes: dict[str, ReportIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(log: ReportLog) -> ReportIndex:
+    """Process-wide index for the log at log.index_path."""
+    with _indexes_lock:
+        index = _indexes.get(log.index_path)
+        if index is None:
+            index = _indexes[log.index_path] = ReportIndex(log)
+        return index
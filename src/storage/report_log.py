@@ -0,0 +1,218 @@
+"""Append-only report log split into time segments.
+
+Every check produces a report, so rewriting one reports.json per check made
+writes grow with history. Reports are instead appended as JSON lines to a
+segment per UTC day (or month) of their created_at:
+
+    reports.json              index: {"segments": ["2026-10-16", "2026-10-17"]}
+    reports/2026-10-17.jsonl  one report per line, in append order
+
+Updates are appended too, as ``{"_patch": <report id>, ...fields}`` lines
+folded into the report when the segment is read. Only erasure rewrites
+segment files, and retention unlinks whole segments older than the cutoff
+(rewriting at most the segment the cutoff falls in).
+
+Writers serialize on one lock for the whole log (appends are short); readers
+take no lock. An append cut short by a crash is truncated by the next one, and
+readers skip (and log) lines they can't parse. A legacy reports.json holding a list of reports is still
+readable and is split into segments by ensure().
+"""
+
+import json
+import logging
+import os
+from collections.abc import Callable, Iterator
+from typing import BinaryIO
+
+from .jsonfile import file_lock, read_json, write_json, write_jsonl
+
+logger = logging.getLogger(__name__)
+
+# day | month: how much report history one segment file holds
+REPORT_SEGMENT = os.getenv("ARKWATCH_REPORT_SEGMENT", "day")
+
+_KEY_LENGTH = {"day": len("2026-10-17"), "month": len("2026-10")}
+_PATCH = "_patch"
+_PATCH_PREFIX = b'{"_patch":'
+
+
+def segment_key(created_at: str, granularity: str | None = None) -> str:
+    """Segment holding a report created at created_at (naive UTC isoformat)."""
+    granularity = (granularity or REPORT_SEGMENT).lower()
+    if granularity not in _KEY_LENGTH:
+        raise ValueError(f"Unknown report segment granularity: {granularity}")
+    return created_at[: _KEY_LENGTH[granularity]]
+
+
+def _parse_line(line: str | bytes, key: str) -> dict | None:
+    """A report or patch line of segment key, None (logged) if it can't be read."""
+    try:
+        record = json.loads(line)
+    except ValueError:
+        record = None
+    if not isinstance(record, dict):
+        # A partial line a crash left mid-segment, with the next append glued onto it
+        logger.warning("Skipping unreadable line in report segment %s", key)
+        return None
+    return record
+
+
+def _parse_lines(text: str, key: str) -> Iterator[dict]:
+    # A line without its newline is an append in progress
+    for line in text.split("\n")[:-1]:
+        if line:
+            record = _parse_line(line, key)
+            if record is not None:
+                yield record
+
+
+def _drop_partial_line(f: BinaryIO, key: str):
+    """Truncate a line without its newline from the end of segment file f."""
+    end = f.seek(0, os.SEEK_END)
+    if not end:
+        return
+    f.seek(end - 1)
+    if f.read(1) == b"\n":
+        return
+    # Under the writers' lock this can only be an append cut short by a crash:
+    # the next record must not be glued onto it
+    f.seek(0)
+    f.truncate(f.read().rfind(b"\n") + 1)
+    logger.warning("Dropped a partial line at the end of report segment %s", key)
+
+
+class ReportLog:
+    """Reports stored as an index file plus one JSONL file per segment."""
+
+    def __init__(self, index_path: str, granularity: str | None = None):
+        self.index_path = index_path
+        self.segment_dir = os.path.splitext(index_path)[0]
+        self.granularity = granularity
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.segment_dir, f"{key}.jsonl")
+
+    def _lock(self):
+        return file_lock(self.segment_dir)
+
+    def _set_segments(self, segments: list[str]):
+        write_json(self.index_path, {"segments": sorted(set(segments))})
+
+    def ensure(self):
+        """Create the index, splitting a legacy list-of-reports file into segments."""
+        with self._lock():
+            legacy = read_json(self.index_path)
+            if isinstance(legacy, dict):
+                return
+            segments: dict[str, list] = {}
+            for report in legacy or []:
+                segments.setdefault(segment_key(report.get("created_at", ""), self.granularity), []).append(report)
+            for key, reports in segments.items():
+                write_jsonl(self._path(key), reports)
+            self._set_segments(list(segments))
+
+    def segments(self) -> list[str]:
+        """Segment keys, oldest first."""
+        index = read_json(self.index_path, {})
+        return index.get("segments", []) if isinstance(index, dict) else []
+
+    def read_segment(self, key: str) -> list[dict]:
+        """Reports in a segment with their patches applied, in append order."""
+        try:
+            # A partial line may end inside a multi-byte character
+            with open(self._path(key), encoding="utf-8", errors="replace") as f:
+                text = f.read()
+        except FileNotFoundError:
+            return []
+        reports: dict[str, dict] = {}
+        for record in _parse_lines(text, key):
+            report_id = record.pop(_PATCH, None)
+            if report_id is None:
+                reports[record["id"]] = record
+            elif report_id in reports:
+                reports[report_id].update(record)
+        return list(reports.values())
+
+    def reports(self) -> Iterator[dict]:
+        """All reports, newest first (lazily, one segment at a time)."""
+        index = read_json(self.index_path, {})
+        if isinstance(index, list):
+            yield from sorted(index, key=lambda r: r["created_at"], reverse=True)
+            return
+        for key in reversed(index.get("segments", [])):
+            yield from sorted(self.read_segment(key), key=lambda r: r["created_at"], reverse=True)
+
+    def _write_line(self, key: str, record: dict):
+        path = self._path(key)
+        with self._lock():
+            segments = self.segments()
+            if key not in segments:
+                os.makedirs(self.segment_dir, exist_ok=True)
+                self._set_segments([*segments, key])
+            with open(path, "a+b") as f:
+                _drop_partial_line(f, key)
+                f.write((json.dumps(record, default=str) + "\n").encode())
+                f.flush()
+                os.fsync(f.fileno())
+
+    def append(self, report: dict):
+        """Add a new report to the segment of its created_at."""
+        self._write_line(segment_key(report["created_at"], self.granularity), report)
+
+    def patch(self, report_id: str, fields: dict) -> bool:
+        """Update fields of a report by appending a patch line. False if not found."""
+        with self._lock():
+            for key in reversed(self.segments()):
+                if any(r["id"] == report_id for r in self.read_segment(key)):
+                    self._write_line(key, {_PATCH: report_id, **fields})
+                    return True
+        return False
+
+    def _drop_segment(self, key: str):
+        self._set_segments([k for k in self.segments() if k != key])
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _rewrite(self, key: str, keep: Callable[[dict], bool]) -> int:
+        """Drop a segment's reports for which keep() is False; returns how many were dropped."""
+        reports = self.read_segment(key)
+        remaining = [r for r in reports if keep(r)]
+        if len(remaining) == len(reports):
+            return 0
+        if remaining:
+            write_jsonl(self._path(key), remaining)
+        else:
+            self._drop_segment(key)
+        return len(reports) - len(remaining)
+
+    def remove(self, predicate: Callable[[dict], bool]) -> int:
+        """Erase every report matching predicate (rewrites the affected segments)."""
+        with self._lock():
+            return sum(self._rewrite(key, lambda r: not predicate(r)) for key in self.segments())
+
+    def drop_before(self, cutoff: str) -> int:
+        """Delete reports created at or before cutoff (ISO timestamp). Returns count deleted.
+
+        Segments entirely before the cutoff are unlinked without being parsed.
+        """
+        deleted = 0
+        with self._lock():
+            for key in self.segments():
+                if key > cutoff[: len(key)]:
+                    break
+                if key == cutoff[: len(key)]:
+                    deleted += self._rewrite(key, lambda r: r.get("created_at", "") > cutoff)
+                    continue
+                deleted += self._count(key)
+                self._drop_segment(key)
+        return deleted
+
+    def _count(self, key: str) -> int:
+        """Reports in a segment, counting lines rather than parsing them."""
+        try:
+            with open(self._path(key), "rb") as f:
+                return sum(1 for line in f if line.strip() and not line.startswith(_PATCH_PREFIX))
+        except FileNotFoundError:
+            return 0
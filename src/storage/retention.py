@@ -1,56 +1,55 @@
 """RGPD data retention enforcement (Art. 5.1.e - Storage limitation).
 
 Purges expired data according to the documented retention periods:
-- Reports: 12 months
+- Reports: 12 months (expired report log segments are deleted whole)
+- Page version history: 12 months (the version live 12 months ago is kept)
+- Page snapshots: as long as a watch or a kept version references them
 - Nginx access logs: 12 months (handled by logrotate, not this script)
 - Account data after deletion: immediate (handled by DELETE /account)
 
-Run daily via cron or systemd timer.
+Run daily via cron or systemd timer: python3 -m src.storage.retention
 """
 
-import json
-import os
 from datetime import UTC, datetime, timedelta
 
-DATA_DIR = "/opt/claude-ceo/workspace/arkwatch/data"
-REPORTS_FILE = f"{DATA_DIR}/reports.json"
+from .database import DATA_DIR, get_db
 
-# Retention period for reports (12 months)
+# Retention period for reports and page versions (12 months)
 REPORTS_RETENTION_DAYS = 365
 
 
-def _load(filepath: str) -> list:
-    if not os.path.exists(filepath):
-        return []
-    with open(filepath) as f:
-        return json.load(f)
-
-
-def _save(filepath: str, data: list):
-    with open(filepath, "w") as f:
-        json.dump(data, f, indent=2, default=str)
+def _cutoff() -> str:
+    # created_at is stored as a naive UTC isoformat, compare in the same format
+    return (datetime.now(UTC) - timedelta(days=REPORTS_RETENTION_DAYS)).replace(tzinfo=None).isoformat()
 
 
 def purge_old_reports() -> int:
     """Remove reports older than REPORTS_RETENTION_DAYS. Returns count of deleted reports."""
-    reports = _load(REPORTS_FILE)
-    cutoff = (datetime.now(UTC) - timedelta(days=REPORTS_RETENTION_DAYS)).isoformat()
+    return get_db().purge_reports_before(_cutoff())
 
-    remaining = [r for r in reports if r.get("created_at", "") > cutoff]
-    deleted = len(reports) - len(remaining)
 
-    if deleted > 0:
-        _save(REPORTS_FILE, remaining)
+def purge_old_versions() -> int:
+    """Remove page versions superseded more than REPORTS_RETENTION_DAYS ago. Returns count deleted."""
+    return get_db().purge_versions_before(_cutoff())
 
-    return deleted
+
+def collect_snapshots() -> int:
+    """Remove page snapshots nothing references any more. Returns count of deleted blobs."""
+    return get_db().collect_snapshots()
 
 
 def run_retention():
     """Execute all retention policies."""
     now = datetime.now(UTC).isoformat()
     deleted_reports = purge_old_reports()
-
-    log_entry = f"[{now}] Retention: {deleted_reports} reports purged"
+    deleted_versions = purge_old_versions()
+    # After versions, so keyframes they dropped are collected
+    deleted_snapshots = collect_snapshots()
+
+    log_entry = (
+        f"[{now}] Retention: {deleted_reports} reports purged, {deleted_versions} versions purged, "
+        f"{deleted_snapshots} snapshots collected"
+    )
     print(log_entry)
 
     # Write to retention log
@@ -58,7 +57,11 @@ def run_retention():
     with open(log_file, "a") as f:
         f.write(log_entry + "\n")
 
-    return {"reports_purged": deleted_reports}
+    return {
+        "reports_purged": deleted_reports,
+        "versions_purged": deleted_versions,
+        "snapshots_collected": deleted_snapshots,
+    }
 
 
 if __name__ == "__main__":
@@ -0,0 +1,137 @@
+"""Content-addressed, compressed store for page snapshots.
+
+Watches used to keep the last page text (cut to 10,000 characters) inline
+in watches.json. Snapshots are instead written once per distinct content as
+``snapshots/<ab>/<sha256>.<codec>`` and watches keep only the key, so pages
+shared by several watches are stored once and comparisons see the full text.
+
+Blobs are zstd-compressed when ``zstandard`` is installed, zlib otherwise;
+both are always readable. collect() deletes blobs nobody references any more,
+sparing recent ones that a worker may have written but not yet recorded.
+"""
+
+import hashlib
+import importlib.util
+import os
+import time
+import zlib
+from collections.abc import Iterable
+
+from .jsonfile import write_bytes
+
+# auto (zstd when installed) | zstd | zlib
+SNAPSHOT_COMPRESSION = os.getenv("ARKWATCH_SNAPSHOT_COMPRESSION", "auto")
+# Unreferenced blobs younger than this many seconds survive collection
+SNAPSHOT_GC_GRACE = int(os.getenv("ARKWATCH_SNAPSHOT_GC_GRACE", "3600"))
+
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 10
+
+_CODECS = ("zst", "zz")
+
+
+def snapshot_key(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zst":
+        import zstandard
+
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return zlib.compress(data, ZLIB_LEVEL)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zst":
+        import zstandard
+
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+def resolve_codec(name: str | None = None) -> str:
+    """File extension of the codec for name (default SNAPSHOT_COMPRESSION)."""
+    name = (name or SNAPSHOT_COMPRESSION).lower()
+    has_zstd = importlib.util.find_spec("zstandard") is not None
+    if name == "auto":
+        return "zst" if has_zstd else "zz"
+    if name == "zstd":
+        if not has_zstd:
+            raise ValueError("ARKWATCH_SNAPSHOT_COMPRESSION=zstd needs `pip install zstandard`")
+        return "zst"
+    if name == "zlib":
+        return "zz"
+    raise ValueError(f"Unknown snapshot compression: {name}")
+
+
+class SnapshotStore:
+    """Page texts stored once per content, compressed, addressed by SHA-256."""
+
+    def __init__(self, root: str, compression: str | None = None):
+        self.root = root
+        self.codec = resolve_codec(compression)
+
+    def _path(self, key: str, codec: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.{codec}")
+
+    def _find(self, key: str) -> str | None:
+        for codec in _CODECS:
+            path = self._path(key, codec)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def put(self, text: str) -> str:
+        """Store text (no-op if already stored) and return its key."""
+        key = snapshot_key(text)
+        existing = self._find(key)
+        if existing is not None:
+            # Refresh mtime so a blob becoming referenced again isn't collected mid-write
+            os.utime(existing)
+            return key
+        write_bytes(self._path(key, self.codec), _compress(text.encode(), self.codec))
+        return key
+
+    def get(self, key: str | None) -> str | None:
+        """Text stored under key, None if unknown."""
+        if not key:
+            return None
+        path = self._find(key)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        return _decompress(data, path.rsplit(".", 1)[1]).decode()
+
+    def keys(self) -> Iterable[tuple[str, str]]:
+        """(key, path) of every stored blob."""
+        if not os.path.isdir(self.root):
+            return
+        for prefix in os.scandir(self.root):
+            if not prefix.is_dir():
+                continue
+            for entry in os.scandir(prefix.path):
+                key, _, codec = entry.name.partition(".")
+                if codec in _CODECS:
+                    yield key, entry.path
+
+    def collect(self, referenced: Iterable[str], grace: float | None = None) -> int:
+        """Delete blobs not in referenced and older than grace seconds. Returns count deleted."""
+        referenced = set(referenced)
+        cutoff = time.time() - (SNAPSHOT_GC_GRACE if grace is None else grace)
+        deleted = 0
+        for key, path in list(self.keys()):
+            if key in referenced:
+                continue
+            try:
+                if os.stat(path).st_mtime > cutoff:
+                    continue
+                os.unlink(path)
+                deleted += 1
+            except FileNotFoundError:
+                continue
+        return deleted
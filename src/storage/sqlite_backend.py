@@ -0,0 +1,359 @@
+"""SQLite storage backend (WAL mode) with the same surface as the JSON Database.
+
+Watches and reports are stored one row per record, with the full record kept as
+JSON in a ``data`` column (PII fields encrypted exactly as in watches.json) and the
+fields we filter or sort on promoted to indexed columns.
+
+Enable with ARKWATCH_STORAGE_BACKEND=sqlite. Existing JSON data can be imported
+once with ``python3 scripts/migrate_json_to_sqlite.py``.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from collections.abc import Iterable
+from datetime import datetime
+from uuid import uuid4
+
+from .database import decrypt_watch, encrypt_watch
+from .report_log import ReportLog
+from .snapshots import SnapshotStore
+from .versions import VersionStore
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS watches (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_watches_status ON watches(status);
+
+CREATE TABLE IF NOT EXISTS reports (
+    id TEXT PRIMARY KEY,
+    watch_id TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_reports_watch_created ON reports(watch_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_reports_created ON reports(created_at);
+"""
+
+
+class SQLiteDatabase:
+    """SQLite-backed database, drop-in replacement for the JSON Database"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._conn() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        """Per-thread connection (sqlite3 connections must not be shared across threads)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    @staticmethod
+    def _dump(record: dict) -> str:
+        return json.dumps(record, default=str)
+
+    def _put_watch(self, conn: sqlite3.Connection, watch: dict):
+        conn.execute(
+            "INSERT OR REPLACE INTO watches (id, status, data) VALUES (?, ?, ?)",
+            (watch["id"], watch.get("status") or "active", self._dump(encrypt_watch(watch))),
+        )
+
+    def _put_report(self, conn: sqlite3.Connection, report: dict):
+        conn.execute(
+            "INSERT OR REPLACE INTO reports (id, watch_id, created_at, data) VALUES (?, ?, ?, ?)",
+            (report["id"], report["watch_id"], report["created_at"], self._dump(report)),
+        )
+
+    # Watches
+    def create_watch(
+        self,
+        name: str,
+        url: str,
+        check_interval: int = 3600,
+        notify_email: str | None = None,
+        min_change_ratio: float | None = None,
+        adaptive_interval: bool = False,
+        max_check_interval: int | None = None,
+    ) -> dict:
+        watch = {
+            "id": str(uuid4()),
+            "name": name,
+            "url": url,
+            "check_interval": check_interval,
+            "min_change_ratio": min_change_ratio,
+            "adaptive_interval": adaptive_interval,
+            "effective_interval": check_interval,
+            "max_check_interval": max_check_interval,
+            "notify_email": notify_email,
+            "status": "active",
+            "last_check": None,
+            "last_content_hash": None,
+            "last_snapshot": None,
+            "consecutive_failures": 0,
+            "last_error": None,
+            "next_retry_at": None,
+            "created_at": datetime.utcnow().isoformat(),
+            "updated_at": datetime.utcnow().isoformat(),
+        }
+        self._put_watch(self._conn(), watch)
+        return watch
+
+    def get_watches(self, status: str | None = None) -> list:
+        if status:
+            rows = self._conn().execute("SELECT data FROM watches WHERE status = ? ORDER BY rowid", (status,))
+        else:
+            rows = self._conn().execute("SELECT data FROM watches ORDER BY rowid")
+        return [decrypt_watch(json.loads(data)) for (data,) in rows]
+
+    def get_watches_by_user(self, email: str) -> list:
+        return [w for w in self.get_watches() if w.get("user_email") == email]
+
+    def get_watch(self, watch_id: str) -> dict | None:
+        row = self._conn().execute("SELECT data FROM watches WHERE id = ?", (watch_id,)).fetchone()
+        return decrypt_watch(json.loads(row[0])) if row else None
+
+    def update_watch(self, watch_id: str, **kwargs) -> dict | None:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT data FROM watches WHERE id = ?", (watch_id,)).fetchone()
+            if row is None:
+                conn.execute("ROLLBACK")
+                return None
+            watch = decrypt_watch(json.loads(row[0]))
+            watch.update(kwargs)
+            watch["updated_at"] = datetime.utcnow().isoformat()
+            conn.execute(
+                "UPDATE watches SET status = ?, data = ? WHERE id = ?",
+                (watch.get("status") or "active", self._dump(encrypt_watch(watch)), watch_id),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return watch
+
+    def delete_watch(self, watch_id: str) -> bool:
+        cursor = self._conn().execute("DELETE FROM watches WHERE id = ?", (watch_id,))
+        if cursor.rowcount > 0:
+            self._versions().drop(watch_id)
+        return cursor.rowcount > 0
+
+    # Reports
+    def create_report(
+        self,
+        watch_id: str,
+        changes_detected: bool,
+        current_hash: str,
+        previous_hash: str | None = None,
+        diff: str | None = None,
+        ai_summary: str | None = None,
+        ai_importance: str | None = None,
+        analysis_pending: bool = False,
+    ) -> dict:
+        report = {
+            "id": str(uuid4()),
+            "watch_id": watch_id,
+            "changes_detected": changes_detected,
+            "previous_hash": previous_hash,
+            "current_hash": current_hash,
+            "diff": diff,
+            "ai_summary": ai_summary,
+            "ai_importance": ai_importance,
+            "analysis_pending": analysis_pending,
+            "notified": False,
+            "created_at": datetime.utcnow().isoformat(),
+        }
+        self._put_report(self._conn(), report)
+        return report
+
+    def get_reports(self, watch_id: str | None = None, limit: int = 100) -> list:
+        if watch_id:
+            rows = self._conn().execute(
+                "SELECT data FROM reports WHERE watch_id = ? ORDER BY created_at DESC LIMIT ?",
+                (watch_id, limit),
+            )
+        else:
+            rows = self._conn().execute("SELECT data FROM reports ORDER BY created_at DESC LIMIT ?", (limit,))
+        return [json.loads(data) for (data,) in rows]
+
+    def query_reports(
+        self,
+        watch_ids: Iterable[str] | None = None,
+        after: tuple[str, str] | None = None,
+        before: tuple[str, str] | None = None,
+        limit: int | None = 100,
+    ) -> list:
+        """Reports of watch_ids (all if None), newest first, paged by (created_at, id) positions.
+
+        after: only reports older than that position; before: the `limit` reports just newer.
+        """
+        where, params = [], []
+        if watch_ids is not None:
+            watch_ids = list(watch_ids)
+            if not watch_ids:
+                return []
+            where.append(f"watch_id IN ({', '.join('?' * len(watch_ids))})")
+            params.extend(watch_ids)
+        if after is not None:
+            where.append("(created_at, id) < (?, ?)")
+            params.extend(after)
+        if before is not None:
+            where.append("(created_at, id) > (?, ?)")
+            params.extend(before)
+        order = "ASC" if before is not None else "DESC"
+        sql = "SELECT data FROM reports"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY created_at {order}, id {order} LIMIT ?"
+        params.append(-1 if limit is None else limit)
+        reports = [json.loads(data) for (data,) in self._conn().execute(sql, params)]
+        return reports[::-1] if before is not None else reports
+
+    def get_report(self, report_id: str) -> dict | None:
+        row = self._conn().execute("SELECT data FROM reports WHERE id = ?", (report_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def delete_user_data(self, user_email: str) -> dict:
+        """Delete all data for a user (GDPR Art. 17 right to erasure)."""
+        watch_ids = [w["id"] for w in self.get_watches_by_user(user_email)]
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            deleted_reports = 0
+            for watch_id in watch_ids:
+                conn.execute("DELETE FROM watches WHERE id = ?", (watch_id,))
+                deleted_reports += conn.execute("DELETE FROM reports WHERE watch_id = ?", (watch_id,)).rowcount
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        for watch_id in watch_ids:
+            self._versions().drop(watch_id)
+
+        return {
+            "watches_deleted": len(watch_ids),
+            "reports_deleted": deleted_reports,
+        }
+
+    def purge_reports_before(self, cutoff: str) -> int:
+        """Delete reports created before cutoff (ISO timestamp). Returns count deleted."""
+        return self._conn().execute("DELETE FROM reports WHERE created_at <= ?", (cutoff,)).rowcount
+
+    def mark_report_notified(self, report_id: str) -> bool:
+        return self.update_report(report_id, notified=True)
+
+    def update_report(self, report_id: str, **fields) -> bool:
+        """Update fields of a report. False if not found."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT data FROM reports WHERE id = ?", (report_id,)).fetchone()
+            if row is not None:
+                report = {**json.loads(row[0]), **fields}
+                conn.execute("UPDATE reports SET data = ? WHERE id = ?", (self._dump(report), report_id))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return row is not None
+
+    def get_pending_reports(self) -> list:
+        """Reports still waiting for their AI analysis, oldest first."""
+        rows = self._conn().execute(
+            "SELECT data FROM reports WHERE json_extract(data, '$.analysis_pending') = 1 ORDER BY created_at"
+        )
+        return [json.loads(data) for (data,) in rows]
+
+    # Snapshots
+    def _snapshots(self) -> SnapshotStore:
+        return SnapshotStore(os.path.join(os.path.dirname(self.path) or ".", "snapshots"))
+
+    def put_snapshot(self, text: str) -> str:
+        """Store a page text, returning the key to keep on the watch."""
+        return self._snapshots().put(text)
+
+    def get_snapshot(self, key: str | None) -> str | None:
+        return self._snapshots().get(key)
+
+    def collect_snapshots(self, grace: float | None = None) -> int:
+        """Delete snapshots no watch references any more. Returns count deleted."""
+        rows = self._conn().execute("SELECT json_extract(data, '$.last_snapshot') FROM watches")
+        referenced = {key for (key,) in rows} | self._versions().keyframe_keys()
+        return self._snapshots().collect(referenced, grace)
+
+    # Versions
+    def _versions(self) -> VersionStore:
+        return VersionStore(os.path.join(os.path.dirname(self.path) or ".", "versions"), self._snapshots())
+
+    def add_version(self, watch_id: str, text: str, content_hash: str, previous_text: str | None = None) -> dict:
+        """Record a changed page text in the watch's history (previous_text: the text it replaced)."""
+        return self._versions().append(
+            watch_id, text, content_hash, datetime.utcnow().isoformat(), previous_text=previous_text
+        )
+
+    def get_versions(self, watch_id: str, at: str | None = None, limit: int | None = 100) -> list:
+        """Version metadata newest first; with at (ISO timestamp), those created at or before it."""
+        return self._versions().history(watch_id, at=at, limit=limit)
+
+    def get_version(self, watch_id: str, version_id: int) -> dict | None:
+        """A version with its reconstructed text in "content"."""
+        return self._versions().get(watch_id, version_id)
+
+    def purge_versions_before(self, cutoff: str) -> int:
+        """Delete versions superseded before cutoff (ISO timestamp). Returns count deleted."""
+        return self._versions().drop_before(cutoff)
+
+    # Migration
+    def import_json(self, watches_file: str, reports_file: str, force: bool = False) -> dict:
+        """One-shot import of watches.json and the report log (or a legacy reports.json list).
+
+        Records are copied as stored (PII stays encrypted). Refuses to run on a
+        non-empty database unless force=True, in which case rows are upserted by id.
+        """
+        conn = self._conn()
+        if not force:
+            (existing,) = conn.execute(
+                "SELECT (SELECT COUNT(*) FROM watches) + (SELECT COUNT(*) FROM reports)"
+            ).fetchone()
+            if existing:
+                raise RuntimeError(f"{self.path} already contains data; pass force=True to upsert")
+
+        counts = {"watches": 0, "reports": 0}
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if os.path.exists(watches_file):
+                with open(watches_file) as f:
+                    for watch in json.load(f):
+                        conn.execute(
+                            "INSERT OR REPLACE INTO watches (id, status, data) VALUES (?, ?, ?)",
+                            (watch["id"], watch.get("status") or "active", self._dump(watch)),
+                        )
+                        counts["watches"] += 1
+            for report in ReportLog(reports_file).reports():
+                self._put_report(conn, report)
+                counts["reports"] += 1
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return counts
@@ -0,0 +1,196 @@
+"""Per-watch page version history: periodic keyframes plus line-level deltas.
+
+A version is recorded only when a watch's content changes, so history grows
+with the amount of change rather than the number of checks. Each watch has
+an append-only ``versions/<watch_id>.jsonl``; a version line holds either a
+keyframe (the key of the full text in the snapshot store) or a delta against
+the previous version: the line edits difflib finds on the same
+``splitlines(keepends=True)`` split that WebScraper.compute_diff uses.
+
+Every VERSION_KEYFRAME_INTERVAL-th version is a keyframe (as is any version
+whose delta would not be much smaller than the text), so rebuilding a
+version applies at most VERSION_KEYFRAME_INTERVAL - 1 deltas.
+"""
+
+import difflib
+import json
+import os
+import re
+
+from .jsonfile import file_lock, write_jsonl
+from .snapshots import SnapshotStore, snapshot_key
+
+# A keyframe at least every this many versions (bounds reconstruction cost)
+VERSION_KEYFRAME_INTERVAL = int(os.getenv("ARKWATCH_VERSION_KEYFRAME_INTERVAL", "20"))
+
+# Version fields returned by the API (the rest locate the content)
+PUBLIC_FIELDS = ("id", "created_at", "content_hash", "size", "keyframe")
+
+_WATCH_ID = re.compile(r"[\w-]+")
+
+
+def line_delta(old: str, new: str) -> list:
+    """Edits turning old into new: [[start, end, replacement lines], ...] on old's lines."""
+    a = old.splitlines(keepends=True)
+    b = new.splitlines(keepends=True)
+    return [
+        [i1, i2, b[j1:j2]]
+        for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, a, b).get_opcodes()
+        if tag != "equal"
+    ]
+
+
+def apply_delta(old: str, delta: list) -> str:
+    lines = old.splitlines(keepends=True)
+    out = []
+    pos = 0
+    for start, end, replacement in delta:
+        out += lines[pos:start]
+        out += replacement
+        pos = end
+    out += lines[pos:]
+    return "".join(out)
+
+
+def public(version: dict) -> dict:
+    return {field: version.get(field) for field in PUBLIC_FIELDS}
+
+
+class VersionStore:
+    """Version chains of all watches, keyframes kept in a SnapshotStore."""
+
+    def __init__(self, root: str, snapshots: SnapshotStore, keyframe_interval: int | None = None):
+        self.root = root
+        self.snapshots = snapshots
+        self.keyframe_interval = max(1, keyframe_interval or VERSION_KEYFRAME_INTERVAL)
+
+    def _lock(self):
+        # One lock for all chains: appends are short and come from the worker
+        return file_lock(self.root)
+
+    def _path(self, watch_id: str) -> str:
+        if not _WATCH_ID.fullmatch(watch_id):
+            raise ValueError(f"Invalid watch id: {watch_id!r}")
+        return os.path.join(self.root, f"{watch_id}.jsonl")
+
+    def chain(self, watch_id: str) -> list[dict]:
+        """All versions of a watch, oldest first."""
+        try:
+            with open(self._path(watch_id), encoding="utf-8") as f:
+                return [json.loads(line) for line in f if line.endswith("\n")]
+        except FileNotFoundError:
+            return []
+
+    def _keyframe(self, text: str) -> dict:
+        return {"keyframe": True, "snapshot": self.snapshots.put(text)}
+
+    def append(
+        self, watch_id: str, text: str, content_hash: str, created_at: str, previous_text: str | None = None
+    ) -> dict:
+        """Record text as the watch's newest version.
+
+        previous_text is the text the caller compared against; it is used as
+        the delta base only if it is exactly the current newest version.
+        """
+        path = self._path(watch_id)
+        with self._lock():
+            versions = self.chain(watch_id)
+            tip = versions[-1] if versions else None
+            if tip is not None and tip["sha"] == snapshot_key(text):
+                return public(tip)
+
+            version = {
+                "id": tip["id"] + 1 if tip else 1,
+                "created_at": created_at,
+                "content_hash": content_hash,
+                "sha": snapshot_key(text),
+                "size": len(text),
+            }
+            since_keyframe = next((i for i, v in enumerate(reversed(versions)) if v["keyframe"]), len(versions))
+            use_delta = (
+                tip is not None
+                and previous_text is not None
+                and tip["sha"] == snapshot_key(previous_text)
+                and since_keyframe + 1 < self.keyframe_interval
+            )
+            if use_delta:
+                delta = line_delta(previous_text, text)
+                # Not worth it when most of the page changed
+                use_delta = len(json.dumps(delta)) < len(text) // 2
+            version.update({"keyframe": False, "delta": delta} if use_delta else self._keyframe(text))
+
+            os.makedirs(self.root, exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(version) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        return public(version)
+
+    def _content(self, versions: list[dict], index: int) -> str | None:
+        """Rebuild versions[index] from the nearest keyframe at or before it."""
+        start = index
+        while not versions[start]["keyframe"]:
+            start -= 1
+        text = self.snapshots.get(versions[start]["snapshot"])
+        if text is None:
+            return None
+        for version in versions[start + 1 : index + 1]:
+            text = apply_delta(text, version["delta"])
+        return text
+
+    def history(self, watch_id: str, at: str | None = None, limit: int | None = 100) -> list[dict]:
+        """Versions newest first; with at, only those created at or before it (the first was live at `at`)."""
+        versions = [public(v) for v in reversed(self.chain(watch_id)) if at is None or v["created_at"] <= at]
+        return versions[:limit]
+
+    def get(self, watch_id: str, version_id: int) -> dict | None:
+        """A version with its full text in "content", None if unknown."""
+        versions = self.chain(watch_id)
+        index = next((i for i, v in enumerate(versions) if v["id"] == version_id), None)
+        if index is None:
+            return None
+        content = self._content(versions, index)
+        if content is None:
+            return None
+        return {**public(versions[index]), "content": content}
+
+    def drop(self, watch_id: str):
+        """Delete a watch's whole history."""
+        path = self._path(watch_id)
+        with self._lock():
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+    def watch_ids(self) -> list[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return [name[: -len(".jsonl")] for name in os.listdir(self.root) if name.endswith(".jsonl")]
+
+    def keyframe_keys(self) -> set[str]:
+        """Snapshot keys referenced by keyframes (kept by snapshot collection)."""
+        return {v["snapshot"] for watch_id in self.watch_ids() for v in self.chain(watch_id) if v["keyframe"]}
+
+    def drop_before(self, cutoff: str) -> int:
+        """Delete versions superseded before cutoff (ISO timestamp). Returns count deleted.
+
+        The version that was live at cutoff is kept, turned into a keyframe if needed.
+        """
+        deleted = 0
+        with self._lock():
+            for watch_id in self.watch_ids():
+                versions = self.chain(watch_id)
+                live = max((i for i, v in enumerate(versions) if v["created_at"] <= cutoff), default=0)
+                if live == 0:
+                    continue
+                first = versions[live]
+                if not first["keyframe"]:
+                    content = self._content(versions, live)
+                    if content is None:
+                        continue
+                    first = {k: v for k, v in first.items() if k != "delta"}
+                    first.update(self._keyframe(content))
+                write_jsonl(self._path(watch_id), [first, *versions[live + 1 :]])
+                deleted += live
+        return deleted
@@ -1,46 +1,225 @@
 """ArkWatch Worker - Main processing loop"""
 
 import asyncio
-import difflib
+import os
+import random
+import time
 from datetime import datetime, timedelta
 
-from .analyzer import ContentAnalyzer
+from .analyzer import AnalysisCache, AnalysisResult, ContentAnalyzer
+from .analyzer.cache import ANALYSIS_CACHE_SIZE
+from .circuit import OPEN, CircuitBreaker, CircuitBreakers
 from .notifications import EmailNotifier
-from .scraper import WebScraper
-from .storage import get_db
+from .scheduler import DueWatch, WatchScheduler, adaptive_interval, interval_of, retry_delay
+from .scheduler.adaptive import ADAPTIVE_WINDOW
+from .scheduler.retry import RETRY_BASE_DELAY
+from .scraper import HostThrottle, ScrapeResult, get_scraper
+from .scraper.change_ratio import change_ratio
+from .scraper.politeness import host_key, url_key
+from .storage import database, get_db
 
 # Minimum change ratio to trigger a notification (5%)
 # This filters out noise from dynamic sites (votes, timestamps, etc.)
 MIN_CHANGE_RATIO = 0.05
 
+# Concurrency: max watches processed at once, and politeness limits per host
+# (max in-flight requests, min seconds between request starts to the same host)
+WORKER_CONCURRENCY = int(os.getenv("ARKWATCH_WORKER_CONCURRENCY", "10"))
+PER_HOST_CONCURRENCY = int(os.getenv("ARKWATCH_PER_HOST_CONCURRENCY", "2"))
+PER_HOST_DELAY = float(os.getenv("ARKWATCH_PER_HOST_DELAY", "2"))
+
+# Host circuit breaker: stop fetching from a host after this many consecutive
+# unreachable fetches, for this many seconds (then a single trial fetch)
+HOST_BREAKER_THRESHOLD = int(os.getenv("ARKWATCH_HOST_BREAKER_THRESHOLD", "5"))
+HOST_BREAKER_COOLDOWN = float(os.getenv("ARKWATCH_HOST_BREAKER_COOLDOWN", "300"))
+
+# Watches the worker checks; "error" is only left on watches that failed before retries existed
+MONITORED_STATUSES = ("active", "error")
+
+# Watch fields reset by a successful check
+HEALTHY_FIELDS = {"consecutive_failures": 0, "last_error": None, "next_retry_at": None}
+
+# Analyzer circuit breaker: after this many consecutive failed or slow analyses,
+# stop calling the API for this many seconds (then a single trial call)
+ANALYZER_BREAKER_THRESHOLD = int(os.getenv("ARKWATCH_ANALYZER_BREAKER_THRESHOLD", "3"))
+ANALYZER_BREAKER_COOLDOWN = float(os.getenv("ARKWATCH_ANALYZER_BREAKER_COOLDOWN", "120"))
+# Seconds a check waits for its analysis before saving the report pending, and
+# duration above which a successful analysis still counts as a latency spike
+ANALYZER_WAIT = float(os.getenv("ARKWATCH_ANALYZER_WAIT", "20"))
+ANALYZER_SLOW_CALL = float(os.getenv("ARKWATCH_ANALYZER_SLOW_CALL", "10"))
+# Backfill attempts of a pending analysis before its report is completed (and notified) without one
+ANALYSIS_BACKFILL_ATTEMPTS = int(os.getenv("ARKWATCH_ANALYSIS_BACKFILL_ATTEMPTS", "5"))
+
+# ai_summary of a report saved while the analyzer was unavailable, until backfilled
+PENDING_SUMMARY = "Analyse en attente (service d'analyse indisponible)"
+
+# SQLite file of the analysis cache (default: analysis_cache.db in the data dir)
+ANALYSIS_CACHE_PATH = os.getenv("ARKWATCH_ANALYSIS_CACHE_PATH")
+
+# How often run_forever reloads active watches to pick up API-side changes
+RESYNC_INTERVAL = int(os.getenv("ARKWATCH_RESYNC_INTERVAL", "60"))
+
 
 class ArkWatchWorker:
     """Main worker that processes all watches"""
 
-    def __init__(self):
-        self.scraper = WebScraper()
-        self.analyzer = ContentAnalyzer()
+    def __init__(
+        self,
+        concurrency: int | None = None,
+        per_host_concurrency: int | None = None,
+        per_host_delay: float | None = None,
+    ):
+        self.scraper = get_scraper()
+        self.analyzer = ContentAnalyzer(cache=self._analysis_cache())
         self.db = get_db()
         self.notifier = EmailNotifier()
+        self.concurrency = max(1, concurrency or WORKER_CONCURRENCY)
+        self.throttle = HostThrottle(
+            max_per_host=per_host_concurrency or PER_HOST_CONCURRENCY,
+            min_delay=PER_HOST_DELAY if per_host_delay is None else per_host_delay,
+        )
+        self.scheduler = WatchScheduler()
+        self.host_breakers = CircuitBreakers(HOST_BREAKER_THRESHOLD, HOST_BREAKER_COOLDOWN)
+        self.analyzer_breaker = CircuitBreaker(ANALYZER_BREAKER_THRESHOLD, ANALYZER_BREAKER_COOLDOWN)
+        # Ids of reports waiting for their analysis, oldest first (loaded from storage on first use)
+        self._pending_analyses: dict[str, None] | None = None
+        # Next due time of watches whose check just failed (read when they complete)
+        self._retry_at: dict[str, datetime] = {}
+        # Due watches vs fetches actually made; their ratio is the URL dedup ratio
+        self.watches_checked = 0
+        self.fetches = 0
+
+    @staticmethod
+    def _analysis_cache() -> AnalysisCache | None:
+        if ANALYSIS_CACHE_SIZE <= 0:
+            return None
+        return AnalysisCache(ANALYSIS_CACHE_PATH or os.path.join(database.DATA_DIR, "analysis_cache.db"))
+
+    async def aclose(self):
+        """Release the scraper's and analyzer's pooled connections."""
+        await self.scraper.aclose()
+        await self.analyzer.aclose()
+        if self.analyzer.cache is not None:
+            self.analyzer.cache.close()
+
+    def _print_analysis_cache(self):
+        cache = self.analyzer.cache
+        if cache is not None and cache.hits + cache.misses:
+            print(f"Analysis cache: hit rate {cache.hit_rate:.0%} ({cache.hits}/{cache.hits + cache.misses})")
+
+    def _monitored_watches(self) -> list[dict]:
+        return [w for w in self.db.get_watches() if w.get("status") in MONITORED_STATUSES]
+
+    def _record_host(self, url: str, result: ScrapeResult):
+        """Feed a fetch outcome to its host's circuit breaker."""
+        breaker = self.host_breakers.get(host_key(url))
+        if result.unreachable:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+    def _record_failure(self, watch: dict, error: str, delay: float | None = None, **fields) -> datetime:
+        """Keep a failed watch active and schedule its retry (backoff with jitter unless delay is given)."""
+        failures = watch.get("consecutive_failures") or 0
+        if delay is None:
+            failures += 1
+            delay = retry_delay(failures, interval_of(watch))
+        retry_at = datetime.utcnow() + timedelta(seconds=delay)
+        self.db.update_watch(
+            watch["id"],
+            status="active",
+            last_check=datetime.utcnow().isoformat(),
+            consecutive_failures=failures,
+            last_error=error[:500],
+            next_retry_at=retry_at.isoformat(),
+            **fields,
+        )
+        self._retry_at[watch["id"]] = retry_at
+        print(f"  Retry #{failures} at {retry_at.isoformat(timespec='seconds')}")
+        return retry_at
+
+    @property
+    def dedup_ratio(self) -> float:
+        """Watches checked per fetch since start (1.0 = no URL shared within a batch)."""
+        return self.watches_checked / self.fetches if self.fetches else 1.0
+
+    @staticmethod
+    def _validators(watch: dict) -> dict:
+        """Conditional-fetch validators for a watch.
+
+        Only sent when we still have the content they vouch for, otherwise a
+        304 would leave nothing to compare against.
+        """
+        if watch.get("last_content_hash") is None:
+            return {}
+        return {
+            "etag": watch.get("etag"),
+            "last_modified": watch.get("last_modified"),
+            "body_hash": watch.get("last_body_hash"),
+        }
+
+    def _shared_validators(self, watches: list[dict]) -> dict:
+        """Validators for one fetch serving several watches: a 304 must hold for all of them."""
+        first = self._validators(watches[0])
+        same = all(
+            self._validators(w) == first and w.get("last_content_hash") == watches[0].get("last_content_hash")
+            for w in watches[1:]
+        )
+        return first if same else {}
 
-    async def process_watch(self, watch: dict) -> dict | None:
-        """Process a single watch"""
+    async def process_watch(
+        self, watch: dict, lag: float | None = None, result: ScrapeResult | None = None
+    ) -> dict | None:
+        """Process a single watch (lag: seconds it was dispatched after its due time).
+
+        result is a fetch of the watch's URL shared with other watches; without
+        it the watch's URL is scraped here.
+        """
         watch_id = watch["id"]
         url = watch["url"]
+        # Scheduling lag is recorded on the watch so SLA drift is visible per watch
+        lag_fields = {"schedule_lag": round(lag, 1)} if lag is not None else {}
 
-        print(f"Processing watch: {watch['name']} ({url})")
+        print(f"Processing watch: {watch['name']} ({url})" + (f" [lag {lag:.0f}s]" if lag is not None else ""))
 
-        # Scrape the URL
-        result = await self.scraper.scrape(url)
+        previous_hash = watch.get("last_content_hash")
+        # Watches checked before the snapshot store still carry inline (truncated) content
+        legacy_content = not watch.get("last_snapshot")
+        if legacy_content:
+            previous_content = watch.get("last_content") or ""
+        else:
+            previous_content = self.db.get_snapshot(watch["last_snapshot"]) or ""
+
+        if result is None:
+            result = await self.scraper.scrape(url, **self._validators(watch))
+            self._record_host(url, result)
 
         if result.error:
             print(f"Scrape error: {result.error}")
-            self.db.update_watch(watch_id, status="error", last_check=datetime.utcnow().isoformat())
+            self._record_failure(watch, result.error, **lag_fields)
             return None
 
+        if result.not_modified:
+            # 304 or byte-identical body: page unchanged, skip parsing/diffing entirely
+            print(f"  Not modified ({'304' if result.status_code == 304 else 'same body'})")
+            self.db.update_watch(
+                watch_id,
+                last_check=datetime.utcnow().isoformat(),
+                status="active",
+                etag=result.etag,
+                last_modified=result.last_modified,
+                last_body_hash=result.body_hash,
+                **HEALTHY_FIELDS,
+                **lag_fields,
+            )
+            return self.db.create_report(
+                watch_id=watch_id,
+                changes_detected=False,
+                current_hash=previous_hash,
+                previous_hash=previous_hash,
+            )
+
         # Check for changes
-        previous_hash = watch.get("last_content_hash")
-        previous_content = watch.get("last_content", "")
 
         hash_changed = previous_hash is not None and previous_hash != result.content_hash
 
@@ -49,26 +228,44 @@ class ArkWatchWorker:
         threshold = watch.get("min_change_ratio") or MIN_CHANGE_RATIO
         changes_detected = False
         if hash_changed and previous_content:
-            similarity = difflib.SequenceMatcher(None, previous_content, result.text_content[:10000]).ratio()
-            change_ratio = 1.0 - similarity
-            if change_ratio >= threshold:
+            # Legacy inline content was cut at 10,000 chars: compare like with like
+            current_content = result.text_content[:10000] if legacy_content else result.text_content
+            # Up to a few hundred ms on a large page: keep it off the event loop
+            change = await asyncio.to_thread(change_ratio, previous_content, current_content, threshold)
+            timing = f"[{change.strategy} {change.elapsed_ms:.1f}ms]"
+            if change.ratio >= threshold:
                 changes_detected = True
-                print(f"  Significant change: {change_ratio:.1%}")
+                print(f"  Significant change: {change.ratio:.1%} {timing}")
             else:
-                print(f"  Minor change filtered: {change_ratio:.1%} (threshold: {threshold:.0%})")
+                print(f"  Minor change filtered: {change.ratio:.1%} (threshold: {threshold:.0%}) {timing}")
         elif hash_changed and previous_hash is not None:
             # No previous content to compare against - skip notification
             # on first cycle after content is lost; content will be stored
             # for proper comparison on the next cycle.
             print("  Hash changed but no previous content to compare; skipping notification")
 
-        # Update watch with new content
+        # Update watch with a reference to the new content
+        snapshot = self.db.put_snapshot(result.text_content)
+        if result.content_hash != previous_hash:
+            # Version history grows only when the page changes
+            self.db.add_version(
+                watch_id,
+                result.text_content,
+                result.content_hash,
+                previous_text=None if legacy_content else previous_content,
+            )
         self.db.update_watch(
             watch_id,
             last_check=datetime.utcnow().isoformat(),
             last_content_hash=result.content_hash,
-            last_content=result.text_content[:10000],  # Limit stored content
+            last_snapshot=snapshot,
+            last_content=None,
             status="active",
+            etag=result.etag,
+            last_modified=result.last_modified,
+            last_body_hash=result.body_hash,
+            **HEALTHY_FIELDS,
+            **lag_fields,
         )
 
         # If changes detected, analyze and report
@@ -79,8 +276,8 @@ class ArkWatchWorker:
             # Compute diff
             has_diff, diff_text = self.scraper.compute_diff(previous_content, result.text_content)
 
-            # Analyze with AI
-            analysis = await self.analyzer.analyze_changes(url, previous_content, result.text_content, diff_text)
+            # Analyze with AI (unless the analyzer is down: the report is then completed by backfill_analyses)
+            analysis = await self._analyze(url, diff_text)
 
             # Create report
             report = self.db.create_report(
@@ -89,21 +286,16 @@ class ArkWatchWorker:
                 previous_hash=previous_hash,
                 current_hash=result.content_hash,
                 diff=diff_text[:5000],
-                ai_summary=analysis.summary,
-                ai_importance=analysis.importance,
+                ai_summary=analysis.summary if analysis else PENDING_SUMMARY,
+                ai_importance=analysis.importance if analysis else None,
+                analysis_pending=analysis is None,
             )
 
-            # Send notification if email configured
-            if watch.get("notify_email"):
-                self.notifier.send_alert(
-                    to=watch["notify_email"],
-                    watch_name=watch["name"],
-                    url=url,
-                    summary=analysis.summary,
-                    importance=analysis.importance,
-                    diff=diff_text[:1000],
-                )
-                self.db.mark_report_notified(report["id"])
+            if analysis is None:
+                print("  Analyzer unavailable, report saved pending analysis")
+                self._pending()[report["id"]] = None
+            else:
+                await self._notify(watch, report, analysis, diff_text)
 
         else:
             # No changes, still create a report for tracking
@@ -116,56 +308,280 @@ class ArkWatchWorker:
 
         return report
 
+    async def _notify(self, watch: dict, report: dict, analysis: AnalysisResult, diff: str):
+        """Email the watch's owner about a report, if they asked for alerts."""
+        if not watch.get("notify_email"):
+            return
+        await asyncio.to_thread(
+            self.notifier.send_alert,
+            to=watch["notify_email"],
+            watch_name=watch["name"],
+            url=watch["url"],
+            summary=analysis.summary,
+            importance=analysis.importance,
+            diff=diff[:1000],
+        )
+        self.db.mark_report_notified(report["id"])
+
+    async def _analyze(self, url: str, diff: str) -> AnalysisResult | None:
+        """Analysis of a change, None when the analyzer is unavailable (circuit open, failed or too slow)."""
+        analysis = self.analyzer.local_result(url, diff)
+        if analysis is None and self.analyzer_breaker.allow():
+            analysis = await self._call_analyzer(url, diff)
+        return analysis
+
+    async def _call_analyzer(self, url: str, diff: str) -> AnalysisResult | None:
+        """Ask the API, feeding the outcome (failure, timeout, latency) to the analyzer breaker."""
+        started = time.monotonic()
+        try:
+            analysis = await asyncio.wait_for(self.analyzer.analyze_remote(url, diff), ANALYZER_WAIT)
+        except TimeoutError:
+            analysis = self.analyzer.unavailable_result(f"No analysis within {ANALYZER_WAIT:.0f}s")
+        elapsed = time.monotonic() - started
+        if analysis.error or elapsed > ANALYZER_SLOW_CALL:
+            self.analyzer_breaker.record_failure()
+            print(f"  Analyzer {analysis.error or f'slow ({elapsed:.0f}s)'}")
+        else:
+            self.analyzer_breaker.record_success()
+        return None if analysis.error else analysis
+
+    def _pending(self) -> dict[str, None]:
+        if self._pending_analyses is None:
+            self._pending_analyses = dict.fromkeys(r["id"] for r in self.db.get_pending_reports())
+        return self._pending_analyses
+
+    async def backfill_analyses(self) -> int:
+        """Analyze reports saved while the analyzer was down and send their delayed notifications.
+
+        Stops at the first failure, leaving the rest for when the breaker lets
+        calls through again. Returns how many reports were completed.
+        """
+        pending = self._pending()
+        done = 0
+        for report_id in list(pending):
+            report = self.db.get_report(report_id)
+            watch = self.db.get_watch(report["watch_id"]) if report else None
+            if watch is None or not report.get("analysis_pending"):
+                del pending[report_id]
+                continue
+
+            diff = report.get("diff") or ""
+            analysis = self.analyzer.local_result(watch["url"], diff)
+            if analysis is None:
+                if not self.analyzer_breaker.allow():
+                    break
+                analysis = await self._call_analyzer(watch["url"], diff)
+            if analysis is None:
+                attempts = (report.get("analysis_attempts") or 0) + 1
+                if attempts < ANALYSIS_BACKFILL_ATTEMPTS:
+                    self.db.update_report(report_id, analysis_attempts=attempts)
+                    break
+                print(f"  Giving up on the analysis of report {report_id} after {attempts} attempts")
+                analysis = self.analyzer.unavailable_result("Analysis backfill attempts exhausted")
+                self.db.update_report(report_id, analysis_attempts=attempts)
+
+            self.db.update_report(
+                report_id, ai_summary=analysis.summary, ai_importance=analysis.importance, analysis_pending=False
+            )
+            del pending[report_id]
+            done += 1
+            if not report.get("notified"):
+                await self._notify(watch, report, analysis, diff)
+
+        if done or pending:
+            print(f"Analysis backfill: {done} completed, {len(pending)} pending")
+        return done
+
+    def _adapt_interval(self, watch: dict) -> int:
+        """Re-estimate an adaptive watch's interval from its latest reports and store it."""
+        reports = self.db.query_reports([watch["id"]], limit=ADAPTIVE_WINDOW)
+        interval = adaptive_interval(watch, reports)
+        if interval != watch.get("effective_interval"):
+            print(f"  Adaptive interval: {interval}s")
+            self.db.update_watch(watch["id"], effective_interval=interval)
+        return interval
+
+    async def _run_group(self, group: list[DueWatch], slots: asyncio.Semaphore) -> list[dict | None]:
+        """Fetch a group of due watches sharing a URL once and evaluate each watch against the result.
+
+        The fetch runs inside its host's politeness slot and a global slot. A
+        group of one is scraped by process_watch itself, as before coalescing.
+        While the host's circuit breaker is open nothing is fetched and the
+        watches are rescheduled for when it lets a trial fetch through.
+        """
+        url = group[0].watch["url"]
+        breaker = self.host_breakers.get(host_key(url))
+        intervals: dict[str, int] = {}
+
+        async def evaluate(due: DueWatch, shared: ScrapeResult | None) -> dict | None:
+            try:
+                if shared is None:
+                    report = await self.process_watch(due.watch, lag=due.lag)
+                else:
+                    report = await self.process_watch(due.watch, lag=due.lag, result=shared)
+                if report is not None and due.watch.get("adaptive_interval"):
+                    intervals[due.watch["id"]] = self._adapt_interval(due.watch)
+                return report
+            except Exception as e:
+                print(f"Watch error ({due.watch.get('name')}): {e}")
+                return None
+
+        try:
+            if breaker.state == OPEN:
+                # Don't even queue for a host known to be down
+                return self._skip_open_host(group, breaker)
+            # Host slot first so watches queued behind a busy host don't hold global slots
+            async with self.throttle.slot(url):
+                # The breaker may have opened while this group waited for the host
+                if not breaker.allow():
+                    return self._skip_open_host(group, breaker)
+                self.watches_checked += len(group)
+                self.fetches += 1
+                async with slots:
+                    if len(group) == 1:
+                        return [await evaluate(group[0], None)]
+                    print(f"Fetching {url} once for {len(group)} watches")
+                    shared = await self.scraper.scrape(url, **self._shared_validators([d.watch for d in group]))
+                    self._record_host(url, shared)
+                    return list(await asyncio.gather(*(evaluate(d, shared) for d in group)))
+        except Exception as e:
+            print(f"Fetch error ({url}): {e}")
+            return [None] * len(group)
+        finally:
+            for due in group:
+                retry_at = self._retry_at.pop(due.watch["id"], None)
+                seconds = intervals.get(due.watch["id"], interval_of(due.watch))
+                self.scheduler.complete(due.watch, retry_at or datetime.utcnow() + timedelta(seconds=seconds))
+
+    def _skip_open_host(self, group: list[DueWatch], breaker: CircuitBreaker) -> list[None]:
+        """Reschedule watches of a host whose circuit is open for when it lets a trial fetch through.
+
+        Not the watches' fault: no extra failure is counted.
+        """
+        print(f"Host circuit open, skipping {len(group)} watch(es) of {host_key(group[0].watch['url'])}")
+        delay = max(breaker.retry_in(), RETRY_BASE_DELAY)
+        for due in group:
+            self._record_failure(due.watch, "Host unreachable (circuit open)", delay=random.uniform(delay, delay * 1.5))
+        return [None] * len(group)
+
+    @staticmethod
+    def _coalesce(due: list[DueWatch]) -> list[list[DueWatch]]:
+        """Group due watches by normalized URL, keeping most-overdue-first order."""
+        groups: dict[str, list[DueWatch]] = {}
+        for d in due:
+            groups.setdefault(url_key(d.watch["url"]), []).append(d)
+        return list(groups.values())
+
+    @staticmethod
+    def _print_dedup(due: list[DueWatch], groups: list[list[DueWatch]]):
+        if len(groups) < len(due):
+            print(f"Fetches: {len(groups)} for {len(due)} due watches (dedup ratio {len(due) / len(groups):.2f})")
+
+    @staticmethod
+    def _print_lag(due: list[DueWatch]):
+        if due:
+            lags = [d.lag for d in due]
+            print(f"Scheduling lag: max {max(lags):.0f}s, avg {sum(lags) / len(lags):.0f}s")
+
     async def run_cycle(self):
-        """Run one processing cycle for all due watches"""
-        watches = self.db.get_watches(status="active")
+        """Run one processing cycle for all due watches, most overdue first"""
+        watches = self._monitored_watches()
 
         print(f"\n=== ArkWatch Cycle: {datetime.utcnow().isoformat()} ===")
         print(f"Active watches: {len(watches)}")
 
-        processed = 0
-        changes = 0
-
-        for watch in watches:
-            # Check if watch is due
-            last_check = watch.get("last_check")
-            interval = watch.get("check_interval", 3600)
+        self.scheduler.sync(watches)
+        due = self.scheduler.pop_due()
+        self._print_lag(due)
+        groups = self._coalesce(due)
+        self._print_dedup(due, groups)
 
-            if last_check:
-                last_dt = datetime.fromisoformat(last_check.replace("Z", ""))
-                next_check = last_dt + timedelta(seconds=interval)
-                if datetime.utcnow() < next_check:
-                    continue  # Not due yet
+        slots = asyncio.Semaphore(self.concurrency)
+        reports = [r for rs in await asyncio.gather(*(self._run_group(g, slots) for g in groups)) for r in rs]
 
-            report = await self.process_watch(watch)
-            processed += 1
-
-            if report and report.get("changes_detected"):
-                changes += 1
-
-            # Small delay between requests
-            await asyncio.sleep(2)
+        processed = len(due)
+        changes = sum(1 for report in reports if report and report.get("changes_detected"))
 
         print(f"Processed: {processed}, Changes detected: {changes}")
+        self._print_analysis_cache()
+        if self._pending():
+            await self.backfill_analyses()
         return processed, changes
 
-    async def run_forever(self, check_interval: int = 300):
-        """Run continuously"""
+    async def _dispatch(self, group: list[DueWatch], slots: asyncio.Semaphore, current: dict[str, dict]):
+        """Process due watches as currently stored (they may have changed since the last sync).
+
+        current maps watch ids to the watches read from storage for this wave.
+        """
+        fresh = []
+        for due in group:
+            watch = current.get(due.watch["id"])
+            if not watch or watch.get("status") not in MONITORED_STATUSES:
+                self.scheduler.remove(due.watch["id"])
+                continue
+            fresh.append(DueWatch(watch, due.due_at, due.lag))
+        # An edit may have changed a watch's URL since it was grouped
+        for regrouped in self._coalesce(fresh):
+            await self._run_group(regrouped, slots)
+
+    async def run_forever(self, resync_interval: int = RESYNC_INTERVAL):
+        """Run continuously, waking when the earliest watch is due.
+
+        Active watches are reloaded from storage every resync_interval seconds
+        to pick up watches created, edited or deleted through the API; pending
+        analyses are backfilled on the same beat. A finished check that moves
+        a watch earlier (retry backoff, shorter adaptive interval) wakes the
+        loop too.
+        """
         print("ArkWatch Worker starting...")
 
+        slots = asyncio.Semaphore(self.concurrency)
+        tasks: set[asyncio.Task] = set()
+        backfill: asyncio.Task | None = None
+        next_sync = 0.0
+
         while True:
             try:
-                await self.run_cycle()
+                if time.monotonic() >= next_sync:
+                    next_sync = time.monotonic() + resync_interval
+                    self.scheduler.sync(self._monitored_watches())
+                    self._print_analysis_cache()
+                    # Complete reports saved while the analyzer was down, once it may be back
+                    idle = backfill is None or backfill.done()
+                    if idle and self._pending() and self.analyzer_breaker.state != OPEN:
+                        backfill = asyncio.create_task(self.backfill_analyses())
+
+                due = self.scheduler.pop_due()
+                self._print_lag(due)
+                groups = self._coalesce(due)
+                self._print_dedup(due, groups)
+                # One read of watches.json for the whole wave rather than one per due watch
+                current = {w["id"]: w for w in self.db.get_watches()} if due else {}
+                for group in groups:
+                    task = asyncio.create_task(self._dispatch(group, slots, current))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
             except Exception as e:
-                print(f"Cycle error: {e}")
+                print(f"Scheduler error: {e}")
 
-            print(f"Sleeping for {check_interval} seconds...")
-            await asyncio.sleep(check_interval)
+            # Sleep until the earliest watch is due, or until a completed check schedules one earlier
+            self.scheduler.rescheduled.clear()
+            until_sync = max(0.0, next_sync - time.monotonic())
+            until_due = self.scheduler.seconds_until_next()
+            try:
+                await asyncio.wait_for(
+                    self.scheduler.rescheduled.wait(), until_sync if until_due is None else min(until_due, until_sync)
+                )
+            except TimeoutError:
+                pass
 
 
 async def main():
     worker = ArkWatchWorker()
-    await worker.run_cycle()
+    try:
+        await worker.run_cycle()
+    finally:
+        await worker.aclose()
 
 
 if __name__ == "__main__":
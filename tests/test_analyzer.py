@@ -1,8 +1,9 @@
 """Tests for the content analyzer module"""
 
+import asyncio
 import json
 import sys
-from datetime import datetime
+from datetime import UTC, datetime
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -68,6 +69,14 @@ class TestContentAnalyzer:
         assert result.importance == "medium"
         assert result.error == "Test error"
 
+    def test_unavailable_result(self):
+        """Test the public stand-in used when the API could not answer"""
+        result = ContentAnalyzer().unavailable_result("No analysis within 20s")
+
+        assert result.summary == "Analyse non disponible"
+        assert result.importance == "medium"
+        assert result.error == "No analysis within 20s"
+
 
 @pytest.mark.asyncio
 class TestAnalyzerAsync:
@@ -211,3 +220,198 @@ class TestAnalyzerAsync:
             result = await analyzer.summarize_content("Content")
 
             assert result == "Erreur lors du résumé"
+
+
+def _mock_mistral(mock_client, summary="Prix réduit"):
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = {
+        "choices": [{"message": {"content": json.dumps({"summary": summary, "importance": "high"})}}]
+    }
+    instance = AsyncMock()
+    instance.post = AsyncMock(return_value=response)
+    instance.__aenter__ = AsyncMock(return_value=instance)
+    instance.__aexit__ = AsyncMock(return_value=None)
+    mock_client.return_value = instance
+    return instance
+
+
+@pytest.mark.asyncio
+class TestAnalysisCache:
+    """Tests for the persistent analysis cache"""
+
+    DIFF = "--- before\n+++ after\n@@ -1,2 +1,2 @@\n-Prix: 100€\n+Prix: 80€"
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        from src.analyzer.cache import AnalysisCache
+
+        cache = AnalysisCache(str(tmp_path / "analysis_cache.db"), max_entries=100, ttl=3600)
+        yield cache
+        cache.close()
+
+    async def test_repeat_diff_served_from_cache(self, cache):
+        analyzer = ContentAnalyzer(cache=cache)
+        with patch("httpx.AsyncClient") as mock_client:
+            instance = _mock_mistral(mock_client)
+            first = await analyzer.analyze_changes("https://example.com/p", "", "", self.DIFF)
+            # Same changes at other positions, other whitespace, equivalent URL
+            moved = self.DIFF.replace("@@ -1,2 +1,2 @@", "@@ -40,2 +40,2 @@").replace("80€", "80€  ")
+            second = await analyzer.analyze_changes("https://EXAMPLE.com:443/p#top", "", "", moved)
+
+        assert instance.post.await_count == 1
+        assert second == first
+        assert (cache.hits, cache.misses, cache.hit_rate) == (1, 1, 0.5)
+
+    async def test_other_url_or_diff_is_a_miss(self, cache):
+        analyzer = ContentAnalyzer(cache=cache)
+        with patch("httpx.AsyncClient") as mock_client:
+            instance = _mock_mistral(mock_client)
+            await analyzer.analyze_changes("https://example.com/p", "", "", self.DIFF)
+            await analyzer.analyze_changes("https://example.com/other", "", "", self.DIFF)
+            await analyzer.analyze_changes("https://example.com/p", "", "", self.DIFF.replace("80", "70"))
+
+        assert instance.post.await_count == 3
+
+    async def test_errors_are_not_cached(self, cache):
+        analyzer = ContentAnalyzer(cache=cache)
+        with patch("httpx.AsyncClient") as mock_client:
+            instance = _mock_mistral(mock_client)
+            instance.post.return_value.status_code = 500
+            assert (await analyzer.analyze_changes("https://example.com/p", "", "", self.DIFF)).error
+            assert (await analyzer.analyze_changes("https://example.com/p", "", "", self.DIFF)).error
+
+        assert instance.post.await_count == 2
+        assert len(cache) == 0
+
+    async def test_persists_across_instances(self, cache, tmp_path):
+        from src.analyzer.cache import AnalysisCache
+
+        with patch("httpx.AsyncClient") as mock_client:
+            _mock_mistral(mock_client)
+            await ContentAnalyzer(cache=cache).analyze_changes("https://example.com/p", "", "", self.DIFF)
+
+        reopened = AnalysisCache(cache.path)
+        with patch("httpx.AsyncClient") as mock_client:
+            instance = _mock_mistral(mock_client)
+            result = await ContentAnalyzer(cache=reopened).analyze_changes("https://example.com/p", "", "", self.DIFF)
+        reopened.close()
+
+        instance.post.assert_not_awaited()
+        assert result.summary == "Prix réduit"
+        assert result.analyzed_at.tzinfo is not None
+
+
+class TestAnalysisCacheEviction:
+    def _result(self, summary: str) -> AnalysisResult:
+        return AnalysisResult(
+            summary=summary,
+            key_changes=[],
+            sentiment="neutral",
+            importance="low",
+            analyzed_at=datetime.now(UTC),
+            model_used="test",
+        )
+
+    def test_least_recently_used_evicted(self, tmp_path):
+        from src.analyzer.cache import AnalysisCache
+
+        cache = AnalysisCache(str(tmp_path / "cache.db"), max_entries=2, ttl=1e12)
+        with patch("src.analyzer.cache.time.time", side_effect=[1.0, 2.0, 3.0, 4.0]):
+            cache.put("a", self._result("a"))
+            cache.put("b", self._result("b"))
+            assert cache.get("a").summary == "a"
+            cache.put("c", self._result("c"))
+
+        assert cache.get("b") is None
+        assert cache.get("a").summary == "a"
+        assert cache.get("c").summary == "c"
+
+    def test_expired_entries_miss(self, tmp_path):
+        from src.analyzer.cache import AnalysisCache
+
+        cache = AnalysisCache(str(tmp_path / "cache.db"), max_entries=10, ttl=60)
+        with patch("src.analyzer.cache.time.time", return_value=1000.0):
+            cache.put("a", self._result("a"))
+        with patch("src.analyzer.cache.time.time", return_value=1061.0):
+            assert cache.get("a") is None
+        assert cache.misses == 1
+
+
+def _mistral_reply(content: str) -> MagicMock:
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = {"choices": [{"message": {"content": content}}]}
+    return response
+
+
+@pytest.mark.asyncio
+class TestBatching:
+    """Tests for analyzing several changes in one API call"""
+
+    CHANGES = [(f"https://example.com/{i}", f"-Prix: {i}0€\n+Prix: {i}5€") for i in range(3)]
+
+    async def _analyze_all(self, analyzer):
+        return await asyncio.gather(*(analyzer.analyze_changes(url, "", "", diff) for url, diff in self.CHANGES))
+
+    async def test_changes_in_window_share_one_call(self):
+        analyzer = ContentAnalyzer(batch_size=3)
+        reply = {"analyses": [{"id": i, "summary": f"Changement {i}", "importance": "low"} for i in (3, 1, 2)]}
+
+        with patch("httpx.AsyncClient") as mock_client:
+            post = mock_client.return_value.post = AsyncMock(return_value=_mistral_reply(json.dumps(reply)))
+            results = await self._analyze_all(analyzer)
+
+        assert post.await_count == 1
+        prompt = post.call_args.kwargs["json"]["messages"][0]["content"]
+        assert all(url in prompt for url, _ in self.CHANGES)
+        assert [r.summary for r in results] == ["Changement 1", "Changement 2", "Changement 3"]
+        assert analyzer.batcher.batches == 1
+
+    async def test_window_flushes_partial_batch(self):
+        analyzer = ContentAnalyzer(batch_size=10)
+        analyzer.batcher.window = 0.01
+        reply = {"analyses": [{"id": i, "summary": f"Changement {i}"} for i in (1, 2, 3)]}
+
+        with patch("httpx.AsyncClient") as mock_client:
+            post = mock_client.return_value.post = AsyncMock(return_value=_mistral_reply(json.dumps(reply)))
+            results = await asyncio.wait_for(self._analyze_all(analyzer), timeout=1)
+
+        assert post.await_count == 1
+        assert results[2].summary == "Changement 3"
+
+    async def test_unparseable_batch_falls_back_to_single_calls(self):
+        analyzer = ContentAnalyzer(batch_size=3)
+        single = _mistral_reply(json.dumps({"summary": "Seul"}))
+
+        with patch("httpx.AsyncClient") as mock_client:
+            post = mock_client.return_value.post = AsyncMock(side_effect=[_mistral_reply("pas du JSON"), *[single] * 3])
+            results = await self._analyze_all(analyzer)
+
+        assert post.await_count == 4
+        assert [r.summary for r in results] == ["Seul"] * 3
+        assert analyzer.batcher.fallbacks == 3
+
+    async def test_missing_entries_analyzed_alone(self):
+        analyzer = ContentAnalyzer(batch_size=3)
+        reply = {"analyses": [{"id": 1, "summary": "Un"}, {"id": "3", "summary": "Trois"}]}
+        single = _mistral_reply(json.dumps({"summary": "Deux"}))
+
+        with patch("httpx.AsyncClient") as mock_client:
+            post = mock_client.return_value.post = AsyncMock(side_effect=[_mistral_reply(json.dumps(reply)), single])
+            results = await self._analyze_all(analyzer)
+
+        assert post.await_count == 2
+        assert [r.summary for r in results] == ["Un", "Deux", "Trois"]
+
+    async def test_api_error_reported_for_every_change(self):
+        analyzer = ContentAnalyzer(batch_size=3)
+        error = MagicMock()
+        error.status_code = 500
+
+        with patch("httpx.AsyncClient") as mock_client:
+            post = mock_client.return_value.post = AsyncMock(return_value=error)
+            results = await self._analyze_all(analyzer)
+
+        assert post.await_count == 1
+        assert all("500" in r.error for r in results)
@@ -1,5 +1,7 @@
 """Tests for authentication endpoints (register, verify, RGPD)"""
 
+import json
+import os
 import sys
 from unittest.mock import patch
 
@@ -249,3 +251,154 @@ class TestAuthentication:
         api_key = resp.json()["api_key"]
         resp = client.get("/api/v1/watches", headers={"X-API-Key": api_key})
         assert resp.status_code == 200
+
+
+class TestKeyStoreCache:
+    """Tests for the cached key store and batched usage counters"""
+
+    def _read(self):
+        from src.api import auth
+
+        with open(auth.API_KEYS_FILE) as f:
+            return json.load(f)
+
+    def test_validate_does_not_rewrite_file(self):
+        from src.api import auth
+
+        raw_key, key_hash, _ = auth.create_api_key("Cache", "cache@example.com")
+        before = os.stat(auth.API_KEYS_FILE).st_mtime_ns
+
+        with patch("src.api.auth.USAGE_FLUSH_INTERVAL", 3600), patch("src.api.auth.USAGE_FLUSH_BATCH", 1000):
+            for _ in range(5):
+                user = auth.validate_api_key(raw_key)
+
+        assert user["requests_count"] == 5
+        assert os.stat(auth.API_KEYS_FILE).st_mtime_ns == before
+        auth.flush_usage()
+        assert self._read()[key_hash]["requests_count"] == 5
+
+    def test_flush_merges_with_other_writers(self):
+        """Counters are added to what is on disk, so another process's flush isn't lost"""
+        from src.api import auth
+
+        raw_key, key_hash, _ = auth.create_api_key("Merge", "merge@example.com")
+        with patch("src.api.auth.USAGE_FLUSH_INTERVAL", 3600):
+            auth.validate_api_key(raw_key)
+            auth.validate_api_key(raw_key)
+
+        # Another worker flushed 10 requests in the meantime
+        raw = self._read()
+        raw[key_hash]["requests_count"] = 10
+        with open(auth.API_KEYS_FILE, "w") as f:
+            json.dump(raw, f)
+
+        auth.flush_usage()
+        assert self._read()[key_hash]["requests_count"] == 12
+
+    def test_batch_size_triggers_flush(self):
+        from src.api import auth
+
+        raw_key, key_hash, _ = auth.create_api_key("Batch", "batch@example.com")
+        with patch("src.api.auth.USAGE_FLUSH_INTERVAL", 3600), patch("src.api.auth.USAGE_FLUSH_BATCH", 3):
+            for _ in range(3):
+                auth.validate_api_key(raw_key)
+
+        assert self._read()[key_hash]["requests_count"] == 3
+
+    def test_external_change_is_picked_up(self):
+        from src.api import auth
+
+        raw_key, key_hash, _ = auth.create_api_key("Ext", "ext@example.com")
+        assert auth.validate_api_key(raw_key)["tier"] == "free"
+
+        raw = self._read()
+        raw[key_hash]["tier"] = "pro"
+        with open(auth.API_KEYS_FILE, "w") as f:
+            json.dump(raw, f, indent=4)
+
+        assert auth.validate_api_key(raw_key)["tier"] == "pro"
+
+
+class TestBlindIndex:
+    """Tests for blind-indexed lookups by email and Stripe customer ID"""
+
+    @pytest.fixture(autouse=True)
+    def pii_key(self, monkeypatch):
+        from cryptography.fernet import Fernet
+
+        from src import crypto
+
+        monkeypatch.setenv("ARKWATCH_PII_KEY", Fernet.generate_key().decode())
+        monkeypatch.setattr(crypto, "_fernet_cache", None)
+        yield
+        crypto._fernet_cache = None
+
+    def _read(self):
+        from src.api import auth
+
+        with open(auth.API_KEYS_FILE) as f:
+            return json.load(f)
+
+    def _rewrite(self, raw):
+        """Write api_keys.json as another process would (forces a reload)"""
+        from src.api import auth
+
+        with open(auth.API_KEYS_FILE, "w") as f:
+            json.dump(raw, f, indent=4)
+
+    def test_index_stored_next_to_ciphertext(self):
+        from src.api import auth
+        from src.crypto import blind_index
+
+        _, key_hash, _ = auth.create_api_key("Idx", "idx@example.com")
+        record = self._read()[key_hash]
+        assert record["email"].startswith("enc:")
+        assert record["email_bidx"] == blind_index("idx@example.com", "email")
+        assert "idx@example.com" not in json.dumps(record)
+        assert "email_bidx" not in auth.get_user_by_email("idx@example.com")[1]
+
+    def test_lookup_decrypts_only_the_match(self):
+        from src.api import auth
+
+        for i in range(20):
+            auth.create_api_key(f"User {i}", f"user{i}@example.com")
+        self._rewrite(self._read())
+
+        with patch("src.api.auth.decrypt_pii", wraps=auth.decrypt_pii) as decrypt:
+            found = auth.get_user_by_email("user7@example.com")
+            assert auth.get_user_by_email("nobody@example.com") is None
+
+        assert found[1]["name"] == "User 7"
+        assert 0 < decrypt.call_count <= len(auth._PII_FIELDS)
+
+    def test_records_without_index_are_found(self):
+        """Records written before the index existed are indexed on load"""
+        from src.api import auth
+
+        _, key_hash, _ = auth.create_api_key("Legacy", "legacy@example.com")
+        raw = self._read()
+        del raw[key_hash]["email_bidx"]
+        self._rewrite(raw)
+
+        assert auth.get_user_by_email("legacy@example.com")[0] == key_hash
+        assert auth.verify_user_email("legacy@example.com", "000000") is False
+        assert auth.update_user_data("legacy@example.com", name="Renamed")
+        assert self._read()[key_hash]["email_bidx"]
+
+    def test_index_follows_updates_and_deletes(self):
+        from src.api import auth
+
+        _, key_hash, _ = auth.create_api_key("Stripe", "stripe@example.com")
+        assert auth.get_user_by_customer_id("cus_123") is None
+        auth.update_stripe_info(key_hash, customer_id="cus_123", tier="pro")
+        assert auth.get_user_by_customer_id("cus_123")[0] == key_hash
+        assert auth.get_key_hash_for_user({"email": "stripe@example.com"}) == key_hash
+
+        auth.update_stripe_info(key_hash, customer_id="cus_456")
+        assert auth.get_user_by_customer_id("cus_123") is None
+        assert auth.get_user_by_customer_id("cus_456")[1]["tier"] == "pro"
+
+        assert auth.delete_api_key_by_email("stripe@example.com")
+        assert auth.get_user_by_email("stripe@example.com") is None
+        assert auth.get_user_by_customer_id("cus_456") is None
+        assert self._read() == {}
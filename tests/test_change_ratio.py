@@ -0,0 +1,161 @@
+"""Tests for the change-ratio engine"""
+
+import difflib
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, "/opt/claude-ceo/workspace/arkwatch")
+
+from src.scraper.backends import extract_with
+from src.scraper.change_ratio import STRATEGIES, change_ratio, exact_ratio
+
+PAGES_DIR = Path(__file__).parent / "fixtures" / "pages"
+
+# Max (estimate - exact) deviation on the regression corpus, as (below, above);
+# lines must never be below exact, or auto could drop a change near the threshold
+TOLERANCE = {
+    "exact": (0.0, 0.0),
+    "lines": (0.0, 0.3),
+    "minhash": (0.05, 0.3),
+    "simhash": (0.05, 0.5),
+}
+# Corpus edits that only reorder or repeat lines: the shingle estimators cannot
+# see them, lines counts every moved line as changed
+REORDERINGS = ("reverse", "move-to-top", "swap", "duplicate-line")
+ORDER_BLIND = ("minhash", "simhash")
+
+
+def _texts() -> list[tuple[str, str]]:
+    pages = []
+    for page in sorted(PAGES_DIR.glob("*.html")):
+        with open(page, encoding="utf-8", newline="") as f:
+            pages.append((page.name, extract_with(f.read(), "bs4").text_content))
+    return pages
+
+
+def _corpus() -> list[tuple[str, str, str]]:
+    """(case id, old text, new text) pairs: typical edits applied to each saved page."""
+    cases = []
+    for name, text in _texts():
+        lines = text.split("\n")
+        mid = len(lines) // 2
+        edits = {
+            "digit": re.sub(r"\d", lambda m: str((int(m.group()) + 1) % 10), text, count=1),
+            "timestamp": text + "\nLast updated 2025-03-04 09:00 UTC",
+            "word": "\n".join(lines[:mid] + [lines[mid] + " (updated)"] + lines[mid + 1 :]),
+            "drop-line": "\n".join(lines[:mid] + lines[mid + 1 :]),
+            "duplicate-line": "\n".join(lines[: mid + 1] + lines[mid:]),
+            "paragraph": "\n".join(lines[:3] + ["Refunds are now available within 14 days of purchase."] + lines[3:]),
+            "rewrite": "\n".join(lines[:mid] + [line[::-1] for line in lines[mid:]]),
+            "reverse": "\n".join(lines[::-1]),
+            "move-to-top": "\n".join(lines[mid : mid + 1] + lines[:mid] + lines[mid + 1 :]),
+            "swap": "\n".join(lines[1:2] + lines[:1] + lines[2:]),
+        }
+        cases += [(f"{name}:{edit}", text, new) for edit, new in edits.items()]
+    return cases
+
+
+CORPUS = _corpus()
+
+
+class TestStrategies:
+    """Tests for the individual estimators"""
+
+    @pytest.mark.parametrize("strategy", STRATEGIES)
+    def test_identical_and_empty(self, strategy):
+        assert STRATEGIES[strategy]("same\ntext", "same\ntext") == 0.0
+        assert STRATEGIES[strategy]("", "") == 0.0
+
+    def test_exact_matches_sequence_matcher(self):
+        old, new = "Price: 10 EUR\nIn stock", "Price: 12 EUR\nIn stock"
+        assert exact_ratio(old, new) == 1.0 - difflib.SequenceMatcher(None, old, new).ratio()
+
+    def test_exact_sees_a_repeated_line(self):
+        # difflib's autojunk ignores the common letters of a text over 200 characters,
+        # which made copying one line read as most of the page changing
+        old = dict(_texts())["article_fr.html"]
+        lines = old.split("\n")
+        new = "\n".join(lines[12:13] + lines)
+
+        assert exact_ratio(old, new) <= STRATEGIES["lines"](old, new) < 0.05
+
+    @pytest.mark.parametrize("strategy", STRATEGIES)
+    def test_within_tolerance_of_exact(self, strategy):
+        for case, old, new in CORPUS:
+            below, above = TOLERANCE[strategy]
+            if case.endswith(REORDERINGS):
+                if strategy in ORDER_BLIND:
+                    continue
+                above = 1.0
+            error = STRATEGIES[strategy](old, new) - exact_ratio(old, new)
+            assert -below - 1e-9 <= error <= above, case
+
+    def test_unknown_strategy_rejected(self):
+        with pytest.raises(ValueError):
+            change_ratio("a", "b", 0.05, strategy="levenshtein")
+
+
+class TestAuto:
+    """auto must give the same verdict as exact while skipping it for small changes"""
+
+    @pytest.mark.parametrize("threshold", [0.01, 0.05, 0.1, 0.2, 0.3, 0.5])
+    def test_same_verdict_as_exact(self, threshold):
+        for case, old, new in CORPUS:
+            auto = change_ratio(old, new, threshold, strategy="auto")
+            assert (auto.ratio >= threshold) == (exact_ratio(old, new) >= threshold), case
+
+    def test_small_change_skips_exact(self):
+        old = "\n".join(f"Paragraph {i} with some stable text" for i in range(300))
+        new = old.replace("Paragraph 7 ", "Paragraph seven ")
+
+        result = change_ratio(old, new, 0.05, strategy="auto")
+
+        assert result.strategy == "lines"
+        assert result.ratio == result.estimate < 0.05
+        assert result.elapsed_ms >= 0
+
+    @pytest.mark.parametrize(
+        "order",
+        [lambda lines: lines[::-1], lambda lines: lines[12:13] + lines[:12] + lines[13:]],
+        ids=["reversed", "moved-to-top"],
+    )
+    def test_reordering_is_a_change(self, order):
+        old = "\n".join(f"Item number {i} in the ranking" for i in range(20))
+        new = "\n".join(order(old.split("\n")))
+
+        result = change_ratio(old, new, 0.05, strategy="auto")
+
+        assert result.ratio == exact_ratio(old, new) >= 0.05
+
+    @pytest.mark.parametrize("strategy", ["auto", "exact"])
+    def test_large_change_keeps_line_estimate(self, strategy):
+        old = "\n".join(f"Paragraph {i} with some stable text" for i in range(3000))
+        new = "\n".join(line[::-1] if i % 5 == 0 else line for i, line in enumerate(old.split("\n")))
+
+        result = change_ratio(old, new, 0.05, strategy=strategy)
+
+        assert result.strategy == "lines"
+        assert result.ratio == STRATEGIES["lines"](old, new) >= 0.05
+        assert result.elapsed_ms < 1000
+
+    def test_common_prefix_and_suffix_are_skipped(self):
+        body = "\n".join(f"Paragraph {i} with some stable text" for i in range(3000))
+        old, new = f"{body}\nUpdated 2026-10-16\n{body}", f"{body}\nUpdated 2026-10-17\n{body}"
+
+        result = change_ratio(old, new, 0.05, strategy="exact")
+
+        assert result.strategy == "exact"
+        # One character out of ~200k differs; a full difflib pass would take minutes
+        assert result.ratio == pytest.approx(2 / (len(old) + len(new)))
+
+    def test_change_near_threshold_runs_exact(self):
+        old = "\n".join(f"Line {i}" for i in range(20))
+        new = old.replace("Line 3", "Line three")
+
+        result = change_ratio(old, new, 0.05, strategy="auto")
+
+        assert result.strategy == "exact"
+        assert result.ratio == exact_ratio(old, new)
@@ -0,0 +1,89 @@
+"""Tests for circuit breakers and failed-watch retry delays"""
+
+import random
+import sys
+
+sys.path.insert(0, "/opt/claude-ceo/workspace/arkwatch")
+
+from src.circuit import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitBreakers
+from src.scheduler.retry import RETRY_BASE_DELAY, retry_delay
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(failure_threshold=3, cooldown=60, clock=FakeClock())
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.state == CLOSED and breaker.allow()
+
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        assert not breaker.allow()
+        assert breaker.retry_in() == 60
+
+    def test_single_trial_after_cooldown(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, cooldown=60, clock=clock)
+        breaker.record_failure()
+        clock.now += 60
+
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow()
+        assert not breaker.allow()
+
+        breaker.record_success()
+        assert breaker.state == CLOSED and breaker.allow()
+
+    def test_failed_trial_reopens(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, cooldown=60, clock=clock)
+        breaker.record_failure()
+        breaker.record_failure()
+        clock.now += 61
+        assert breaker.allow()
+
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        assert breaker.retry_in() == 60
+
+    def test_lost_trial_frees_slot_after_cooldown(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, cooldown=60, clock=clock)
+        breaker.record_failure()
+        clock.now += 60
+        assert breaker.allow()
+        clock.now += 30
+        assert not breaker.allow()
+        clock.now += 30
+        assert breaker.allow()
+
+    def test_registry_keeps_one_breaker_per_key(self):
+        breakers = CircuitBreakers(failure_threshold=1, cooldown=60, clock=FakeClock())
+        assert breakers.get("a.example") is breakers.get("a.example")
+        breakers.get("a.example").record_failure()
+        assert breakers.open_keys() == ["a.example"]
+        assert breakers.get("b.example").allow()
+
+
+class TestRetryDelay:
+    def test_doubles_with_jitter(self):
+        rng = random.Random(0)
+        for failures in range(1, 6):
+            full = RETRY_BASE_DELAY * 2 ** (failures - 1)
+            assert full / 2 <= retry_delay(failures, 86400, rng) <= full
+
+    def test_capped(self):
+        rng = random.Random(0)
+        assert retry_delay(40, 3600, rng) <= 21600
+        assert 43200 <= retry_delay(40, 86400, rng) <= 86400
@@ -0,0 +1,110 @@
+"""Tests for the local pre-classifier of mechanical changes"""
+
+import json
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, "/opt/claude-ceo/workspace/arkwatch")
+
+from src.analyzer.analyzer import ContentAnalyzer
+from src.analyzer.classifier import (
+    ESCALATE,
+    HEURISTIC_MODEL,
+    MECHANICAL,
+    classify_diff,
+    diff_changes,
+    heuristic_result,
+)
+from src.scraper.scraper import WebScraper
+
+CORPUS = Path(__file__).parent / "fixtures" / "diffs" / "corpus.jsonl"
+
+
+def _diff(old: str, new: str) -> str:
+    return WebScraper.compute_diff(old, new)[1]
+
+
+class TestDiffChanges:
+    def test_compute_diff_output(self):
+        # compute_diff glues the file and hunk headers onto the first line
+        diff = _diff("a\nb\nc\n", "a\nB\nc\n")
+        assert diff.startswith("--- previous+++ current@@")
+        assert diff_changes(diff) == (["b"], ["B"])
+
+    def test_standard_headers(self):
+        diff = "--- previous\n+++ current\n@@ -1,2 +1,2 @@\n-old\n+new\n keep\n@@ -9 +9 @@\n-x\n+y\n"
+        assert diff_changes(diff) == (["old", "x"], ["new", "y"])
+
+    def test_bare_lines(self):
+        assert diff_changes("-old\n+new") == (["old"], ["new"])
+
+
+class TestClassifyDiff:
+    def test_counter_bump(self):
+        result = classify_diff(_diff("Intro\n1,204 stars\n", "Intro\n1,217 stars\n"))
+        assert result.verdict == MECHANICAL
+        assert result.kind == "bumped"
+
+    def test_reordering(self):
+        result = classify_diff(_diff("A\nB\nC\n", "C\nA\nB\n"))
+        assert result.verdict == MECHANICAL
+        assert result.kind == "reordered"
+
+    def test_whitespace(self):
+        result = classify_diff(_diff("Nos  services\n", "Nos services\n"))
+        assert result.verdict == MECHANICAL
+        assert result.kind == "whitespace"
+
+    def test_price_escalates(self):
+        assert classify_diff(_diff("Prix: 100€\n", "Prix: 80€\n")).verdict == ESCALATE
+        assert classify_diff(_diff("Remise 10 %\n", "Remise 15 %\n")).verdict == ESCALATE
+
+    def test_partial_score(self):
+        # One line bumped, one rewritten: half the changes explained, still escalated
+        result = classify_diff(_diff("Updated 2026-10-16\nOpen\n", "Updated 2026-10-17\nClosed\n"))
+        assert result.verdict == ESCALATE
+        assert result.score == 0.5
+
+    def test_heuristic_result(self):
+        result = heuristic_result(_diff("Version 3.4.1\n", "Version 3.4.2\n"))
+        assert result.importance == "low"
+        assert result.sentiment == "neutral"
+        assert result.model_used == HEURISTIC_MODEL
+        assert result.key_changes == ["Version 3.4.1 → Version 3.4.2"]
+        assert heuristic_result(_diff("En stock\n", "Rupture de stock\n")) is None
+
+
+class TestCorpus:
+    """Measured against a labelled corpus of real-world-style diffs"""
+
+    def test_precision_and_recall(self):
+        cases = [json.loads(line) for line in CORPUS.read_text().splitlines() if line.strip()]
+        predicted = {
+            case["note"]: classify_diff(_diff(case["old"], case["new"])).verdict == MECHANICAL for case in cases
+        }
+        mechanical = {case["note"] for case in cases if case["label"] == "mechanical"}
+        flagged = {note for note, is_mechanical in predicted.items() if is_mechanical}
+
+        # A substantive change answered locally is a missed alert: precision must be perfect
+        assert flagged <= mechanical, f"substantive changes classified mechanical: {sorted(flagged - mechanical)}"
+        recall = len(flagged & mechanical) / len(mechanical)
+        assert recall >= 0.9, f"recall {recall:.2f}, missed: {sorted(mechanical - flagged)}"
+
+
+class TestAnalyzerIntegration:
+    async def test_mechanical_change_skips_api(self):
+        analyzer = ContentAnalyzer(heuristics=True)
+        with patch.object(analyzer.dispatcher, "post") as post:
+            result = await analyzer.analyze_changes(
+                "https://example.com", "", "", _diff("42 commentaires\n", "43 commentaires\n")
+            )
+        post.assert_not_called()
+        assert result.model_used == HEURISTIC_MODEL
+        assert result.error is None
+
+    async def test_disabled(self):
+        analyzer = ContentAnalyzer(heuristics=False)
+        with patch.object(analyzer, "_request_analysis") as request:
+            await analyzer.analyze_changes("https://example.com", "", "", _diff("42 vues\n", "43 vues\n"))
+        request.assert_called_once()
@@ -207,6 +207,19 @@ class TestReports:
         notified_report = next(r for r in reports if r["id"] == report["id"])
         assert notified_report["notified"] is True
 
+    def test_pending_reports_backfilled(self, db_with_temp_dir):
+        """Test listing reports awaiting analysis and completing them"""
+        db = db_with_temp_dir
+        first = db.create_report("watch-1", True, "hash1", analysis_pending=True)
+        db.create_report("watch-1", True, "hash2", ai_summary="Done")
+        second = db.create_report("watch-2", True, "hash3", analysis_pending=True)
+
+        assert [r["id"] for r in db.get_pending_reports()] == [first["id"], second["id"]]
+
+        assert db.update_report(first["id"], ai_summary="Prix baissé", analysis_pending=False) is True
+        assert [r["id"] for r in db.get_pending_reports()] == [second["id"]]
+        assert db.get_report(first["id"])["ai_summary"] == "Prix baissé"
+
     def test_mark_report_notified_not_found(self, db_with_temp_dir):
         """Test marking non-existent report as notified"""
         db = db_with_temp_dir
@@ -0,0 +1,128 @@
+"""Tests for the analyzer's LLM request dispatcher"""
+
+import asyncio
+import sys
+import time
+from datetime import UTC, datetime, timedelta
+from email.utils import format_datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+sys.path.insert(0, "/opt/claude-ceo/workspace/arkwatch")
+
+from src.analyzer.analyzer import ContentAnalyzer
+from src.analyzer.dispatch import DeadlineExceeded, LLMDispatcher, TokenBucket, retry_after
+
+
+def _response(status: int, headers: dict | None = None) -> MagicMock:
+    response = MagicMock()
+    response.status_code = status
+    response.headers = httpx.Headers(headers or {})
+    response.json.return_value = {"choices": [{"message": {"content": '{"summary": "ok"}'}}]}
+    return response
+
+
+def _dispatcher(**kwargs) -> LLMDispatcher:
+    return LLMDispatcher("https://llm.example/v1/chat/completions", "key", **{"rate": 0, **kwargs})
+
+
+class TestRetryAfter:
+    def test_seconds_and_http_date(self):
+        assert retry_after(_response(429, {"Retry-After": "7"})) == 7
+        later = format_datetime(datetime.now(UTC) + timedelta(seconds=30), usegmt=True)
+        assert 25 < retry_after(_response(429, {"Retry-After": later})) <= 30
+        assert retry_after(_response(429)) is None
+        assert retry_after(_response(429, {"Retry-After": "soon"})) is None
+
+
+class TestTokenBucket:
+    def test_burst_then_paced(self):
+        bucket = TokenBucket(rate=10, burst=2)
+        waits = [bucket.reserve() for _ in range(4)]
+        assert waits[:2] == [0, 0]
+        assert waits[2] == pytest.approx(0.1, abs=0.01)
+        assert waits[3] == pytest.approx(0.2, abs=0.01)
+
+    def test_unlimited(self):
+        assert TokenBucket(rate=0).reserve() == 0
+
+
+@pytest.mark.asyncio
+class TestLLMDispatcher:
+    async def test_shared_client(self):
+        dispatcher = _dispatcher()
+        with patch("httpx.AsyncClient") as client_cls:
+            client_cls.return_value.post = AsyncMock(return_value=_response(200))
+            for _ in range(3):
+                await dispatcher.post({})
+        assert client_cls.call_count == 1
+        assert client_cls.return_value.post.await_count == 3
+
+    async def test_concurrency_cap(self):
+        dispatcher = _dispatcher(concurrency=2)
+        in_flight = peak = 0
+
+        async def slow_post(*args, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return _response(200)
+
+        with patch("httpx.AsyncClient") as client_cls:
+            client_cls.return_value.post = slow_post
+            await asyncio.gather(*(dispatcher.post({}) for _ in range(6)))
+        assert peak == 2
+
+    async def test_retry_after_honored(self):
+        dispatcher = _dispatcher()
+        with patch("httpx.AsyncClient") as client_cls:
+            client_cls.return_value.post = AsyncMock(
+                side_effect=[_response(429, {"Retry-After": "0.1"}), _response(200)]
+            )
+            start = time.monotonic()
+            response = await dispatcher.post({})
+        assert response.status_code == 200
+        assert time.monotonic() - start >= 0.1
+        assert dispatcher.throttled == 1
+
+    async def test_throttling_pauses_other_requests(self):
+        dispatcher = _dispatcher(concurrency=4)
+        starts = []
+        responses = [_response(429, {"Retry-After": "0.1"}), _response(200), _response(200)]
+
+        async def post(*args, **kwargs):
+            starts.append(time.monotonic())
+            return responses.pop(0)
+
+        with patch("httpx.AsyncClient") as client_cls:
+            client_cls.return_value.post = post
+            first = asyncio.create_task(dispatcher.post({}))
+            await asyncio.sleep(0.01)
+            await asyncio.gather(first, dispatcher.post({}))
+        # The second request waited out the pause the first one was told about
+        assert starts[1] - starts[0] >= 0.1
+
+    async def test_deadline(self):
+        dispatcher = _dispatcher(deadline=0.05)
+
+        async def hang(*args, **kwargs):
+            await asyncio.sleep(10)
+
+        with patch("httpx.AsyncClient") as client_cls:
+            client_cls.return_value.post = hang
+            with pytest.raises(DeadlineExceeded):
+                await dispatcher.post({})
+
+    async def test_analyzer_falls_back_past_deadline(self):
+        analyzer = ContentAnalyzer(dispatcher=_dispatcher(deadline=0.05))
+        with patch("httpx.AsyncClient") as client_cls:
+            client_cls.return_value.post = AsyncMock(return_value=_response(429, {"Retry-After": "60"}))
+            start = time.monotonic()
+            result = await analyzer.analyze_changes("https://example.com", "old", "new", "-old\n+new")
+        assert time.monotonic() - start < 1
+        assert result.summary == "Analyse non disponible"
+        assert "deadline" in result.error
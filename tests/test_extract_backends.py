@@ -0,0 +1,102 @@
+"""Conformance tests for the HTML extraction backends"""
+
+import json
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, "/opt/claude-ceo/workspace/arkwatch")
+
+from src.scraper.backends import BACKENDS, available_backends, extract_with, needs_reference, resolve_backend
+
+PAGES_DIR = Path(__file__).parent / "fixtures" / "pages"
+PAGES = sorted(PAGES_DIR.glob("*.html"))
+EXPECTED = json.loads((PAGES_DIR / "expected.json").read_text())
+FAST_BACKENDS = [name for name in BACKENDS if name != "bs4"]
+
+
+def _require(backend: str):
+    if backend not in available_backends():
+        pytest.skip(f"{backend} not installed")
+
+
+def _read(page: Path) -> str:
+    # newline="" keeps the page exactly as saved (no CRLF translation)
+    with open(page, encoding="utf-8", newline="") as f:
+        return f.read()
+
+
+class TestReference:
+    """The bs4 backend must keep producing the hashes stored for existing watches"""
+
+    @pytest.mark.parametrize("page", PAGES, ids=lambda p: p.name)
+    def test_reference_output_is_stable(self, page):
+        expected = EXPECTED[page.name]
+        result = extract_with(_read(page), "bs4")
+
+        assert result.content_hash == expected["content_hash"]
+        assert result.title == expected["title"]
+
+    def test_corpus_is_complete(self):
+        assert sorted(EXPECTED) == [page.name for page in PAGES]
+
+
+class TestConformance:
+    """Every backend must match the reference byte for byte"""
+
+    @pytest.mark.parametrize("backend", FAST_BACKENDS)
+    @pytest.mark.parametrize("page", PAGES, ids=lambda p: p.name)
+    def test_saved_pages(self, backend, page):
+        _require(backend)
+        html = _read(page)
+
+        assert BACKENDS[backend](html) == BACKENDS["bs4"](html) or needs_reference(html)
+        assert extract_with(html, backend) == extract_with(html, "bs4")
+
+    @pytest.mark.parametrize("backend", FAST_BACKENDS)
+    @pytest.mark.parametrize(
+        "html",
+        [
+            "<title>A</title>\r\n<p>line one\r\nline two</p>",
+            "<p>a<![CDATA[b]]>c</p>",
+            "<title>Deals <b>now</b></title><p>x</p>",
+            "<html><body><p>in</p></body></html><p>after</p>",
+            "<p>a<template>hidden<b>x</b></template>b<!-- comment -->c</p>",
+            "",
+            "<p>AT&T &copy2026 &notit;</p>",
+            "hello<html><body>world</body></html>",
+            "<p>a<textarea><b>x</b></textarea><iframe><p>y</p></iframe><xmp><i>z</i></xmp></p>",
+        ],
+        ids=[
+            "crlf",
+            "cdata",
+            "title-markup",
+            "after-html",
+            "template-comment",
+            "empty",
+            "bare-entities",
+            "before-html",
+            "raw-text",
+        ],
+    )
+    def test_divergent_inputs(self, backend, html):
+        _require(backend)
+        assert extract_with(html, backend) == extract_with(html, "bs4")
+
+
+class TestResolveBackend:
+    """Tests for backend selection"""
+
+    def test_auto_prefers_fastest_installed(self):
+        with patch("src.scraper.backends.available_backends", return_value=["lxml", "bs4"]):
+            assert resolve_backend("auto") == "lxml"
+
+    def test_missing_backend_falls_back_to_bs4(self):
+        with patch("src.scraper.backends.available_backends", return_value=["bs4"]):
+            assert resolve_backend("selectolax") == "bs4"
+
+    def test_unknown_backend_rejected(self):
+        with pytest.raises(ValueError):
+            resolve_backend("html5lib")
@@ -0,0 +1,172 @@
+"""Tests for cross-process JSON file locking and atomic commits"""
+
+import multiprocessing
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, "/opt/claude-ceo/workspace/arkwatch")
+
+from src.storage.jsonfile import (
+    VersionConflict,
+    commit_json,
+    file_lock,
+    read_json,
+    read_json_versioned,
+    update_json,
+    write_json,
+)
+
+PROCESSES = 4
+INCREMENTS = 25
+
+
+def _run_processes(target, *args):
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=target, args=args) for _ in range(PROCESSES)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(30)
+    assert all(p.exitcode == 0 for p in procs)
+
+
+def _increment_locked(path):
+    for _ in range(INCREMENTS):
+        with file_lock(path):
+            data = read_json(path, {"count": 0})
+            data["count"] += 1
+            write_json(path, data)
+
+
+def _increment_optimistic(path):
+    def bump(data):
+        return {"count": data["count"] + 1}, None
+
+    for _ in range(INCREMENTS):
+        update_json(path, bump, default={"count": 0})
+
+
+class TestAtomicWrite:
+    def test_round_trip_and_no_temp_files(self, tmp_path):
+        path = str(tmp_path / "data" / "store.json")
+        write_json(path, {"name": "Café"}, ensure_ascii=False)
+
+        assert read_json(path) == {"name": "Café"}
+        assert os.listdir(tmp_path / "data") == ["store.json"]
+
+    def test_keeps_permissions(self, tmp_path):
+        path = str(tmp_path / "store.json")
+        write_json(path, [])
+        os.chmod(path, 0o600)
+        write_json(path, [1])
+        assert os.stat(path).st_mode & 0o777 == 0o600
+
+    def test_failed_write_keeps_old_contents(self, tmp_path):
+        path = str(tmp_path / "store.json")
+        write_json(path, [1, 2])
+        with pytest.raises(TypeError):
+            write_json(path, [object()], default=None)
+        assert read_json(path) == [1, 2]
+        assert os.listdir(tmp_path) == ["store.json"]
+
+    def test_missing_file_returns_default(self, tmp_path):
+        assert read_json(str(tmp_path / "missing.json"), []) == []
+
+
+class TestLocking:
+    def test_lock_is_reentrant(self, tmp_path):
+        path = str(tmp_path / "store.json")
+        with file_lock(path):
+            with file_lock(path):
+                write_json(path, [])
+        assert read_json(path) == []
+
+    def test_locked_updates_from_processes_are_not_lost(self, tmp_path):
+        path = str(tmp_path / "counter.json")
+        _run_processes(_increment_locked, path)
+        assert read_json(path)["count"] == PROCESSES * INCREMENTS
+
+    def test_optimistic_updates_from_processes_are_not_lost(self, tmp_path):
+        path = str(tmp_path / "counter.json")
+        _run_processes(_increment_optimistic, path)
+        assert read_json(path)["count"] == PROCESSES * INCREMENTS
+
+
+class TestVersioning:
+    def test_commit_rejects_stale_version(self, tmp_path):
+        path = str(tmp_path / "store.json")
+        write_json(path, {"v": 1})
+        data, version = read_json_versioned(path)
+
+        write_json(path, {"v": 2})  # another writer got there first
+        with pytest.raises(VersionConflict):
+            commit_json(path, {"v": 3}, version)
+        assert read_json(path) == {"v": 2}
+
+    def test_commit_creates_missing_file(self, tmp_path):
+        path = str(tmp_path / "store.json")
+        data, version = read_json_versioned(path, [])
+        assert version is None
+        commit_json(path, data + [1], version)
+        assert read_json(path) == [1]
+
+    def test_update_retries_on_conflict(self, tmp_path):
+        path = str(tmp_path / "store.json")
+        write_json(path, [])
+        calls = []
+
+        def append(data):
+            calls.append(list(data))
+            if len(calls) == 1:
+                write_json(path, ["other"])  # concurrent commit after our read
+            return data + ["mine"], len(data)
+
+        assert update_json(path, append) == 1
+        assert read_json(path) == ["other", "mine"]
+        assert calls == [[], ["other"]]
+
+    def test_update_skips_write_when_nothing_changed(self, tmp_path):
+        path = str(tmp_path / "store.json")
+        write_json(path, [1])
+        before = os.stat(path).st_mtime_ns
+        assert update_json(path, lambda data: (None, "unchanged")) == "unchanged"
+        assert os.stat(path).st_mtime_ns == before
+
+
+def _update_watch_field(watch_id, field):
+    from src.storage.database import Database
+
+    db = Database()
+    for i in range(INCREMENTS):
+        db.update_watch(watch_id, **{field: i})
+
+
+class TestDatabaseConcurrency:
+    def test_concurrent_watch_updates_are_merged(self, tmp_path):
+        """Processes updating different fields of one watch don't overwrite each other"""
+        data_dir = str(tmp_path / "data")
+        with (
+            patch("src.storage.database.DATA_DIR", data_dir),
+            patch("src.storage.database.WATCHES_FILE", f"{data_dir}/watches.json"),
+            patch("src.storage.database.REPORTS_FILE", f"{data_dir}/reports.json"),
+        ):
+            from src.storage.database import Database
+
+            db = Database()
+            watch = db.create_watch(name="Shared", url="https://example.com")
+
+            ctx = multiprocessing.get_context("fork")
+            procs = [
+                ctx.Process(target=_update_watch_field, args=(watch["id"], f"field_{n}")) for n in range(PROCESSES)
+            ]
+            for p in procs:
+                p.start()
+            for p in procs:
+                p.join(30)
+            assert all(p.exitcode == 0 for p in procs)
+
+            stored = db.get_watch(watch["id"])
+            assert all(stored[f"field_{n}"] == INCREMENTS - 1 for n in range(PROCESSES))
@@ -0,0 +1,112 @@
+"""Tests for the report log index and paginated report queries"""
+
+import json
+import sys
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, "/opt/claude-ceo/workspace/arkwatch")
+
+from src.storage.report_index import ReportIndex
+from src.storage.report_log import ReportLog
+
+
+def _report(report_id, created_at, watch_id="w1"):
+    return {"id": report_id, "watch_id": watch_id, "notified": False, "created_at": created_at}
+
+
+@pytest.fixture
+def log(tmp_path):
+    log = ReportLog(str(tmp_path / "reports.json"), granularity="day")
+    log.ensure()
+    # r0..r9 over two days, alternating watches w0/w1
+    for i in range(10):
+        log.append(_report(f"r{i}", f"2026-10-{16 + i // 5}T0{i % 5}:00:00", watch_id=f"w{i % 2}"))
+    return log
+
+
+def _ids(reports):
+    return [r["id"] for r in reports]
+
+
+class TestQuery:
+    def test_newest_first_with_limit(self, log):
+        assert _ids(ReportIndex(log).query(limit=3)) == ["r9", "r8", "r7"]
+
+    def test_filters_by_watch(self, log):
+        index = ReportIndex(log)
+        assert _ids(index.query(["w0"], limit=None)) == ["r8", "r6", "r4", "r2", "r0"]
+        assert _ids(index.query(["w0", "w1"], limit=4)) == ["r9", "r8", "r7", "r6"]
+        assert index.query([], limit=10) == []
+        assert index.query(["unknown"], limit=10) == []
+
+    def test_after_and_before(self, log):
+        index = ReportIndex(log)
+        r7 = ("2026-10-17T02:00:00", "r7")
+        assert _ids(index.query(after=r7, limit=3)) == ["r6", "r5", "r4"]
+        assert _ids(index.query(before=r7, limit=1)) == ["r8"]
+        assert _ids(index.query(["w1"], before=("2026-10-16T00:00:00", "r0"), limit=2)) == ["r3", "r1"]
+
+    def test_pages_cover_everything_once(self, log):
+        index = ReportIndex(log)
+        seen, after = [], None
+        while page := index.query(["w0", "w1"], after=after, limit=3):
+            seen += _ids(page)
+            after = (page[-1]["created_at"], page[-1]["id"])
+        assert seen == [f"r{i}" for i in range(9, -1, -1)]
+
+    def test_get_by_id_applies_patches(self, log):
+        index = ReportIndex(log)
+        log.patch("r3", {"notified": True})
+        assert index.get("r3")["notified"] is True
+        assert index.get("r4")["notified"] is False
+        assert index.get("missing") is None
+
+
+class TestRefresh:
+    def test_reads_only_appended_bytes(self, log):
+        index = ReportIndex(log)
+        index.refresh()
+        log.append(_report("r10", "2026-10-17T09:00:00"))
+
+        with patch.object(index, "_ingest", wraps=index._ingest) as ingest:
+            assert _ids(index.query(limit=1)) == ["r10"]
+        (key, start), _ = ingest.call_args
+        assert key == "2026-10-17" and start > 0
+
+    def test_rebuilds_after_rewrite_and_drop(self, log):
+        index = ReportIndex(log)
+        index.refresh()
+        log.remove(lambda r: r["id"] == "r8")
+        assert "r8" not in _ids(index.query(limit=None))
+        assert index.get("r8") is None
+
+        log.drop_before("2026-10-16T23:59:59")
+        assert _ids(index.query(limit=None)) == ["r9", "r7", "r6", "r5"]
+
+    def test_report_rewritten_between_refresh_and_read(self, log):
+        index = ReportIndex(log)
+        index.refresh()
+        real_refresh = index.refresh
+        calls = []
+
+        def refresh_then_rewrite():
+            real_refresh()
+            if not calls:
+                log.remove(lambda r: r["id"] == "r5")  # new inode after the index was refreshed
+            calls.append(1)
+
+        with patch.object(index, "refresh", refresh_then_rewrite):
+            assert _ids(index.query(limit=2)) == ["r9", "r8"]
+        assert len(calls) == 2
+
+    def test_glued_line_is_skipped(self, log, tmp_path):
+        index = ReportIndex(log)
+        index.refresh()
+        with open(tmp_path / "reports" / "2026-10-17.jsonl", "a") as f:
+            f.write('{"id": "r10", "wat' + json.dumps(_report("r11", "2026-10-17T08:00:00")) + "\n")
+        log.append(_report("r12", "2026-10-17T09:00:00"))
+
+        assert _ids(index.query(limit=2)) == ["r12", "r9"]
+        assert index.get("r11") is None
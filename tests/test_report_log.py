@@ -0,0 +1,172 @@
+"""Tests for the segmented append-only report log"""
+
+import json
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, "/opt/claude-ceo/workspace/arkwatch")
+
+from src.storage.report_log import ReportLog, segment_key
+
+
+def _report(report_id, created_at, watch_id="watch-1"):
+    return {"id": report_id, "watch_id": watch_id, "notified": False, "created_at": created_at}
+
+
+@pytest.fixture
+def log(tmp_path):
+    log = ReportLog(str(tmp_path / "reports.json"), granularity="day")
+    log.ensure()
+    return log
+
+
+class TestSegments:
+    def test_segment_key(self):
+        assert segment_key("2026-10-17T08:30:00", "day") == "2026-10-17"
+        assert segment_key("2026-10-17T08:30:00", "month") == "2026-10"
+        with pytest.raises(ValueError):
+            segment_key("2026-10-17T08:30:00", "week")
+
+    def test_append_goes_to_its_segment(self, log, tmp_path):
+        log.append(_report("a", "2026-10-16T23:59:00"))
+        log.append(_report("b", "2026-10-17T00:01:00"))
+        log.append(_report("c", "2026-10-17T09:00:00"))
+
+        assert log.segments() == ["2026-10-16", "2026-10-17"]
+        lines = (tmp_path / "reports" / "2026-10-17.jsonl").read_text().splitlines()
+        assert [json.loads(line)["id"] for line in lines] == ["b", "c"]
+
+    def test_reports_newest_first(self, log):
+        log.append(_report("a", "2026-10-16T10:00:00"))
+        log.append(_report("c", "2026-10-17T09:00:00"))
+        log.append(_report("b", "2026-10-17T08:00:00"))
+        assert [r["id"] for r in log.reports()] == ["c", "b", "a"]
+
+    def test_partial_last_line_is_ignored(self, log, tmp_path):
+        log.append(_report("a", "2026-10-17T08:00:00"))
+        with open(tmp_path / "reports" / "2026-10-17.jsonl", "a") as f:
+            f.write('{"id": "b", "watch')
+        assert [r["id"] for r in log.reports()] == ["a"]
+
+    def test_append_after_crash_drops_partial_line(self, log, tmp_path):
+        log.append(_report("a", "2026-10-17T08:00:00"))
+        segment = tmp_path / "reports" / "2026-10-17.jsonl"
+        with open(segment, "a") as f:
+            f.write('{"id": "b", "watch')  # process killed mid-append
+        log.append(_report("c", "2026-10-17T09:00:00"))
+
+        assert [json.loads(line)["id"] for line in segment.read_text().splitlines()] == ["a", "c"]
+        assert [r["id"] for r in log.reports()] == ["c", "a"]
+
+    def test_glued_line_is_skipped(self, log, tmp_path):
+        # Written before appends dropped partial lines: the next report was glued onto one
+        log.append(_report("a", "2026-10-17T08:00:00"))
+        with open(tmp_path / "reports" / "2026-10-17.jsonl", "a") as f:
+            f.write('{"id": "b", "wat' + json.dumps(_report("c", "2026-10-17T09:00:00")) + "\n")
+        log.append(_report("d", "2026-10-17T10:00:00"))
+
+        assert [r["id"] for r in log.reports()] == ["d", "a"]
+
+
+class TestUpdates:
+    def test_patch_appends_and_folds(self, log, tmp_path):
+        log.append(_report("a", "2026-10-17T08:00:00"))
+        assert log.patch("a", {"notified": True}) is True
+        assert log.patch("missing", {"notified": True}) is False
+
+        assert next(log.reports())["notified"] is True
+        assert len((tmp_path / "reports" / "2026-10-17.jsonl").read_text().splitlines()) == 2
+
+    def test_remove_rewrites_only_matching(self, log):
+        log.append(_report("a", "2026-10-16T08:00:00", watch_id="mine"))
+        log.append(_report("b", "2026-10-17T08:00:00", watch_id="other"))
+        log.append(_report("c", "2026-10-17T09:00:00", watch_id="mine"))
+        log.patch("c", {"notified": True})
+
+        assert log.remove(lambda r: r["watch_id"] == "mine") == 2
+        assert [r["id"] for r in log.reports()] == ["b"]
+        # The emptied segment is gone from disk and from the index
+        assert log.segments() == ["2026-10-17"]
+
+
+class TestRetention:
+    def test_drop_before_unlinks_old_segments(self, log, tmp_path):
+        log.append(_report("old1", "2025-10-01T08:00:00"))
+        log.append(_report("old2", "2025-10-01T09:00:00"))
+        log.patch("old2", {"notified": True})
+        log.append(_report("edge-old", "2025-10-02T08:00:00"))
+        log.append(_report("edge-new", "2025-10-02T20:00:00"))
+        log.append(_report("new", "2026-10-17T08:00:00"))
+
+        with patch.object(log, "read_segment", wraps=log.read_segment) as read_segment:
+            assert log.drop_before("2025-10-02T12:00:00") == 3
+        # Only the segment the cutoff falls in is parsed
+        assert [c.args[0] for c in read_segment.call_args_list] == ["2025-10-02"]
+
+        assert not (tmp_path / "reports" / "2025-10-01.jsonl").exists()
+        assert log.segments() == ["2025-10-02", "2026-10-17"]
+        assert [r["id"] for r in log.reports()] == ["new", "edge-new"]
+
+    def test_drop_before_with_nothing_expired(self, log):
+        log.append(_report("a", "2026-10-17T08:00:00"))
+        assert log.drop_before("2025-01-01T00:00:00") == 0
+        assert log.segments() == ["2026-10-17"]
+
+
+class TestLegacyMigration:
+    def test_list_file_is_readable_then_split(self, tmp_path):
+        index = tmp_path / "reports.json"
+        legacy = [_report("a", "2026-10-16T08:00:00"), _report("b", "2026-10-17T08:00:00")]
+        index.write_text(json.dumps(legacy))
+        log = ReportLog(str(index), granularity="month")
+
+        assert [r["id"] for r in log.reports()] == ["b", "a"]
+
+        log.ensure()
+        assert json.loads(index.read_text()) == {"segments": ["2026-10"]}
+        assert os.listdir(tmp_path / "reports") == ["2026-10.jsonl"]
+        assert [r["id"] for r in log.reports()] == ["b", "a"]
+
+        log.ensure()  # idempotent
+        assert [r["id"] for r in log.reports()] == ["b", "a"]
+
+
+class TestDatabaseReports:
+    @pytest.fixture
+    def db(self, tmp_path):
+        data_dir = str(tmp_path / "data")
+        with (
+            patch("src.storage.database.DATA_DIR", data_dir),
+            patch("src.storage.database.WATCHES_FILE", f"{data_dir}/watches.json"),
+            patch("src.storage.database.REPORTS_FILE", f"{data_dir}/reports.json"),
+        ):
+            from src.storage.database import Database
+
+            yield Database()
+
+    def test_create_report_appends_without_rewriting(self, db, tmp_path):
+        db.create_report("watch-1", False, "hash1")
+        index = tmp_path / "data" / "reports.json"
+        before = os.stat(index).st_ino
+
+        db.create_report("watch-1", False, "hash2")
+        assert os.stat(index).st_ino == before
+        assert len(db.get_reports()) == 2
+
+    def test_delete_user_data_erases_reports(self, db):
+        mine = db.create_watch(name="Mine", url="https://example.com")
+        db.update_watch(mine["id"], user_email="me@example.com")
+        db.create_report(mine["id"], True, "h1")
+        db.create_report("other-watch", False, "h2")
+
+        assert db.delete_user_data("me@example.com") == {"watches_deleted": 1, "reports_deleted": 1}
+        assert [r["watch_id"] for r in db.get_reports()] == ["other-watch"]
+
+    def test_purge_reports_before(self, db):
+        old = db.create_report("watch-1", False, "hash1")
+        db.create_report("watch-1", False, "hash2")
+        assert db.purge_reports_before(old["created_at"]) == 1
+        assert [r["current_hash"] for r in db.get_reports()] == ["hash2"]
@@ -157,3 +157,56 @@ class TestGetReport:
 
         resp = client.get(f"/api/v1/reports?watch_id={watch_id}", headers={"X-API-Key": key2})
         assert resp.status_code == 403
+
+
+def _seed_reports(email, count):
+    """Create a watch owned by email with count reports, without going through the API."""
+    from src.storage import get_db
+
+    db = get_db()
+    watch = db.create_watch(name="Seeded", url="https://example.com")
+    db.update_watch(watch["id"], user_email=email)
+    return watch["id"], [db.create_report(watch["id"], False, f"hash{i}")["id"] for i in range(count)]
+
+
+class TestPagination:
+    def test_cursor_walks_all_pages(self, client):
+        api_key = _create_verified_user(client, "pager@example.com")
+        _, report_ids = _seed_reports("pager@example.com", 5)
+        _seed_reports("someone-else@example.com", 3)
+
+        seen, params = [], {"limit": 2}
+        while True:
+            resp = client.get("/api/v1/reports", params=params, headers={"X-API-Key": api_key})
+            assert resp.status_code == 200
+            seen += [r["id"] for r in resp.json()]
+            if "X-Next-Cursor" not in resp.headers:
+                break
+            params = {"limit": 2, "after": resp.headers["X-Next-Cursor"]}
+
+        assert seen == report_ids[::-1]
+
+    def test_before_cursor_polls_new_reports(self, client):
+        api_key = _create_verified_user(client, "poller@example.com")
+        watch_id, _ = _seed_reports("poller@example.com", 2)
+        resp = client.get("/api/v1/reports", headers={"X-API-Key": api_key})
+        newest = resp.headers["X-Prev-Cursor"]
+
+        from src.storage import get_db
+
+        fresh = get_db().create_report(watch_id, True, "hash-new")
+        resp = client.get("/api/v1/reports", params={"before": newest}, headers={"X-API-Key": api_key})
+        assert [r["id"] for r in resp.json()] == [fresh["id"]]
+
+    def test_invalid_cursor(self, client):
+        api_key = _create_verified_user(client, "badcursor@example.com")
+        resp = client.get("/api/v1/reports", params={"after": "%%%"}, headers={"X-API-Key": api_key})
+        assert resp.status_code == 400
+
+    def test_get_report_by_id_checks_owner(self, client):
+        owner_key = _create_verified_user(client, "idowner@example.com")
+        other_key = _create_verified_user(client, "idother@example.com")
+        _, (report_id,) = _seed_reports("idowner@example.com", 1)
+
+        assert client.get(f"/api/v1/reports/{report_id}", headers={"X-API-Key": owner_key}).status_code == 200
+        assert client.get(f"/api/v1/reports/{report_id}", headers={"X-API-Key": other_key}).status_code == 403
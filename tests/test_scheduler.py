@@ -0,0 +1,142 @@
+"""Tests for the due-time watch scheduler"""
+
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, "/opt/claude-ceo/workspace/arkwatch")
+
+from src.scheduler import WatchScheduler, adaptive_interval, next_check_at
+
+NOW = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def _watch(watch_id: str, last_check_ago: int | None, interval: int = 60) -> dict:
+    last_check = None if last_check_ago is None else (NOW - timedelta(seconds=last_check_ago)).isoformat()
+    return {
+        "id": watch_id,
+        "url": f"https://{watch_id}.example",
+        "check_interval": interval,
+        "last_check": last_check,
+        "created_at": (NOW - timedelta(days=1)).isoformat(),
+    }
+
+
+class TestNextCheckAt:
+    def test_from_last_check(self):
+        assert next_check_at(_watch("a", 30, interval=60)) == NOW + timedelta(seconds=30)
+
+    def test_never_checked_is_due_since_creation(self):
+        assert next_check_at(_watch("a", None)) == NOW - timedelta(days=1)
+
+
+class TestWatchScheduler:
+    def test_pop_due_in_lateness_order_with_lag(self):
+        scheduler = WatchScheduler()
+        scheduler.sync([_watch("slightly-late", 70), _watch("not-due", 10), _watch("very-late", 600)])
+
+        due = scheduler.pop_due(NOW)
+
+        assert [d.watch["id"] for d in due] == ["very-late", "slightly-late"]
+        assert [d.lag for d in due] == [540.0, 10.0]
+        assert len(scheduler) == 1
+
+    def test_seconds_until_next(self):
+        scheduler = WatchScheduler()
+        assert scheduler.seconds_until_next(NOW) is None
+
+        scheduler.sync([_watch("a", 40, interval=60), _watch("b", 10, interval=60)])
+        assert scheduler.seconds_until_next(NOW) == 20.0
+
+    def test_reschedule_skips_stale_entries(self):
+        scheduler = WatchScheduler()
+        watch = _watch("a", 600)
+        scheduler.sync([watch])
+
+        scheduler.schedule(watch, NOW + timedelta(seconds=30))
+
+        assert scheduler.pop_due(NOW) == []
+        assert [d.watch["id"] for d in scheduler.pop_due(NOW + timedelta(seconds=30))] == ["a"]
+
+    def test_rescheduled_set_when_earliest_moves_earlier(self):
+        scheduler = WatchScheduler()
+        scheduler.sync([_watch("a", 0), _watch("b", 0)])
+        scheduler.rescheduled.clear()
+
+        scheduler.schedule(_watch("a", 0), NOW + timedelta(seconds=120))
+        assert not scheduler.rescheduled.is_set()
+
+        scheduler.schedule(_watch("b", 0), NOW + timedelta(seconds=5))
+        assert scheduler.rescheduled.is_set()
+
+    def test_sync_removes_deleted_watches(self):
+        scheduler = WatchScheduler()
+        scheduler.sync([_watch("a", 600), _watch("b", 600)])
+
+        scheduler.sync([_watch("b", 600)])
+
+        assert [d.watch["id"] for d in scheduler.pop_due(NOW)] == ["b"]
+
+    def test_in_flight_watches_not_redispatched_until_complete(self):
+        scheduler = WatchScheduler()
+        watch = _watch("a", 600)
+        scheduler.sync([watch])
+        assert len(scheduler.pop_due(NOW)) == 1
+
+        # Storage still shows the old last_check while the check is running
+        scheduler.sync([watch])
+        assert scheduler.pop_due(NOW) == []
+
+        scheduler.complete(watch, NOW + timedelta(seconds=60))
+        assert scheduler.pop_due(NOW) == []
+        assert len(scheduler.pop_due(NOW + timedelta(seconds=60))) == 1
+
+    def test_sync_keeps_completed_schedule_when_record_unchanged(self):
+        scheduler = WatchScheduler()
+        watch = {**_watch("a", 600), "updated_at": "v1"}
+        scheduler.sync([watch])
+        scheduler.pop_due(NOW)
+
+        # Check failed without writing back: storage still says it is overdue
+        scheduler.complete(watch, NOW + timedelta(seconds=60))
+        scheduler.sync([watch])
+        assert scheduler.pop_due(NOW) == []
+
+        # Record edited through the API: due time is recomputed from storage
+        scheduler.sync([{**watch, "updated_at": "v2"}])
+        assert len(scheduler.pop_due(NOW)) == 1
+
+
+def _reports(changes: list[bool], every: int = 3600) -> list[dict]:
+    """Reports newest first, one per `every` seconds, changes[0] being the newest."""
+    return [
+        {"changes_detected": changed, "created_at": (NOW - timedelta(seconds=i * every)).isoformat()}
+        for i, changed in enumerate(changes)
+    ]
+
+
+class TestAdaptiveInterval:
+    WATCH = {"check_interval": 3600, "adaptive_interval": True, "max_check_interval": 86400}
+
+    def test_stable_page_backs_off_gradually(self):
+        reports = _reports([False] * 50)
+        assert adaptive_interval({**self.WATCH, "effective_interval": 3600}, reports) == 7200
+        assert adaptive_interval({**self.WATCH, "effective_interval": 7200}, reports) == 14400
+        # Estimate caps growth: 50 quiet hours -> a change every ~50h, checked 4 times per change
+        assert adaptive_interval({**self.WATCH, "effective_interval": 28800}, reports) == 45000
+
+    def test_capped_by_tier_ceiling(self):
+        reports = _reports([False] * 50, every=86400)
+        assert adaptive_interval({**self.WATCH, "effective_interval": 80000}, reports) == 86400
+
+    def test_frequently_changing_page_stays_at_check_interval(self):
+        reports = _reports([False, True] * 25)
+        assert adaptive_interval({**self.WATCH, "effective_interval": 3600}, reports) == 3600
+
+    def test_snaps_back_after_change(self):
+        reports = _reports([True] + [False] * 49)
+        assert adaptive_interval({**self.WATCH, "effective_interval": 86400}, reports) == 3600
+
+    def test_next_check_uses_effective_interval_only_when_adaptive(self):
+        watch = {**_watch("a", 0, interval=60), "effective_interval": 600}
+        assert next_check_at(watch) == NOW + timedelta(seconds=60)
+        assert next_check_at({**watch, "adaptive_interval": True}) == NOW + timedelta(seconds=600)
@@ -1,15 +1,22 @@
 """Tests for the web scraper module"""
 
+import asyncio
 import hashlib
+import socket
 import sys
+import threading
 from datetime import datetime
+from http.server import BaseHTTPRequestHandler, HTTPServer
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
 import pytest
 
 sys.path.insert(0, "/opt/claude-ceo/workspace/arkwatch")
 
-from src.scraper.scraper import ScrapeResult, WebScraper
+from src.scraper.extract import ExtractionPool, extract
+from src.scraper.resolver import CachingResolver
+from src.scraper.scraper import ScrapeResult, WebScraper, _vet_addresses, is_safe_url
 
 
 class TestScrapeResult:
@@ -129,13 +136,12 @@ class TestScraperAsync:
         """Test successful scrape with mocked response"""
         scraper = WebScraper()
 
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.text = sample_html_content
+        mock_response = httpx.Response(200, html=sample_html_content)
 
         with patch("httpx.AsyncClient") as mock_client:
             mock_instance = AsyncMock()
-            mock_instance.get = AsyncMock(return_value=mock_response)
+            mock_instance.build_request = MagicMock()
+            mock_instance.send = AsyncMock(return_value=mock_response)
             mock_instance.__aenter__ = AsyncMock(return_value=mock_instance)
             mock_instance.__aexit__ = AsyncMock(return_value=None)
             mock_client.return_value = mock_instance
@@ -155,11 +161,12 @@ class TestScraperAsync:
         scraper = WebScraper()
 
         with (
-            patch("src.scraper.scraper._is_safe_url", return_value=(True, "", "93.184.216.34")),
+            patch("src.scraper.scraper.is_safe_url", AsyncMock(return_value=(True, "", "93.184.216.34"))),
             patch("httpx.AsyncClient") as mock_client,
         ):
             mock_instance = AsyncMock()
-            mock_instance.get = AsyncMock(side_effect=Exception("Connection failed"))
+            mock_instance.build_request = MagicMock()
+            mock_instance.send = AsyncMock(side_effect=Exception("Connection failed"))
             mock_instance.__aenter__ = AsyncMock(return_value=mock_instance)
             mock_instance.__aexit__ = AsyncMock(return_value=None)
             mock_client.return_value = mock_instance
@@ -169,3 +176,355 @@ class TestScraperAsync:
             assert result.status_code == 0
             assert result.error is not None
             assert "Connection failed" in result.error
+            assert result.unreachable is False
+
+    async def test_transport_error_marks_host_unreachable(self):
+        scraper = WebScraper()
+
+        with (
+            patch("src.scraper.scraper.is_safe_url", AsyncMock(return_value=(True, "", "93.184.216.34"))),
+            patch("httpx.AsyncClient") as mock_client,
+        ):
+            mock_instance = AsyncMock()
+            mock_instance.build_request = MagicMock()
+            mock_instance.send = AsyncMock(side_effect=httpx.ConnectTimeout(""))
+            mock_client.return_value = mock_instance
+
+            result = await scraper.scrape("https://down.example")
+
+            assert result.unreachable is True
+            assert result.error == "ConnectTimeout"
+
+
+@pytest.mark.asyncio
+class TestPooledClient:
+    """Tests for the shared pooled httpx client"""
+
+    async def test_client_reused_across_scrapes(self, sample_html_content):
+        """Test that one AsyncClient serves every scrape until aclose()"""
+        with (
+            patch("src.scraper.scraper.is_safe_url", AsyncMock(return_value=(True, "", "93.184.216.34"))),
+            patch("httpx.AsyncClient") as mock_client,
+        ):
+            mock_instance = AsyncMock()
+            mock_instance.build_request = MagicMock()
+            mock_instance.send = AsyncMock(side_effect=lambda *a, **kw: httpx.Response(200, html=sample_html_content))
+            mock_client.return_value = mock_instance
+
+            async with WebScraper(max_connections=5) as scraper:
+                await scraper.scrape("https://example.com/a")
+                await scraper.scrape("https://example.com/b", timeout=5)
+
+            assert mock_client.call_count == 1
+            assert mock_client.call_args.kwargs["limits"].max_connections == 5
+            assert mock_instance.build_request.call_args.kwargs["timeout"] == 5
+            mock_instance.aclose.assert_awaited_once()
+
+    async def test_http2_falls_back_without_h2(self):
+        """Test that requesting HTTP/2 without the h2 package degrades to HTTP/1.1"""
+        with patch("src.scraper.scraper._http2_available", return_value=False):
+            scraper = WebScraper(http2=True)
+        assert scraper.http2 is False
+
+    async def test_connected_ip_verified_on_pooled_connection(self):
+        """Test the post-connection SSRF hook rejects a loopback peer on every request"""
+        server = HTTPServer(("127.0.0.1", 0), BaseHTTPRequestHandler)
+        threading.Thread(target=server.handle_request, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_port}/"
+
+        try:
+            with patch("src.scraper.scraper.is_safe_url", AsyncMock(return_value=(True, "", "127.0.0.1"))):
+                async with WebScraper(timeout=5) as scraper:
+                    result = await scraper.scrape(url)
+        finally:
+            server.server_close()
+
+        assert result.error is not None
+        assert "SSRF blocked" in result.error
+
+
+@pytest.mark.asyncio
+class TestConditionalFetch:
+    """Tests for ETag / Last-Modified conditional requests"""
+
+    async def _scrape(self, response, **validators):
+        with (
+            patch("src.scraper.scraper.is_safe_url", AsyncMock(return_value=(True, "", "93.184.216.34"))),
+            patch("httpx.AsyncClient") as mock_client,
+        ):
+            mock_instance = AsyncMock()
+            mock_instance.build_request = MagicMock()
+            mock_instance.send = AsyncMock(return_value=response)
+            mock_client.return_value = mock_instance
+            result = await WebScraper().scrape("https://example.com", **validators)
+        return result, mock_instance.build_request.call_args.kwargs["headers"]
+
+    async def test_validators_captured_and_sent(self, sample_html_content):
+        """Test that response validators are returned and sent back as conditional headers"""
+        response = httpx.Response(
+            200,
+            html=sample_html_content,
+            headers={"etag": '"v1"', "last-modified": "Wed, 01 Jan 2025 00:00:00 GMT"},
+        )
+
+        result, headers = await self._scrape(response)
+        assert (result.etag, result.last_modified) == ('"v1"', "Wed, 01 Jan 2025 00:00:00 GMT")
+        assert "If-None-Match" not in headers
+
+        _, headers = await self._scrape(response, etag=result.etag, last_modified=result.last_modified)
+        assert headers["If-None-Match"] == '"v1"'
+        assert headers["If-Modified-Since"] == "Wed, 01 Jan 2025 00:00:00 GMT"
+
+    async def test_304_short_circuits(self):
+        """Test that a 304 returns not_modified without parsing and keeps the sent validators"""
+        response = httpx.Response(304)
+
+        result, _ = await self._scrape(response, etag='"v1"')
+
+        assert result.not_modified is True
+        assert result.error is None
+        assert result.etag == '"v1"'
+
+
+async def _aiter(chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+@pytest.mark.asyncio
+class TestStreamedBody:
+    """Tests for bounded, streamed response bodies"""
+
+    async def _scrape(self, response, scraper=None, **kwargs):
+        with (
+            patch("src.scraper.scraper.is_safe_url", AsyncMock(return_value=(True, "", "93.184.216.34"))),
+            patch("httpx.AsyncClient") as mock_client,
+        ):
+            mock_instance = AsyncMock()
+            mock_instance.build_request = MagicMock()
+            mock_instance.send = AsyncMock(return_value=response)
+            mock_client.return_value = mock_instance
+            return await (scraper or WebScraper()).scrape("https://example.com", **kwargs)
+
+    async def test_endless_stream_is_cut_off(self):
+        """Test that a body without Content-Length stops being read at the cap"""
+        chunks_read = 0
+
+        async def endless():
+            nonlocal chunks_read
+            while True:
+                chunks_read += 1
+                yield b"<p>" + b"x" * 1020 + b"</p>"
+
+        result = await self._scrape(httpx.Response(200, content=endless()), WebScraper(max_body_bytes=10_000))
+
+        assert result.too_large is True
+        assert result.error is not None
+        assert chunks_read == 10
+
+    async def test_declared_length_over_cap_is_not_read(self):
+        """Test that an oversized Content-Length is rejected before reading the body"""
+        response = httpx.Response(200, headers={"content-length": "999999999"}, content=_aiter([b"never read"]))
+
+        result = await self._scrape(response, WebScraper(max_body_bytes=1000))
+
+        assert result.too_large is True
+
+    async def test_disallowed_content_type(self):
+        """Test that binary content types are refused without extracting text"""
+        response = httpx.Response(200, content=b"%PDF-1.7", headers={"content-type": "application/pdf"})
+
+        result = await self._scrape(response)
+
+        assert result.too_large is False
+        assert "Unsupported content type" in result.error
+
+    async def test_json_endpoint_allowed(self):
+        """Test that JSON status and API endpoints are still scraped"""
+        response = httpx.Response(200, json={"status": "operational"})
+
+        result = await self._scrape(response)
+
+        assert result.error is None
+        assert "operational" in result.text_content
+
+    async def test_charset_decoded_across_chunk_boundaries(self):
+        """Test incremental decoding of multi-byte characters split between chunks"""
+        body = "<title>Café €</title><p>Prix : 10 €</p>".encode()
+        chunks = [body[i : i + 3] for i in range(0, len(body), 3)]
+        response = httpx.Response(200, content=_aiter(chunks), headers={"content-type": "text/html; charset=utf-8"})
+
+        result = await self._scrape(response)
+
+        assert result.title == "Café €"
+        assert result.text_content == "Café €\nPrix : 10 €"
+        assert result.body_hash == hashlib.sha256(body).hexdigest()[:16]
+
+    async def test_same_body_hash_skips_extraction(self, sample_html_content):
+        """Test that a byte-identical body is reported as not modified without parsing"""
+        first = await self._scrape(httpx.Response(200, html=sample_html_content))
+        scraper = WebScraper()
+        scraper.extractor.run = AsyncMock()
+
+        again = await self._scrape(httpx.Response(200, html=sample_html_content), scraper, body_hash=first.body_hash)
+
+        assert again.not_modified is True
+        scraper.extractor.run.assert_not_called()
+
+
+@pytest.mark.asyncio
+class TestExtractionPool:
+    """Tests for off-loop HTML extraction"""
+
+    def test_extract_strips_chrome(self, sample_html_content):
+        """Test that the pure extract function drops nav/footer/script and hashes the text"""
+        extracted = extract(sample_html_content)
+
+        assert extracted.title == "Test Page"
+        assert type(extracted.title) is str
+        assert "Main Content" in extracted.text_content
+        assert "Navigation" not in extracted.text_content
+        assert "console.log" not in extracted.text_content
+        assert extracted.content_hash == hashlib.sha256(extracted.text_content.encode()).hexdigest()[:16]
+
+    async def test_large_pages_use_process_pool(self, sample_html_content):
+        """Test that pages over the threshold are parsed in a worker process with the same result"""
+        pool = ExtractionPool(processes=1, process_threshold=len(sample_html_content))
+        try:
+            assert not pool.uses_process(sample_html_content[:-1])
+            assert pool.uses_process(sample_html_content)
+            assert await pool.run(sample_html_content) == extract(sample_html_content)
+            assert pool._executor is not None
+        finally:
+            pool.close()
+
+    async def test_max_pending_bounds_concurrent_extractions(self, sample_html_content):
+        """Test that no more than max_pending extractions run at once"""
+        pool = ExtractionPool(processes=0, max_pending=2)
+        running = 0
+        peak = 0
+
+        def slow_extract(html, backend):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            threading.Event().wait(0.02)
+            running -= 1
+            return extract(html, backend)
+
+        with patch("src.scraper.extract.extract", slow_extract):
+            await asyncio.gather(*(pool.run(sample_html_content) for _ in range(6)))
+
+        assert peak <= 2
+
+
+def _addr(ip: str) -> list:
+    return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (ip, 443))]
+
+
+@pytest.mark.asyncio
+class TestAsyncSafeUrl:
+    """Tests for the non-blocking, cached SSRF check"""
+
+    async def test_checks_without_dns(self):
+        """Test scheme/port/IP-literal checks short-circuit before any lookup"""
+        assert (await is_safe_url("ftp://example.com"))[0] is False
+        assert (await is_safe_url("http://example.com:6379/"))[0] is False
+        assert await is_safe_url("http://10.0.0.1/") == (False, "Blocked: private/reserved IP address", None)
+        assert await is_safe_url("http://93.184.216.34/") == (True, "", "93.184.216.34")
+
+    async def test_lookup_cached(self):
+        """Test repeated checks of a host reuse the cached verdict"""
+        resolver = CachingResolver(_vet_addresses, ttl=60)
+        lookup = AsyncMock(return_value=_addr("93.184.216.34"))
+
+        with patch("asyncio.BaseEventLoop.getaddrinfo", lookup):
+            first = await resolver.vet_host("Example.com", 443)
+            second = await resolver.vet_host("example.com", 443)
+
+        assert first == second == (True, "", "93.184.216.34")
+        assert lookup.await_count == 1
+        assert (resolver.hits, resolver.misses) == (1, 1)
+
+    async def test_blocked_verdict_is_cached(self):
+        """Test a host resolving to a private network stays blocked from cache"""
+        resolver = CachingResolver(_vet_addresses, ttl=60)
+        lookup = AsyncMock(return_value=_addr("192.168.1.10"))
+
+        with patch("asyncio.BaseEventLoop.getaddrinfo", lookup):
+            await resolver.vet_host("rebind.example", 443)
+            cached = await resolver.vet_host("rebind.example", 443)
+
+        assert cached == (False, "Blocked: resolves to private/reserved IP", None)
+        assert lookup.await_count == 1
+
+    async def test_entries_expire(self):
+        """Test entries are re-resolved once their TTL elapses"""
+        resolver = CachingResolver(_vet_addresses, ttl=0)
+        lookup = AsyncMock(return_value=_addr("93.184.216.34"))
+
+        with patch("asyncio.BaseEventLoop.getaddrinfo", lookup):
+            await resolver.vet_host("example.com", 443)
+            await resolver.vet_host("example.com", 443)
+
+        assert lookup.await_count == 2
+
+    async def test_failed_lookup(self):
+        """Test unresolvable hosts are reported, and cached with the negative TTL"""
+        resolver = CachingResolver(_vet_addresses, ttl=60, negative_ttl=60)
+        lookup = AsyncMock(side_effect=socket.gaierror("nope"))
+
+        with patch("asyncio.BaseEventLoop.getaddrinfo", lookup):
+            verdict = await resolver.vet_host("missing.example", 443)
+            await resolver.vet_host("missing.example", 443)
+
+        assert verdict == (False, "Cannot resolve hostname: missing.example", None)
+        assert lookup.await_count == 1
+
+    async def test_concurrent_lookups_coalesced(self):
+        """Test concurrent checks of one host share a single getaddrinfo call"""
+        resolver = CachingResolver(_vet_addresses)
+        calls = 0
+
+        async def slow_lookup(*args, **kwargs):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return _addr("93.184.216.34")
+
+        with patch("asyncio.BaseEventLoop.getaddrinfo", slow_lookup):
+            results = await asyncio.gather(*(resolver.vet_host("example.com", 443) for _ in range(5)))
+
+        assert calls == 1
+        assert all(r[0] for r in results)
+
+    async def test_cancelled_caller_does_not_fail_other_waiters(self):
+        """Test a caller timing out mid-lookup leaves the shared lookup running for the others"""
+        resolver = CachingResolver(_vet_addresses)
+
+        async def slow_lookup(*args, **kwargs):
+            await asyncio.sleep(0.05)
+            return _addr("93.184.216.34")
+
+        with patch("asyncio.BaseEventLoop.getaddrinfo", slow_lookup):
+            first = asyncio.create_task(resolver.vet_host("example.com", 443))
+            await asyncio.sleep(0)
+            second = asyncio.create_task(resolver.vet_host("example.com", 443))
+            with pytest.raises(TimeoutError):
+                await asyncio.wait_for(first, 0.01)
+
+            assert (await second)[0] is True
+
+        assert resolver._pending == {}
+        assert resolver._get(("example.com", 443)) is not None
+
+    async def test_cache_is_bounded(self):
+        """Test the least recently used entries are evicted past max_entries"""
+        resolver = CachingResolver(_vet_addresses, max_entries=2)
+        lookup = AsyncMock(return_value=_addr("93.184.216.34"))
+
+        with patch("asyncio.BaseEventLoop.getaddrinfo", lookup):
+            for host in ("a.example", "b.example", "c.example", "a.example"):
+                await resolver.vet_host(host, 443)
+
+        assert lookup.await_count == 4
@@ -0,0 +1,92 @@
+"""Tests for the content-addressed snapshot store"""
+
+import os
+import sys
+import time
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, "/opt/claude-ceo/workspace/arkwatch")
+
+from src.storage.snapshots import SnapshotStore, resolve_codec, snapshot_key
+
+PAGE = "Pricing\n" + "Plan Pro: 29 EUR / month\n" * 2000
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SnapshotStore(str(tmp_path / "snapshots"), compression="zlib")
+
+
+def _blobs(store):
+    return sorted(key for key, _ in store.keys())
+
+
+class TestSnapshotStore:
+    def test_round_trip_full_text(self, store):
+        key = store.put(PAGE)
+        assert key == snapshot_key(PAGE)
+        assert store.get(key) == PAGE
+        assert len(PAGE) > 10000
+
+    def test_compressed_on_disk(self, store):
+        key = store.put(PAGE)
+        (path,) = [p for k, p in store.keys() if k == key]
+        assert path.endswith(".zz")
+        assert os.path.getsize(path) < len(PAGE) / 10
+
+    def test_identical_content_stored_once(self, store):
+        assert store.put(PAGE) == store.put(PAGE)
+        store.put("other page")
+        assert _blobs(store) == sorted([snapshot_key(PAGE), snapshot_key("other page")])
+
+    def test_unknown_key(self, store):
+        assert store.get(None) is None
+        assert store.get("0" * 64) is None
+
+    def test_reads_blobs_written_with_another_codec(self, tmp_path):
+        root = str(tmp_path / "snapshots")
+        key = SnapshotStore(root, compression="zlib").put(PAGE)
+        with patch("src.storage.snapshots.importlib.util.find_spec", return_value=None):
+            assert SnapshotStore(root, compression="auto").get(key) == PAGE
+
+    def test_codec_names(self):
+        assert resolve_codec("zlib") == "zz"
+        with pytest.raises(ValueError):
+            resolve_codec("lz4")
+
+
+class TestCollect:
+    def test_collects_only_old_unreferenced(self, store):
+        kept = store.put("referenced")
+        old = store.put("orphaned")
+        recent = store.put("just written")
+        for key in (kept, old):
+            (path,) = [p for k, p in store.keys() if k == key]
+            os.utime(path, (time.time() - 7200, time.time() - 7200))
+
+        assert store.collect({kept}, grace=3600) == 1
+        assert _blobs(store) == sorted([kept, recent])
+
+    def test_database_collects_blobs_of_deleted_watches(self, tmp_path):
+        data_dir = str(tmp_path / "data")
+        with (
+            patch("src.storage.database.DATA_DIR", data_dir),
+            patch("src.storage.database.WATCHES_FILE", f"{data_dir}/watches.json"),
+            patch("src.storage.database.REPORTS_FILE", f"{data_dir}/reports.json"),
+        ):
+            from src.storage.database import Database
+
+            db = Database()
+            first = db.create_watch(name="A", url="https://a.example")
+            second = db.create_watch(name="B", url="https://b.example")
+            shared = db.put_snapshot(PAGE)
+            db.update_watch(first["id"], last_snapshot=shared)
+            db.update_watch(second["id"], last_snapshot=shared)
+
+            db.delete_watch(first["id"])
+            assert db.collect_snapshots(grace=0) == 0
+            db.delete_watch(second["id"])
+            assert db.collect_snapshots(grace=0) == 1
+            assert db.get_snapshot(shared) is None
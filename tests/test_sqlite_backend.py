@@ -0,0 +1,203 @@
+"""Tests for the SQLite storage backend"""
+
+import json
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, "/opt/claude-ceo/workspace/arkwatch")
+
+from src.storage.sqlite_backend import SQLiteDatabase
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Create a SQLiteDatabase in a temporary directory"""
+    database = SQLiteDatabase(str(tmp_path / "data" / "arkwatch.db"))
+    yield database
+    database.close()
+
+
+class TestSQLiteWatches:
+    """Watch operations mirror the JSON Database"""
+
+    def test_wal_mode_enabled(self, db):
+        """Test that the database runs in WAL mode"""
+        (mode,) = sqlite3.connect(db.path).execute("PRAGMA journal_mode").fetchone()
+        assert mode == "wal"
+
+    def test_create_and_get_watch(self, db, sample_watch):
+        """Test creating then fetching a watch by ID"""
+        created = db.create_watch(**sample_watch)
+
+        watch = db.get_watch(created["id"])
+        assert watch["name"] == "Test Watch"
+        assert watch["status"] == "active"
+        assert watch["last_check"] is None
+
+    def test_get_watch_not_found(self, db):
+        """Test getting non-existent watch"""
+        assert db.get_watch("non-existent-id") is None
+
+    def test_get_watches_by_status(self, db, sample_watch):
+        """Test status filtering uses the status column kept in sync by update_watch"""
+        watch = db.create_watch(**sample_watch)
+        db.update_watch(watch["id"], status="paused")
+        db.create_watch(name="Active Watch", url="https://active.com")
+
+        active = db.get_watches(status="active")
+        paused = db.get_watches(status="paused")
+
+        assert [w["name"] for w in active] == ["Active Watch"]
+        assert len(paused) == 1
+        assert len(db.get_watches()) == 2
+
+    def test_update_watch_extra_fields(self, db, sample_watch):
+        """Test that arbitrary fields (e.g. user_email) round-trip"""
+        created = db.create_watch(**sample_watch)
+
+        updated = db.update_watch(created["id"], user_email="owner@example.com", last_content_hash="abc")
+
+        assert updated["user_email"] == "owner@example.com"
+        assert db.get_watch(created["id"])["last_content_hash"] == "abc"
+        assert [w["id"] for w in db.get_watches_by_user("owner@example.com")] == [created["id"]]
+
+    def test_update_watch_not_found(self, db):
+        """Test updating non-existent watch"""
+        assert db.update_watch("non-existent-id", name="Test") is None
+
+    def test_delete_watch(self, db, sample_watch):
+        """Test deleting a watch"""
+        created = db.create_watch(**sample_watch)
+
+        assert db.delete_watch(created["id"]) is True
+        assert db.get_watch(created["id"]) is None
+        assert db.delete_watch(created["id"]) is False
+
+
+class TestSQLiteReports:
+    """Report operations mirror the JSON Database"""
+
+    def test_get_reports_by_watch_newest_first(self, db):
+        """Test filtering reports by watch_id, newest first"""
+        first = db.create_report("watch-1", False, "hash1")
+        second = db.create_report("watch-1", True, "hash2")
+        db.create_report("watch-2", False, "hash3")
+
+        reports = db.get_reports(watch_id="watch-1")
+        assert [r["id"] for r in reports] == [second["id"], first["id"]]
+
+    def test_get_reports_limit(self, db):
+        """Test reports limit"""
+        for i in range(10):
+            db.create_report(f"watch-{i}", False, f"hash{i}")
+
+        assert len(db.get_reports(limit=5)) == 5
+
+    def test_mark_report_notified(self, db):
+        """Test marking a report as notified"""
+        report = db.create_report("watch-1", True, "hash1")
+
+        assert db.mark_report_notified(report["id"]) is True
+        assert db.get_reports()[0]["notified"] is True
+        assert db.mark_report_notified("non-existent-id") is False
+
+    def test_pending_reports_backfilled(self, db):
+        """Test listing reports awaiting analysis and completing them"""
+        first = db.create_report("watch-1", True, "hash1", analysis_pending=True)
+        db.create_report("watch-1", True, "hash2", ai_summary="Done")
+        second = db.create_report("watch-2", True, "hash3", analysis_pending=True)
+
+        assert [r["id"] for r in db.get_pending_reports()] == [first["id"], second["id"]]
+
+        assert db.update_report(first["id"], ai_summary="Prix baissé", analysis_pending=False) is True
+        assert [r["id"] for r in db.get_pending_reports()] == [second["id"]]
+        assert db.get_report(first["id"])["ai_summary"] == "Prix baissé"
+        assert db.update_report("non-existent-id", notified=True) is False
+
+    def test_purge_reports_before(self, db):
+        """Test retention purge uses the created_at index"""
+        old = db.create_report("watch-1", False, "hash1")
+        db._conn().execute("UPDATE reports SET created_at = ? WHERE id = ?", ("2020-01-01T00:00:00", old["id"]))
+        db.create_report("watch-1", False, "hash2")
+
+        assert db.purge_reports_before("2021-01-01T00:00:00") == 1
+        assert len(db.get_reports()) == 1
+
+    def test_delete_user_data(self, db, sample_watch):
+        """Test GDPR erasure removes the user's watches and their reports"""
+        mine = db.create_watch(**sample_watch)
+        db.update_watch(mine["id"], user_email="me@example.com")
+        other = db.create_watch(name="Other", url="https://other.com")
+        db.create_report(mine["id"], False, "h1")
+        db.create_report(mine["id"], True, "h2")
+        db.create_report(other["id"], False, "h3")
+
+        result = db.delete_user_data("me@example.com")
+
+        assert result == {"watches_deleted": 1, "reports_deleted": 2}
+        assert [w["id"] for w in db.get_watches()] == [other["id"]]
+        assert len(db.get_reports()) == 1
+
+    def test_query_reports_pages_by_position(self, db):
+        """Test cursor pagination filtered by watch IDs"""
+        for i in range(6):
+            db._put_report(
+                db._conn(),
+                {"id": f"r{i}", "watch_id": f"w{i % 3}", "created_at": f"2026-10-17T0{i}:00:00"},
+            )
+
+        assert [r["id"] for r in db.query_reports(["w0", "w1"], limit=3)] == ["r4", "r3", "r1"]
+        assert [r["id"] for r in db.query_reports(after=("2026-10-17T04:00:00", "r4"), limit=2)] == ["r3", "r2"]
+        assert [r["id"] for r in db.query_reports(before=("2026-10-17T01:00:00", "r1"), limit=2)] == ["r3", "r2"]
+        assert db.query_reports([], limit=10) == []
+        assert db.get_report("r2")["watch_id"] == "w2"
+        assert db.get_report("missing") is None
+
+
+class TestImportJson:
+    """Tests for the one-shot JSON importer"""
+
+    def _write(self, tmp_path):
+        watches = [
+            {"id": "w1", "name": "A", "url": "https://a.com", "status": "active", "user_email": "a@example.com"},
+            {"id": "w2", "name": "B", "url": "https://b.com", "status": "paused"},
+        ]
+        reports = [
+            {
+                "id": "r1",
+                "watch_id": "w1",
+                "changes_detected": False,
+                "current_hash": "h",
+                "created_at": "2026-01-01T00:00:00",
+            },
+        ]
+        watches_file = tmp_path / "watches.json"
+        reports_file = tmp_path / "reports.json"
+        watches_file.write_text(json.dumps(watches))
+        reports_file.write_text(json.dumps(reports))
+        return str(watches_file), str(reports_file)
+
+    def test_import_json(self, db, tmp_path):
+        """Test importing existing JSON files"""
+        watches_file, reports_file = self._write(tmp_path)
+
+        counts = db.import_json(watches_file, reports_file)
+
+        assert counts == {"watches": 2, "reports": 1}
+        assert [w["id"] for w in db.get_watches(status="active")] == ["w1"]
+        assert db.get_watches_by_user("a@example.com")[0]["id"] == "w1"
+        assert db.get_reports(watch_id="w1")[0]["id"] == "r1"
+
+    def test_import_refuses_non_empty_db(self, db, tmp_path, sample_watch):
+        """Test the importer is one-shot unless forced"""
+        watches_file, reports_file = self._write(tmp_path)
+        db.create_watch(**sample_watch)
+
+        with pytest.raises(RuntimeError):
+            db.import_json(watches_file, reports_file)
+
+        counts = db.import_json(watches_file, reports_file, force=True)
+        assert counts["watches"] == 2
+        assert len(db.get_watches()) == 3
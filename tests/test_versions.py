@@ -0,0 +1,208 @@
+"""Tests for delta-compressed page version history"""
+
+import json
+import sys
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, "/opt/claude-ceo/workspace/arkwatch")
+
+from src.storage.snapshots import SnapshotStore
+from src.storage.versions import VersionStore, apply_delta, line_delta
+
+
+def _page(n: int) -> str:
+    """A 200-line page where line n % 200 says which revision it is."""
+    lines = [f"Item {i}: stable text" for i in range(200)]
+    lines[n % 200] = f"Item {n % 200}: revision {n}"
+    return "\n".join(lines) + "\n"
+
+
+@pytest.fixture
+def store(tmp_path):
+    snapshots = SnapshotStore(str(tmp_path / "snapshots"), compression="zlib")
+    return VersionStore(str(tmp_path / "versions"), snapshots, keyframe_interval=5)
+
+
+def _record(store, n, previous=None, created_at=None):
+    return store.append("w1", _page(n), f"h{n}", created_at or f"2026-10-17T10:{n:02d}:00", previous_text=previous)
+
+
+class TestLineDelta:
+    @pytest.mark.parametrize(
+        "old,new",
+        [
+            ("a\nb\nc\n", "a\nB\nc\n"),
+            ("a\nb\nc", "a\nb\nc\nd"),
+            ("", "new page\n"),
+            ("x\ny\n", ""),
+            ("same\n", "same\n"),
+        ],
+    )
+    def test_round_trip(self, old, new):
+        assert apply_delta(old, line_delta(old, new)) == new
+
+    def test_delta_holds_only_changed_lines(self):
+        delta = line_delta(_page(0), _page(1))
+        assert sum(len(lines) for _, _, lines in delta) == 2
+
+
+class TestVersionStore:
+    def test_every_version_reconstructs(self, store):
+        previous = None
+        for n in range(12):
+            _record(store, n, previous)
+            previous = _page(n)
+
+        for n in range(12):
+            assert store.get("w1", n + 1)["content"] == _page(n)
+        assert store.get("w1", 99) is None
+
+    def test_keyframe_spacing_bounds_reconstruction(self, store):
+        previous = None
+        for n in range(12):
+            _record(store, n, previous)
+            previous = _page(n)
+
+        chain = store.chain("w1")
+        assert [v["keyframe"] for v in chain] == [True, False, False, False, False] * 2 + [True, False]
+        with patch.object(store.snapshots, "get", wraps=store.snapshots.get) as get:
+            with patch("src.storage.versions.apply_delta", wraps=apply_delta) as apply:
+                store.get("w1", 10)
+        assert get.call_count == 1
+        assert apply.call_count == 4
+
+    def test_storage_grows_with_change(self, store, tmp_path):
+        previous = None
+        for n in range(4):
+            _record(store, n, previous)
+            previous = _page(n)
+        delta_line = (tmp_path / "versions" / "w1.jsonl").read_text().splitlines()[-1]
+        assert len(delta_line) < len(_page(3)) / 10
+
+        # Same content again is not a new version
+        assert _record(store, 3, previous)["id"] == 4
+        assert len(store.chain("w1")) == 4
+
+    def test_unknown_base_writes_keyframe(self, store):
+        _record(store, 0)
+        version = _record(store, 1, previous="something else")
+        assert version["keyframe"] is True
+        assert store.get("w1", 2)["content"] == _page(1)
+
+    def test_history_at(self, store):
+        for n in range(3):
+            _record(store, n, _page(n - 1) if n else None)
+        assert [v["id"] for v in store.history("w1")] == [3, 2, 1]
+        assert [v["id"] for v in store.history("w1", at="2026-10-17T10:01:30")] == [2, 1]
+        assert store.history("w1", at="2026-10-17T09:00:00") == []
+        assert "delta" not in store.history("w1")[0]
+
+    def test_drop_before_keeps_live_version_as_keyframe(self, store):
+        previous = None
+        for n in range(4):
+            _record(store, n, previous)
+            previous = _page(n)
+
+        assert store.drop_before("2026-10-17T10:02:30") == 2
+        chain = store.chain("w1")
+        assert [(v["id"], v["keyframe"]) for v in chain] == [(3, True), (4, False)]
+        assert store.get("w1", 3)["content"] == _page(2)
+        assert store.get("w1", 4)["content"] == _page(3)
+        assert store.get("w1", 1) is None
+
+    def test_rejects_path_like_watch_ids(self, store):
+        with pytest.raises(ValueError):
+            store.chain("../api_keys")
+
+
+@pytest.fixture
+def api(tmp_path):
+    keys_file = str(tmp_path / "api_keys.json")
+    data_dir = str(tmp_path / "data")
+    with open(keys_file, "w") as f:
+        json.dump({}, f)
+
+    with (
+        patch("src.api.auth.API_KEYS_FILE", keys_file),
+        patch("src.storage.database.DATA_DIR", data_dir),
+        patch("src.storage.database.WATCHES_FILE", f"{data_dir}/watches.json"),
+        patch("src.storage.database.REPORTS_FILE", f"{data_dir}/reports.json"),
+    ):
+        import src.storage.database as db_mod
+        from src.api.main import app
+        from src.api.routers.auth import _registration_attempts, _verify_attempts
+
+        _registration_attempts.clear()
+        _verify_attempts.clear()
+        db_mod._db = None
+        yield TestClient(app)
+        db_mod._db = None
+
+
+def _verified_key(client, email):
+    from src.api.auth import regenerate_verification_code
+
+    api_key = client.post(
+        "/api/v1/auth/register", json={"email": email, "name": "Versions", "privacy_accepted": True}
+    ).json()["api_key"]
+    client.post("/api/v1/auth/verify-email", json={"email": email, "code": regenerate_verification_code(email)})
+    return {"X-API-Key": api_key}
+
+
+class TestVersionsAPI:
+    def _watch_with_history(self, email):
+        from src.storage import get_db
+
+        db = get_db()
+        watch = db.create_watch(name="History", url="https://example.com")
+        db.update_watch(watch["id"], user_email=email)
+        db.add_version(watch["id"], _page(0), "h0")
+        db.add_version(watch["id"], _page(1), "h1", previous_text=_page(0))
+        return watch["id"]
+
+    def test_list_and_get(self, api):
+        headers = _verified_key(api, "history@example.com")
+        watch_id = self._watch_with_history("history@example.com")
+
+        resp = api.get(f"/api/v1/watches/{watch_id}/versions", headers=headers)
+        assert resp.status_code == 200
+        assert [v["id"] for v in resp.json()] == [2, 1]
+
+        resp = api.get(f"/api/v1/watches/{watch_id}/versions/2", headers=headers)
+        assert resp.status_code == 200
+        assert resp.json()["content"] == _page(1)
+        assert resp.json()["keyframe"] is False
+
+        assert api.get(f"/api/v1/watches/{watch_id}/versions/7", headers=headers).status_code == 404
+
+    def test_at_filters_by_time(self, api):
+        headers = _verified_key(api, "attime@example.com")
+        watch_id = self._watch_with_history("attime@example.com")
+
+        resp = api.get(f"/api/v1/watches/{watch_id}/versions", params={"at": "2000-01-01T00:00:00Z"}, headers=headers)
+        assert resp.json() == []
+
+    def test_other_users_history_denied(self, api):
+        _verified_key(api, "pageowner@example.com")
+        other = _verified_key(api, "curious@example.com")
+        watch_id = self._watch_with_history("pageowner@example.com")
+
+        assert api.get(f"/api/v1/watches/{watch_id}/versions", headers=other).status_code == 403
+        assert api.get(f"/api/v1/watches/{watch_id}/versions/1", headers=other).status_code == 403
+
+    def test_deleting_watch_drops_history(self, api):
+        from src.storage import get_db
+
+        watch_id = self._watch_with_history("dropper@example.com")
+        get_db().delete_watch(watch_id)
+        assert get_db().get_versions(watch_id) == []
+
+    def test_keyframes_survive_snapshot_collection(self, api):
+        from src.storage import get_db
+
+        watch_id = self._watch_with_history("keeper@example.com")
+        assert get_db().collect_snapshots(grace=0) == 0
+        assert get_db().get_version(watch_id, 2)["content"] == _page(1)
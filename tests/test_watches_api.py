@@ -109,6 +109,18 @@ class TestCreateWatch:
         assert resp.status_code == 200
         assert resp.json()["check_interval"] >= 86400
 
+    def test_adaptive_interval_opt_in(self, client):
+        api_key = _create_verified_user(client)
+        resp = client.post(
+            "/api/v1/watches",
+            json={"url": "https://example.com", "name": "Adaptive", "adaptive_interval": True},
+            headers={"X-API-Key": api_key},
+        )
+        data = resp.json()
+        assert data["adaptive_interval"] is True
+        assert data["effective_interval"] == data["check_interval"] == 86400
+        assert data["max_check_interval"] == 604800
+
 
 class TestSSRFProtection:
     def test_ssrf_localhost(self, client):
@@ -244,6 +256,25 @@ class TestUpdateWatch:
         assert resp.status_code == 200
         assert resp.json()["name"] == "New Name"
 
+    def test_enabling_adaptive_resets_effective_interval(self, client):
+        from src.storage import get_db
+
+        api_key = _create_verified_user(client)
+        watch_id = client.post(
+            "/api/v1/watches",
+            json={"url": "https://example.com", "name": "W"},
+            headers={"X-API-Key": api_key},
+        ).json()["id"]
+        get_db().update_watch(watch_id, effective_interval=999999)
+
+        resp = client.patch(
+            f"/api/v1/watches/{watch_id}",
+            json={"adaptive_interval": True},
+            headers={"X-API-Key": api_key},
+        )
+        assert resp.json()["adaptive_interval"] is True
+        assert resp.json()["effective_interval"] == 86400
+
     def test_update_other_users_watch_denied(self, client):
         key1 = _create_verified_user(client, "owner2@example.com")
         key2 = _create_verified_user(client, "hacker@example.com")
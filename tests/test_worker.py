@@ -0,0 +1,618 @@
+"""Tests for the ArkWatch worker cycle"""
+
+import asyncio
+import sys
+import time
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+sys.path.insert(0, "/opt/claude-ceo/workspace/arkwatch")
+
+from src.scraper.change_ratio import change_ratio
+from src.scraper.politeness import HostThrottle, host_key, url_key
+from src.scraper.scraper import ScrapeResult
+from src.worker import ArkWatchWorker
+
+
+def _watch(i: int, url: str) -> dict:
+    return {
+        "id": f"w{i}",
+        "name": f"Watch {i}",
+        "url": url,
+        "check_interval": 60,
+        "last_check": None,
+        "status": "active",
+    }
+
+
+@pytest.fixture
+def make_worker():
+    def _make(watches, **kwargs):
+        db = MagicMock()
+        db.get_watches.return_value = watches
+        with patch("src.worker.get_db", return_value=db):
+            return ArkWatchWorker(**kwargs)
+
+    return _make
+
+
+class TestHostThrottle:
+    """Tests for per-host politeness"""
+
+    def test_host_key_ignores_port_and_case(self):
+        assert host_key("https://Example.com:8443/a") == "example.com"
+
+    def test_url_key_normalizes_equivalent_urls(self):
+        assert url_key("HTTPS://Example.com:443#pricing") == "https://example.com/"
+        assert url_key("https://example.com:8443/a?b=1") == "https://example.com:8443/a?b=1"
+        assert url_key("https://example.com/a?b=1") != url_key("https://example.com/a?b=2")
+        assert url_key("https://user:pw@example.com/") == "https://user:pw@example.com/"
+
+    @pytest.mark.asyncio
+    async def test_same_host_requests_are_paced(self):
+        throttle = HostThrottle(max_per_host=5, min_delay=0.05)
+        starts = []
+
+        async def hit(url):
+            async with throttle.slot(url):
+                starts.append(time.monotonic())
+
+        await asyncio.gather(*(hit("https://a.com/p") for _ in range(3)))
+
+        # Each start is reserved min_delay after the previous one (late wakeups only add delay)
+        assert all(start - starts[0] >= i * 0.05 - 0.005 for i, start in enumerate(starts))
+
+    @pytest.mark.asyncio
+    async def test_different_hosts_are_not_paced(self):
+        throttle = HostThrottle(max_per_host=1, min_delay=10)
+
+        async def hit(url):
+            async with throttle.slot(url):
+                return True
+
+        results = await asyncio.wait_for(asyncio.gather(hit("https://a.com"), hit("https://b.com")), timeout=1)
+        assert results == [True, True]
+
+
+@pytest.mark.asyncio
+class TestRunCycle:
+    """Tests for the concurrent run_cycle"""
+
+    async def test_global_concurrency_limit(self, make_worker):
+        watches = [_watch(i, f"https://host{i}.example/") for i in range(8)]
+        worker = make_worker(watches, concurrency=3, per_host_delay=0)
+        in_flight = 0
+        peak = 0
+
+        async def fake_process(watch, lag=None):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {"changes_detected": watch["id"] == "w0"}
+
+        worker.process_watch = fake_process
+        processed, changes = await worker.run_cycle()
+
+        assert processed == 8
+        assert changes == 1
+        assert peak == 3
+
+    async def test_per_host_limit(self, make_worker):
+        watches = [_watch(i, f"https://same.example/page{i}") for i in range(4)]
+        worker = make_worker(watches, concurrency=10, per_host_concurrency=1, per_host_delay=0)
+        in_flight = 0
+        peak = 0
+
+        async def fake_process(watch, lag=None):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return None
+
+        worker.process_watch = fake_process
+        processed, _ = await worker.run_cycle()
+
+        assert processed == 4
+        assert peak == 1
+
+    async def test_one_failing_watch_does_not_abort_cycle(self, make_worker):
+        watches = [_watch(0, "https://a.example/"), _watch(1, "https://b.example/")]
+        worker = make_worker(watches, per_host_delay=0)
+
+        async def fake_process(watch, lag=None):
+            if watch["id"] == "w0":
+                raise RuntimeError("boom")
+            return {"changes_detected": True}
+
+        worker.process_watch = fake_process
+        processed, changes = await worker.run_cycle()
+
+        assert (processed, changes) == (2, 1)
+
+    async def test_run_forever_dispatches_due_watch_once(self, make_worker):
+        watch = _watch(0, "https://a.example/")
+        worker = make_worker([watch], per_host_delay=0)
+        calls = []
+
+        async def fake_process(watch, lag=None):
+            calls.append((watch["id"], lag))
+            return None
+
+        worker.process_watch = fake_process
+        task = asyncio.create_task(worker.run_forever(resync_interval=0.02))
+        await asyncio.sleep(0.15)
+        task.cancel()
+
+        assert len(calls) == 1
+        assert calls[0][0] == "w0"
+        assert calls[0][1] >= 0
+
+    async def test_run_forever_reads_watches_once_per_wave(self, make_worker):
+        watches = [_watch(i, f"https://site{i}.example/") for i in range(5)]
+        worker = make_worker(watches, per_host_delay=0)
+        calls = []
+
+        async def fake_process(watch, lag=None):
+            calls.append(watch["id"])
+            return None
+
+        worker.process_watch = fake_process
+        task = asyncio.create_task(worker.run_forever(resync_interval=60))
+        await asyncio.sleep(0.1)
+        task.cancel()
+
+        assert sorted(calls) == [f"w{i}" for i in range(5)]
+        # One read for the sync, one for the wave of due watches
+        assert worker.db.get_watches.call_count == 2
+        worker.db.get_watch.assert_not_called()
+
+    async def test_run_forever_wakes_for_earlier_retry(self, make_worker):
+        watch = _watch(0, "https://a.example/")
+        worker = make_worker([watch], per_host_delay=0)
+        calls = []
+
+        async def fake_process(watch, lag=None):
+            calls.append(watch["id"])
+            # As after a failed fetch: retry shortly, long before the next resync
+            worker._retry_at[watch["id"]] = datetime.utcnow() + timedelta(seconds=0.05)
+            return None
+
+        worker.process_watch = fake_process
+        task = asyncio.create_task(worker.run_forever(resync_interval=60))
+        await asyncio.sleep(0.3)
+        task.cancel()
+
+        assert len(calls) >= 2
+
+
+@pytest.mark.asyncio
+class TestConditionalFetch:
+    """Tests for the 304 short-circuit in process_watch"""
+
+    def _result(self, **kwargs) -> ScrapeResult:
+        fields = {"url": "https://a.example/", "status_code": 200, "content_hash": "", "text_content": ""}
+        return ScrapeResult(title=None, scraped_at=datetime.utcnow(), **{**fields, **kwargs})
+
+    async def test_not_modified_skips_diff_and_records_unchanged(self, make_worker):
+        watch = {**_watch(0, "https://a.example/"), "last_content_hash": "h1", "last_content": "old", "etag": '"v1"'}
+        worker = make_worker([watch])
+        worker.scraper.scrape = AsyncMock(return_value=self._result(status_code=304, etag='"v1"', not_modified=True))
+        worker.analyzer.analyze_remote = AsyncMock()
+
+        await worker.process_watch(watch)
+
+        assert worker.scraper.scrape.call_args.kwargs == {"etag": '"v1"', "last_modified": None, "body_hash": None}
+        update = worker.db.update_watch.call_args.kwargs
+        assert "last_content_hash" not in update
+        assert update["status"] == "active"
+        report = worker.db.create_report.call_args.kwargs
+        assert report["changes_detected"] is False
+        assert report["current_hash"] == "h1"
+        worker.analyzer.analyze_remote.assert_not_called()
+
+    async def test_validators_persisted_and_not_sent_without_content(self, make_worker):
+        watch = {**_watch(0, "https://a.example/"), "etag": '"stale"'}
+        worker = make_worker([watch])
+        worker.scraper.scrape = AsyncMock(
+            return_value=self._result(content_hash="h2", text_content="new", etag='"v2"', last_modified="Thu")
+        )
+
+        await worker.process_watch(watch)
+
+        assert worker.scraper.scrape.call_args.kwargs == {}
+        update = worker.db.update_watch.call_args.kwargs
+        assert (update["etag"], update["last_modified"]) == ('"v2"', "Thu")
+        assert update["last_content_hash"] == "h2"
+
+
+@pytest.mark.asyncio
+class TestSnapshots:
+    """Tests for page text kept in the snapshot store instead of on the watch"""
+
+    def _result(self, text: str) -> ScrapeResult:
+        return ScrapeResult(
+            url="https://a.example/",
+            status_code=200,
+            content_hash=str(hash(text)),
+            text_content=text,
+            title=None,
+            scraped_at=datetime.utcnow(),
+        )
+
+    async def test_stores_reference_and_compares_full_text(self, make_worker):
+        old = "a\n" * 6000 + "tail"
+        watch = {**_watch(0, "https://a.example/"), "last_content_hash": "h1", "last_snapshot": "k1"}
+        worker = make_worker([watch])
+        worker.db.get_snapshot.return_value = old
+        worker.db.put_snapshot.return_value = "k2"
+        worker.scraper.scrape = AsyncMock(return_value=self._result(old + " changed"))
+
+        with patch("src.worker.change_ratio", wraps=change_ratio) as ratio:
+            await worker.process_watch(watch)
+
+        worker.db.get_snapshot.assert_called_once_with("k1")
+        assert ratio.call_args.args[:2] == (old, old + " changed")
+        update = worker.db.update_watch.call_args.kwargs
+        assert update["last_snapshot"] == "k2"
+        assert update["last_content"] is None
+
+    async def test_legacy_inline_content_compared_truncated(self, make_worker):
+        new = "b" * 20000
+        watch = {**_watch(0, "https://a.example/"), "last_content_hash": "h1", "last_content": "b" * 10000}
+        worker = make_worker([watch])
+        worker.scraper.scrape = AsyncMock(return_value=self._result(new))
+
+        await worker.process_watch(watch)
+
+        worker.db.get_snapshot.assert_not_called()
+        worker.db.put_snapshot.assert_called_once_with(new)
+        assert worker.db.create_report.call_args.kwargs["changes_detected"] is False
+
+
+@pytest.mark.asyncio
+class TestCoalescing:
+    """Tests for fetching a URL shared by several due watches once"""
+
+    def _result(self, text: str, **kwargs) -> ScrapeResult:
+        return ScrapeResult(
+            url="https://shared.example/",
+            status_code=200,
+            content_hash=str(hash(text)),
+            text_content=text,
+            title=None,
+            scraped_at=datetime.utcnow(),
+            **kwargs,
+        )
+
+    async def test_one_fetch_fans_out_to_each_watch(self, make_worker):
+        old = "price 10\n" * 20
+        watches = [
+            {**_watch(0, "https://shared.example/"), "last_content_hash": "h", "min_change_ratio": 0.01},
+            {**_watch(1, "https://Shared.example:443/#top"), "last_content_hash": "h", "min_change_ratio": 0.9},
+            {**_watch(2, "https://other.example/"), "last_content_hash": "h"},
+        ]
+        worker = make_worker(watches, per_host_delay=0)
+        worker.db.get_snapshot.return_value = old
+        worker.scraper.scrape = AsyncMock(return_value=self._result(old.replace("10", "12")))
+        worker.analyzer.analyze_remote = AsyncMock(return_value=MagicMock(summary="s", importance="low", error=None))
+        for w in watches:
+            w["last_snapshot"] = "k"
+
+        processed, changes = await worker.run_cycle()
+
+        assert processed == 3
+        fetched = sorted(call.args[0] for call in worker.scraper.scrape.call_args_list)
+        assert fetched == ["https://other.example/", "https://shared.example/"]
+        assert worker.dedup_ratio == 1.5
+        # Each watch applies its own threshold to the shared result
+        flagged = {
+            call.kwargs["watch_id"]
+            for call in worker.db.create_report.call_args_list
+            if call.kwargs["changes_detected"]
+        }
+        assert flagged == {"w0", "w2"}
+
+    async def test_validators_sent_only_when_all_watches_agree(self, make_worker):
+        base = {"last_content_hash": "h", "last_snapshot": "k", "etag": '"v1"'}
+        watches = [{**_watch(0, "https://shared.example/"), **base}, {**_watch(1, "https://shared.example/"), **base}]
+        worker = make_worker(watches, per_host_delay=0)
+        worker.db.get_snapshot.return_value = "same"
+        worker.scraper.scrape = AsyncMock(return_value=self._result("same", not_modified=True))
+
+        await worker.run_cycle()
+        assert worker.scraper.scrape.call_args.kwargs["etag"] == '"v1"'
+
+        watches[1]["etag"] = '"v0"'
+        worker.scheduler = type(worker.scheduler)()
+        await worker.run_cycle()
+        assert worker.scraper.scrape.call_args.kwargs == {}
+
+    async def test_failed_evaluation_does_not_affect_siblings(self, make_worker):
+        watches = [_watch(i, "https://shared.example/") for i in range(3)]
+        worker = make_worker(watches, per_host_delay=0)
+        worker.scraper.scrape = AsyncMock(return_value=self._result("page"))
+
+        async def fake_process(watch, lag=None, result=None):
+            assert result is not None
+            if watch["id"] == "w1":
+                raise RuntimeError("boom")
+            return {"changes_detected": True}
+
+        worker.process_watch = fake_process
+        assert await worker.run_cycle() == (3, 2)
+        assert worker.scraper.scrape.await_count == 1
+
+
+@pytest.mark.asyncio
+class TestAdaptiveInterval:
+    """Tests for rescheduling adaptive watches from their report history"""
+
+    async def test_stable_adaptive_watch_is_rescheduled_later(self, make_worker):
+        watch = {**_watch(0, "https://a.example/"), "adaptive_interval": True, "max_check_interval": 86400}
+        worker = make_worker([watch], per_host_delay=0)
+        now = datetime.utcnow()
+        worker.db.query_reports.return_value = [
+            {"changes_detected": False, "created_at": (now - timedelta(hours=i)).isoformat()} for i in range(50)
+        ]
+
+        async def fake_process(watch, lag=None):
+            return {"changes_detected": False}
+
+        worker.process_watch = fake_process
+        await worker.run_cycle()
+
+        worker.db.update_watch.assert_called_once_with("w0", effective_interval=120)
+        assert worker.scheduler.next_due_at() >= now + timedelta(seconds=119)
+
+    async def test_fixed_watch_keeps_check_interval(self, make_worker):
+        worker = make_worker([_watch(0, "https://a.example/")], per_host_delay=0)
+
+        async def fake_process(watch, lag=None):
+            return {"changes_detected": False}
+
+        worker.process_watch = fake_process
+        await worker.run_cycle()
+
+        worker.db.query_reports.assert_not_called()
+        assert worker.scheduler.next_due_at() <= datetime.utcnow() + timedelta(seconds=60)
+
+
+@pytest.mark.asyncio
+class TestFailures:
+    """Tests for retry with backoff and per-host circuit breaking"""
+
+    def _error(self, unreachable=True) -> ScrapeResult:
+        return ScrapeResult(
+            url="https://down.example/",
+            status_code=0,
+            content_hash="",
+            text_content="",
+            title=None,
+            scraped_at=datetime.utcnow(),
+            error="timed out",
+            unreachable=unreachable,
+        )
+
+    async def test_failure_keeps_watch_active_with_backoff(self, make_worker):
+        watch = {**_watch(0, "https://down.example/"), "consecutive_failures": 2}
+        worker = make_worker([watch])
+        worker.scraper.scrape = AsyncMock(return_value=self._error())
+
+        before = datetime.utcnow()
+        assert await worker.process_watch(watch) is None
+
+        update = worker.db.update_watch.call_args.kwargs
+        assert update["status"] == "active"
+        assert update["consecutive_failures"] == 3
+        assert update["last_error"] == "timed out"
+        # Third failure: 4x the base delay, jittered down to half of it at most
+        retry_at = datetime.fromisoformat(update["next_retry_at"])
+        assert before + timedelta(seconds=119) <= retry_at <= datetime.utcnow() + timedelta(seconds=240)
+        worker.db.create_report.assert_not_called()
+
+    async def test_success_clears_error_state(self, make_worker):
+        watch = {**_watch(0, "https://a.example/"), "consecutive_failures": 3, "last_error": "timed out"}
+        worker = make_worker([watch])
+        worker.scraper.scrape = AsyncMock(
+            return_value=ScrapeResult(
+                url="https://a.example/",
+                status_code=200,
+                content_hash="h",
+                text_content="page",
+                title=None,
+                scraped_at=datetime.utcnow(),
+            )
+        )
+
+        await worker.process_watch(watch)
+
+        update = worker.db.update_watch.call_args.kwargs
+        assert (update["consecutive_failures"], update["last_error"], update["next_retry_at"]) == (0, None, None)
+
+    async def test_failed_watch_rescheduled_at_retry_time(self, make_worker):
+        watch = _watch(0, "https://down.example/")
+        worker = make_worker([watch], per_host_delay=0)
+        worker.scraper.scrape = AsyncMock(return_value=self._error())
+
+        await worker.run_cycle()
+
+        retry_at = datetime.fromisoformat(worker.db.update_watch.call_args.kwargs["next_retry_at"])
+        assert worker.scheduler.next_due_at() == retry_at
+
+    async def test_open_host_circuit_skips_fetches(self, make_worker):
+        watches = [_watch(i, f"https://down.example/page{i}") for i in range(4)]
+        worker = make_worker(watches, per_host_delay=0)
+        worker.host_breakers.failure_threshold = 2
+        worker.scraper.scrape = AsyncMock(return_value=self._error())
+
+        await worker.run_cycle()
+
+        # Two unreachable fetches open the breaker; the other watches are not fetched
+        assert worker.scraper.scrape.await_count == 2
+        assert worker.host_breakers.open_keys() == ["down.example"]
+        skipped = [
+            call
+            for call in worker.db.update_watch.call_args_list
+            if call.kwargs["last_error"] == "Host unreachable (circuit open)"
+        ]
+        assert len(skipped) == 2
+        assert all(call.kwargs["consecutive_failures"] == 0 for call in skipped)
+
+    async def test_unrelated_errors_do_not_trip_circuit(self, make_worker):
+        watches = [_watch(i, f"https://picky.example/page{i}") for i in range(4)]
+        worker = make_worker(watches, per_host_delay=0)
+        worker.host_breakers.failure_threshold = 1
+        worker.scraper.scrape = AsyncMock(return_value=self._error(unreachable=False))
+
+        await worker.run_cycle()
+
+        assert worker.scraper.scrape.await_count == 4
+        assert worker.host_breakers.open_keys() == []
+
+    async def test_legacy_error_watches_are_monitored(self, make_worker):
+        watches = [
+            {**_watch(0, "https://a.example/"), "status": "error"},
+            {**_watch(1, "https://b.example/"), "status": "paused"},
+        ]
+        worker = make_worker(watches, per_host_delay=0)
+        seen = []
+
+        async def fake_process(watch, lag=None):
+            seen.append(watch["id"])
+
+        worker.process_watch = fake_process
+        await worker.run_cycle()
+
+        assert seen == ["w0"]
+
+
+@pytest.mark.asyncio
+class TestAnalyzerOutage:
+    """Tests for the analyzer circuit breaker, pending reports and their backfill"""
+
+    OLD = "Prix: 100€\nLivraison offerte\n"
+    NEW = "Prix: 80€\nPromotion limitée\n"
+
+    def _worker(self, make_worker):
+        watch = {
+            **_watch(0, "https://shop.example/"),
+            "last_content_hash": "h",
+            "last_snapshot": "k",
+            "min_change_ratio": 0.01,
+            "notify_email": "owner@example.com",
+        }
+        worker = make_worker([watch])
+        worker.analyzer.cache = None
+        worker.notifier.send_alert = MagicMock()
+        worker.db.get_snapshot.return_value = self.OLD
+        worker.db.get_watch.return_value = watch
+        worker.db.get_pending_reports.return_value = []
+        worker.db.create_report.side_effect = lambda **kw: {"id": "r1", **kw}
+        worker.scraper.scrape = AsyncMock(
+            return_value=ScrapeResult(
+                url=watch["url"],
+                status_code=200,
+                content_hash="h2",
+                text_content=self.NEW,
+                title=None,
+                scraped_at=datetime.utcnow(),
+            )
+        )
+        return worker, watch
+
+    def _analysis(self, error=None):
+        return MagicMock(summary="Prix baissé", importance="high", error=error)
+
+    async def test_open_circuit_saves_pending_report(self, make_worker):
+        worker, watch = self._worker(make_worker)
+        worker.analyzer_breaker.failure_threshold = 1
+        worker.analyzer_breaker.record_failure()
+        worker.analyzer.analyze_remote = AsyncMock()
+
+        report = await worker.process_watch(watch)
+
+        worker.analyzer.analyze_remote.assert_not_called()
+        assert report["analysis_pending"] is True
+        assert report["ai_importance"] is None
+        worker.notifier.send_alert.assert_not_called()
+        assert list(worker._pending()) == ["r1"]
+
+    async def test_failures_open_circuit(self, make_worker):
+        worker, watch = self._worker(make_worker)
+        worker.analyzer_breaker.failure_threshold = 2
+        worker.analyzer.analyze_remote = AsyncMock(return_value=self._analysis(error="Mistral error: 500"))
+
+        for _ in range(3):
+            await worker.process_watch(watch)
+
+        assert worker.analyzer.analyze_remote.await_count == 2
+        assert all(call.kwargs["analysis_pending"] for call in worker.db.create_report.call_args_list)
+
+    async def test_slow_analysis_used_but_counted(self, make_worker):
+        worker, watch = self._worker(make_worker)
+        worker.analyzer.analyze_remote = AsyncMock(return_value=self._analysis())
+
+        with patch("src.worker.ANALYZER_SLOW_CALL", -1):
+            report = await worker.process_watch(watch)
+
+        assert report["ai_summary"] == "Prix baissé"
+        assert worker.analyzer_breaker.failures == 1
+        worker.notifier.send_alert.assert_called_once()
+
+    async def test_timeout_does_not_hold_the_check(self, make_worker):
+        worker, watch = self._worker(make_worker)
+
+        async def hang(url, diff):
+            await asyncio.sleep(60)
+
+        worker.analyzer.analyze_remote = hang
+        started = time.monotonic()
+        with patch("src.worker.ANALYZER_WAIT", 0.05):
+            report = await worker.process_watch(watch)
+
+        assert time.monotonic() - started < 5
+        assert report["analysis_pending"] is True
+        assert worker.analyzer_breaker.failures == 1
+
+    async def test_backfill_completes_and_notifies(self, make_worker):
+        worker, watch = self._worker(make_worker)
+        pending = {"id": "r0", "watch_id": "w0", "diff": "-Prix: 100€\n+Prix: 80€", "analysis_pending": True}
+        worker.db.get_pending_reports.return_value = [pending]
+        worker.db.get_report.return_value = pending
+        worker.analyzer.analyze_remote = AsyncMock(return_value=self._analysis())
+
+        assert await worker.backfill_analyses() == 1
+
+        update = worker.db.update_report.call_args.kwargs
+        assert update == {"ai_summary": "Prix baissé", "ai_importance": "high", "analysis_pending": False}
+        assert worker.notifier.send_alert.call_args.kwargs["summary"] == "Prix baissé"
+        worker.db.mark_report_notified.assert_called_once_with("r0")
+        assert worker._pending() == {}
+
+    async def test_backfill_stops_on_failure_then_gives_up(self, make_worker):
+        worker, watch = self._worker(make_worker)
+        pending = {"id": "r0", "watch_id": "w0", "diff": "-a\n+b", "analysis_pending": True}
+        other = {**pending, "id": "r1"}
+        worker.db.get_pending_reports.return_value = [pending, other]
+        worker.db.get_report.side_effect = {"r0": pending, "r1": other}.get
+        worker.analyzer.analyze_remote = AsyncMock(return_value=self._analysis(error="Mistral error: 500"))
+
+        assert await worker.backfill_analyses() == 0
+        assert worker.analyzer.analyze_remote.await_count == 1
+        worker.db.update_report.assert_called_once_with("r0", analysis_attempts=1)
+
+        # Last attempt: the report is completed without an analysis and the alert goes out
+        pending["analysis_attempts"] = 4
+        worker.analyzer_breaker.record_success()
+        assert await worker.backfill_analyses() == 1
+        worker.db.update_report.assert_any_call(
+            "r0", ai_summary="Analyse non disponible", ai_importance="medium", analysis_pending=False
+        )
+        worker.notifier.send_alert.assert_called_once()
+        assert list(worker._pending()) == ["r1"]